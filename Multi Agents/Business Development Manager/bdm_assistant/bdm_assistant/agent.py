@@ -1,24 +1,62 @@
 # The Root Coordinator Agent for the bdm_assistant system.
 from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
+from google.adk.plugins.base_plugin import BasePlugin
 
-from . import prompt
-# Import all specialist agents that you will define.
-from .sub_agents.market_research_agent import MarketResearchAgent
-from .sub_agents.lead_generation_agent import LeadGenerationAgent
-from .sub_agents.sales_material_agent import SalesMaterialAgent
-from .sub_agents.client_engagement_agent import ClientEngagementAgent
+from . import prompt, tracing
+from .lazy import LazyAgentTool
+from .router import IntentRouter
+from .routes import ROUTES
+from .scheduler import install_scheduler
+from .sessions import session_app
+
+# Specialists are registered lazily: each sub_agent module (and the tools it imports) is only
+# loaded the first time the coordinator delegates to it.
+specialists = [
+    LazyAgentTool(
+        "bdm_assistant.sub_agents.market_research_agent:MarketResearchAgent",
+        name="MarketResearchAgent",
+        description="Researches target markets, industry trends, and potential opportunities for a Business Development Manager.",
+    ),
+    LazyAgentTool(
+        "bdm_assistant.sub_agents.lead_generation_agent:LeadGenerationAgent",
+        name="LeadGenerationAgent",
+        description="Identifies and qualifies potential leads for a Business Development Manager.",
+    ),
+    LazyAgentTool(
+        "bdm_assistant.sub_agents.sales_material_agent:SalesMaterialAgent",
+        name="SalesMaterialAgent",
+        description="Assists in creating sales proposals, presentations, and other client-facing documents for a Business Development Manager.",
+    ),
+    LazyAgentTool(
+        "bdm_assistant.sub_agents.client_engagement_agent:ClientEngagementAgent",
+        name="ClientEngagementAgent",
+        description="Helps manage client communications and relationships for a Business Development Manager.",
+    ),
+]
+
+# Obvious requests go straight to a specialist without a coordinator model call (see router.py).
+intent_router = IntentRouter.from_routes(specialists, ROUTES)
 
-# The root_agent uses the AgentTool model to call specialists.
 root_agent = Agent(
     name="BDMAssistantCoordinator",
     model="gemini-2.5-pro", # Or another powerful model for orchestration
     description="A multi-agent system designed to assist Business Development Managers in New Zealand by automating and streamlining key tasks, allowing them to focus on generating new business.",
     instruction=prompt.COORDINATOR_PROMPT,
-    tools=[
-        AgentTool(agent=MarketResearchAgent),
-        AgentTool(agent=LeadGenerationAgent),
-        AgentTool(agent=SalesMaterialAgent),
-        AgentTool(agent=ClientEngagementAgent),
-    ]
+    tools=[*specialists],
+    before_agent_callback=intent_router.before_agent,
+    after_model_callback=intent_router.after_model,
+    on_model_error_callback=intent_router.on_model_error,
 )
+
+# Every Gemini call waits its turn in one scheduler: per-model quotas, adaptive concurrency, retries on 429
+# and 5xx, and interactive calls ahead of batch ones (see scheduler.py). MODEL_SCHEDULER=off calls models directly.
+scheduler = install_scheduler()
+
+# Set TRACE_PATH, METRICS_PATH or METRICS_PORT to trace every agent, model and tool hop (see tracing.py).
+plugins: list[BasePlugin] = []
+if tracing.enabled():
+    plugins.append(tracing.tracing_plugin_from_env(collectors=(scheduler.metrics.render,) if scheduler else ()))
+
+# Long conversations are compacted once they pass SESSION_TOKEN_BUDGET, and large tool outputs from
+# earlier turns are sent as references into session state (see sessions.py).
+app = session_app(root_agent, app_name="bdm_assistant", plugins=plugins)
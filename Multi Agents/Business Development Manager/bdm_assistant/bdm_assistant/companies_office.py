@@ -0,0 +1,135 @@
+# A single-pass parser for Companies Office search results and a concurrent paginated search.
+import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import quote, urljoin
+
+RESULT_CLASS = "search-result" # Example class, inspect actual site
+_COMPANY_NUMBER = re.compile(r"\((\d{4,})\)|/(\d{4,})(?:[/?#]|$)")
+_STATUS = re.compile(
+    r"\b(Registered(?! office)|Removed|Closed|In Liquidation|In Receivership|Struck Off|Voluntary Administration)\b", re.I
+)
+_PAGE = re.compile(r"[?&]page=(\d+)")
+_LINK = re.compile(r"<a\b[^>]*?\bhref\s*=\s*[\"']?([^\"'\s>]+)", re.I)
+
+@dataclass
+class CompanyRecord:
+    """A single company from a Companies Office search results page."""
+    name: str
+    company_number: str | None
+    status: str | None
+    link: str
+    description: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class _ResultsParser(HTMLParser):
+    """Collects only the fields of result containers; no tree is built."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.records: list[dict] = []
+        self._current: dict | None = None
+        self._depth = 0
+        self._capture: str | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._current is None:
+            if tag == "div" and RESULT_CLASS in (dict(attrs).get("class") or "").split():
+                self._current = {"h3": [], "p": [], "a": None}
+                self._depth = 1
+            return
+        if tag == "div":
+            self._depth += 1
+        elif tag in ("h3", "p") and not self._current[tag]:
+            self._capture = tag
+        elif tag == "a" and self._current["a"] is None:
+            self._current["a"] = dict(attrs).get("href")
+
+    def handle_endtag(self, tag):
+        if self._current is None:
+            return
+        if tag == self._capture:
+            self._capture = None
+        elif tag == "div":
+            self._depth -= 1
+            if self._depth == 0:
+                self.records.append(self._current)
+                self._current = None
+                self._capture = None
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._current[self._capture].append(data)
+
+def _to_record(raw: dict, base_url: str) -> CompanyRecord:
+    title = " ".join("".join(raw["h3"]).split())
+    description = " ".join("".join(raw["p"]).split())
+    link = urljoin(base_url, raw["a"]) if raw["a"] else ""
+    number = _COMPANY_NUMBER.search(title) or _COMPANY_NUMBER.search(link)
+    status = _STATUS.search(description) or _STATUS.search(title)
+    return CompanyRecord(
+        name=re.sub(r"\s*\(\d{4,}\)\s*", " ", title).strip() or "N/A",
+        company_number=next((g for g in number.groups() if g), None) if number else None,
+        status=status.group(1).title() if status else None,
+        link=link,
+        description=description,
+    )
+
+def _last_page(html: str) -> int:
+    """The highest page number any link on the page points at, wherever the pagination sits."""
+    pages = (_PAGE.search(unescape(href)) for href in _LINK.findall(html))
+    return max((int(page.group(1)) for page in pages if page), default=1)
+
+def parse_results_page(html: str, base_url: str) -> tuple[list[CompanyRecord], int]:
+    """Parses one results page into typed records.
+
+    Args:
+        html: The page markup.
+        base_url: Used to turn relative result links into absolute ones.
+
+    Returns:
+        The records on the page and the highest page number linked from its pagination.
+    """
+    # Pagination may sit above or below the results, so its links are scanned across the whole page. Result
+    # containers are recognised by the parser from their class attribute, so the class name turning up in a
+    # script or another class ahead of the results cannot throw it off.
+    parser = _ResultsParser()
+    parser.feed(html)
+    parser.close()
+    return [_to_record(raw, base_url) for raw in parser.records], _last_page(html)
+
+def search(
+    query: str,
+    fetch: Callable[[str, str], str],
+    base_url: str,
+    max_pages: int = 3,
+) -> tuple[list[CompanyRecord], int]:
+    """Fetches the first results page, then any further pages concurrently up to `max_pages`.
+
+    Args:
+        query: The already-normalised search query.
+        fetch: Called as fetch(url, cache_key) and returns the page body.
+        base_url: The Companies Office site root.
+        max_pages: The most result pages to fetch.
+
+    Returns:
+        The records from all fetched pages, in page order, and the number of pages fetched.
+    """
+    search_url = f"{base_url}companies/search?q={quote(query)}"
+    cache_key = f"companies_office:search:{query}"
+    records, last_page = parse_results_page(fetch(search_url, cache_key), base_url)
+    pages = min(last_page, max(max_pages, 1))
+    if pages > 1:
+        def fetch_page(page: int) -> list[CompanyRecord]:
+            html = fetch(f"{search_url}&page={page}", f"{cache_key}:page={page}")
+            return parse_results_page(html, base_url)[0]
+
+        with ThreadPoolExecutor(max_workers=min(pages - 1, 4)) as pool:
+            for page_records in pool.map(fetch_page, range(2, pages + 1)):
+                records.extend(page_records)
+    return records, pages
@@ -0,0 +1,462 @@
+# Bulk lead enrichment: streams a CSV of prospects, dedupes them by normalised company name, looks each one up on the
+# Companies Office and the web at the same time, scores it with fixed rules and writes the results as JSONL. A
+# checkpoint file records every lead written, so an interrupted run resumes where it stopped.
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from typing import (
+    IO,
+    TextIO,
+)
+
+APP_NAME = "bdm_assistant_enrichment"
+USER_ID = "lead_enrichment"
+
+# The first column found under each of these names is used ('Company Name', 'company-name' and 'company_name' all match).
+COLUMNS = {
+    "name": ("company", "company_name", "business", "business_name", "organisation", "organization", "name"),
+    "email": ("email", "email_address", "contact_email"),
+    "phone": ("phone", "phone_number", "mobile", "contact_phone"),
+    "website": ("website", "url", "web", "domain"),
+    "industry": ("industry", "sector", "trade", "category", "description"),
+    "location": ("region", "city", "location", "town", "address"),
+}
+_LEGAL_SUFFIXES = {"limited", "ltd", "inc", "incorporated", "llc", "plc", "pty", "co", "company", "nz", "and"}
+INACTIVE_STATUSES = {"Removed", "Closed", "In Liquidation", "In Receivership", "Struck Off"}
+# Sectors TradieAI sells into: trades and construction first, then the other operations-heavy industries.
+TARGET_INDUSTRIES = (
+    "plumb", "electric", "build", "construct", "roof", "drain", "carpent", "joiner", "landscap", "paint", "tiling",
+    "hvac", "heat pump", "gas fit", "scaffold", "civil", "manufactur", "logistic", "transport", "agri", "engineer",
+)
+DIGITAL_SIGNALS = ("automation", "digital", "software", "online booking", "hiring", "job opening", "expanding", "new branch")
+HOT_SCORE = 60
+WARM_SCORE = 35
+
+def normalise_company_name(name: str) -> str:
+    """The key leads are deduplicated by: lowercase, '&' as 'and', no punctuation and no trailing legal form.
+
+    'Kiwi Plumbing Ltd.', 'KIWI PLUMBING LIMITED' and 'Kiwi  Plumbing (NZ) Limited' all become 'kiwi plumbing'.
+    """
+    words = re.sub(r"[^\w\s]", " ", name.lower().replace("&", " and ")).split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+# --- Leads ---
+
+@dataclass
+class Lead:
+    """One prospect from the uploaded list: its original row, plus the well-known columns (see COLUMNS) found in it."""
+    key: str
+    name: str
+    row: int
+    fields: dict
+    details: dict = field(default_factory=dict)
+
+    def get(self, column: str) -> str:
+        return self.details.get(column, "")
+
+def _column_map(header: Iterable[str]) -> dict[str, str]:
+    """Which of the list's columns holds each well-known column."""
+    lowered = {re.sub(r"[\s-]+", "_", name.strip().lower()): name for name in header if name}
+    return {column: next(lowered[alias] for alias in aliases if alias in lowered)
+            for column, aliases in COLUMNS.items() if any(alias in lowered for alias in aliases)}
+
+def read_leads(path: str) -> Iterator[Lead]:
+    """Streams leads from a CSV file ('-' for stdin) without loading it; rows without a company name are skipped."""
+    if path == "-":
+        yield from _parse_leads(sys.stdin, path)  # Not closed here: stdin belongs to the process
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from _parse_leads(f, path)
+
+def _parse_leads(f: TextIO, path: str) -> Iterator[Lead]:
+    reader = csv.DictReader(f)
+    columns = _column_map(reader.fieldnames or [])
+    if "name" not in columns:
+        raise ValueError(f"{path} has no company name column; expected one of {', '.join(COLUMNS['name'])}")
+    for row, fields in enumerate(reader, start=2):  # Row 1 is the header
+        details = {column: (fields.get(name) or "").strip() for column, name in columns.items()}
+        key = normalise_company_name(details["name"])
+        if key:
+            yield Lead(key=key, name=details["name"], row=row, fields=fields, details=details)
+
+@dataclass
+class EnrichedLead:
+    """A lead with what was found about it and its score."""
+    key: str
+    name: str
+    row: int
+    score: int = 0
+    tier: str = "cold"
+    reasons: list[str] = field(default_factory=list)
+    companies_office: dict = field(default_factory=dict)
+    web: str = ""
+    summary: str = ""
+    latency_s: float = 0.0
+    error: str = ""
+    input: dict = field(default_factory=dict)
+
+# --- Scoring ---
+
+def match_company(key: str, results: list[dict]) -> tuple[dict | None, int]:
+    """The Companies Office record whose normalised name is the lead's, and how many results there were."""
+    return next((r for r in results if normalise_company_name(r.get("name", "")) == key), None), len(results)
+
+def score_lead(lead: Lead, companies_office: dict, web: str) -> tuple[int, str, list[str]]:
+    """Scores a lead with fixed rules, before any model sees it. Returns the score, its tier and the reasons.
+
+    A company the Companies Office lists as removed, closed, struck off or in liquidation or receivership is
+    disqualified outright. Otherwise points are added for a registered match, a target industry, each way to
+    make contact and what the web search shows.
+    """
+    record = companies_office.get("match")
+    if record and record.get("status") in INACTIVE_STATUSES:
+        return 0, "disqualified", [f"Companies Office status: {record['status']}"]
+    score, reasons = 0, []
+
+    def add(points: int, reason: str) -> None:
+        nonlocal score
+        score += points
+        reasons.append(f"{reason} (+{points})")
+
+    if record and record.get("status") == "Registered":
+        add(30, f"registered company {record.get('company_number') or ''}".rstrip())
+    elif record:
+        add(20, "listed on the Companies Office")
+    elif companies_office.get("results"):
+        add(5, "similar names on the Companies Office")
+    industry = f"{lead.get('industry')} {(record or {}).get('description', '')}".lower()
+    if any(word in industry for word in TARGET_INDUSTRIES):
+        add(20, "target industry")
+    for column, points in (("email", 10), ("phone", 5), ("website", 10)):
+        if lead.get(column):
+            add(points, f"has {column}")
+    text = web.lower()
+    if text and all(word in text for word in lead.key.split()[:3]):
+        add(10, "web presence")
+    if any(signal in text for signal in DIGITAL_SIGNALS):
+        add(15, "digital or growth signals")
+    tier = "hot" if score >= HOT_SCORE else "warm" if score >= WARM_SCORE else "cold"
+    return score, tier, reasons
+
+# --- Checkpoint ---
+
+class Checkpoint:
+    """An append-only log of the leads already written, and where the output ended after each one.
+
+    Each line is written after its result is flushed to the output, so on resume the output is cut back to the
+    last checkpointed line (dropping a result written just before an interruption) and nothing is written twice.
+    A lead whose lookups failed is written but not counted as done: a resumed run tries it again, and the later
+    row for that company supersedes the failed one.
+
+    Args:
+        path: The checkpoint file; created on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        self.output_bytes = 0
+        line = ""
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by an interruption; its result was cut from the output too
+                    if entry.get("failed"):
+                        self.done.discard(entry["key"])
+                    else:
+                        self.done.add(entry["key"])
+                    self.output_bytes = entry["end"]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115 - open for the checkpoint's lifetime; close() closes it
+        if line and not line.endswith("\n"):
+            self._file.write("\n")
+
+    def record(self, key: str, end: int, failed: bool = False) -> None:
+        if not failed:
+            self.done.add(key)
+        self.output_bytes = end
+        self._file.write(json.dumps({"key": key, "end": end, **({"failed": True} if failed else {})}) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+# --- Enrichment ---
+
+@dataclass
+class EnrichmentStats:
+    """Running totals for an enrichment run.
+
+    `duplicates` counts rows repeating an earlier row's company, and `resumed` counts the companies a previous
+    run already finished (once each), so a resumed run reports the same duplicates as an uninterrupted one.
+    """
+    started_at: float = field(default_factory=time.perf_counter)
+    enriched: int = 0
+    duplicates: int = 0
+    resumed: int = 0
+    errors: int = 0
+    tiers: dict = field(default_factory=dict)
+
+    def record(self, result: EnrichedLead) -> None:
+        self.enriched += 1
+        self.errors += bool(result.error)
+        self.tiers[result.tier] = self.tiers.get(result.tier, 0) + 1
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "enriched": self.enriched,
+            "skipped_duplicates": self.duplicates,
+            "skipped_already_done": self.resumed,
+            "errors": self.errors,
+            "tiers": self.tiers,
+            "elapsed_s": round(elapsed, 3),
+            "leads_per_s": round(self.enriched / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+class _AgentCaller:
+    """Runs one agent against a fresh session and returns its final text."""
+
+    def __init__(self, agent):
+        from google.adk.apps import App
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(app=App(name=APP_NAME, root_agent=agent), session_service=self.session_service)
+
+    async def __call__(self, text: str) -> str:
+        from google.genai import types
+
+        session = await self.session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=uuid.uuid4().hex)
+        reply = ""
+        try:
+            async for event in self.runner.run_async(
+                user_id=USER_ID, session_id=session.id, new_message=types.Content(role="user", parts=[types.Part(text=text)])
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    reply = "".join(part.text or "" for part in event.content.parts)
+        finally:
+            await self.session_service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session.id)
+        return reply.strip()
+
+def _build_summary_agent():
+    from google.adk.agents import Agent
+
+    from . import prompt
+
+    return Agent(
+        name="LeadSummariser",
+        model="gemini-2.0-flash",
+        description="Summarises why an enriched, scored lead is worth contacting.",
+        instruction=prompt.LEAD_ENRICHMENT_SUMMARY_PROMPT,
+    )
+
+class LeadEnrichment:
+    """Enriches leads concurrently: a Companies Office lookup and a web search per lead, at the same time.
+
+    Companies Office lookups go through the shared fetcher, so they are cached and kept to
+    COMPANIES_OFFICE_RATE_PER_SEC however high `concurrency` is; web searches go through the SearchAgent, its
+    search cache and the model scheduler's batch lane, behind any interactive use.
+
+    Args:
+        concurrency: The most leads in flight at once.
+        web_search: Whether to search the web for each lead; scoring then has only the list and the registry.
+        summarise_min_score: Leads scoring at least this get a short model-written summary; None for no summaries.
+        companies_office: Looks a name up and returns companies_office_direct_search's result; replaceable for testing.
+        search: Searches the web for a query and returns the text found; replaceable for testing.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        web_search: bool = True,
+        summarise_min_score: int | None = None,
+        companies_office: Callable[[str], dict] | None = None,
+        search: Callable[[str], Awaitable[str]] | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.summarise_min_score = summarise_min_score
+        self.companies_office = companies_office or _companies_office_lookup
+        self.search = search if search is not None else (_web_searcher() if web_search else None)
+        self._summarise = _AgentCaller(_build_summary_agent()) if summarise_min_score is not None else None
+        if self.search is not None or self._summarise is not None:
+            from .scheduler import install_scheduler
+
+            install_scheduler()
+        self.stats = EnrichmentStats()
+
+    async def enrich_one(self, lead: Lead) -> EnrichedLead:
+        """Looks the lead up on the Companies Office and the web together, then scores it."""
+        from .scheduler import model_lane
+
+        result = EnrichedLead(key=lead.key, name=lead.name, row=lead.row, input=lead.fields)
+        started = time.perf_counter()
+        try:
+            with model_lane("batch"):
+                query = f"{lead.name} {lead.get('location')} New Zealand".replace("  ", " ")
+                # One source failing still leaves the other to score with; the error is kept on the result.
+                registry, web = await asyncio.gather(
+                    asyncio.to_thread(self.companies_office, lead.name),
+                    self.search(query) if self.search is not None else _no_web_search(),
+                    return_exceptions=True,
+                )
+                errors = []
+                for outcome in (registry, web):
+                    if not isinstance(outcome, BaseException):
+                        continue
+                    if not isinstance(outcome, Exception):
+                        raise outcome  # Cancelled, not a failed lookup
+                    errors.append(f"{type(outcome).__name__}: {outcome}")
+                if isinstance(registry, BaseException):
+                    registry = {}
+                elif registry.get("status") == "error":
+                    errors.append(registry.get("error_message", ""))
+                    registry = {}
+                if isinstance(web, BaseException):
+                    web = ""
+                record, count = match_company(lead.key, registry.get("results", []))
+                result.companies_office = {"match": record, "results": count}
+                result.web = web[:1000]
+                result.score, result.tier, result.reasons = score_lead(lead, result.companies_office, web)
+                result.error = "; ".join(filter(None, errors))
+                min_score = self.summarise_min_score
+                if self._summarise is not None and min_score is not None and result.score >= min_score:
+                    result.summary = await self._summarise(json.dumps({
+                        "lead": lead.fields, "companies_office": record, "web": result.web,
+                        "score": result.score, "reasons": result.reasons,
+                    }, default=str))
+        except Exception as e:  # noqa: BLE001 - one bad lead is recorded, not allowed to stop the run
+            result.error = f"{type(e).__name__}: {e}"
+        result.latency_s = round(time.perf_counter() - started, 3)
+        self.stats.record(result)
+        return result
+
+    async def run(self, leads: Iterable[Lead], done: frozenset = frozenset()) -> AsyncIterator[EnrichedLead]:
+        """Enriches a stream of leads, skipping repeats and those in `done`, yielding each result as it finishes."""
+        self.stats = EnrichmentStats()
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        finished: asyncio.Queue = asyncio.Queue()
+        end = object()
+
+        async def produce() -> None:
+            seen = set()
+            # Reading the leads (a file, or stdin waiting on its writer) blocks, so it happens off the event loop.
+            source = iter(leads)
+            try:
+                while (lead := await asyncio.to_thread(next, source, None)) is not None:
+                    if lead.key in seen:
+                        self.stats.duplicates += 1
+                        continue
+                    seen.add(lead.key)
+                    if lead.key in done:
+                        self.stats.resumed += 1
+                        continue
+                    await pending.put(lead)
+            finally:
+                for _ in range(self.concurrency):
+                    await pending.put(end)
+
+        async def work() -> None:
+            while (lead := await pending.get()) is not end:
+                await finished.put(await self.enrich_one(lead))
+            await finished.put(end)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            remaining = self.concurrency
+            while remaining:
+                item = await finished.get()
+                if item is end:
+                    remaining -= 1
+                else:
+                    yield item
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+async def enrich_csv(input_path: str, output_path: str, checkpoint_path: str | None = None,
+                     enrichment: LeadEnrichment | None = None) -> dict:
+    """Enriches a CSV of leads into a JSONL file, resuming from the checkpoint (OUTPUT.checkpoint by default).
+
+    Returns:
+        The run's summary (see EnrichmentStats.summary).
+    """
+    enrichment = enrichment or LeadEnrichment()
+    checkpoint, out = await asyncio.to_thread(_open_output, output_path, checkpoint_path or f"{output_path}.checkpoint")
+    try:
+        with out:
+            async for result in enrichment.run(read_leads(input_path), frozenset(checkpoint.done)):
+                out.write((json.dumps(asdict(result), default=str) + "\n").encode("utf-8"))
+                out.flush()
+                checkpoint.record(result.key, out.tell(), failed=bool(result.error))
+    finally:
+        checkpoint.close()
+    return enrichment.stats.summary()
+
+def _open_output(output_path: str, checkpoint_path: str) -> tuple[Checkpoint, IO[bytes]]:
+    """Opens the checkpoint and the output, cut back to the last checkpointed result and ready to append to."""
+    checkpoint = Checkpoint(checkpoint_path)
+    exists = os.path.exists(output_path)
+    size = os.path.getsize(output_path) if exists else 0
+    if size and not checkpoint.output_bytes:
+        checkpoint.close()
+        raise FileExistsError(f"{output_path} already has results but no checkpoint; remove it or pick another output")
+    if size < checkpoint.output_bytes:  # Resuming would skip leads whose results are no longer there
+        checkpoint.close()
+        raise FileNotFoundError(f"{output_path} is missing results its checkpoint records; restore it or remove "
+                                f"{checkpoint.path} to start over")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    out = open(output_path, "r+b" if exists else "wb")  # noqa: SIM115 - closed by enrich_csv once the run ends
+    out.truncate(checkpoint.output_bytes)  # Drops a result written after the last checkpoint line
+    out.seek(checkpoint.output_bytes)
+    return checkpoint, out
+
+# --- Default Lookups ---
+
+async def _no_web_search() -> str:
+    return ""
+
+def _companies_office_lookup(name: str) -> dict:
+    from .tools import companies_office_direct_search
+
+    return companies_office_direct_search(name, max_pages=1)
+
+def _web_searcher() -> Callable[[str], Awaitable[str]]:
+    from .tools import SearchAgent
+
+    return _AgentCaller(SearchAgent)
+
+# --- Command Line Entry Point ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich and score a CSV of leads (one company per row) into JSONL.")
+    parser.add_argument("input", help="The CSV of leads, with a company name column, or '-' for stdin.")
+    parser.add_argument("output", help="The JSONL file to write; an interrupted run resumes into it.")
+    parser.add_argument("--checkpoint", help="The checkpoint file (default: OUTPUT.checkpoint).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum leads in flight at once.")
+    parser.add_argument("--no-web", action="store_true", help="Skip the web search; use the list and the registry only.")
+    parser.add_argument("--summarise-min-score", type=int, help=f"Summarise leads scoring at least this (hot is {HOT_SCORE}).")
+    args = parser.parse_args()
+    enrichment = LeadEnrichment(args.concurrency, web_search=not args.no_web, summarise_min_score=args.summarise_min_score)
+    summary = asyncio.run(enrich_csv(args.input, args.output, args.checkpoint, enrichment))
+    print(json.dumps({"summary": summary}), file=sys.stderr)
@@ -0,0 +1,228 @@
+# A shared HTTP fetch layer: pooled keep-alive connections, a persistent TTL cache and polite rate limiting.
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bdm_assistant", "http_cache.sqlite")
+USER_AGENT = "bdm_assistant/0.1 (+https://tradieai.co.nz)"
+
+def normalise_query(query: str) -> str:
+    """Lowercases and collapses whitespace so trivially different queries share a cache entry."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+# --- Rate Limiting ---
+
+class TokenBucket:
+    """A thread-safe token bucket that blocks callers until a token is available.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: The maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes `tokens` from the bucket, sleeping as needed. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+# --- Persistent Cache ---
+
+@dataclass
+class CachedResponse:
+    """A response body plus the validators needed to revalidate it."""
+    status: int
+    text: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+class SQLiteCache:
+    """An on-disk response cache with size-bounded least-recently-used eviction.
+
+    Args:
+        path: The SQLite database file, or ':memory:'.
+        max_bytes: The total body size to keep before evicting the least recently used entries.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 50 * 1024 * 1024):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+        self.evictions = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse(*row)
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        size = len(response.text.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status, response.text, response.etag, response.last_modified,
+                 response.fetched_at, time.time(), size),
+            )
+            self._evict()
+
+    def touch(self, key: str, fetched_at: float) -> None:
+        """Marks an entry as freshly validated without rewriting its body."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ?, last_access = ? WHERE key = ?", (fetched_at, time.time(), key)
+            )
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+# --- Fetcher ---
+
+class CachedFetcher:
+    """Fetches pages through one pooled session, a TTL cache and a token-bucket rate limiter.
+
+    Args:
+        cache: The response cache to use.
+        ttl: Seconds a cached response is served without contacting the server.
+        rate: Requests per second allowed to the upstream host.
+        burst: How many requests may be sent back-to-back before the rate applies.
+        pool_size: The number of keep-alive connections to hold open.
+        timeout: The per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        cache: SQLiteCache | None = None,
+        ttl: float = 24 * 3600,
+        rate: float = 1.0,
+        burst: float = 3.0,
+        pool_size: int = 8,
+        timeout: float = 10.0,
+    ):
+        self.cache = cache if cache is not None else SQLiteCache()
+        self.ttl = ttl
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate=rate, capacity=burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+        self._lock = threading.Lock()
+        self.counters = {
+            "hits": 0, "misses": 0, "revalidated": 0, "fetched": 0, "stale": 0, "rate_limited_s": 0.0,
+        }
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def get(self, url: str, cache_key: str | None = None) -> str:
+        """Returns the body for `url`, serving from cache or revalidating where possible.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails and there is no cached copy
+                to fall back on.
+        """
+        key = cache_key or url
+        cached = self.cache.get(key)
+        now = time.time()
+        if cached and now - cached.fetched_at < self.ttl:
+            self._count("hits")
+            return cached.text
+
+        self._count("misses")
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        self._count("rate_limited_s", self.limiter.acquire())
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cached:
+                self._count("revalidated")
+                self.cache.touch(key, now)
+                return cached.text
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            if cached is None:
+                raise
+            self._count("stale")
+            return cached.text
+        self._count("fetched")
+        self.cache.put(key, CachedResponse(
+            status=response.status_code,
+            text=response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=now,
+        ))
+        return response.text
+
+    def stats(self) -> dict:
+        """Returns cache hit/miss counts and time spent waiting on the rate limiter."""
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["evictions"] = self.cache.evictions
+        return stats
+
+    def close(self) -> None:
+        self.session.close()
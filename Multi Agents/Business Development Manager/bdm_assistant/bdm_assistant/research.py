@@ -0,0 +1,143 @@
+# Parallel research: independent research branches run at the same time under a ParallelAgent, each writing its
+# findings to its own session state key with its own deadline, so one slow source never holds up the synthesis.
+# The same module ships with the marketing and BDM packages (kept identical by sync_shared.py).
+import asyncio
+import inspect
+import logging
+import os
+from collections.abc import AsyncGenerator, Callable
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai.errors import APIError
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# How a research source fails when it is down or unusable: a network, timeout or file error (requests' errors are
+# OSErrors too), a model call that failed after the scheduler's retries, or a reply or record that would not parse.
+# A branch failing with one of these leaves a note; anything else is a bug and is raised.
+SOURCE_ERRORS: tuple[type[Exception], ...] = (OSError, APIError, ValueError)
+
+def branch_timeout() -> float:
+    """Seconds each research branch gets (RESEARCH_BRANCH_TIMEOUT)."""
+    return float(os.getenv("RESEARCH_BRANCH_TIMEOUT", "30"))
+
+def _request_text(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    return "".join(part.text or "" for part in content.parts or []) if content else ""
+
+def _final_text(event: Event) -> str:
+    if not event.is_final_response() or not event.content:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts or [] if not part.thought)
+
+class FunctionBranch(BaseAgent):
+    """A research branch that is a plain function of the request text, so it costs no model call.
+
+    Blocking functions run in a worker thread; coroutine functions are awaited.
+
+    Args:
+        function: Called with the request text; returns the findings.
+        output_key: The session state key for the findings (set by `parallel_research`).
+    """
+
+    function: Callable[[str], object]
+    output_key: str = "findings"
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if inspect.iscoroutinefunction(self.function):
+            result = await self.function(_request_text(ctx))
+        else:
+            result = await asyncio.to_thread(self.function, _request_text(ctx))
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch, actions=EventActions(
+            state_delta={self.output_key: str(result)},
+        ))
+
+class TimeboxedBranch(BaseAgent):
+    """Runs one research agent with a deadline and always leaves something under `output_key`.
+
+    An LLM branch writes its answer through its own output_key. If the branch overruns, fails or finishes
+    without an answer, a short note is written instead so the synthesiser knows the source is missing.
+
+    Args:
+        output_key: The session state key for the branch's findings.
+        timeout_s: Seconds the branch may take.
+    """
+
+    output_key: str
+    timeout_s: float = 30.0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = self.sub_agents[0]
+        # The branch runs start to finish in one task (its tracing context must not hop tasks), handing its
+        # events over through a queue; `_DONE` marks the end, after which the task holds the branch's error if it
+        # failed. Each event waits until it has been yielded on, so the runner records it before the branch carries on.
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for event in agent.run_async(ctx):
+                    consumed = asyncio.Event()
+                    await queue.put((event, consumed))
+                    await consumed.wait()
+            finally:
+                queue.put_nowait(_DONE)
+
+        task = asyncio.create_task(pump())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_s
+        written, last_text, note = False, "", None
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+                if item is _DONE:
+                    try:
+                        await task
+                    except SOURCE_ERRORS as e:  # A failing source must not sink the other branches.
+                        logger.warning("Research branch %s failed: %s", agent.name, e)
+                        note = f"({agent.name} failed: {e})"
+                    break
+                event, consumed = item
+                written = written or self.output_key in event.actions.state_delta
+                last_text = _final_text(event) or last_text
+                yield event
+                consumed.set()
+        except asyncio.TimeoutError:
+            logger.warning("Research branch %s timed out after %.1fs", agent.name, self.timeout_s)
+            note = f"({agent.name} did not finish within {self.timeout_s:g}s; carry on without it.)"
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if note is None and not written:
+            note = last_text or f"({agent.name} found nothing.)"
+        if note is not None:
+            yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch, actions=EventActions(
+                state_delta={self.output_key: note},
+            ))
+
+def parallel_research(
+    name: str,
+    branches: dict[str, BaseAgent],
+    timeouts: dict[str, float] | None = None,
+    description: str = "",
+) -> ParallelAgent:
+    """Builds a ParallelAgent that runs every branch at once, storing each one's findings under its state key.
+
+    Args:
+        name: The parallel agent's name.
+        branches: State key -> the agent that researches it; each agent's output_key is set to its key.
+        timeouts: Per-key deadlines in seconds; the rest get RESEARCH_BRANCH_TIMEOUT.
+    """
+    timeouts = timeouts or {}
+    wrapped: list[BaseAgent] = []
+    for key, agent in branches.items():
+        if isinstance(agent, (LlmAgent, FunctionBranch)):
+            agent.output_key = key
+        wrapped.append(TimeboxedBranch(
+            name=f"{agent.name}Deadline", output_key=key, timeout_s=timeouts.get(key, branch_timeout()), sub_agents=[agent],
+        ))
+    return ParallelAgent(name=name, description=description or "Runs independent research at the same time.", sub_agents=wrapped)
@@ -0,0 +1,292 @@
+# A local intent router that sends obvious requests straight to a specialist, skipping the coordinator's model call.
+# The same module ships with each of the four agent packages (kept identical by sync_shared.py);
+# each package's routes live in routes.py.
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "could", "do", "for", "from", "have", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "our", "please", "the", "this", "that", "to", "us", "we", "what",
+    "with", "you", "your",
+})
+
+def tokenize(text: str) -> list[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+@dataclass
+class Route:
+    """One specialist the router can dispatch to.
+
+    Args:
+        agent: The specialist's name, matching its AgentTool.
+        patterns: Regular expressions (case-insensitive) that clearly identify the specialist's requests.
+        examples: Example requests used to build the specialist's centroid.
+    """
+    agent: str
+    patterns: list[str] = field(default_factory=list)
+    examples: list[str] = field(default_factory=list)
+
+@dataclass
+class Prediction:
+    agent: str
+    stage: str
+    confidence: float
+    scores: dict = field(default_factory=dict)
+
+class Stage(Protocol):
+    """A routing stage returns a confident Prediction, or None to defer to the next stage."""
+
+    def predict(self, text: str) -> Prediction | None: ...
+
+# --- Stages ---
+
+class KeywordStage:
+    """Routes when the request matches the patterns of exactly one specialist."""
+
+    name = "keyword"
+
+    def __init__(self, routes: list[Route]):
+        self._patterns = {
+            route.agent: [re.compile(pattern, re.I) for pattern in route.patterns] for route in routes
+        }
+
+    def predict(self, text: str) -> Prediction | None:
+        hits = {agent: sum(1 for p in patterns if p.search(text)) for agent, patterns in self._patterns.items()}
+        hits = {agent: count for agent, count in hits.items() if count}
+        if len(hits) != 1:
+            return None
+        return Prediction(next(iter(hits)), self.name, 1.0, hits)
+
+class CentroidStage:
+    """A TF-IDF nearest-centroid classifier over each route's example requests.
+
+    Args:
+        routes: The routes whose examples form the centroids.
+        min_similarity: The cosine similarity the best centroid must reach.
+        margin: How far the best centroid must lead the runner-up.
+    """
+
+    name = "centroid"
+
+    def __init__(self, routes: list[Route], min_similarity: float = 0.3, margin: float = 0.1):
+        self.min_similarity = min_similarity
+        self.margin = margin
+        documents = [(route.agent, tokenize(example)) for route in routes for example in route.examples]
+        document_frequency = Counter(word for _, words in documents for word in set(words))
+        self._idf = {word: math.log((1 + len(documents)) / (1 + df)) + 1 for word, df in document_frequency.items()}
+        self._centroids: dict[str, dict[str, float]] = {}
+        for route in routes:
+            centroid: Counter[str] = Counter()
+            for agent, words in documents:
+                if agent == route.agent:
+                    centroid.update(self._vector(words))
+            if centroid:
+                self._centroids[route.agent] = self._normalise(centroid)
+
+    def _vector(self, words: list[str]) -> dict[str, float]:
+        counts = Counter(word for word in words if word in self._idf)
+        return self._normalise({word: (1 + math.log(n)) * self._idf[word] for word, n in counts.items()})
+
+    @staticmethod
+    def _normalise(vector: Mapping[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {word: value / norm for word, value in vector.items()} if norm else {}
+
+    def predict(self, text: str) -> Prediction | None:
+        vector = self._vector(tokenize(text))
+        if not vector or not self._centroids:
+            return None
+        scores = {
+            agent: round(sum(value * centroid.get(word, 0.0) for word, value in vector.items()), 4)
+            for agent, centroid in self._centroids.items()
+        }
+        ranked = [*sorted(scores.values(), reverse=True), 0.0]
+        best = max(scores, key=lambda agent: scores[agent])
+        if ranked[0] < self.min_similarity or ranked[0] - ranked[1] < self.margin:
+            return None
+        return Prediction(best, self.name, ranked[0], scores)
+
+# --- Router ---
+
+class IntentRouter:
+    """Picks a specialist locally and, when confident, runs it instead of the coordinator's model.
+
+    Attach `before_agent`, `after_model` and `on_model_error` to the coordinator. In "on" mode a confident decision
+    dispatches straight to the specialist's AgentTool; otherwise, and always in "shadow" mode, the
+    coordinator's model runs and the tool it chose is logged next to the router's decision so routing
+    accuracy can be measured offline with `python -m <package>.router eval <log>`.
+
+    Args:
+        tools: The coordinator's specialist AgentTools.
+        stages: Routing stages, tried in order until one is confident.
+        mode: "on", "shadow" or "off".
+        log_path: Optional JSONL file for routing decisions.
+        first_turn_only: Only route a session's first request, where no conversation context is lost.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[AgentTool],
+        stages: list[Stage],
+        mode: str = "on",
+        log_path: str | None = None,
+        first_turn_only: bool = True,
+    ):
+        self.tools = {tool.name: tool for tool in tools}
+        self.stages = stages
+        self.mode = mode
+        self.log_path = log_path
+        self.first_turn_only = first_turn_only
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.counters = {"dispatched": 0, "fallback": 0}
+
+    @classmethod
+    def from_routes(cls, tools: Sequence[AgentTool], routes: list[Route], **kwargs) -> "IntentRouter":
+        """Builds the keyword then centroid router, configured from INTENT_ROUTER_MODE and INTENT_ROUTER_LOG_PATH."""
+        kwargs.setdefault("mode", os.getenv("INTENT_ROUTER_MODE", "on").lower())
+        kwargs.setdefault("log_path", os.getenv("INTENT_ROUTER_LOG_PATH") or None)
+        return cls(tools, [KeywordStage(routes), CentroidStage(routes)], **kwargs)
+
+    def route(self, text: str) -> Prediction | None:
+        for stage in self.stages:
+            prediction = stage.predict(text)
+            if prediction is not None and prediction.agent in self.tools:
+                return prediction
+        return None
+
+    def _log(self, record: dict) -> None:
+        logger.debug("Routing decision: %s", record)
+        if not self.log_path:
+            return
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    async def before_agent(self, callback_context: CallbackContext) -> types.Content | None:
+        """Runs a confidently-routed request on its specialist, skipping the coordinator's model."""
+        if self.mode == "off":
+            return None
+        content = callback_context.user_content
+        text = "".join(part.text or "" for part in content.parts or []) if content else ""
+        if not text.strip():
+            return None
+        if self.first_turn_only and any(event.author != "user" for event in callback_context.session.events):
+            return None
+        prediction = self.route(text)
+        record = {
+            "timestamp": time.time(),
+            "request": text,
+            "router": prediction.agent if prediction else None,
+            "stage": prediction.stage if prediction else None,
+            "confidence": prediction.confidence if prediction else None,
+            "scores": prediction.scores if prediction else {},
+        }
+        if prediction is None or self.mode != "on":
+            with self._lock:
+                self.counters["fallback"] += 1
+                self._pending[callback_context.invocation_id] = record
+            return None
+        with self._lock:
+            self.counters["dispatched"] += 1
+        self._log({**record, "dispatched": True})
+        # A callback context is also a valid tool context, so the specialist runs exactly as if the
+        # coordinator's model had called it.
+        reply = await self.tools[prediction.agent].run_async(args={"request": text}, tool_context=callback_context)
+        return types.Content(role="model", parts=[types.Part(text=reply if isinstance(reply, str) else json.dumps(reply))])
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        """Logs which specialist the coordinator's model chose for a request the router did not dispatch."""
+        if llm_response.partial or not llm_response.content:
+            return None
+        calls = [part.function_call.name for part in llm_response.content.parts or [] if part.function_call]
+        with self._lock:
+            record = self._pending.pop(callback_context.invocation_id, None)
+        if record is not None:
+            self._log({**record, "dispatched": False, "llm": calls[0] if calls else None})
+        return None
+
+    def on_model_error(
+        self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> LlmResponse | None:
+        """Drops the pending decision when the coordinator's model call raises, logging it without a label."""
+        with self._lock:
+            record = self._pending.pop(callback_context.invocation_id, None)
+        if record is not None:
+            self._log({**record, "dispatched": False, "llm": None, "error": type(error).__name__})
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        total = counters["dispatched"] + counters["fallback"]
+        return {**counters, "dispatch_rate": round(counters["dispatched"] / total, 4) if total else 0.0}
+
+# --- Offline Evaluation ---
+
+def evaluate(records: list[dict]) -> dict:
+    """Scores logged router decisions against the choices the coordinator's model made for the same requests.
+
+    Returns:
+        Coverage (share of requests the router was confident on) and accuracy (agreement with the model
+        where both made a choice), overall and per stage.
+    """
+    labelled = [r for r in records if r.get("llm")]
+    routed = [r for r in labelled if r.get("router")]
+    by_stage: dict[str, list[bool]] = {}
+    for record in routed:
+        by_stage.setdefault(record["stage"], []).append(record["router"] == record["llm"])
+    return {
+        "labelled": len(labelled),
+        "coverage": round(len(routed) / len(labelled), 4) if labelled else 0.0,
+        "accuracy": round(sum(sum(v) for v in by_stage.values()) / len(routed), 4) if routed else None,
+        "by_stage": {stage: {"routed": len(v), "accuracy": round(sum(v) / len(v), 4)} for stage, v in by_stage.items()},
+        "dispatched": sum(1 for r in records if r.get("dispatched")),
+    }
+
+def replay(router: IntentRouter, records: list[dict]) -> list[dict]:
+    """Re-routes recorded requests with `router`, e.g. to score changed routes against past traffic."""
+    replayed = []
+    for record in records:
+        prediction = router.route(record["request"])
+        replayed.append({
+            **record,
+            "router": prediction.agent if prediction else None,
+            "stage": prediction.stage if prediction else None,
+            "confidence": prediction.confidence if prediction else None,
+        })
+    return replayed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure routing accuracy against a decision log.")
+    parser.add_argument("command", choices=["eval"])
+    parser.add_argument("log", help="A JSONL file written via INTENT_ROUTER_LOG_PATH (run in shadow mode to label every request).")
+    parser.add_argument("--replay", action="store_true", help="Re-route the logged requests with the current routes first.")
+    args = parser.parse_args()
+
+    with open(args.log, encoding="utf-8") as f:
+        logged = [json.loads(line) for line in f if line.strip()]
+    if args.replay:
+        from . import agent
+        intent_router: IntentRouter | None = getattr(agent, "intent_router", None)
+        if intent_router is None:
+            parser.error("this app's root agent has no intent router")
+        logged = replay(intent_router, logged)
+    print(json.dumps(evaluate(logged), indent=2))
@@ -0,0 +1,73 @@
+# Routing rules for the local intent router, mirroring the delegation bullets in COORDINATOR_PROMPT.
+# A keyword match skips the coordinator, so patterns name the task (a verb and its object, or a phrase) rather
+# than a single word a request might only mention in passing; anything vaguer is left to the centroid examples.
+from .router import Route
+
+ROUTES = [
+    Route(
+        agent="MarketResearchAgent",
+        patterns=[
+            r"\bmarket research\b",
+            r"\bresearch (the )?(market|industry|sector)",
+            r"\bindustry trends?\b",
+            r"\bmarket (size|share|trends?|analysis|opportunit)",
+            r"\badoption rates?\b",
+        ],
+        examples=[
+            "Research the current adoption rates of AI solutions in the New Zealand construction industry.",
+            "What are the latest trends in the NZ hospitality sector?",
+            "Find market opportunities for bespoke AI agents in agriculture.",
+            "How big is the market for automation software among Auckland tradies?",
+            "Give me an overview of industry trends in residential building.",
+        ],
+    ),
+    Route(
+        agent="LeadGenerationAgent",
+        patterns=[
+            r"\b(find|generate|identify|source|list)\b.*\b(leads|prospects)\b",
+            r"\b(lead generation|sales leads|lead lists?)\b",
+            r"^\s*(please\s+)?qualify\b",
+            r"\bdecision[- ]makers?\b",
+        ],
+        examples=[
+            "Find potential leads for AI consulting in Wellington.",
+            "Identify construction companies in Christchurch that could be prospects.",
+            "Qualify this list of companies for our services.",
+            "Who are the decision makers at Fletcher Building?",
+            "Look up the directors of Acme Plumbing Limited on the Companies Office.",
+        ],
+    ),
+    Route(
+        agent="SalesMaterialAgent",
+        patterns=[
+            r"\bsales proposals?\b",
+            r"\b(draft|write|prepare|create)\b.*\b(proposal|presentation)\b",
+            r"\bpitch (deck|presentation)\b",
+            r"\bone[- ]pager\b",
+            r"\bcase stud(y|ies)\b",
+        ],
+        examples=[
+            "Draft a sales proposal for a bespoke ADK agent for a mid-sized builder.",
+            "Create a pitch deck outline for our AI automation services.",
+            "Write a one-pager explaining our offering for accountants.",
+            "Prepare a presentation for a meeting with an engineering firm.",
+            "Write a case study about our work with a plumbing company.",
+        ],
+    ),
+    Route(
+        agent="ClientEngagementAgent",
+        patterns=[
+            r"\bfollow[- ]up (email|message|call|note)s?\b",
+            r"\bcheck[- ]in (email|message|call)\b",
+            r"\bclient (relationship|communication|meeting)s?\b",
+            r"\bthank[- ]you (email|note|message)\b",
+        ],
+        examples=[
+            "Write a follow-up email to the client we met last week.",
+            "Draft a check-in message for our existing clients.",
+            "How should I manage my relationship with a client who has gone quiet?",
+            "Send a thank-you note after today's meeting.",
+            "Schedule regular touchpoints with our top clients.",
+        ],
+    ),
+]
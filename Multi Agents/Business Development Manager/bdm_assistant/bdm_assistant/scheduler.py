@@ -0,0 +1,480 @@
+# Model-call scheduling: every Gemini call an agent makes waits its turn here. Each model has token buckets for
+# requests and tokens per minute and an adaptive (AIMD) concurrency limit; throttled (429) and server (5xx) errors
+# are retried with jittered backoff; and waiting calls are served by lane, so interactive requests go ahead of
+# batch jobs. The same module ships with each of the four agent packages (kept identical by sync_shared.py).
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai.errors import APIError
+
+logger = logging.getLogger(__name__)
+
+LANES = ("interactive", "background", "batch")  # Served in this order
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Published per-project limits for the models the agents use: requests and tokens per minute.
+DEFAULT_QUOTAS: dict[str, tuple[float, float]] = {
+    "gemini-2.5-pro": (150, 2_000_000),
+    "gemini-2.5-flash": (1000, 1_000_000),
+    "gemini-2.0-flash": (2000, 4_000_000),
+}
+FALLBACK_QUOTA = (150, 1_000_000)
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("model_lane", default="interactive")
+
+@contextmanager
+def model_lane(lane: str) -> Iterator[None]:
+    """Runs the model calls made inside the block (and in tasks started from it) in `lane`."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane {lane!r}; expected one of {', '.join(LANES)}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """A rough prompt size (about four characters per token), charged up front and corrected from the usage reported."""
+    chars = 0
+    config = llm_request.config
+    if config is not None and isinstance(config.system_instruction, str):
+        chars += len(config.system_instruction)
+    for tool in (config.tools or []) if config is not None else []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            chars += len(json.dumps(declaration.model_dump(exclude_none=True), default=str))
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return max(1, chars // 4)
+
+# --- Limits ---
+
+class TokenBucket:
+    """Refills at `per_minute / 60` a second up to `capacity` (a minute's worth by default).
+
+    A bucket may be charged past empty when a call turns out larger than estimated; later calls then wait
+    until it has refilled.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (amounts over the capacity wait for a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+class AimdLimit:
+    """Additive-increase, multiplicative-decrease limit, on concurrency or on the request rate.
+
+    Each successful call raises the limit by 1/limit (about one a round of calls); a throttled call halves it,
+    at most once per `cooldown_s`, so a burst of 429s from one round counts once.
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 32, decrease: float = 0.5,
+                 cooldown_s: float = 1.0):
+        self.limit = initial
+        self.minimum, self.maximum, self.decrease, self.cooldown_s = minimum, maximum, decrease, cooldown_s
+        self._last_decrease = float("-inf")
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self, now: float) -> bool:
+        """Lowers the limit unless it was lowered within the cooldown; True if it was lowered."""
+        if now - self._last_decrease < self.cooldown_s:
+            return False
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._last_decrease = now
+        return True
+
+@dataclass
+class Quota:
+    """One model's limits. `burst_s` is how many seconds of quota may be spent at once (a minute's worth by default)."""
+    requests_per_minute: float
+    tokens_per_minute: float
+    initial_concurrency: float = 4
+    max_concurrency: float = 32
+    burst_s: float = 60
+
+def quotas_from_env() -> dict[str, Quota]:
+    """Per-model quotas: DEFAULT_QUOTAS, overridden by MODEL_QUOTAS ('gemini-2.5-pro=150/2000000,...' as rpm/tpm)."""
+    maximum = float(os.getenv("MODEL_MAX_CONCURRENCY", "32"))
+    initial = min(float(os.getenv("MODEL_INITIAL_CONCURRENCY", "4")), maximum)
+    limits = dict(DEFAULT_QUOTAS)
+    for item in filter(None, (item.strip() for item in os.getenv("MODEL_QUOTAS", "").split(","))):
+        model, _, value = item.partition("=")
+        rpm, _, tpm = value.partition("/")
+        limits[model.strip()] = (float(rpm), float(tpm or limits.get(model.strip(), FALLBACK_QUOTA)[1]))
+    return {model: Quota(rpm, tpm, initial, maximum) for model, (rpm, tpm) in limits.items()}
+
+# --- Per-Model Queue ---
+
+class ModelQueue:
+    """The calls waiting for, and holding, one model's capacity.
+
+    Waiting calls are admitted strictly by lane, then in arrival order, once a concurrency slot is free and both
+    buckets can pay for them. When only the buckets are short, one timer re-checks when they will have refilled.
+    Throttling lowers the concurrency limit and the request rate together (the quota may be shared with other
+    clients, or lower than configured); successes raise both back towards the quota.
+
+    Calls may wait on any number of event loops at once (e.g. `adk web` and a thread running `asyncio.run`).
+    They share the buckets, the limits and the lane order, and each is woken on its own loop. Calls waiting on a
+    loop that has closed are dropped, and the slots its calls held are freed.
+    """
+
+    def __init__(self, model: str, quota: Quota, metrics: "SchedulerMetrics"):
+        self.model = model
+        self.requests = TokenBucket(quota.requests_per_minute, quota.requests_per_minute * quota.burst_s / 60)
+        self.tokens = TokenBucket(quota.tokens_per_minute, quota.tokens_per_minute * quota.burst_s / 60)
+        self.limit = AimdLimit(initial=quota.initial_concurrency, maximum=quota.max_concurrency)
+        self.pace = AimdLimit(initial=self.requests.rate, minimum=min(self.requests.rate, 0.1), maximum=self.requests.rate)
+        self.metrics = metrics
+        self._held: dict[asyncio.AbstractEventLoop, int] = {}  # Slots held by calls on each loop
+        self._waiting: list[tuple[int, int, asyncio.Future, int]] = []
+        self._order = itertools.count()
+        self._timer: tuple[asyncio.AbstractEventLoop, asyncio.Handle] | None = None  # The refill wake-up
+        self._lock = threading.RLock()  # Held while the queue changes, so the metrics thread reads it whole
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(self._held.values())
+
+    def depth(self, lane: str) -> int:
+        with self._lock:
+            return sum(1 for index, _, future, _ in self._waiting if LANES[index] == lane and not future.done())
+
+    def snapshot(self) -> dict:
+        """Queue depth per lane, calls in flight, the concurrency limit and the request rate, read together."""
+        with self._lock:
+            return {"depth": {lane: self.depth(lane) for lane in LANES}, "in_flight": self.in_flight,
+                    "limit": self.limit.limit, "rate": self.pace.limit}
+
+    async def acquire(self, tokens: int, lane: str) -> float:
+        """Waits for a slot; returns the seconds waited."""
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            heapq.heappush(self._waiting, (LANES.index(lane), next(self._order), future, tokens))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():  # Admitted just as the caller gave up
+                self.release("cancelled", tokens, None)
+            raise
+        waited = time.monotonic() - started
+        self.metrics.observe_wait(self.model, lane, waited)
+        return waited
+
+    def release(self, outcome: str, estimated: int, used: int | None) -> None:
+        """Frees the slot, adapts the limit to the outcome and charges the tokens the call really used."""
+        now = time.monotonic()
+        with self._lock:
+            loop = _running_loop()
+            if loop is not None and self._held.get(loop):
+                self._held[loop] -= 1
+            if outcome == "ok":
+                self.limit.on_success()
+                self.pace.on_success()
+            elif outcome == "throttled":
+                self.limit.on_throttle(now)
+                if self.pace.on_throttle(now):
+                    self.requests.level = min(self.requests.level, 0.0)  # No burst until the rate has recovered
+            self.requests.rate = self.pace.limit
+            if used is not None and used != estimated:
+                self.tokens.take(used - estimated, now)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            self._admit()
+
+    def _admit(self) -> None:
+        now = time.monotonic()
+        for loop in [loop for loop in self._held if loop.is_closed()]:  # Its calls can no longer finish
+            del self._held[loop]
+        if self._timer is not None and self._timer[0].is_closed():
+            self._timer = None
+        while self._waiting and self.in_flight < int(self.limit.limit):
+            _, _, future, tokens = self._waiting[0]
+            loop = future.get_loop()
+            if future.done() or loop.is_closed():  # Cancelled while waiting, or left by a loop that has closed
+                heapq.heappop(self._waiting)
+                continue
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                if self._timer is None:
+                    self._wake_later(loop, wait)
+                return
+            heapq.heappop(self._waiting)
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            self._held[loop] = self._held.get(loop, 0) + 1
+            if loop is _running_loop():
+                future.set_result(None)
+            elif not _call_soon_threadsafe(loop, self._admitted, future, tokens):
+                self._held[loop] -= 1
+
+    def _admitted(self, future: asyncio.Future, tokens: int) -> None:
+        """Wakes a call admitted from another loop's thread, on its own loop."""
+        if future.done():  # Cancelled before it could be woken: hand the slot back
+            self.release("cancelled", tokens, None)
+        else:
+            future.set_result(None)
+
+    def _wake_later(self, loop: asyncio.AbstractEventLoop, wait: float) -> None:
+        """Re-checks the queue once the buckets have refilled, on the loop of the call waiting for them."""
+        if loop is _running_loop():
+            self._timer = (loop, loop.call_later(wait, self._wake))
+        else:  # Timers are not thread-safe: the loop's own thread sets the timer when it re-checks
+            handle = _call_soon_threadsafe(loop, self._wake)
+            self._timer = (loop, handle) if handle is not None else None
+
+    def _wake(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._admit()
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback: Callable, *args) -> asyncio.Handle | None:
+    """Schedules `callback` on another thread's loop; None if that loop closed in the meantime."""
+    try:
+        return loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        return None
+
+# --- Metrics ---
+
+class SchedulerMetrics:
+    """Queue depth, in-flight calls, concurrency limits, wait times and call outcomes, in the Prometheus format."""
+
+    def __init__(self, buckets: tuple = WAIT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._waits: dict[tuple[str, str], list] = {}
+        self._outcomes: dict[tuple[str, str], int] = {}
+        self._queues: Callable[[], dict[str, ModelQueue]] = dict
+
+    def observe_wait(self, model: str, lane: str, seconds: float) -> None:
+        with self._lock:
+            counts = self._waits.setdefault((model, lane), [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += seconds
+
+    def count(self, model: str, outcome: str) -> None:
+        with self._lock:
+            self._outcomes[(model, outcome)] = self._outcomes.get((model, outcome), 0) + 1
+
+    def outcomes(self) -> dict[str, int]:
+        with self._lock:
+            totals: dict[str, int] = {}
+            for (_, outcome), count in self._outcomes.items():
+                totals[outcome] = totals.get(outcome, 0) + count
+        return totals
+
+    def wait_percentile(self, lane: str, q: float) -> float | None:
+        """The upper bucket bound below which `q` of the lane's waits fell (None before any wait)."""
+        with self._lock:
+            rows = [counts for (_, name), counts in self._waits.items() if name == lane]
+        total = sum(counts[-2] for counts in rows)
+        if not total:
+            return None
+        for i, bound in enumerate(self.buckets):
+            if sum(counts[i] for counts in rows) >= q * total:
+                return bound
+        return float("inf")
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format. Safe to call from another thread."""
+        queues = {model: queue.snapshot() for model, queue in sorted(self._queues().items())}
+        lines = [
+            "# HELP tradie_ai_model_queue_depth Model calls waiting for capacity.",
+            "# TYPE tradie_ai_model_queue_depth gauge",
+        ]
+        for model, queue in queues.items():
+            for lane in LANES:
+                lines.append(f'tradie_ai_model_queue_depth{{model="{model}",lane="{lane}"}} {queue["depth"][lane]}')
+        lines += ["# HELP tradie_ai_model_in_flight Model calls being made.", "# TYPE tradie_ai_model_in_flight gauge"]
+        lines += [f'tradie_ai_model_in_flight{{model="{model}"}} {queue["in_flight"]}' for model, queue in queues.items()]
+        lines += ["# HELP tradie_ai_model_concurrency_limit The adaptive concurrency limit.",
+                  "# TYPE tradie_ai_model_concurrency_limit gauge"]
+        lines += [f'tradie_ai_model_concurrency_limit{{model="{model}"}} {queue["limit"]:.2f}' for model, queue in queues.items()]
+        lines += ["# HELP tradie_ai_model_request_rate The adaptive request rate, per second.",
+                  "# TYPE tradie_ai_model_request_rate gauge"]
+        lines += [f'tradie_ai_model_request_rate{{model="{model}"}} {queue["rate"]:.3f}' for model, queue in queues.items()]
+        lines += ["# HELP tradie_ai_model_wait_seconds Time model calls waited for capacity.",
+                  "# TYPE tradie_ai_model_wait_seconds histogram"]
+        with self._lock:
+            for (model, lane), counts in sorted(self._waits.items()):
+                labels = f'model="{model}",lane="{lane}"'
+                for bound, count in zip(self.buckets, counts, strict=False):
+                    lines.append(f'tradie_ai_model_wait_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'tradie_ai_model_wait_seconds_bucket{{{labels},le="+Inf"}} {counts[-2]}')
+                lines.append(f"tradie_ai_model_wait_seconds_count{{{labels}}} {counts[-2]}")
+                lines.append(f"tradie_ai_model_wait_seconds_sum{{{labels}}} {counts[-1]:.6f}")
+            lines += ["# HELP tradie_ai_model_calls_total Model call attempts by outcome.",
+                      "# TYPE tradie_ai_model_calls_total counter"]
+            for (model, outcome), count in sorted(self._outcomes.items()):
+                lines.append(f'tradie_ai_model_calls_total{{model="{model}",outcome="{outcome}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+# --- Scheduler ---
+
+def _retry_after(error: APIError) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+class ModelScheduler:
+    """Admits, retries and meters every model call, per model.
+
+    Args:
+        quotas: Per-model quotas; models not listed get FALLBACK_QUOTA.
+        attempts: Tries per call, counting the first (MODEL_RETRY_ATTEMPTS).
+        base_delay_s: First backoff ceiling; it doubles each retry up to `max_delay_s` and the delay is drawn
+            uniformly below it ("full jitter"). A Retry-After header, when sent, is the minimum.
+        max_delay_s: The largest backoff (MODEL_RETRY_MAX_DELAY).
+    """
+
+    def __init__(self, quotas: dict[str, Quota] | None = None, attempts: int = 5, base_delay_s: float = 1.0,
+                 max_delay_s: float = 30.0):
+        self.quotas = quotas if quotas is not None else quotas_from_env()
+        self.attempts = attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.metrics = SchedulerMetrics()
+        self.metrics._queues = self._snapshot_queues
+        self._queues: dict[str, ModelQueue] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, model: str) -> ModelQueue:
+        model = model.rsplit("/", 1)[-1]
+        with self._lock:
+            if model not in self._queues:
+                default = self.quotas.get("*") or Quota(*FALLBACK_QUOTA)
+                self._queues[model] = ModelQueue(model, self.quotas.get(model, default), self.metrics)
+            return self._queues[model]
+
+    def _snapshot_queues(self) -> dict[str, ModelQueue]:
+        with self._lock:
+            return dict(self._queues)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        ceiling = min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1))
+        return max(random.uniform(0, ceiling), retry_after or 0.0)
+
+    async def call(self, model: str, llm_request: LlmRequest,
+                   send: Callable[[], AsyncGenerator[LlmResponse, None]]) -> AsyncGenerator[LlmResponse, None]:
+        """Runs `send()` once capacity allows, retrying throttled and server errors until a response has been yielded."""
+        queue = self.queue(model)
+        lane = _lane.get()
+        estimated = estimate_tokens(llm_request)
+        for attempt in range(1, self.attempts + 1):
+            await queue.acquire(estimated, lane)
+            outcome, used, yielded, delay = "error", None, False, 0.0
+            try:
+                async for response in send():
+                    if response.usage_metadata and response.usage_metadata.total_token_count:
+                        used = response.usage_metadata.total_token_count
+                    yielded = True
+                    yield response
+                outcome = "ok"
+                return
+            except APIError as e:
+                if e.code == 429:
+                    outcome = "throttled"
+                elif e.code and e.code >= 500:
+                    outcome = "server_error"
+                if e.code not in RETRYABLE_CODES or yielded or attempt == self.attempts:
+                    raise
+                delay = self.backoff(attempt, _retry_after(e))
+                logger.info("%s call %s (%s); retry %d in %.2fs", queue.model, outcome, e.code, attempt, delay)
+            except GeneratorExit:  # The caller stopped reading; after a response, that is its usual way to finish
+                outcome = "ok" if yielded else "cancelled"
+                raise
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                self.metrics.count(queue.model, outcome)
+                queue.release(outcome, estimated, used)
+            await asyncio.sleep(delay)
+
+class ScheduledGemini(Gemini):
+    """Gemini, with each call admitted, retried and metered by the installed ModelScheduler."""
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        scheduler = _scheduler or install_scheduler()
+        if scheduler is None:  # MODEL_SCHEDULER=off since it was installed
+            async for response in Gemini.generate_content_async(self, llm_request, stream):
+                yield response
+            return
+        async for response in scheduler.call(llm_request.model or self.model, llm_request,
+                                             lambda: Gemini.generate_content_async(self, llm_request, stream)):
+            yield response
+
+# --- Opt-out ---
+
+_scheduler: ModelScheduler | None = None
+
+def install_scheduler(scheduler: ModelScheduler | None = None) -> ModelScheduler | None:
+    """Routes every agent whose model is a Gemini model name through one shared scheduler.
+
+    Registers ScheduledGemini for Gemini's model names, so agents need no change. Configured from MODEL_QUOTAS,
+    MODEL_MAX_CONCURRENCY, MODEL_INITIAL_CONCURRENCY, MODEL_RETRY_ATTEMPTS and MODEL_RETRY_MAX_DELAY; returns
+    None (and installs nothing) when MODEL_SCHEDULER=off.
+    """
+    global _scheduler  # noqa: PLW0603 - one scheduler per process, shared by every agent
+    if os.getenv("MODEL_SCHEDULER", "on").lower() == "off":
+        return None
+    if scheduler is not None or _scheduler is None:
+        _scheduler = scheduler or ModelScheduler(
+            attempts=int(os.getenv("MODEL_RETRY_ATTEMPTS", "5")),
+            max_delay_s=float(os.getenv("MODEL_RETRY_MAX_DELAY", "30")),
+        )
+        LLMRegistry.register(ScheduledGemini)
+    return _scheduler
@@ -1,7 +1,10 @@
 # A specialist agent for managing client communications and relationships.
 from google.adk.agents import Agent
+
 from bdm_assistant import prompt
-from bdm_assistant.tools import my_custom_tool # Example: A custom tool for CRM interaction or email drafting
+from bdm_assistant.tools import (
+    my_custom_tool,  # Example: A custom tool for CRM interaction or email drafting
+)
 
 ClientEngagementAgent = Agent(
     name="ClientEngagementAgent",
@@ -1,9 +1,10 @@
 # A specialist agent for identifying and qualifying potential leads.
 from google.adk.agents import Agent
-from bdm_assistant import prompt
-from bdm_assistant.tools import SearchAgent # Import tools from the central file
 from google.adk.tools.agent_tool import AgentTool
 
+from bdm_assistant import prompt
+from bdm_assistant.tools import SearchAgent  # Import tools from the central file
+
 LeadGenerationAgent = Agent(
     name="LeadGenerationAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
@@ -1,16 +1,42 @@
 # A specialist agent for researching target markets, industry trends, and potential opportunities.
-from google.adk.agents import Agent
+# The web and the Companies Office are searched at the same time, then a summariser answers from both.
+from google.adk.agents import Agent, SequentialAgent
+from google.adk.tools import google_search
+
 from bdm_assistant import prompt
-from bdm_assistant.tools import SearchAgent, CompaniesOfficeDirectSearchAgent # Import both search agents
-from google.adk.tools.agent_tool import AgentTool
+from bdm_assistant.research import parallel_research
+from bdm_assistant.tools import search_companies_office
 
-MarketResearchAgent = Agent(
-    name="MarketResearchAgent",
+# Not behind the search cache: the branch researches the whole conversation, so the latest message
+# (e.g. 'go ahead') is no key for its answer.
+web_research = Agent(
+    name="MarketWebResearch",
+    model="gemini-2.0-flash",
+    description="Researches markets, industry trends and opportunities on the web.",
+    instruction=prompt.MARKET_RESEARCH_WEB_PROMPT,
+    tools=[google_search],
+)
+
+companies_office_research = Agent(
+    name="MarketCompaniesOfficeResearch",
+    model="gemini-2.0-flash",
+    description="Looks up the companies a request is about on the New Zealand Companies Office.",
+    instruction=prompt.MARKET_RESEARCH_COMPANIES_OFFICE_PROMPT,
+    tools=[search_companies_office],  # Async, so the web branch and the deadline keep running
+)
+
+MarketResearchSummarizer = Agent(
+    name="MarketResearchSummarizer",
     model="gemini-2.0-flash", # A focused, cost-effective model
-    description="Researches target markets, industry trends, and potential opportunities for a Business Development Manager.",
+    description="Answers market research requests from the gathered research.",
     instruction=prompt.MARKET_RESEARCH_PROMPT,
-    tools=[
-        AgentTool(agent=SearchAgent), # General web search
-        AgentTool(agent=CompaniesOfficeDirectSearchAgent) # Targeted Companies Office direct search
-    ]
+)
+
+MarketResearchAgent = SequentialAgent(
+    name="MarketResearchAgent",
+    description="Researches target markets, industry trends, and potential opportunities for a Business Development Manager.",
+    sub_agents=[
+        parallel_research("MarketResearch", {"research_web": web_research, "research_companies_office": companies_office_research}),
+        MarketResearchSummarizer,
+    ],
 )
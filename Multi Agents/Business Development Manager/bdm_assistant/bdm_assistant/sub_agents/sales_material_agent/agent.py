@@ -1,7 +1,10 @@
 # A specialist agent for creating sales proposals, presentations, and other client-facing documents.
 from google.adk.agents import Agent
+
 from bdm_assistant import prompt
-from bdm_assistant.tools import my_custom_tool # Example: A custom tool for generating sales content
+from bdm_assistant.tools import (
+    my_custom_tool,  # Example: A custom tool for generating sales content
+)
 
 SalesMaterialAgent = Agent(
     name="SalesMaterialAgent",
@@ -1,9 +1,27 @@
 # Central repository for all tools and tool-agents.
-import requests
-from bs4 import BeautifulSoup
+# Heavy imports (requests, sqlite caches) and the tool-agents are only built on first use.
+import asyncio
+import os
+from functools import cache
+
 from google.adk.agents import Agent
 from google.adk.tools import google_search
-from google.adk.tools.agent_tool import AgentTool # Import AgentTool for agent-as-a-tool pattern
+
+from .lazy import LazyAttributes
+from .search_cache import SearchCallbacks
+
+COMPANIES_OFFICE_BASE_URL = os.getenv("COMPANIES_OFFICE_BASE_URL", "https://www.companiesoffice.govt.nz/")
+
+@cache
+def get_companies_office_fetcher():
+    """Returns the one pooled, cached and rate-limited fetcher shared by every Companies Office lookup."""
+    from .fetch import DEFAULT_CACHE_PATH, CachedFetcher, SQLiteCache
+
+    return CachedFetcher(
+        cache=SQLiteCache(os.getenv("BDM_HTTP_CACHE_PATH", DEFAULT_CACHE_PATH)),
+        ttl=float(os.getenv("COMPANIES_OFFICE_CACHE_TTL", "86400")),
+        rate=float(os.getenv("COMPANIES_OFFICE_RATE_PER_SEC", "1.0")),
+    )
 
 # --- Custom Function Tools ---
 
@@ -12,67 +30,101 @@ def my_custom_tool(param: str) -> str:
     # Tool logic goes here
     return f"Input was {param}"
 
-def companies_office_direct_search(query: str) -> str:
+def companies_office_direct_search(query: str, max_pages: int = 3) -> dict:
     """Performs a direct search on the New Zealand Companies Office website for company information.
 
     Args:
         query: The search query (e.g., company name, director name).
+        max_pages: The maximum number of result pages to fetch.
 
     Returns:
-        A string containing the search results, or an error message.
+        A dict with a 'status' of 'success' or 'error'. On success, 'results' is a list of
+        companies with name, company_number, status, link and description.
     """
-    base_url = "https://www.companiesoffice.govt.nz/"
-    search_url = f"{base_url}companies/search?q={requests.utils.quote(query)}"
+    import requests
 
-    try:
-        response = requests.get(search_url, timeout=10)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
+    from . import companies_office
+    from .fetch import normalise_query
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    fetcher = get_companies_office_fetcher()
+    try:
+        records, pages = companies_office.search(
+            normalise_query(query),
+            fetch=lambda url, key: fetcher.get(url, cache_key=key),
+            base_url=COMPANIES_OFFICE_BASE_URL,
+            max_pages=max_pages,
+        )
+    except requests.exceptions.RequestException as e:
+        return {"status": "error", "error_message": f"Error during Companies Office direct search: {e}"}
+    except Exception as e:
+        return {"status": "error", "error_message": f"An unexpected error occurred during Companies Office direct search: {e}"}
 
-        # Attempt to find search results. This part is highly dependent on the website's HTML structure.
-        # This is a simplified example and may need adjustment based on actual Companies Office HTML.
-        results = soup.find_all('div', class_='search-result') # Example class, inspect actual site
+    if not records:
+        return {"status": "success", "results": [], "message": f"No direct search results found on Companies Office for '{query}'."}
+    return {"status": "success", "pages_fetched": pages, "results": [record.to_dict() for record in records]}
 
-        if not results:
-            return f"No direct search results found on Companies Office for '{query}'."
+async def search_companies_office(query: str, max_pages: int = 3) -> dict:
+    """Searches the New Zealand Companies Office website for company information.
 
-        output = []
-        for result in results:
-            title = result.find('h3').text.strip() if result.find('h3') else 'N/A'
-            link = result.find('a')['href'] if result.find('a') else 'N/A'
-            description = result.find('p').text.strip() if result.find('p') else 'N/A'
-            output.append(f"Title: {title}\nLink: {base_url}{link}\nDescription: {description}\n---")
+    Runs companies_office_direct_search in a worker thread: its page fetches and rate limiting block, and ADK
+    runs synchronous tools on the event loop, where they would hold up every other agent.
 
-        return "\n".join(output)
+    Args:
+        query: The search query (e.g., company name, director name).
+        max_pages: The maximum number of result pages to fetch.
 
-    except requests.exceptions.RequestException as e:
-        return f"Error during Companies Office direct search: {e}"
-    except Exception as e:
-        return f"An unexpected error occurred during Companies Office direct search: {e}"
+    Returns:
+        A dict with a 'status' of 'success' or 'error'. On success, 'results' is a list of
+        companies with name, company_number, status, link and description.
+    """
+    return await asyncio.to_thread(companies_office_direct_search, query, max_pages)
 
 # --- Agent-as-a-Tool Definitions ---
 
-SearchAgent = Agent(
-    name="SearchAgent",
-    model="gemini-2.0-flash",
-    description="Performs a general Google web search.",
-    tools=[google_search],
-)
+# Search agents sit behind the shared search cache, so repeated or concurrent identical queries cost one search.
+web_search_cache = SearchCallbacks(namespace="web")
+companies_office_search_cache = SearchCallbacks(namespace="site:companiesoffice.govt.nz")
+
+# Each tool-agent is built the first time it is imported or accessed, e.g. `from bdm_assistant.tools import SearchAgent`.
+def _build_search_agent() -> Agent:
+    return Agent(
+        name="SearchAgent",
+        model="gemini-2.0-flash",
+        description="Performs a general Google web search.",
+        tools=[google_search],
+        before_agent_callback=web_search_cache.before_agent,
+        after_model_callback=web_search_cache.after_model,
+        after_agent_callback=web_search_cache.after_agent,
+        on_model_error_callback=web_search_cache.on_model_error,
+    )
 
 # New Agent for Companies Office Search (Google indexed)
-CompaniesOfficeSearchAgent = Agent(
-    name="CompaniesOfficeSearchAgent",
-    model="gemini-2.0-flash",
-    description="Performs a targeted search within the New Zealand Companies Office website (companiesoffice.govt.nz) using Google's index.",
-    instruction="When using this tool, append 'site:companiesoffice.govt.nz' to your search query to ensure results are limited to the Companies Office website.",
-    tools=[google_search], # Still uses google_search, but the prompt will guide its usage
-)
+def _build_companies_office_search_agent() -> Agent:
+    return Agent(
+        name="CompaniesOfficeSearchAgent",
+        model="gemini-2.0-flash",
+        description="Performs a targeted search within the New Zealand Companies Office website (companiesoffice.govt.nz) using Google's index.",
+        instruction="When using this tool, append 'site:companiesoffice.govt.nz' to your search query to ensure results are limited to the Companies Office website.",
+        tools=[google_search], # Still uses google_search, but the prompt will guide its usage
+        before_agent_callback=companies_office_search_cache.before_agent,
+        after_model_callback=companies_office_search_cache.after_model,
+        after_agent_callback=companies_office_search_cache.after_agent,
+        on_model_error_callback=companies_office_search_cache.on_model_error,
+    )
 
 # New Agent for Companies Office Direct Search
-CompaniesOfficeDirectSearchAgent = Agent(
-    name="CompaniesOfficeDirectSearchAgent",
-    model="gemini-2.0-flash",
-    description="Performs a direct search on the New Zealand Companies Office website for company information, such as registration details or director information.",
-    tools=[companies_office_direct_search],
+def _build_companies_office_direct_search_agent() -> Agent:
+    return Agent(
+        name="CompaniesOfficeDirectSearchAgent",
+        model="gemini-2.0-flash",
+        description="Performs a direct search on the New Zealand Companies Office website for company information, such as registration details or director information.",
+        tools=[search_companies_office],  # Async, so its page fetches don't hold up the event loop
+    )
+
+_lazy = LazyAttributes(
+    globals(),
+    SearchAgent=_build_search_agent,
+    CompaniesOfficeSearchAgent=_build_companies_office_search_agent,
+    CompaniesOfficeDirectSearchAgent=_build_companies_office_direct_search_agent,
 )
+__getattr__ = _lazy.__getattr__
@@ -0,0 +1,51 @@
+# Offline benchmarks for bdm_assistant: a market-research request against scripted models.
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from harness import Call, Reply, Workload, main
+
+REQUEST = (
+    "Research the current adoption rates of AI solutions in the New Zealand construction industry, "
+    "specifically identifying companies that might be early adopters of bespoke ADK agents."
+)
+SEARCH_ANSWER = (
+    "Surveys from 2024 put AI adoption in NZ construction at around 12%, concentrated in firms with over 50 staff. "
+    "Early adopters include mid-sized Auckland and Christchurch builders investing in estimating and scheduling software."
+)
+COMPANIES_ANSWER = (
+    "Companies Office: Hawkins Construction Ltd and Naylor Love Construction Ltd are registered and active, "
+    "each with over 200 staff and offices in Auckland and Christchurch."
+)
+SUMMARY = (
+    "AI adoption in NZ construction is early (about 12%), led by mid-sized builders already digitising estimating "
+    "and scheduling. Target firms with 50+ staff in Auckland and Christchurch first."
+)
+
+def _root():
+    from bdm_assistant.agent import root_agent
+    return root_agent
+
+def _reset_search_cache():
+    from bdm_assistant.search_cache import search_cache
+    search_cache.clear()
+
+WORKLOADS = [
+    Workload(
+        name="bdm_market_research",
+        root_agent=_root,
+        message=REQUEST,
+        scripts={
+            "BDMAssistantCoordinator": [Call("MarketResearchAgent", {"request": REQUEST}), Reply(SUMMARY)],
+            "MarketWebResearch": [Reply(SEARCH_ANSWER)],
+            "MarketCompaniesOfficeResearch": [Reply(COMPANIES_ANSWER)],
+            "MarketResearchSummarizer": [Reply(SUMMARY)],
+        },
+        reset=_reset_search_cache,
+    ),
+]
+
+if __name__ == "__main__":
+    main(WORKLOADS, default_output=str(pathlib.Path(__file__).parent / "results.jsonl"))
@@ -0,0 +1,54 @@
+"""Micro-benchmark: parse time per Companies Office results page, over the saved HTML fixtures."""
+import argparse
+import json
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from bdm_assistant.companies_office import parse_results_page
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+BASE_URL = "https://www.companiesoffice.govt.nz/"
+
+def _bs4_baseline(html: str) -> list[dict]:
+    """The previous implementation: a full BeautifulSoup tree and two find() calls per field."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    output = []
+    for result in soup.find_all("div", class_="search-result"):
+        output.append({
+            "title": result.find("h3").text.strip() if result.find("h3") else "N/A",
+            "link": result.find("a")["href"] if result.find("a") else "N/A",
+            "description": result.find("p").text.strip() if result.find("p") else "N/A",
+        })
+    return output
+
+def bench(number: int) -> list[dict]:
+    try:
+        import bs4  # noqa: F401
+        parsers = {"single_pass": lambda html: parse_results_page(html, BASE_URL), "bs4_baseline": _bs4_baseline}
+    except ImportError:
+        parsers = {"single_pass": lambda html: parse_results_page(html, BASE_URL)}
+    results = []
+    for fixture in sorted(FIXTURES.glob("companies_office_search_*.html")):
+        html = fixture.read_text(encoding="utf-8")
+        for name, parse in parsers.items():
+            best = min(timeit.repeat(lambda parse=parse, html=html: parse(html), number=number, repeat=5)) / number
+            results.append({
+                "benchmark": "companies_office_parse",
+                "fixture": fixture.name,
+                "parser": name,
+                "bytes": len(html),
+                "ms_per_page": round(best * 1000, 4),
+            })
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=50, help="Parses per timing sample.")
+    args = parser.parse_args()
+    for row in bench(args.number):
+        print(json.dumps(row))
@@ -0,0 +1,129 @@
+# Measures bulk lead enrichment (enrich.py) on a synthetic prospect list with repeated companies, with stand-in
+# Companies Office and web lookups that take a fixed time. Compares one lead at a time (as through the
+# LeadGenerationAgent) with concurrent enrichment, then interrupts a run part way and resumes it from its checkpoint.
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from bdm_assistant.enrich import LeadEnrichment, enrich_csv
+
+TRADES = ["Plumbing", "Electrical", "Builders", "Roofing", "Drainage", "Landscaping", "Accounting", "Cafe", "Joinery"]
+PLACES = ["Kiwi", "Southern", "Harbour", "Summit", "Totara", "Pacific", "Alpine", "Coastal", "Rimu", "Kauri"]
+REGIONS = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Tauranga", "Dunedin"]
+STATUSES = ["Registered"] * 8 + ["Removed", "In Liquidation"]
+
+def write_leads(path: str, count: int, duplicate_rate: float, seed: int = 7) -> int:
+    """Writes `count` rows, about `duplicate_rate` of them repeating an earlier company under another spelling."""
+    rng = random.Random(seed)
+    names: list[str] = []
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Company Name", "Industry", "Region", "Email", "Phone", "Website"])
+        for i in range(count):
+            if names and rng.random() < duplicate_rate:
+                name = rng.choice(names).upper().replace(" LIMITED", " Ltd.")
+            else:
+                name = f"{rng.choice(PLACES)} {TRADES[i % len(TRADES)]} {i} Limited"
+                names.append(name)
+            writer.writerow([
+                name, TRADES[i % len(TRADES)], rng.choice(REGIONS),
+                f"info@lead{i}.co.nz" if rng.random() < 0.6 else "", "09 555 0000" if rng.random() < 0.5 else "",
+                f"https://lead{i}.co.nz" if rng.random() < 0.4 else "",
+            ])
+    return len(names)
+
+def stand_ins(registry_s: float, web_s: float):
+    """A Companies Office lookup (blocking, like the real one) and a web search (async, like the SearchAgent)."""
+    def companies_office(name: str) -> dict:
+        time.sleep(registry_s)
+        number = zlib.crc32(name.encode()) % 10_000_000
+        return {"status": "success", "results": [
+            {"name": name, "company_number": str(number), "status": STATUSES[number % len(STATUSES)], "description": ""},
+            {"name": f"{name} Holdings Limited", "company_number": str(number + 1), "status": "Registered", "description": ""},
+        ]}
+
+    async def search(query: str) -> str:
+        await asyncio.sleep(web_s)
+        name = query.rsplit(" ", 2)[0] if "New Zealand" in query else query
+        return f"{name} is a local business. " + ("They are hiring and expanding." if len(query) % 3 == 0 else "")
+
+    return companies_office, search
+
+def lines(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def head(path: str, out: str, rows: int) -> None:
+    """Copies the header and the first `rows` leads of a CSV."""
+    with open(path, encoding="utf-8") as src, open(out, "w", encoding="utf-8") as dst:
+        dst.writelines(line for _, line in zip(range(rows + 1), src, strict=False))
+
+async def run(args, tmp: str) -> list[dict]:
+    leads = os.path.join(tmp, "leads.csv")
+    unique = write_leads(leads, args.leads, args.duplicates)
+    companies_office, search = stand_ins(args.registry_ms / 1000, args.web_ms / 1000)
+    results = []
+
+    # One lead at a time over a sample, as qualifying them through the LeadGenerationAgent would.
+    sample = os.path.join(tmp, "sample.csv")
+    head(leads, sample, args.sample)
+    sequential = await enrich_csv(sample, os.path.join(tmp, "sequential.jsonl"), enrichment=LeadEnrichment(
+        concurrency=1, companies_office=companies_office, search=search))
+    results.append({"benchmark": "enrich", "mode": "sequential_sample", "leads": args.sample, **sequential,
+                    "projected_full_run_s": round(unique / sequential["leads_per_s"], 1)})
+
+    output = os.path.join(tmp, "leads.jsonl")
+    full = await enrich_csv(leads, output, enrichment=LeadEnrichment(
+        concurrency=args.concurrency, companies_office=companies_office, search=search))
+    results.append({"benchmark": "enrich", "mode": f"concurrent_{args.concurrency}", "rows": args.leads, **full})
+
+    # Interrupted part way (as by Ctrl-C), then resumed from the checkpoint.
+    output = os.path.join(tmp, "resumed.jsonl")
+    task = asyncio.create_task(enrich_csv(leads, output, enrichment=LeadEnrichment(
+        concurrency=args.concurrency, companies_office=companies_office, search=search)))
+    await asyncio.sleep(full["elapsed_s"] * args.interrupt_at)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    before = len(lines(output))
+    resumed = await enrich_csv(leads, output, enrichment=LeadEnrichment(
+        concurrency=args.concurrency, companies_office=companies_office, search=search))
+    written = lines(output)
+    keys = [row["key"] for row in written]
+    results.append({
+        "benchmark": "enrich", "mode": "interrupted_and_resumed", "rows": args.leads, "written_before_interrupt": before,
+        **resumed, "output_rows": len(written), "unique_companies": unique, "duplicate_rows_in_output": len(keys) - len(set(keys)),
+    })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk lead enrichment throughput and checkpoint/resume.")
+    parser.add_argument("--leads", type=int, default=10_000)
+    parser.add_argument("--duplicates", type=float, default=0.12, help="Share of rows repeating an earlier company.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sample", type=int, default=200, help="Leads enriched one at a time for the baseline.")
+    parser.add_argument("--registry-ms", type=float, default=30, help="Time a Companies Office lookup takes.")
+    parser.add_argument("--web-ms", type=float, default=150, help="Time a web search takes.")
+    parser.add_argument("--interrupt-at", type=float, default=0.4, help="Share of the full run's time before interrupting.")
+    parser.add_argument("--output", default=str(pathlib.Path(__file__).resolve().parent / "results.jsonl"))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args, tmp))
+    with open(args.output, "a", encoding="utf-8") as out:
+        for result in results:
+            print(json.dumps(result))
+            out.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
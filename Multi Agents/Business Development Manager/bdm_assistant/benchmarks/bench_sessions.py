@@ -0,0 +1,152 @@
+# Measures the coordinator's prompt size over a long conversation: one session, many turns, each bringing back a
+# Companies Office dump from the LeadGenerationAgent. Compares the default in-memory session, where the history
+# grows with every turn, with the SQLite session and compaction from sessions.py, then restarts the latter.
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncGenerator
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+os.environ["INTENT_ROUTER_MODE"] = "off"  # Every turn goes through the coordinator's model, whose prompt is measured
+
+from google.adk.apps import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from harness import Recorder, _request_tokens, estimate_tokens, install_scripted_models
+
+from bdm_assistant import sessions
+
+REGIONS = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Tauranga", "Dunedin", "Napier", "Nelson"]
+
+def companies_office_dump(turn: int) -> str:
+    """About 6 KB of search results, as a Companies Office lookup returns them."""
+    region = REGIONS[turn % len(REGIONS)]
+    return "\n".join(
+        f"{region} Builders {turn}-{i} Limited | NZBN 94290{turn:03d}{i:05d} | Registered | Incorporated 20{i % 24:02d}-03-1{i % 9} | "
+        f"Directors: A. Smith, B. Jones | Address: {i} Main Road, {region}"
+        for i in range(40)
+    )
+
+class TurnLlm(BaseLlm):
+    """The coordinator: delegates each new request once, then answers from what came back.
+
+    Unlike the harness's ScriptedLlm, the step depends only on the current turn, so one session can run any
+    number of turns.
+    """
+
+    recorder: object = None
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        last = llm_request.contents[-1]
+        answered = any(part.function_response for part in last.parts or [])
+        if answered:
+            part = types.Part(text="Here are the strongest leads from that search, with directors to contact first. " * 6)
+        else:
+            request = next(part.text for part in last.parts if part.text)
+            part = types.Part(function_call=types.FunctionCall(name="LeadGenerationAgent", args={"request": request}))
+        prompt_tokens = _request_tokens(llm_request)
+        self.recorder.hops.append((answered, prompt_tokens))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=estimate_tokens(part.text or "call"),
+            ),
+        )
+
+class DumpLlm(BaseLlm):
+    """The LeadGenerationAgent: returns a different Companies Office dump each call."""
+
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=companies_office_dump(self.calls))]))
+
+def build(compacted: bool, recorder: Recorder) -> App:
+    from bdm_assistant.agent import root_agent
+
+    install_scripted_models(root_agent, {}, Recorder(), 0.0, 0.0)
+    root_agent.model = TurnLlm(model="gemini-2.5-pro", recorder=recorder)
+    for tool in root_agent.tools:
+        if getattr(tool, "name", "") == "LeadGenerationAgent":
+            tool.agent.model = DumpLlm(model="gemini-2.5-flash")
+    if compacted:
+        return sessions.session_app(root_agent, app_name="bdm_assistant")
+    return App(name="bdm_assistant", root_agent=root_agent)
+
+async def converse(runner: Runner, session_id: str, turns: range, recorder: Recorder) -> list[dict]:
+    rows = []
+    for turn in turns:
+        recorder.hops.clear()
+        started = time.perf_counter()
+        message = f"Find more leads for AI consulting in {REGIONS[turn % len(REGIONS)]}, batch {turn}."
+        async for _ in runner.run_async(user_id="bench", session_id=session_id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=message)])):
+            pass
+        rows.append({
+            "turn": turn + 1,
+            "prompt_tokens": sum(tokens for _, tokens in recorder.hops),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    return rows
+
+async def run(turns: int, db_path: str) -> list[dict]:
+    results = []
+    for mode in ("in_memory", "sqlite_compacted"):
+        recorder = Recorder()
+        app = build(mode == "sqlite_compacted", recorder)
+        service = sessions.session_service(db_path) if mode == "sqlite_compacted" else InMemorySessionService()
+        session = await service.create_session(app_name=app.name, user_id="bench")
+        rows = await converse(Runner(app=app, session_service=service), session.id, range(turns), recorder)
+        result = summarise(mode, rows)
+        if mode == "sqlite_compacted":
+            # A restart: a new service and runner over the same file pick the conversation up where it was.
+            service = sessions.session_service(db_path)
+            restored = await service.get_session(app_name=app.name, user_id="bench", session_id=session.id)
+            after = await converse(Runner(app=build(True, recorder), session_service=service), session.id, range(turns, turns + 1), recorder)
+            result.update(restored_events=len(restored.events), after_restart_prompt_tokens=after[0]["prompt_tokens"],
+                          db_kb=round(await asyncio.to_thread(os.path.getsize, db_path) / 1024))
+        results.append(result)
+    return results
+
+def summarise(mode: str, rows: list[dict]) -> dict:
+    tokens = [row["prompt_tokens"] for row in rows]
+    return {
+        "benchmark": "sessions",
+        "mode": mode,
+        "turns": len(rows),
+        "prompt_tokens_turn_1": tokens[0],
+        "prompt_tokens_turn_10": tokens[min(9, len(tokens) - 1)],
+        "prompt_tokens_last": tokens[-1],
+        "prompt_tokens_max": max(tokens),
+        "prompt_tokens_total": sum(tokens),
+        "latency_ms_p50": round(statistics.median(row["latency_ms"] for row in rows), 2),
+        "latency_ms_last": rows[-1]["latency_ms"],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coordinator prompt size over a long conversation, with and without compaction.")
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--output", default=str(pathlib.Path(__file__).parent / "results.jsonl"))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args.turns, os.path.join(tmp, "sessions.sqlite")))
+    with open(args.output, "a", encoding="utf-8") as out:
+        for result in results:
+            print(json.dumps(result))
+            out.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# The Companies Office results parser (companies_office.py): typed records, pagination found wherever the
+# page puts it, and result containers told apart from other mentions of their class. Plus the async lookup tool, which must leave the event loop free while pages are fetched.
+import asyncio
+import pathlib
+import time
+
+import pytest
+
+from bdm_assistant import tools
+from bdm_assistant.companies_office import parse_results_page, search
+
+FIXTURES = pathlib.Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+BASE_URL = "https://www.companiesoffice.govt.nz/"
+RESULT = """<div class="search-result"><h3>{name} ({number})</h3>
+<a href="/companies/{number}/detail">View</a><p>Registered. Plumbing services.</p></div>"""
+PAGINATION = '<nav><a href="/companies/search?q=plumbing&amp;page=2">2</a><a href="?q=plumbing&page=3">3</a></nav>'
+
+def test_pagination_above_the_results_is_found():
+    results = RESULT.format(name="Kai Plumbing Limited", number="1234567")
+    for html in (f"<body>{PAGINATION}{results}</body>", f"<body>{results}{PAGINATION}</body>"):
+        [record], last_page = parse_results_page(html, BASE_URL)
+        assert last_page == 3
+        assert (record.name, record.company_number, record.status) == ("Kai Plumbing Limited", "1234567", "Registered")
+        assert record.link == "https://www.companiesoffice.govt.nz/companies/1234567/detail"
+
+def test_only_a_result_container_starts_a_result():
+    script = """<script>const template = '<div class="search-result"><h3>Template (9999999)</h3></div>';</script>"""
+    results = RESULT.format(name="Kai Plumbing Limited", number="1234567")
+    html = f'<body>{script}<div class="search-results-count">1 result</div>{results}</body>'
+    [record], _ = parse_results_page(html, BASE_URL)
+    assert record.company_number == "1234567"
+
+def test_saved_results_pages():
+    records, last_page = parse_results_page((FIXTURES / "companies_office_search_page1.html").read_text(), BASE_URL)
+    assert (len(records), last_page) == (20, 5)
+    assert parse_results_page((FIXTURES / "companies_office_search_empty.html").read_text(), BASE_URL) == ([], 1)
+
+def test_search_fetches_the_pages_pagination_links_to():
+    pages = {1: PAGINATION, 2: "", 3: ""}
+    fetched = []
+
+    def fetch(url: str, cache_key: str) -> str:
+        page = int(url.rsplit("&page=", 1)[1]) if "&page=" in url else 1
+        fetched.append(page)
+        return RESULT.format(name=f"Page {page} Limited", number=f"100000{page}") + pages[page]
+
+    records, fetched_pages = search("plumbing", fetch, BASE_URL, max_pages=5)
+    assert fetched_pages == 3 and sorted(fetched) == [1, 2, 3]
+    assert [record.name for record in records] == ["Page 1 Limited", "Page 2 Limited", "Page 3 Limited"]
+
+@pytest.mark.asyncio
+async def test_the_async_lookup_leaves_the_event_loop_free(monkeypatch):
+    def slow_search(query: str, max_pages: int = 3) -> dict:
+        time.sleep(0.3)  # A slow page fetch
+        return {"status": "success", "results": [], "query": query, "max_pages": max_pages}
+
+    monkeypatch.setattr(tools, "companies_office_direct_search", slow_search)
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    result = await tools.search_companies_office("kai plumbing", max_pages=1)
+    ticker.cancel()
+    assert result == {"status": "success", "results": [], "query": "kai plumbing", "max_pages": 1}
+    assert ticks >= 10
@@ -0,0 +1,79 @@
+# Bulk lead enrichment (enrich.py): a resumed run counts the leads it skips as finished separately from the
+# rows that repeat a company, writes each company once, and will not resume from a checkpoint whose results are gone.
+# A failed lookup leaves the other to score with, and reading leads from stdin leaves it open.
+import io
+import json
+import sys
+
+import pytest
+
+from bdm_assistant.enrich import LeadEnrichment, enrich_csv, read_leads
+
+LEADS = ["Kai Plumbing Ltd", "Harbour Builders", "KAI PLUMBING LIMITED", "Southern Drains", "Harbour Builders Ltd",
+         "Tui Electrical", "Kai Plumbing"]
+
+def companies_office(name: str) -> dict:
+    return {"status": "success", "results": []}
+
+def read_lines(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return f.readlines()
+
+def enrichment() -> LeadEnrichment:
+    return LeadEnrichment(companies_office=companies_office, web_search=False)
+
+@pytest.fixture
+def leads(tmp_path):
+    path = tmp_path / "leads.csv"
+    path.write_text("Company,Location\n" + "".join(f"{name},Auckland\n" for name in LEADS))
+    return str(path)
+
+@pytest.mark.asyncio
+async def test_resumed_leads_are_not_counted_as_duplicates(leads, tmp_path):
+    output = str(tmp_path / "leads.jsonl")
+    full = await enrich_csv(leads, str(tmp_path / "full.jsonl"), enrichment=enrichment())
+    assert (full["enriched"], full["skipped_duplicates"], full["skipped_already_done"]) == (4, 3, 0)
+
+    # The first run was stopped after the first three rows (two companies).
+    (tmp_path / "head.csv").write_text("".join(read_lines(leads)[:4]))
+    await enrich_csv(str(tmp_path / "head.csv"), output, enrichment=enrichment())
+    resumed = await enrich_csv(leads, output, enrichment=enrichment())
+    assert (resumed["enriched"], resumed["skipped_duplicates"], resumed["skipped_already_done"]) == (2, 3, 2)
+
+    keys = [json.loads(line)["key"] for line in read_lines(output)]
+    assert len(keys) == len(set(keys)) == 4
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("damage", ["removed", "cut short"])
+async def test_a_checkpoint_without_its_results_is_not_resumed(leads, tmp_path, damage):
+    output = tmp_path / "leads.jsonl"
+    await enrich_csv(leads, str(output), enrichment=enrichment())
+    if damage == "removed":
+        output.unlink()
+    else:
+        output.write_bytes(output.read_bytes()[:10])
+    with pytest.raises(FileNotFoundError, match="missing results its checkpoint records"):
+        await enrich_csv(leads, str(output), enrichment=enrichment())
+    assert not output.exists() or output.stat().st_size == 10  # Left as it was, not padded
+
+@pytest.mark.asyncio
+async def test_a_failed_registry_lookup_still_scores_on_the_web_search(tmp_path):
+    def unavailable(name: str) -> dict:
+        raise ConnectionError("registry down")
+
+    async def search(query: str) -> str:
+        return "Kai Plumbing is hiring and expanding"
+
+    path = tmp_path / "leads.csv"
+    path.write_text("Company\nKai Plumbing Ltd\n")
+    [lead] = read_leads(str(path))
+    result = await LeadEnrichment(companies_office=unavailable, search=search).enrich_one(lead)
+    assert result.error == "ConnectionError: registry down"
+    assert result.companies_office == {"match": None, "results": 0}
+    assert "web presence (+10)" in result.reasons and "digital or growth signals (+15)" in result.reasons
+
+def test_reading_leads_from_stdin_leaves_it_open(monkeypatch):
+    stdin = io.StringIO("Company,Location\nKai Plumbing Ltd,Auckland\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert [lead.key for lead in read_leads("-")] == ["kai plumbing"]
+    assert not stdin.closed
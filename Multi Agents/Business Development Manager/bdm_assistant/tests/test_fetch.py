@@ -0,0 +1,100 @@
+# The HTTP fetch layer (fetch.py) against a local http.server origin: cache hits and misses, 304 revalidation,
+# serving stale copies when the origin fails, and the rate limiter.
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from bdm_assistant.fetch import CachedFetcher, SQLiteCache
+
+
+class Origin(BaseHTTPRequestHandler):
+    """Serves '<body of path>' with an ETag, answers a matching If-None-Match with 304, and fails with 503 while
+    the server's `failing` flag is set. Every request is recorded on the server."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.server.failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+        etag = f'"{self.server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"<body of {self.path} v{self.server.version}>".encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Origin)
+    server.requests, server.failing, server.version = [], False, 1
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+@pytest.fixture
+def fetcher():
+    fetcher = CachedFetcher(cache=SQLiteCache(":memory:"), ttl=60, rate=1000, burst=1000, timeout=2)
+    yield fetcher
+    fetcher.close()
+
+def test_fresh_copies_are_served_from_the_cache(origin, fetcher):
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"
+    assert fetcher.get(url(origin, "/b")) == "<body of /b v1>"
+    assert len(origin.requests) == 2
+    stats = fetcher.stats()
+    assert (stats["hits"], stats["misses"], stats["fetched"], stats["hit_rate"]) == (1, 2, 2, 0.3333)
+
+def test_expired_copies_are_revalidated(origin, fetcher):
+    fetcher.ttl = 0
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"
+    assert origin.requests[-1] == ("/a", '"1"') and fetcher.stats()["revalidated"] == 1
+    origin.version = 2
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v2>"
+    assert fetcher.stats()["fetched"] == 2
+
+def test_stale_copies_are_served_when_the_origin_fails(origin, fetcher):
+    fetcher.ttl = 0
+    fetcher.get(url(origin, "/a"))
+    origin.failing = True
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"
+    assert fetcher.stats()["stale"] == 1
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetcher.get(url(origin, "/never-fetched"))
+    origin.shutdown()
+    origin.server_close()
+    assert fetcher.get(url(origin, "/a")) == "<body of /a v1>"  # Connection refused
+    assert fetcher.stats()["stale"] == 2
+
+def test_requests_beyond_the_burst_wait_for_the_rate(origin):
+    fetcher = CachedFetcher(cache=SQLiteCache(":memory:"), rate=20, burst=2, timeout=2)
+    started = time.monotonic()
+    for i in range(6):
+        fetcher.get(url(origin, f"/page/{i}"))
+    # Only the wall time is bounded: the bucket refills while each request is in flight, so the time spent
+    # sleeping in the limiter varies with the machine's load.
+    assert time.monotonic() - started >= 4 / 20 * 0.9
+    # Cache hits are never rate limited.
+    started = time.monotonic()
+    for i in range(6):
+        fetcher.get(url(origin, f"/page/{i}"))
+    assert time.monotonic() - started < 0.1
+    fetcher.close()
@@ -0,0 +1,103 @@
+# The shared search cache (search_cache.py) against a fake search backend: caching, coalescing, releasing waiters
+# when the search they joined fails or is abandoned, and runners on their own threads and event loops.
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from bdm_assistant.search_cache import SearchCache, SearchCallbacks
+
+
+class FakeSearch:
+    """A search backend that counts its calls, takes `delay` seconds and raises on the first `failures` calls."""
+
+    def __init__(self, delay: float = 0.05, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self, query: str) -> str:
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if call <= self.failures:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return f"results for {query}"
+
+def context(query: str, invocation_id: str) -> SimpleNamespace:
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=query)]),
+                           invocation_id=invocation_id)
+
+@pytest.mark.asyncio
+async def test_identical_searches_coalesce_and_then_hit_the_cache():
+    cache, search = SearchCache(), FakeSearch()
+    results = await asyncio.gather(*(cache.get_or_search("Plumbers in  Auckland!", search) for _ in range(5)))
+    assert results == ["results for Plumbers in  Auckland!"] * 5
+    assert await cache.get_or_search("plumbers in auckland", search) == "results for Plumbers in  Auckland!"
+    assert search.calls == 1
+    assert cache.stats()["coalesced"] == 4 and cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_waiters_search_themselves_when_the_owner_fails():
+    cache, search = SearchCache(), FakeSearch(failures=1)
+    owner = asyncio.create_task(cache.get_or_search("roofers", search))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_search("roofers", search))
+    with pytest.raises(RuntimeError):
+        await owner
+    assert await asyncio.wait_for(waiter, 1) == "results for roofers"
+    assert search.calls == 2
+    assert cache._inflight == {}
+
+@pytest.mark.asyncio
+async def test_model_error_releases_the_agents_waiters():
+    cache = SearchCache()
+    callbacks = SearchCallbacks(namespace="web", cache=cache)
+    assert await callbacks.before_agent(context("builders", "owner")) is None
+    waiter = asyncio.create_task(callbacks.before_agent(context("builders", "second")))
+    await asyncio.sleep(0)
+    callbacks.on_model_error(context("builders", "owner"), None, RuntimeError("429"))
+    # The waiter is released to run its own search rather than answered from the cache.
+    assert await asyncio.wait_for(waiter, 1) is None
+    assert cache._inflight == {}
+
+@pytest.mark.asyncio
+async def test_an_abandoned_search_is_taken_over_after_the_wait():
+    cache = SearchCache(wait=0.1)
+    callbacks = SearchCallbacks(namespace="web", cache=cache)
+    assert await callbacks.before_agent(context("electricians", "cancelled")) is None  # Never completes
+    started = asyncio.get_running_loop().time()
+    assert await asyncio.wait_for(callbacks.before_agent(context("electricians", "second")), 1) is None
+    assert asyncio.get_running_loop().time() - started >= 0.1
+    assert cache.stats()["abandoned"] == 1
+    # Later callers find the new owner's search rather than the abandoned one.
+    answer = types.Content(role="model", parts=[types.Part(text="Sparkies R Us")])
+    callbacks.after_model(context("electricians", "second"), SimpleNamespace(content=answer, partial=False))
+    assert (await callbacks.before_agent(context("electricians", "third"))).parts[0].text == "Sparkies R Us"
+
+def test_runners_on_other_event_loops_do_not_join_each_others_searches():
+    cache, search = SearchCache(), FakeSearch(delay=0.2)
+    results, errors = [], []
+    started = threading.Barrier(2)
+
+    def runner() -> None:
+        async def run() -> None:
+            started.wait()
+            results.extend(await asyncio.gather(*(cache.get_or_search("tilers", search) for _ in range(3))))
+        try:
+            asyncio.run(run())
+        except Exception as e:  # noqa: BLE001 - an await on another loop's future raises here
+            errors.append(e)
+
+    threads = [threading.Thread(target=runner) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert errors == [] and results == ["results for tilers"] * 6
+    assert search.calls == 2  # One search per loop; each loop's other callers joined it
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"]) == (2, 4)
+    assert cache._inflight == {}
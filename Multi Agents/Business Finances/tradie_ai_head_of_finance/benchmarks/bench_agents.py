@@ -0,0 +1,35 @@
+# Offline benchmarks for tradie_ai_head_of_finance: an invoice request against scripted models.
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from harness import Call, Reply, Workload, main
+
+# Keep benchmark invoices out of the real ledger.
+os.environ.setdefault("FINANCE_LEDGER_PATH", ":memory:")
+
+REQUEST = "Generate a new invoice for Harbour Builders Ltd for $4,850 for the kitchen rewiring at 12 Tui Street."
+INVOICE_ARGS = {"client_name": "Harbour Builders Ltd", "amount": 4850.0, "description": "Kitchen rewiring at 12 Tui Street"}
+CONFIRMATION = "Invoice generated for Harbour Builders Ltd: $4,850.00 NZD for kitchen rewiring at 12 Tui Street."
+
+def _root():
+    from tradie_ai_head_of_finance.agent import root_agent
+    return root_agent
+
+WORKLOADS = [
+    Workload(
+        name="finance_invoice",
+        root_agent=_root,
+        message=REQUEST,
+        scripts={
+            "TradieAIFinanceCoordinator": [Call("InvoiceReceiptAgent", {"request": REQUEST}), Reply(CONFIRMATION)],
+            "InvoiceReceiptAgent": [Call("generate_invoice", INVOICE_ARGS), Reply(CONFIRMATION)],
+        },
+    ),
+]
+
+if __name__ == "__main__":
+    main(WORKLOADS, default_output=str(pathlib.Path(__file__).parent / "results.jsonl"))
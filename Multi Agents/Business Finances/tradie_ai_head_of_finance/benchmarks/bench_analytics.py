@@ -0,0 +1,98 @@
+# Financial analysis engine at 10k, 100k and 1M transactions: ingest, report latency, incremental updates and saves.
+import argparse
+import json
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.analytics import TransactionBook
+
+CATEGORIES = ["sales", "materials", "fuel", "subcontractors", "wages", "insurance", "phone", "vehicles", "loan repayment"]
+
+def _synthetic(n: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    category = rng.integers(0, len(CATEGORIES), n)
+    amount = np.round(rng.uniform(20, 4000, n), 2)
+    amount = np.where(category == 0, amount * 3, -amount)
+    return {
+        "dates": np.datetime64("2022-01-01") + rng.integers(0, 4 * 365, n).astype("timedelta64[D]"),
+        "amounts": amount,
+        "categories": np.asarray(CATEGORIES, dtype=object)[category],
+        "jobs": np.char.add("JOB-", rng.integers(0, 2000, n).astype(str)).astype(object),
+        "clients": np.char.add("Client ", rng.integers(0, 400, n).astype(str)).astype(object),
+    }
+
+def _ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+def _naive_pnl(data: dict) -> dict:
+    """The row-at-a-time recomputation the engine replaces."""
+    totals: dict[str, list[float]] = {}
+    for date, amount, category in zip(data["dates"].tolist(), data["amounts"].tolist(), data["categories"].tolist(), strict=True):
+        if category in ("vehicles", "loan repayment"):
+            continue
+        row = totals.setdefault(date.strftime("%Y-%m"), [0.0, 0.0])
+        row[0 if amount > 0 else 1] += amount
+    return totals
+
+def bench(n: int, chunk: int, naive: bool) -> dict:
+    data = _synthetic(n)
+    book = TransactionBook(capacity=n)
+    started = time.perf_counter()
+    for i in range(0, n, chunk):
+        book.append(*(column[i:i + chunk] for column in data.values()))
+    ingest_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/transactions.npz"
+        started = time.perf_counter()
+        book.save(path)
+        save_full_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        extra = _synthetic(1000, seed=11)
+        started = time.perf_counter()
+        book.append(*extra.values())
+        incremental_ms = round((time.perf_counter() - started) * 1000, 3)
+        started = time.perf_counter()
+        book.save(path)  # Writes a segment with just the new rows
+        save_1k_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    pnl = book.profit_and_loss("month")
+    result = {
+        "transactions": n,
+        "ingest_rows_per_s": round(n / ingest_s),
+        "append_1k_ms": incremental_ms,
+        "save_full_ms": save_full_ms,
+        "save_after_1k_ms": save_1k_ms,
+        "pnl_month_ms": _ms(lambda: book.profit_and_loss("month")),
+        "pnl_quarter_ms": _ms(lambda: book.profit_and_loss("quarter")),
+        "margins_by_job_ms": _ms(lambda: book.margins("job")),
+        "margins_by_client_date_range_ms": _ms(lambda: book.margins("client", start="2024-01-01", end="2024-06-30")),
+        "cash_flow_ms": _ms(lambda: book.cash_flow(start="2024-01")),
+        "pnl_summary_bytes": len(json.dumps(pnl)),
+    }
+    if naive:
+        result["naive_pnl_ms"] = _ms(lambda: _naive_pnl(data), repeat=1)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the financial analysis engine.")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--chunk", type=int, default=50_000, help="Rows per append, as an importer would batch them.")
+    parser.add_argument("--naive", action="store_true", help="Also time a row-at-a-time Python P&L for comparison.")
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(json.dumps({"benchmark": "analytics", **bench(size, args.chunk, args.naive)}))
+
+if __name__ == "__main__":
+    main()
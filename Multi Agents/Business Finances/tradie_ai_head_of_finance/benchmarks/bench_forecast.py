@@ -0,0 +1,63 @@
+# Cash-flow forecasting: model fit, Monte Carlo latency by path count and horizon, cache hits and scenario sweeps.
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.forecasting import (
+    CashFlowForecaster,
+    History,
+    Scenario,
+    fit_smoothing,
+)
+
+
+def _history(months: int = 36, seed: int = 7) -> History:
+    rng = np.random.default_rng(seed)
+    season = 1 + 0.3 * np.cos(2 * np.pi * np.arange(months) / 12)
+    income = 30_000 * season * (1 + 0.01 * np.arange(months)) + rng.normal(0, 3_000, months)
+    expenses = 22_000 + rng.normal(0, 2_000, months)
+    return History(first_month=624, income=income, expenses=expenses, balance=40_000.0)
+
+def _ms(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cash-flow forecaster.")
+    parser.add_argument("--paths", default="10000,50000,100000")
+    parser.add_argument("--horizons", default="12,36")
+    parser.add_argument("--scenarios", type=int, default=16, help="Scenarios in the sweep.")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the pooled sweep.")
+    args = parser.parse_args()
+    history = _history()
+
+    print(json.dumps({"benchmark": "forecast_fit", "months": len(history.income), "fit_ms": _ms(lambda: fit_smoothing(history.income))}))
+    for horizon in (int(h) for h in args.horizons.split(",")):
+        for paths in (int(p) for p in args.paths.split(",")):
+            forecaster = CashFlowForecaster(paths=paths)
+            cold = _ms(lambda f=forecaster, h=horizon: (f.clear(), f.forecast(history, h, threshold=10_000)))
+            cached = _ms(lambda f=forecaster, h=horizon: f.forecast(history, h, threshold=10_000))
+            print(json.dumps({"benchmark": "forecast", "paths": paths, "horizon": horizon, "cold_ms": cold, "cached_ms": cached}))
+
+    scenarios = [Scenario(f"revenue {pct:+d}%", revenue_change_pct=pct) for pct in range(-args.scenarios // 2, args.scenarios // 2)]
+    for workers in (0, args.workers):
+        forecaster = CashFlowForecaster(paths=50_000, workers=workers)
+        started = time.perf_counter()
+        forecaster.sweep(history, scenarios, 36, threshold=10_000)
+        print(json.dumps({
+            "benchmark": "forecast_sweep", "scenarios": len(scenarios), "paths": 50_000, "horizon": 36,
+            "workers": workers, "ms": round((time.perf_counter() - started) * 1000, 3),
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# GST engine: recording throughput, single-return latency as history grows, batch returns and a full rebuild.
+import argparse
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.gst import GstEngine
+
+CATEGORIES = ["materials", "fuel", "subcontractors", "wages", "phone", "exports", ""]
+
+def _records(n: int, seed: int = 7) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 5 * 365, n)
+    dates = (np.datetime64("2021-04-01") + days.astype("timedelta64[D]")).astype(str).tolist()
+    lags = rng.integers(0, 60, n)
+    paid = (np.datetime64("2021-04-01") + (days + lags).astype("timedelta64[D]")).astype(str).tolist()
+    amounts = np.round(rng.uniform(20, 5000, n), 2).tolist()
+    sale = (rng.random(n) < 0.3).tolist()
+    categories = rng.integers(0, len(CATEGORIES), n).tolist()
+    return [
+        {"kind": "sale" if s else "purchase", "date": d, "paid_date": p, "amount": a, "category": CATEGORIES[c]}
+        for d, p, a, s, c in zip(dates, paid, amounts, sale, categories, strict=True)
+    ]
+
+def _ms(fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+def _scan_return(engine: GstEngine, first: str, last: str) -> tuple:
+    """The per-request rescan the precomputed months replace."""
+    return engine._db.execute(
+        "SELECT SUM(CASE WHEN kind = 'sale' THEN amount_cents END), SUM(CASE WHEN kind = 'purchase' THEN amount_cents END)"
+        " FROM gst_records WHERE entity = 'default' AND treatment != 'exempt' AND payment_date BETWEEN ? AND ?",
+        (f"{first}-01", f"{last}-31"),
+    ).fetchone()
+
+def bench(n: int, entities: int, directory: str) -> dict:
+    engine = GstEngine(os.path.join(directory, f"gst_{n}.sqlite"))
+    records = _records(n)
+    per_entity = n // entities
+    started = time.perf_counter()
+    for i in range(entities):
+        chunk = records[i * per_entity:(i + 1) * per_entity]
+        engine.record_many(chunk, entity="default" if i == 0 else f"client-{i}")
+    record_s = time.perf_counter() - started
+    names = ["default"] + [f"client-{i}" for i in range(1, entities)]
+    result = {
+        "records": n,
+        "entities": entities,
+        "record_per_s": round(n / record_s),
+        "return_2_monthly_ms": _ms(lambda: engine.gst_return("2025-08")),
+        "return_6_monthly_ms": _ms(lambda: engine.gst_return("2025-08", frequency=6)),
+        "scan_return_ms": _ms(lambda: _scan_return(engine, "2025-08", "2025-09")),
+        "batch_all_entities_5_years_ms": _ms(lambda: engine.returns(names, "2021-04", "2026-03"), repeat=3),
+        "batch_returns": len(engine.returns(names, "2021-04", "2026-03")),
+        "rebuild_ms": _ms(engine.rebuild, repeat=1),
+    }
+    engine.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the GST engine.")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--entities", type=int, default=20, help="Businesses the records are spread over.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(json.dumps({"benchmark": "gst", **bench(size, args.entities, directory)}))
+
+if __name__ == "__main__":
+    main()
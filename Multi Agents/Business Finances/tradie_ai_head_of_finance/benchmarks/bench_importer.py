@@ -0,0 +1,88 @@
+# Bank statement import: rows/s and peak traced memory for CSV and OFX exports, re-imports and overlapping downloads.
+import argparse
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.importer import StatementImporter
+
+PAYEES = ["Z Energy", "Bunnings", "Mitre 10", "Placemakers", "Spark", "Repco", "Harbour Builders", "Smith", "IRD"]
+
+def _lines(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.integers(0, 6 * 365, n))
+    dates = (np.datetime64("2020-01-01") + days.astype("timedelta64[D]")).astype(str)
+    amounts = np.round(rng.uniform(-900, 400, n), 2)
+    payees = rng.integers(0, len(PAYEES), n)
+    for date, amount, payee in zip(dates.tolist(), amounts.tolist(), payees.tolist(), strict=True):
+        yield date, amount, PAYEES[payee]
+
+def write_csv(path: str, n: int, seed: int = 7) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Type,Details,Particulars,Code,Reference,Amount,Date\n")
+        for date, amount, payee in _lines(n, seed):
+            f.write(f"Eft-Pos,{payee},,,,{amount:.2f},{date[8:]}/{date[5:7]}/{date[:4]}\n")
+
+def write_ofx(path: str, n: int, seed: int = 7) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKACCTFROM><ACCTID>01-0001-0000001-00</BANKACCTFROM><BANKTRANLIST>\n")
+        for i, (date, amount, payee) in enumerate(_lines(n, seed)):
+            f.write(f"<STMTTRN><TRNTYPE>POS<DTPOSTED>{date.replace('-', '')}<TRNAMT>{amount:.2f}<FITID>{i}<NAME>{payee}</STMTTRN>\n")
+        f.write("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+
+def _run(importer: StatementImporter, path: str, memory: bool, **kwargs) -> dict:
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    report = importer.import_file(path, **kwargs)
+    seconds = time.perf_counter() - started
+    result = {
+        "rows": report.rows, "imported": report.imported, "duplicates": report.duplicates,
+        "before_watermark": report.before_watermark, "rows_per_s": round(report.rows / seconds),
+    }
+    if memory:
+        result["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    return result
+
+def bench(n: int, fmt: str, directory: str, memory: bool) -> dict:
+    path = os.path.join(directory, f"statement_{n}.{fmt}")
+    (write_csv if fmt == "csv" else write_ofx)(path, n)
+    database = os.path.join(directory, f"imports_{n}_{fmt}.sqlite")
+    importer = StatementImporter(database)
+    result = {
+        "format": fmt,
+        "rows": n,
+        "file_mib": round(os.path.getsize(path) / 2 ** 20, 2),
+        "first_import": _run(importer, path, memory, account="bench"),
+        "reimport": _run(importer, path, memory, account="bench"),
+        "reimport_backfill": _run(importer, path, memory, account="bench", backfill=True),
+    }
+    importer.close()
+    # A first import that hands each chunk of new lines on, as the import_bank_statement tool does.
+    importer = StatementImporter(os.path.join(directory, f"imports_{n}_{fmt}_chunks.sqlite"))
+    result["first_import_on_chunk"] = _run(importer, path, memory, account="bench", on_chunk=lambda chunk: None)
+    importer.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bank statement imports.")
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--formats", default="csv,ofx")
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory (slows the import down).")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in args.formats.split(","):
+            for size in (int(s) for s in args.sizes.split(",")):
+                print(json.dumps({"benchmark": "importer", **bench(size, fmt, directory, args.memory)}))
+
+if __name__ == "__main__":
+    main()
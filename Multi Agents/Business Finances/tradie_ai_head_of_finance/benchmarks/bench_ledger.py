@@ -0,0 +1,72 @@
+# Month-end invoice run: one transaction for the whole batch versus a commit per invoice, plus query latency.
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.ledger import InvoiceRequest, Ledger
+
+
+def _requests(n: int, clients: int) -> list[InvoiceRequest]:
+    rng = random.Random(42)
+    start = datetime.date.today() - datetime.timedelta(days=150)
+    return [
+        InvoiceRequest(
+            client_name=f"Client {rng.randrange(clients):04d} Ltd",
+            amount=round(rng.uniform(80, 12000), 2),
+            description="Monthly maintenance",
+            issued_on=start + datetime.timedelta(days=rng.randrange(150)),
+        )
+        for _ in range(n)
+    ]
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return round((time.perf_counter() - started) * 1000, 3)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the invoice ledger.")
+    parser.add_argument("--invoices", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=300)
+    args = parser.parse_args()
+    requests = _requests(args.invoices, args.clients)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_row = Ledger(os.path.join(tmp, "per_row.sqlite"))
+        per_row_ms = _timed(lambda: [per_row.issue_many([r]) for r in requests])
+
+        ledger = Ledger(os.path.join(tmp, "batch.sqlite"))
+        batch_ms = _timed(lambda: ledger.issue_many(requests))
+
+        # Concurrent single issues must still get unique, increasing numbers.
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            issued = list(pool.map(lambda r: ledger.issue(r.client_name, r.amount, r.description), requests[:200]))
+        ids = [invoice.invoice_id for invoice in issued]
+        assert len(set(ids)) == len(ids), "duplicate invoice IDs"
+
+        result = {
+            "benchmark": "ledger",
+            "invoices": args.invoices,
+            "per_row_commit_ms": per_row_ms,
+            "batch_ms": batch_ms,
+            "speedup": round(per_row_ms / batch_ms, 1) if batch_ms else None,
+            "outstanding_by_client_ms": _timed(ledger.outstanding_by_client),
+            "outstanding_one_client_ms": _timed(lambda: ledger.outstanding_by_client("Client 0007 Ltd")),
+            "aged_receivables_ms": _timed(ledger.aged_receivables),
+            "concurrent_issue_unique_ids": len(set(ids)),
+        }
+        per_row.close()
+        ledger.close()
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
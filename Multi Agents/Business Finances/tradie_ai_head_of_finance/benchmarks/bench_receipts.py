@@ -0,0 +1,111 @@
+# Receipt ingestion: files/s for a batch of mixed receipts in one process and in a pool, and for a re-run that
+# only hashes (every file already seen), plus how many receipts the rules leave for the model.
+import argparse
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_head_of_finance.receipts import ReceiptRegister
+
+VENDORS = ["Bunnings", "Mitre 10", "PlaceMakers", "Z Energy", "Repco", "Jaycar", "Corys", "Harbour Timber Ltd"]
+ITEMS = ["Timber 90x45", "Screws 8g", "Diesel", "Sealant", "Cable 2.5mm", "Fittings", "Paint 10L", "Blades"]
+
+def _lines(rng: random.Random, i: int) -> list[str]:
+    vendor = rng.choice(VENDORS)
+    items = [(rng.choice(ITEMS), rng.randint(500, 40000)) for _ in range(rng.randint(2, 12))]
+    total = sum(cents for _, cents in items)
+    date = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/202{rng.randint(2, 5)}"
+    lines = [vendor.upper(), "TAX INVOICE", f"GST No: {rng.randint(10, 130)}-{rng.randint(100, 999)}-{rng.randint(100, 999)}"]
+    lines.append(date if rng.random() > 0.05 else "Date unknown")  # Some receipts leave the date off
+    lines += [f"{name}  {cents / 100:.2f}" for name, cents in items]
+    lines += [f"GST  {round(total * 3 / 23) / 100:.2f}", f"TOTAL  {total / 100:.2f}", f"Ref {i}"]
+    return lines
+
+def _pdf(lines: list[str]) -> bytes:
+    """A one-page PDF with the lines as text, written by hand so the benchmark needs nothing beyond pypdf."""
+    text = "".join(f"({line.replace('(', '').replace(')', '')}) Tj T* " for line in lines)
+    stream = f"BT /F1 10 Tf 14 TL 50 780 Td {text}ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def write_receipts(directory: str, n: int, seed: int = 7) -> None:
+    """Writes n receipts, a quarter each as PDF, email, HTML and text."""
+    rng = random.Random(seed)
+    for i in range(n):
+        lines = _lines(rng, i)
+        kind = i % 4
+        if kind == 0:
+            name, data = f"r{i:05d}.pdf", _pdf(lines)
+        elif kind == 1:
+            body = "\n".join(lines[1:])
+            name = f"r{i:05d}.eml"
+            data = f"From: {lines[0].title()} <receipts@example.co.nz>\nSubject: Your receipt\nContent-Type: text/plain\n\n{body}\n".encode()
+        elif kind == 2:
+            rows = "".join(f"<tr><td>{line}</td></tr>" for line in lines)
+            name, data = f"r{i:05d}.html", f"<html><body><table>{rows}</table></body></html>".encode()
+        else:
+            name, data = f"r{i:05d}.txt", "\n".join(lines).encode()
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+def _run(register: ReceiptRegister, path: str, workers: int) -> dict:
+    started = time.perf_counter()
+    report = register.ingest(path, workers=workers)
+    seconds = time.perf_counter() - started
+    return {
+        "workers": workers, "files": report.files, "new": report.new, "duplicates": report.duplicates,
+        "needs_review": report.needs_review, "seconds": round(seconds, 3), "files_per_s": round(report.files / seconds, 1),
+    }
+
+def bench(n: int, workers: int, directory: str) -> dict:
+    folder = os.path.join(directory, f"receipts_{n}")
+    os.makedirs(folder)
+    write_receipts(folder, n)
+    archive = os.path.join(directory, f"receipts_{n}.zip")
+    with zipfile.ZipFile(archive, "w") as z:
+        for name in sorted(os.listdir(folder)):
+            z.write(os.path.join(folder, name), name)
+    serial = ReceiptRegister(":memory:")
+    pooled = ReceiptRegister(":memory:")
+    result = {
+        "receipts": n,
+        "serial": _run(serial, folder, 0),
+        "pooled": _run(pooled, archive, workers),
+        "rerun_dedupe": _run(pooled, folder, workers),
+    }
+    serial.close()
+    pooled.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk receipt ingestion.")
+    parser.add_argument("--sizes", default="1000")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(json.dumps({"benchmark": "receipts", **bench(size, args.workers, directory)}))
+
+if __name__ == "__main__":
+    main()
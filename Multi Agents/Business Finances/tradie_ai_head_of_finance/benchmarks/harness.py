@@ -0,0 +1,232 @@
+# Offline benchmark harness: runs a root_agent against scripted stand-in models instead of Gemini.
+# The same harness ships with each of the four agent packages (kept identical by sync_shared.py);
+# workloads live in bench_agents.py.
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import time
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from pydantic import Field
+
+# --- Scripted Model ---
+
+@dataclass
+class Reply:
+    """A scripted final text answer."""
+    text: str
+
+@dataclass
+class Call:
+    """A scripted function call to one of the agent's tools."""
+    tool: str
+    args: dict = field(default_factory=dict)
+
+Step = Reply | Call
+
+def estimate_tokens(value: Any) -> int:
+    """A rough token count (about four characters per token), good enough to track regressions."""
+    if value is None:
+        return 0
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return max(1, len(text) // 4) if text else 0
+
+def _request_tokens(llm_request: LlmRequest) -> int:
+    config = llm_request.config
+    tokens = estimate_tokens(config.system_instruction if config and isinstance(config.system_instruction, str) else None)
+    for tool in (config.tools or []) if config else []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            tokens += estimate_tokens(declaration.model_dump(exclude_none=True))
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                tokens += estimate_tokens(part.text)
+            if part.function_call:
+                tokens += estimate_tokens(part.function_call.args)
+            if part.function_response:
+                tokens += estimate_tokens(part.function_response.response)
+    return tokens
+
+@dataclass
+class HopRecord:
+    agent: str
+    step: int
+    prompt_tokens: int
+    completion_tokens: int
+    delay_s: float
+
+class Recorder:
+    """Collects one HopRecord per model call."""
+
+    def __init__(self):
+        self.hops: list[HopRecord] = []
+
+class ScriptedLlm(BaseLlm):
+    """A stand-in model that replays a fixed sequence of steps with a configurable delay.
+
+    The step to play is chosen from how many function responses are already in the request, so a
+    single instance serves concurrent invocations without shared cursor state.
+    """
+
+    agent_name: str = ""
+    steps: list = Field(default_factory=list)
+    base_delay_s: float = 0.0
+    per_token_delay_s: float = 0.0
+    recorder: Any = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        index = sum(
+            1 for content in llm_request.contents for part in content.parts or [] if part.function_response
+        )
+        step = self.steps[min(index, len(self.steps) - 1)] if self.steps else Reply("OK")
+        prompt_tokens = _request_tokens(llm_request)
+        if isinstance(step, Call):
+            part = types.Part(function_call=types.FunctionCall(name=step.tool, args=step.args))
+            completion_tokens = estimate_tokens(step.args) + 4
+        else:
+            part = types.Part(text=step.text)
+            completion_tokens = estimate_tokens(step.text)
+        delay = self.base_delay_s + self.per_token_delay_s * completion_tokens
+        if delay:
+            await asyncio.sleep(delay)
+        self.recorder.hops.append(HopRecord(self.agent_name, index, prompt_tokens, completion_tokens, delay))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                total_token_count=prompt_tokens + completion_tokens,
+            ),
+        )
+
+def iter_agents(agent: BaseAgent, seen: set | None = None):
+    """Yields `agent` and every agent reachable through sub_agents and AgentTools (building lazy ones)."""
+    seen = seen if seen is not None else set()
+    if id(agent) in seen:
+        return
+    seen.add(id(agent))
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from iter_agents(sub_agent, seen)
+    for tool in getattr(agent, "tools", []) or []:
+        if isinstance(tool, AgentTool):
+            yield from iter_agents(tool.agent, seen)
+
+def install_scripted_models(
+    root_agent: BaseAgent,
+    scripts: dict[str, list[Step]],
+    recorder: Recorder,
+    base_delay_s: float,
+    per_token_delay_s: float,
+) -> None:
+    """Swaps every LLM agent's model for a ScriptedLlm, keeping the original model name for tool checks."""
+    for agent in iter_agents(root_agent):
+        if isinstance(agent, LlmAgent):
+            model_name = agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", "gemini-2.0-flash")
+            agent.model = ScriptedLlm(
+                model=model_name or "gemini-2.0-flash",
+                agent_name=agent.name,
+                steps=scripts.get(agent.name, [Reply(f"{agent.name} done.")]),
+                base_delay_s=base_delay_s,
+                per_token_delay_s=per_token_delay_s,
+                recorder=recorder,
+            )
+
+# --- Workloads ---
+
+@dataclass
+class Workload:
+    """One benchmarked request: the message sent, the scripts each agent replays and an optional reset hook."""
+    name: str
+    root_agent: Callable[[], BaseAgent]
+    message: str
+    scripts: dict[str, list[Step]]
+    reset: Callable[[], None] | None = None
+
+async def _run_once(runner: InMemoryRunner, app_name: str, message: str) -> str:
+    session = await runner.session_service.create_session(app_name=app_name, user_id="bench")
+    reply = ""
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+    ):
+        if event.is_final_response() and event.content and event.content.parts:
+            reply = "".join(part.text or "" for part in event.content.parts)
+    return reply
+
+async def run_workload(workload: Workload, iterations: int, base_delay_s: float, per_token_delay_s: float) -> dict:
+    """Runs a workload and returns latency, model-call, token and framework-overhead figures."""
+    recorder = Recorder()
+    root = workload.root_agent()
+    install_scripted_models(root, workload.scripts, recorder, base_delay_s, per_token_delay_s)
+    runner = InMemoryRunner(agent=root, app_name=f"bench_{workload.name}")
+    latencies, overheads, calls, prompt_tokens = [], [], [], []
+    per_agent: dict[str, list[int]] = {}
+    await _run_once(runner, runner.app_name, workload.message)  # Warm-up, not recorded
+    for _ in range(iterations):
+        if workload.reset:
+            workload.reset()
+        recorder.hops.clear()
+        started = time.perf_counter()
+        await _run_once(runner, runner.app_name, workload.message)
+        elapsed = time.perf_counter() - started
+        latencies.append(elapsed)
+        overheads.append(elapsed - sum(hop.delay_s for hop in recorder.hops))
+        calls.append(len(recorder.hops))
+        prompt_tokens.append(sum(hop.prompt_tokens for hop in recorder.hops))
+        for hop in recorder.hops:
+            per_agent.setdefault(hop.agent, []).append(hop.prompt_tokens)
+    return {
+        "workload": workload.name,
+        "iterations": iterations,
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 3),
+        "latency_ms_max": round(max(latencies) * 1000, 3),
+        "framework_overhead_ms_p50": round(statistics.median(overheads) * 1000, 3),
+        "model_calls_per_request": statistics.median(calls),
+        "prompt_tokens_per_request": statistics.median(prompt_tokens),
+        "prompt_tokens_per_hop": {
+            agent: round(sum(tokens) / len(tokens), 1) for agent, tokens in sorted(per_agent.items())
+        },
+        "hops": [hop.agent for hop in recorder.hops],
+    }
+
+def main(workloads: list[Workload], default_output: str) -> None:
+    parser = argparse.ArgumentParser(description="Run the offline agent benchmarks against scripted models.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Fixed simulated latency per model call.")
+    parser.add_argument("--per-token-delay-ms", type=float, default=0.0, help="Simulated latency per completion token.")
+    parser.add_argument("--output", default=default_output, help="JSONL file the results are appended to.")
+    parser.add_argument("--only", help="Run a single workload by name.")
+    args = parser.parse_args()
+
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "delay_ms": args.delay_ms,
+        "per_token_delay_ms": args.per_token_delay_ms,
+    }
+    with open(args.output, "a", encoding="utf-8") as out:
+        for workload in workloads:
+            if args.only and workload.name != args.only:
+                continue
+            result = asyncio.run(run_workload(
+                workload, args.iterations, args.delay_ms / 1000, args.per_token_delay_ms / 1000
+            ))
+            result.update(meta)
+            line = json.dumps(result)
+            print(line)
+            out.write(line + "\n")
@@ -0,0 +1,27 @@
+# Points every finance store at a temporary directory and gives each test fresh tool state.
+import pytest
+
+from tradie_ai_head_of_finance import tools
+
+_STORES = {
+    "FINANCE_LEDGER_PATH": "ledger.sqlite",
+    "FINANCE_TRANSACTIONS_PATH": "transactions.npz",
+    "FINANCE_IMPORTS_PATH": "imports.sqlite",
+    "FINANCE_GST_PATH": "gst.sqlite",
+    "FINANCE_RECEIPTS_PATH": "receipts.sqlite",
+}
+_GETTERS = (tools.get_ledger, tools.get_transaction_book, tools.get_statement_importer, tools.get_gst_engine,
+            tools.get_forecaster, tools.get_receipt_register)
+
+@pytest.fixture
+def finance_tools(tmp_path, monkeypatch):
+    """The tools module, with its ledger, books, importer, GST engine and receipt register in `tmp_path`."""
+    for name, filename in _STORES.items():
+        monkeypatch.setenv(name, str(tmp_path / filename))
+    for getter in _GETTERS:
+        getter.cache_clear()
+    yield tools
+    if tools.get_receipt_register.cache_info().currsize:
+        tools.get_receipt_register().close()  # Stops its extraction processes
+    for getter in _GETTERS:
+        getter.cache_clear()
@@ -0,0 +1,58 @@
+# The transaction book (analytics.py): P&L and margins agreeing on the same data, duplicate transactions, and
+# saving only new rows between compactions.
+import os
+
+from tradie_ai_head_of_finance.analytics import COMPACT_SEGMENTS, TransactionBook
+
+JOB = [
+    {"date": "2025-05-02", "amount": 800, "category": "sales", "job": "J1", "client": "Harbour Builders"},
+    {"date": "2025-05-06", "amount": -500, "category": "materials", "job": "J1", "client": "Harbour Builders"},
+    {"date": "2025-05-20", "amount": 250, "category": "materials", "job": "J1", "client": "Harbour Builders",
+     "description": "Bunnings refund"},
+    {"date": "2025-05-21", "amount": -3000, "category": "vehicles", "job": "J1"},
+]
+
+def test_margins_and_profit_and_loss_agree_on_refunds():
+    book = TransactionBook()
+    book.add(JOB)
+    total = book.profit_and_loss()["total"]
+    assert (total["income"], total["expenses"], total["margin_pct"]) == (800.0, 250.0, 68.8)
+    for report in (book.margins("job"), book.margins("client"), book.margins("job", start="2025-05-01", end="2025-05-31")):
+        row = report["rows"][0]
+        assert (row["revenue"], row["costs"], row["margin"], row["margin_pct"]) == (800.0, 250.0, 550.0, 68.8)
+
+def test_adding_the_same_transactions_twice_counts_them_once():
+    book = TransactionBook()
+    lunch = {"date": "2025-05-03", "amount": -18.5, "category": "meals", "job": "J1"}
+    assert book.add([*JOB, lunch, lunch]) == 6  # Two identical transactions in one batch are both kept
+    assert book.add([*JOB, lunch, lunch]) == 6
+    assert book.add([lunch, lunch, lunch]) == 7
+    # Appended rows (bank imports, deduplicated by the importer) are never taken for duplicates.
+    book.append(["2025-05-03"], [-18.5], ["meals"], ["J1"])
+    assert len(book) == 8
+
+def test_saves_append_segments_and_compact(tmp_path):
+    path = str(tmp_path / "transactions.npz")
+    book = TransactionBook()
+    book.add(JOB)
+    book.save(path)
+    for day in range(1, COMPACT_SEGMENTS + 1):
+        book.add([{"date": f"2025-06-{day:02d}", "amount": -10, "category": "fuel", "job": "J2"}])
+        book.save(path)
+    assert len(os.listdir(tmp_path)) == 1 + COMPACT_SEGMENTS
+
+    loaded = TransactionBook.load(path)
+    assert len(loaded) == len(book) and loaded.profit_and_loss() == book.profit_and_loss()
+    assert loaded.add(JOB) == len(book)  # Fingerprints are saved too
+
+    loaded.add([{"date": "2025-07-01", "amount": 90, "category": "sales", "job": "J2"}])
+    loaded.save(path)
+    assert os.listdir(tmp_path) == ["transactions.npz"]
+    assert TransactionBook.load(path).margins("job") == loaded.margins("job")
+
+def test_record_transactions_skips_duplicates(finance_tools):
+    assert finance_tools.record_transactions(JOB)["recorded"] == 4
+    again = finance_tools.record_transactions(JOB)
+    assert (again["recorded"], again["duplicates"], again["total"]) == (0, 4, 4)
+    finance_tools.get_transaction_book.cache_clear()
+    assert finance_tools.get_margins("job")["rows"][0]["costs"] == 250.0
@@ -0,0 +1,42 @@
+# Cash-flow forecasting (forecasting.py): the smoothing fit on flat and seasonal series, repeat forecasts served from
+# the cache, and scenario sweeps giving the same answers across a process pool as in this process.
+import numpy as np
+import pytest
+
+from tradie_ai_head_of_finance.forecasting import (
+    CashFlowForecaster,
+    History,
+    Scenario,
+    fit_smoothing,
+)
+
+MONTHS = np.arange(36)
+PATTERN = 3000 * np.sin(2 * np.pi * MONTHS / 12)  # A busy summer and a quiet winter
+
+def history() -> History:
+    return History(first_month=660, income=20_000 + PATTERN, expenses=np.full(36, 15_000.0), balance=8000)
+
+def test_a_flat_series_forecasts_flat():
+    fit = fit_smoothing(np.full(12, 5000.0))
+    assert fit.forecast(6) == pytest.approx(np.full(6, 5000.0))
+    assert fit.residual_sd == 0.0
+
+def test_the_seasonal_fit_recovers_a_planted_twelve_month_pattern():
+    fit = fit_smoothing(20_000 + PATTERN)
+    assert len(fit.seasonal) == 12
+    assert fit.forecast(12) == pytest.approx(20_000 + PATTERN[:12], abs=200)
+
+def test_a_repeat_forecast_is_served_from_the_cache():
+    forecaster = CashFlowForecaster(paths=2000)
+    first = forecaster.forecast(history(), horizon=6, threshold=5000)
+    second = forecaster.forecast(history(), horizon=6, threshold=5000)
+    assert (first.pop("cached"), second.pop("cached")) == (False, True)
+    assert first == second
+    assert forecaster.counters == {"hits": 1, "misses": 1}
+
+def test_a_sweep_across_processes_matches_one_in_this_process():
+    scenarios = [Scenario(), Scenario(name="quiet year", revenue_change_pct=-20), Scenario(name="new ute", one_offs={2: -40_000})]
+    in_process = CashFlowForecaster(paths=2000).sweep(history(), scenarios, horizon=6, workers=0)
+    pooled = CashFlowForecaster(paths=2000).sweep(history(), scenarios, horizon=6, workers=2)
+    assert pooled == in_process
+    assert [result["scenario"]["name"] for result in pooled] == ["base", "quiet year", "new ute"]
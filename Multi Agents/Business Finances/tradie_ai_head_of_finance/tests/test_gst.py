@@ -0,0 +1,104 @@
+# The GST engine (gst.py): classification, filing periods, returns on both bases, credit notes, idempotent
+# recording and uncategorised purchases held back for review, plus the tools that feed it from the books.
+import pytest
+
+from tradie_ai_head_of_finance.gst import GstEngine, classify, due_date, period_for
+
+
+@pytest.fixture
+def engine():
+    engine = GstEngine(":memory:")
+    yield engine
+    engine.close()
+
+def test_classification_and_periods():
+    assert classify("materials") == ("inclusive", False)
+    assert classify("") == ("inclusive", True)
+    assert classify("bank fees") == ("exempt", False)
+    assert classify("materials", "zero_rated") == ("zero-rated", False)
+    with pytest.raises(ValueError):
+        classify("", "half-rated")
+    assert period_for("2025-04-15", 2) == ("2025-04", "2025-05")
+    assert period_for("2025-08-01", 6) == ("2025-04", "2025-09")
+    assert due_date("2025-03") == "2025-05-07" and due_date("2025-11") == "2026-01-15"
+
+def test_return_on_invoice_and_payments_basis(engine):
+    engine.record_many([
+        {"id": "INV-1", "kind": "sale", "amount": 1150, "date": "2025-05-02", "paid_date": None},
+        {"id": "INV-2", "kind": "sale", "amount": 230, "date": "2025-05-10"},
+        {"kind": "purchase", "amount": 115, "date": "2025-05-12", "category": "materials"},
+    ])
+    invoice = engine.gst_return("2025-05", basis="invoice", frequency=1)
+    payments = engine.gst_return("2025-05", basis="payments", frequency=1)
+    assert (invoice["total_sales_box5"], invoice["gst_collected_box10"]) == (1380.0, 180.0)
+    assert (payments["total_sales_box5"], payments["gst_collected_box10"]) == (230.0, 30.0)
+    assert payments["gst_paid_box14"] == 15.0 and payments["net_gst_box15"] == 15.0
+    assert engine.mark_paid("INV-1", "2025-06-03", source="manual")
+    assert engine.gst_return("2025-06", basis="payments", frequency=1)["total_sales_box5"] == 1150.0
+
+def test_recording_the_same_records_twice_counts_them_once(engine):
+    purchases = [
+        {"kind": "purchase", "amount": 115, "date": "2025-05-12", "category": "materials", "description": "Bunnings",
+         "account": "everyday"},
+        {"kind": "purchase", "amount": 115, "date": "2025-05-12", "category": "materials", "description": "Bunnings",
+         "account": "everyday"},
+    ]
+    assert engine.record_many(purchases) == 2  # Two identical purchases in one batch are both real
+    assert engine.record_many(purchases) == 0
+    assert engine.gst_return("2025-05", frequency=1)["gst_paid_box14"] == 30.0
+    assert engine.rebuild() and engine.gst_return("2025-05", frequency=1)["gst_paid_box14"] == 30.0
+
+def test_credit_notes_reduce_sales_and_gst(engine):
+    engine.record_many([
+        {"id": "INV-1", "kind": "sale", "amount": 1150, "date": "2025-05-02"},
+        {"id": "CN-1", "kind": "sale", "amount": -115, "date": "2025-05-20"},
+        {"id": "BILL-1", "kind": "purchase", "amount": 460, "date": "2025-05-03", "category": "materials"},
+        {"id": "BILL-1-CR", "kind": "purchase", "amount": -46, "date": "2025-05-21", "category": "materials"},
+    ])
+    result = engine.gst_return("2025-05", frequency=1)
+    assert (result["total_sales_box5"], result["gst_collected_box10"]) == (1035.0, 135.0)
+    assert (result["total_purchases_box11"], result["gst_paid_box14"]) == (414.0, 54.0)
+
+def test_unkinded_amounts_are_sales_or_money_out(engine):
+    engine.record_many([
+        {"amount": 230, "date": "2025-05-02"}, {"amount": -115, "date": "2025-05-03", "category": "materials"},
+    ])
+    result = engine.gst_return("2025-05", frequency=1)
+    assert (result["total_sales_box5"], result["total_purchases_box11"]) == (230.0, 115.0)
+
+def test_uncategorised_purchases_are_held_back_until_categorised(engine):
+    engine.record_many([
+        {"kind": "purchase", "amount": 2300, "date": "2025-05-05", "category": "uncategorised expenses",
+         "description": "PAY  J SMITH"},
+        {"kind": "purchase", "amount": 115, "date": "2025-05-12", "description": "Bunnings", "paid_date": "2025-06-01"},
+        {"kind": "purchase", "amount": 46, "date": "2025-05-20", "category": "materials"},
+    ])
+    result = engine.gst_return("2025-05", basis="invoice", frequency=1)
+    assert (result["total_purchases_box11"], result["gst_paid_box14"]) == (46.0, 6.0)
+    assert result["uncategorised_purchases_to_review"] == 2415.0
+    wages, bunnings = engine.uncategorised("2025-05-01", "2025-05-31")
+    assert (wages["description"], wages["amount"], bunnings["description"]) == ("PAY J SMITH", 2300.0, "Bunnings")
+    with pytest.raises(ValueError):
+        engine.categorise([wages["id"]], "uncategorised expenses")
+
+    assert engine.categorise([wages["id"]], "wages") == 1
+    assert engine.categorise([bunnings["id"]], "materials") == 1
+    assert engine.categorise([bunnings["id"]], "materials") == 0  # Already categorised
+    assert engine.uncategorised("2025-05-01", "2025-05-31") == []
+    for _ in range(2):  # The folded totals and a rebuild from the records agree
+        invoice = engine.gst_return("2025-05", basis="invoice", frequency=1)
+        payments = engine.gst_return("2025-06", basis="payments", frequency=1)
+        assert (invoice["total_purchases_box11"], invoice["uncategorised_purchases_to_review"]) == (161.0, 0.0)
+        assert (payments["total_purchases_box11"], payments["gst_paid_box14"]) == (115.0, 15.0)
+        engine.rebuild()
+
+def test_recording_transactions_twice_does_not_double_gst_paid(finance_tools):
+    transactions = [
+        {"date": "2025-05-12", "amount": -115.0, "category": "materials", "description": "Bunnings"},
+        {"date": "2025-05-13", "amount": -115.0, "category": "fuel", "description": "Z Energy"},
+    ]
+    finance_tools.record_gst_transactions([{"amount": 575, "kind": "sale", "date": "2025-05-01"}])
+    finance_tools.record_transactions(transactions)
+    finance_tools.record_transactions(transactions)
+    result = finance_tools.get_gst_engine().gst_return("2025-05", frequency=1)
+    assert result["gst_paid_box14"] == 30.0
@@ -0,0 +1,71 @@
+# Bank statement imports (importer.py and the import_bank_statement tool): idempotent re-imports, and a failed
+# import leaving the books and GST exactly as they were.
+import pytest
+
+from tradie_ai_head_of_finance.importer import StatementImporter
+
+GOOD = """Date,Details,Amount
+01/07/2025,Bunnings,-115.00
+02/07/2025,Harbour Builders,2300.00
+03/07/2025,Z Energy,-92.00
+04/07/2025,Mitre 10,-46.00
+05/07/2025,Spark,-57.50
+"""
+# The same lines with the last date mangled, so the import fails after the earlier lines were written.
+BAD = GOOD.replace("05/07/2025", "5th July")
+
+def test_reimporting_the_same_file_imports_nothing(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(GOOD)
+    importer = StatementImporter(str(tmp_path / "imports.sqlite"))
+    assert importer.import_file(str(path), "everyday").imported == 5
+    again = importer.import_file(str(path), "everyday")
+    assert (again.imported, again.duplicates) == (0, 5)
+
+def test_on_chunk_is_not_called_for_a_failed_import(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(BAD)
+    importer = StatementImporter(str(tmp_path / "imports.sqlite"), chunk_size=2)
+    chunks = []
+    with pytest.raises(ValueError):
+        importer.import_file(str(path), "everyday", on_chunk=chunks.append)
+    assert chunks == []
+    assert importer.accounts() == []
+
+def test_failed_import_leaves_books_and_gst_untouched(finance_tools, tmp_path):
+    finance_tools.get_statement_importer().chunk_size = 2
+    path = tmp_path / "statement.csv"
+    path.write_text(BAD)
+    failed = finance_tools.import_bank_statement(str(path), "everyday")
+    assert failed["status"] == "error" and "Unrecognised date" in failed["error_message"]
+    assert len(finance_tools.get_transaction_book()) == 0
+    assert finance_tools.get_gst_engine().gst_return("2025-07", frequency=1)["records"] == 0
+
+    path.write_text(GOOD)
+    assert finance_tools.import_bank_statement(str(path), "everyday")["imported"] == 5
+    assert finance_tools.import_bank_statement(str(path), "everyday")["imported"] == 0
+    assert len(finance_tools.get_transaction_book()) == 5
+    gst = finance_tools.get_gst_engine().gst_return("2025-07", frequency=1)
+    # Bank debits carry no category, so they wait for review rather than being claimed.
+    assert (gst["total_purchases_box11"], gst["uncategorised_purchases_to_review"]) == (0.0, 310.5)
+
+def test_identical_lines_on_a_day_the_file_comes_back_to_are_kept(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("Date,Details,Amount\n01/03/2025,Coffee,-4.50\n02/03/2025,Fuel,-20.00\n01/03/2025,Coffee,-4.50\n")
+    importer = StatementImporter(str(tmp_path / "imports.sqlite"))
+    report = importer.import_file(str(path), "everyday")
+    assert (report.rows, report.imported, report.duplicates) == (3, 3, 0)
+    again = importer.import_file(str(path), "everyday", backfill=True)
+    assert (again.imported, again.duplicates) == (0, 3)
+
+def test_on_chunk_reads_the_imported_lines_back_in_chunks(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(GOOD)
+    importer = StatementImporter(str(tmp_path / "imports.sqlite"), chunk_size=2)
+    chunks = []
+    importer.import_file(str(path), "everyday", on_chunk=chunks.append)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [t.description for chunk in chunks for t in chunk] == ["Bunnings", "Harbour Builders", "Z Energy", "Mitre 10", "Spark"]
+    assert all(t.hash for chunk in chunks for t in chunk)
+    importer.import_file(str(path), "everyday", on_chunk=chunks.append)
+    assert len(chunks) == 3
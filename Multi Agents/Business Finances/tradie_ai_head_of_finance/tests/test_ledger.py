@@ -0,0 +1,89 @@
+# The invoice ledger (ledger.py) and the invoice tools: invoice numbering under concurrency, all-or-nothing batches,
+# payments, voids and receivables, and the invoice tools keeping the GST engine's sales in step with the ledger.
+import datetime
+import threading
+
+import pytest
+
+from tradie_ai_head_of_finance.ledger import VOID, InvoiceRequest, Ledger
+
+
+def test_generate_invoice_rejects_bad_requests(finance_tools):
+    for client, amount in (("Harbour Builders", 0), ("Harbour Builders", -150), ("  ", 460)):
+        result = finance_tools.generate_invoice(client, amount, "Hot water cylinder")
+        assert result["status"] == "error" and "Could not generate the invoice" in result["error_message"]
+    assert finance_tools.list_invoices()["invoices"] == []
+
+def test_generate_invoice(finance_tools):
+    result = finance_tools.generate_invoice("Harbour Builders", 1150, "Hot water cylinder")
+    assert result["status"] == "success" and "Amount: $1,150.00 NZD" in result["invoice"]
+    assert finance_tools.get_invoice(result["invoice_id"])["invoice"]["amount"] == 1150
+
+def test_invoices_and_their_payments_are_gst_sales(finance_tools):
+    issued = finance_tools.generate_invoice("Harbour Builders", 1150, "Hot water cylinder")
+    invoice = finance_tools.get_invoice(issued["invoice_id"])["invoice"]
+    month = invoice["issued_on"][:7]
+    engine = finance_tools.get_gst_engine()
+    assert engine.gst_return(month, basis="invoice", frequency=1)["gst_collected_box10"] == 150.0
+    assert engine.gst_return(month, basis="payments", frequency=1)["total_sales_box5"] == 0.0
+    finance_tools.mark_invoice_paid(issued["invoice_id"], f"{month}-28")
+    assert engine.gst_return(month, basis="payments", frequency=1)["total_sales_box5"] == 1150.0
+
+def test_the_gst_engine_takes_in_invoices_issued_before_its_first_use(finance_tools):
+    ledger = finance_tools.get_ledger()
+    ledger.issue("Harbour Builders", 460, "Deck", issued_on=datetime.date(2025, 5, 1))
+    voided = ledger.issue("Kai Cafe", 230, "Sink", issued_on=datetime.date(2025, 5, 2))
+    ledger.void(voided.invoice_id)
+    for _ in range(2):  # A second process catching up again adds nothing
+        finance_tools.get_gst_engine.cache_clear()
+        result = finance_tools.get_gst_engine().gst_return("2025-05", basis="invoice", frequency=1)
+        assert (result["total_sales_box5"], result["records"]) == (460.0, 1)
+        finance_tools.get_gst_engine().close()
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite"), due_days=20)
+    yield ledger
+    ledger.close()
+
+def test_invoice_numbers_are_unique_across_threads_and_connections(ledger, tmp_path):
+    other = Ledger(str(tmp_path / "ledger.sqlite"))  # A second process would hold its own connection
+    issued = []
+
+    def issue(book, n):
+        for i in range(n):
+            issued.append(book.issue(f"Client {i}", 100 + i, "Call-out").invoice_id)
+
+    threads = [threading.Thread(target=issue, args=(book, 25)) for book in (ledger, other, ledger, other)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    other.close()
+    assert len(set(issued)) == 100
+    assert sorted(issued) == [f"INV-{n:06d}" for n in range(1, 101)]
+
+def test_a_batch_with_a_bad_request_issues_nothing(ledger):
+    with pytest.raises(ValueError):
+        ledger.issue_many([InvoiceRequest("Harbour Builders", 500, "Deck"), InvoiceRequest("Kai Cafe", 0, "Sink")])
+    assert ledger.invoices() == []
+    assert ledger.issue("Kai Cafe", 230, "Sink").invoice_id == "INV-000001"
+
+def test_payments_voids_and_receivables(ledger):
+    day = datetime.date(2025, 5, 1)
+    first = ledger.issue("Harbour Builders", 1000, "Deck", issued_on=day)  # Due 2025-05-21
+    second = ledger.issue("harbour  builders ", 500, "Gate", issued_on=day, due_days=60)  # Due 2025-06-30
+    third = ledger.issue("Kai Cafe", 230, "Sink", issued_on=day)
+    ledger.issue("Kai Cafe", 99, "Tap washer", issued_on=day)
+    assert ledger.void(third.invoice_id).status == VOID
+    assert ledger.mark_paid(third.invoice_id).status == VOID  # A void invoice cannot be paid
+    assert ledger.mark_paid("INV-000004", datetime.date(2025, 5, 10)).paid_on == "2025-05-10"
+
+    assert ledger.outstanding_by_client() == [
+        {"client_name": "Harbour Builders", "invoices": 2, "outstanding": 1500.0, "oldest_due_on": first.due_on},
+    ]
+    aged = ledger.aged_receivables(datetime.date(2025, 6, 25))
+    assert aged["buckets"] == {"current": 500.0, "1-30": 0.0, "31-60": 1000.0, "61-90": 0.0, "90+": 0.0}
+    assert (aged["total"], aged["invoices"]) == (1500.0, 2)
+    assert ledger.totals("2025-05-01", "2025-05-31") == {"invoices": 3, "invoiced": 1599.0, "paid": 99.0, "outstanding": 1500.0}
+    assert [i.invoice_id for i in ledger.invoices(client_name="HARBOUR BUILDERS")] == [second.invoice_id, first.invoice_id]
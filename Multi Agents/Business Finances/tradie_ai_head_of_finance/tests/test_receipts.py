@@ -0,0 +1,49 @@
+# The receipt register (receipts.py) and the receipt tools: one reused extraction pool, duplicates skipped by
+# content, and the run's progress in the tool result.
+import pytest
+
+from tradie_ai_head_of_finance.receipts import PARSED, ReceiptRegister
+
+
+def write_receipts(folder, n: int, first: int = 0) -> None:
+    folder.mkdir(exist_ok=True)
+    for i in range(first, first + n):
+        total = 100 + i
+        (folder / f"r{i:03d}.txt").write_text(
+            f"BUNNINGS\nTAX INVOICE\n{1 + i % 28:02d}/05/2025\nTimber  {total:.2f}\nGST  {total * 3 / 23:.2f}\nTOTAL  {total:.2f}\n"
+        )
+
+@pytest.fixture
+def register(tmp_path):
+    register = ReceiptRegister(str(tmp_path / "receipts.sqlite"), workers=2)
+    yield register
+    register.close()
+
+def test_ingests_share_one_pool_and_skip_seen_receipts(register, tmp_path):
+    write_receipts(tmp_path / "may", 6)
+    report = register.ingest(str(tmp_path / "may"))
+    pool = register._pool
+    assert (report.files, report.new, report.parsed) == (6, 6, 6)
+    assert register.get(register.receipts(limit=1)[0]["receipt_id"])["status"] == PARSED
+
+    write_receipts(tmp_path / "may", 3, first=6)
+    report = register.ingest(str(tmp_path / "may"))
+    assert (report.files, report.new, report.duplicates) == (9, 3, 6)
+    assert register._pool is pool
+    register.close()
+    assert register._pool is None
+
+def test_all_seen_receipts_start_no_pool(tmp_path):
+    write_receipts(tmp_path / "may", 2)
+    ReceiptRegister(str(tmp_path / "receipts.sqlite"), workers=0).ingest(str(tmp_path / "may"))
+    register = ReceiptRegister(str(tmp_path / "receipts.sqlite"), workers=2)
+    assert register.ingest(str(tmp_path / "may")).duplicates == 2
+    assert register._pool is None
+    register.close()
+
+def test_ingest_receipts_reports_progress(finance_tools, tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCE_RECEIPT_WORKERS", "0")
+    write_receipts(tmp_path / "may", 3)
+    result = finance_tools.ingest_receipts(str(tmp_path / "may"))
+    assert (result["status"], result["new"]) == ("success", 3)
+    assert result["progress"][-1]["files"] == 3 and result["progress"][-1]["new"] == 3
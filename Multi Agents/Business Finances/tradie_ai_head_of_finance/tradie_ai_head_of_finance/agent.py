@@ -1,26 +1,67 @@
 # The Root Coordinator Agent for the tradie_ai_head_of_finance system.
 from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
+from google.adk.plugins.base_plugin import BasePlugin
 
-from . import prompt
-# Import all specialist agents that you will define.
-from .sub_agents.InvoiceReceiptAgent import InvoiceReceiptAgent
-from .sub_agents.TaxComplianceAgent import TaxComplianceAgent
-from .sub_agents.FinancialAnalysisAgent import FinancialAnalysisAgent
-from .sub_agents.ForecastingWealthAgent import ForecastingWealthAgent
-from .sub_agents.DataIntegrationAgent import DataIntegrationAgent
+from . import prompt, tracing
+from .lazy import LazyAgentTool
+from .router import IntentRouter
+from .routes import ROUTES
+from .scheduler import install_scheduler
+from .sessions import session_app
+
+# Specialists are registered lazily: each sub_agent module (and the tools it imports) is only
+# loaded the first time the coordinator delegates to it.
+specialists = [
+    LazyAgentTool(
+        "tradie_ai_head_of_finance.sub_agents.InvoiceReceiptAgent:InvoiceReceiptAgent",
+        name="InvoiceReceiptAgent",
+        description="Manages the creation, tracking, and processing of all invoices and receipts.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_head_of_finance.sub_agents.TaxComplianceAgent:TaxComplianceAgent",
+        name="TaxComplianceAgent",
+        description="Handles tax calculations, ensures compliance with New Zealand tax laws, and prepares tax-related reports.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_head_of_finance.sub_agents.FinancialAnalysisAgent:FinancialAnalysisAgent",
+        name="FinancialAnalysisAgent",
+        description="Performs in-depth financial analysis, generates various financial reports, and provides key insights.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_head_of_finance.sub_agents.ForecastingWealthAgent:ForecastingWealthAgent",
+        name="ForecastingWealthAgent",
+        description="Develops financial forecasts, assists with wealth management strategies, and provides high-level financial planning guidance.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_head_of_finance.sub_agents.DataIntegrationAgent:DataIntegrationAgent",
+        name="DataIntegrationAgent",
+        description="Securely integrates with and retrieves financial data from various external sources.",
+    ),
+]
+
+# Obvious requests go straight to a specialist without a coordinator model call (see router.py).
+intent_router = IntentRouter.from_routes(specialists, ROUTES)
 
-# The root_agent uses the AgentTool model to call specialists.
 root_agent = Agent(
     name="TradieAIFinanceCoordinator",
     model="gemini-2.5-pro", # Or another powerful model for orchestration
     description="A multi-agent system for comprehensive financial management for TradieAI, acting as a personal accountant, wealth manager, and financial virtual assistant.",
     instruction=prompt.COORDINATOR_PROMPT,
-    tools=[
-        AgentTool(agent=InvoiceReceiptAgent),
-        AgentTool(agent=TaxComplianceAgent),
-        AgentTool(agent=FinancialAnalysisAgent),
-        AgentTool(agent=ForecastingWealthAgent),
-        AgentTool(agent=DataIntegrationAgent),
-    ]
+    tools=[*specialists],
+    before_agent_callback=intent_router.before_agent,
+    after_model_callback=intent_router.after_model,
+    on_model_error_callback=intent_router.on_model_error,
 )
+
+# Every Gemini call waits its turn in one scheduler: per-model quotas, adaptive concurrency, retries on 429
+# and 5xx, and interactive calls ahead of batch ones (see scheduler.py). MODEL_SCHEDULER=off calls models directly.
+scheduler = install_scheduler()
+
+# Set TRACE_PATH, METRICS_PATH or METRICS_PORT to trace every agent, model and tool hop (see tracing.py).
+plugins: list[BasePlugin] = []
+if tracing.enabled():
+    plugins.append(tracing.tracing_plugin_from_env(collectors=(scheduler.metrics.render,) if scheduler else ()))
+
+# Long conversations are compacted once they pass SESSION_TOKEN_BUDGET, and large tool outputs from
+# earlier turns are sent as references into session state (see sessions.py).
+app = session_app(root_agent, app_name="tradie_ai_head_of_finance", plugins=plugins)
@@ -0,0 +1,463 @@
+# A columnar transaction book with incrementally maintained aggregates for P&L, margin and cash-flow reporting.
+import glob
+import hashlib
+import os
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.expanduser("~"), ".tradie_ai", "transactions.npz")
+
+OPERATING, INVESTING, FINANCING = "operating", "investing", "financing"
+SECTIONS = (OPERATING, INVESTING, FINANCING)
+# Categories outside day-to-day trading; everything else counts as operating.
+INVESTING_CATEGORIES = frozenset({"equipment", "vehicles", "tools and equipment", "asset purchase", "asset sale"})
+FINANCING_CATEGORIES = frozenset({"loan", "loan repayment", "drawings", "capital contribution", "owner funds"})
+
+_KEY_SPACE = 1 << 24  # Codes are packed as month * _KEY_SPACE + code for grouping.
+# Saves append a segment of the new rows; this many segments are folded back into the main file.
+COMPACT_SEGMENTS = 16
+
+def section_of(category: str) -> str:
+    category = category.strip().lower()
+    if category in INVESTING_CATEGORIES:
+        return INVESTING
+    if category in FINANCING_CATEGORIES:
+        return FINANCING
+    return OPERATING
+
+def to_month(value: str) -> int:
+    """Converts 'YYYY-MM' or 'YYYY-MM-DD' to months since 1970-01."""
+    return int(np.datetime64(value[:7], "M").astype(np.int64))
+
+def month_label(month: int) -> str:
+    return str(np.datetime64(month, "M"))
+
+def _period_label(month: int, period: str) -> str:
+    year, index = divmod(month, 12)
+    if period == "year":
+        return str(1970 + year)
+    if period == "quarter":
+        return f"{1970 + year}-Q{index // 3 + 1}"
+    return month_label(month)
+
+def _dollars(cents: float) -> float:
+    return round(cents / 100, 2)
+
+def _segment_files(path: str) -> list[tuple[int, str]]:
+    """The numbered segment files saved next to `path` (e.g. transactions.000003.npz), oldest first."""
+    root, ext = os.path.splitext(path)
+    segments = []
+    for name in glob.glob(f"{glob.escape(root)}.*{ext}"):
+        number = name[len(root) + 1:len(name) - len(ext)]
+        if number.isdigit():
+            segments.append((int(number), name))
+    return sorted(segments)
+
+class _Vocabulary:
+    """Maps strings to dense integer codes."""
+
+    def __init__(self):
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def encode(self, values: Sequence[str | None], normalise: bool = False, default: str = "") -> np.ndarray:
+        """Returns a code per value (-1 for empty values unless a default is given), adding new values to the vocabulary.
+
+        Sorting a fixed-width string array keeps this in C; only distinct values reach Python.
+        """
+        array = np.asarray(values, dtype=object)
+        array[array == None] = ""  # noqa: E711 - an elementwise comparison, not an identity test
+        unique, inverse = np.unique(array.astype(str), return_inverse=True)
+        lookup = np.empty(len(unique), dtype=np.int32)
+        for i, text in enumerate(unique.tolist()):
+            value = (" ".join(text.split()).lower() if normalise else text) or default
+            if not value:
+                lookup[i] = -1
+                continue
+            if value not in self.codes:
+                self.codes[value] = len(self.values)
+                self.values.append(value)
+            lookup[i] = self.codes[value]
+        return lookup[inverse.reshape(-1)]
+
+    def subset(self, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Recodes `codes` against just the values they use, returning the new codes and those values."""
+        used = np.unique(codes[codes >= 0])
+        remap = np.full(len(self.values) + 1, -1, dtype=np.int32)  # remap[-1] keeps empty values empty
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        return remap[codes], np.asarray(self.values, dtype=object)[used].astype(str)
+
+class TransactionBook:
+    """Transactions held as NumPy columns, with aggregates updated from each appended chunk only.
+
+    Amounts are signed cents: money in is positive, money out negative. Month, job and client totals are
+    kept up to date on every append, so reports never rescan the full history unless they filter by day.
+    Reports treat a category as income or an expense by what it nets to, so a supplier refund lowers costs
+    rather than counting as income.
+
+    Args:
+        capacity: Initial column capacity; columns grow geometrically.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._date = np.empty(capacity, dtype="datetime64[D]")
+        self._amount = np.empty(capacity, dtype=np.int64)
+        self._category = np.empty(capacity, dtype=np.int32)
+        self._job = np.empty(capacity, dtype=np.int32)
+        self._client = np.empty(capacity, dtype=np.int32)
+        self._key = np.empty(capacity, dtype=np.int64)  # Fingerprint of rows added with add(), else 0
+        self._keys: set[int] = set()
+        self.categories = _Vocabulary()
+        self.jobs = _Vocabulary()
+        self.clients = _Vocabulary()
+        self._sections: list[str] = []  # Section of each category code
+        # Aggregates: signed cents by (month, category), (job, category) and (client, category);
+        # [money in, money out] by (month, section).
+        self._month_category: dict[int, int] = {}
+        self._month_section: dict[int, np.ndarray] = {}
+        self._job_category: dict[int, int] = {}
+        self._client_category: dict[int, int] = {}
+        # Where the book was last saved: the file, rows written, the last segment number and the segment files.
+        self._path: str | None = None
+        self._saved = 0
+        self._segment = 0
+        self._segments: list[str] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --- Ingest ---
+
+    def append(
+        self,
+        dates: Sequence,
+        amounts: Sequence[float],
+        categories: Sequence[str | None],
+        jobs: Sequence[str | None] | None = None,
+        clients: Sequence[str | None] | None = None,
+        keys: Sequence[int] | None = None,
+    ) -> int:
+        """Appends a chunk of transactions and folds it into the aggregates. Returns the new row count.
+
+        `keys` are the rows' fingerprints from add(); rows appended without them are never treated as duplicates.
+        """
+        n = len(amounts)
+        if n == 0:
+            return self._size
+        date = np.asarray(dates, dtype="datetime64[D]")
+        amount = np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+        category = self.categories.encode(categories, normalise=True, default="uncategorised")
+        job = self.jobs.encode(jobs) if jobs is not None else np.full(n, -1, dtype=np.int32)
+        client = self.clients.encode(clients) if clients is not None else np.full(n, -1, dtype=np.int32)
+        key = np.asarray(keys, dtype=np.int64) if keys is not None else np.zeros(n, dtype=np.int64)
+        self._sections += [section_of(c) for c in self.categories.values[len(self._sections):]]
+
+        self._reserve(self._size + n)
+        end = self._size + n
+        self._date[self._size:end] = date
+        self._amount[self._size:end] = amount
+        self._category[self._size:end] = category
+        self._job[self._size:end] = job
+        self._client[self._size:end] = client
+        self._key[self._size:end] = key
+        self._size = end
+        if keys is not None:
+            self._keys.update(key[key != 0].tolist())
+        self._fold(date, amount, category, job, client)
+        return self._size
+
+    def add(self, transactions: Iterable[dict]) -> int:
+        """Appends dicts with date, amount, category and optional job, client and description.
+
+        Transactions already added are skipped, so recording the same batch twice counts it once. Each is
+        identified by its fields and how many identical ones came before it in the batch, so two identical
+        transactions in one batch are both kept. Returns the new row count.
+        """
+        fresh, keys = [], []
+        seen: dict[tuple, int] = {}
+        for t in transactions:
+            fields = (
+                str(t["date"])[:10], round(float(t["amount"]) * 100), " ".join(str(t.get("category") or "").split()).lower(),
+                t.get("job") or "", t.get("client") or "", " ".join(str(t.get("description") or "").split()).lower(),
+            )
+            occurrence = seen[fields] = seen.get(fields, -1) + 1
+            digest = hashlib.blake2b(repr((fields, occurrence)).encode(), digest_size=8).digest()
+            key = int.from_bytes(digest, "little", signed=True) or 1
+            if key not in self._keys:
+                fresh.append(t)
+                keys.append(key)
+        return self.append(
+            [t["date"] for t in fresh],
+            [t["amount"] for t in fresh],
+            [t.get("category") for t in fresh],
+            [t.get("job") for t in fresh],
+            [t.get("client") for t in fresh],
+            keys,
+        )
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._amount)
+        if size <= capacity:
+            return
+        capacity = max(size, int(capacity * 1.5) + 1)
+        for name in ("_date", "_amount", "_category", "_job", "_client", "_key"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    @staticmethod
+    def _sum_by(keys: np.ndarray, amount: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Groups a chunk by key and returns the keys with their money-in and money-out sums."""
+        unique, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        money_in = np.bincount(inverse, weights=np.where(amount > 0, amount, 0), minlength=len(unique))
+        money_out = np.bincount(inverse, weights=np.where(amount < 0, amount, 0), minlength=len(unique))
+        return unique, money_in, money_out
+
+    def _fold(self, date, amount, category, job, client) -> None:
+        month = date.astype("datetime64[M]").astype(np.int64)
+        keys, money_in, money_out = self._sum_by(month * _KEY_SPACE + category, amount)
+        for key, cents in zip(keys.tolist(), (money_in + money_out).tolist(), strict=True):
+            self._month_category[key] = self._month_category.get(key, 0) + int(cents)
+
+        section = np.asarray([SECTIONS.index(s) for s in self._sections], dtype=np.int64)[category]
+        keys, money_in, money_out = self._sum_by(month * _KEY_SPACE + section, amount)
+        for key, cents_in, cents_out in zip(keys.tolist(), money_in.tolist(), money_out.tolist(), strict=True):
+            totals = self._month_section.setdefault(key, np.zeros(2, dtype=np.int64))
+            totals += (int(cents_in), int(cents_out))
+
+        # Job and client margins only count trading income and costs, not asset purchases or loans.
+        operating = section == SECTIONS.index(OPERATING)
+        for target, codes in ((self._job_category, job), (self._client_category, client)):
+            keys, money_in, money_out = self._sum_by(codes[operating].astype(np.int64) * _KEY_SPACE + category[operating],
+                                                     amount[operating])
+            for key, cents in zip(keys.tolist(), (money_in + money_out).tolist(), strict=True):
+                target[key] = target.get(key, 0) + int(cents)
+
+    # --- Reports ---
+
+    def profit_and_loss(self, period: str = "month", start: str | None = None, end: str | None = None,
+                        top_categories: int = 8) -> dict:
+        """Income, expenses and net profit by month, quarter or year from operating transactions.
+
+        Args:
+            period: 'month', 'quarter' or 'year'.
+            start: First month to include, as YYYY-MM.
+            end: Last month to include, as YYYY-MM.
+            top_categories: How many expense categories to itemise.
+        """
+        if period not in ("month", "quarter", "year"):
+            raise ValueError(f"Unknown period '{period}'; use month, quarter or year.")
+        first, last = self._month_bounds(start, end)
+        nets: dict[tuple[str, int], int] = {}
+        for key, cents in self._month_category.items():
+            month, code = divmod(key, _KEY_SPACE)
+            if first <= month <= last and self._sections[code] == OPERATING:
+                label = _period_label(month, period)
+                nets[label, code] = nets.get((label, code), 0) + cents
+        rows: dict[str, list[int]] = {}
+        expenses_by_category: dict[str, int] = {}
+        for (label, code), cents in nets.items():
+            row = rows.setdefault(label, [0, 0])
+            row[0 if cents > 0 else 1] += cents
+            if cents < 0:
+                name = self.categories.values[code]
+                expenses_by_category[name] = expenses_by_category.get(name, 0) + cents
+        income = sum(r[0] for r in rows.values())
+        expenses = sum(r[1] for r in rows.values())
+        ranked = sorted(expenses_by_category.items(), key=lambda item: item[1])
+        return {
+            "period": period,
+            "rows": [self._pnl_row(label, *rows[label]) for label in sorted(rows)],
+            "total": self._pnl_row("total", income, expenses),
+            "top_expense_categories": [
+                {"category": name, "amount": _dollars(-cents)} for name, cents in ranked[:top_categories]
+            ],
+        }
+
+    @staticmethod
+    def _pnl_row(label: str, income: int, expenses: int) -> dict:
+        net = income + expenses
+        return {
+            "period": label,
+            "income": _dollars(income),
+            "expenses": _dollars(-expenses),
+            "net_profit": _dollars(net),
+            "margin_pct": round(100 * net / income, 1) if income else None,
+        }
+
+    def margins(self, by: str = "job", start: str | None = None, end: str | None = None, limit: int = 10) -> dict:
+        """Revenue, direct costs and margin per job or client, largest revenue first.
+
+        As in the P&L, each category counts as revenue or a cost by what it nets to for the job or client.
+        All-time figures come from the running totals; a date range (YYYY-MM-DD) is a vectorised scan.
+        """
+        if by not in ("job", "client"):
+            raise ValueError(f"Unknown dimension '{by}'; use job or client.")
+        vocabulary = self.jobs if by == "job" else self.clients
+        if start or end:
+            nets = self._scan_nets(self._job if by == "job" else self._client, start, end)
+        else:
+            nets = self._job_category if by == "job" else self._client_category
+        totals: dict[int, list[int]] = {}
+        for key, cents in nets.items():
+            row = totals.setdefault(key // _KEY_SPACE, [0, 0])
+            row[0 if cents > 0 else 1] += cents
+        rows: list[dict[str, Any]] = []
+        for code, (revenue, cost) in totals.items():
+            if code < 0:
+                continue
+            rows.append({
+                by: vocabulary.values[code],
+                "revenue": _dollars(revenue),
+                "costs": _dollars(-cost),
+                "margin": _dollars(revenue + cost),
+                "margin_pct": round(100 * (revenue + cost) / revenue, 1) if revenue else None,
+            })
+        rows.sort(key=lambda row: -row["revenue"])
+        unassigned = totals.get(-1)
+        return {
+            "by": by,
+            "count": len(rows),
+            "rows": rows[:limit],
+            "unassigned": {"revenue": _dollars(int(unassigned[0])), "costs": _dollars(-int(unassigned[1]))} if unassigned is not None else None,
+        }
+
+    def _scan_nets(self, codes: np.ndarray, start: str | None, end: str | None) -> dict[int, int]:
+        n = self._size
+        mask = np.ones(n, dtype=bool)
+        if start:
+            mask &= self._date[:n] >= np.datetime64(start, "D")
+        if end:
+            mask &= self._date[:n] <= np.datetime64(end, "D")
+        operating = np.asarray([s == OPERATING for s in self._sections], dtype=bool)
+        mask &= operating[self._category[:n]]
+        keys = codes[:n][mask].astype(np.int64) * _KEY_SPACE + self._category[:n][mask]
+        unique, money_in, money_out = self._sum_by(keys, self._amount[:n][mask])
+        return {key: int(cents) for key, cents in zip(unique.tolist(), (money_in + money_out).tolist(), strict=True)}
+
+    def cash_flow(self, start: str | None = None, end: str | None = None) -> dict:
+        """A cash-flow statement: opening balance, money in and out by section, and closing balance."""
+        first, last = self._month_bounds(start, end)
+        opening = 0
+        sections = {name: [0, 0] for name in SECTIONS}
+        for key, (cents_in, cents_out) in self._month_section.items():
+            month, code = divmod(key, _KEY_SPACE)
+            if month < first:
+                opening += int(cents_in + cents_out)
+            elif month <= last:
+                sections[SECTIONS[code]][0] += int(cents_in)
+                sections[SECTIONS[code]][1] += int(cents_out)
+        net = sum(i + o for i, o in sections.values())
+        return {
+            "from": month_label(first) if first > -(1 << 40) else None,
+            "to": month_label(last) if last < (1 << 40) else None,
+            "opening_balance": _dollars(opening),
+            "sections": {
+                name: {"in": _dollars(i), "out": _dollars(-o), "net": _dollars(i + o)} for name, (i, o) in sections.items()
+            },
+            "net_change": _dollars(net),
+            "closing_balance": _dollars(opening + net),
+        }
+
+    def monthly_operating(self) -> tuple[int, np.ndarray, np.ndarray, int]:
+        """Operating money in and out (both positive cents) for every month from the first to the last.
+
+        Returns:
+            The first month (months since 1970-01), the money-in and money-out arrays, and the closing
+            balance in cents across every section.
+        """
+        if not self._month_section:
+            return 0, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0
+        months = [key // _KEY_SPACE for key in self._month_section]
+        first = min(months)
+        money_in = np.zeros(max(months) - first + 1, dtype=np.int64)
+        money_out = np.zeros_like(money_in)
+        balance = 0
+        for key, (cents_in, cents_out) in self._month_section.items():
+            month, code = divmod(key, _KEY_SPACE)
+            balance += int(cents_in + cents_out)
+            if SECTIONS[code] == OPERATING:
+                money_in[month - first] += cents_in
+                money_out[month - first] -= cents_out
+        return first, money_in, money_out, balance
+
+    @staticmethod
+    def _month_bounds(start: str | None, end: str | None) -> tuple[int, int]:
+        return (to_month(start) if start else -(1 << 40), to_month(end) if end else (1 << 40))
+
+    # --- Persistence ---
+    # A book is saved as a main file plus numbered segments, each holding only the rows added since the save
+    # before, so saving after every import or tool call costs the new rows rather than the whole history.
+
+    def save(self, path: str) -> None:
+        """Saves rows added since the last save to `path` as a new segment, compacting every COMPACT_SEGMENTS saves."""
+        path = os.path.abspath(path)
+        if path != self._path or not os.path.exists(path) or len(self._segments) >= COMPACT_SEGMENTS:
+            self._compact(path)
+        elif self._saved < self._size:
+            self._segment += 1
+            root, ext = os.path.splitext(path)
+            segment = f"{root}.{self._segment:06d}{ext}"
+            self._write(segment, self._saved)
+            self._segments.append(segment)
+            self._saved = self._size
+
+    def _compact(self, path: str) -> None:
+        """Writes every row to the main file, then removes the segments it now includes."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stale = _segment_files(path)
+        self._segment = max([self._segment] + [number for number, _ in stale])
+        # The main file records the last segment it includes, so segments left by an interrupted compaction are ignored.
+        self._write(path, 0, through=self._segment)
+        for _, segment in stale:
+            os.remove(segment)
+        self._path, self._saved, self._segments = path, self._size, []
+
+    def _write(self, path: str, start: int, **extra) -> None:
+        n = self._size
+        category, categories = self.categories.subset(self._category[start:n])
+        job, jobs = self.jobs.subset(self._job[start:n])
+        client, clients = self.clients.subset(self._client[start:n])
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            date=self._date[start:n], amount=self._amount[start:n], category=category, job=job, client=client,
+            key=self._key[start:n], categories=categories, jobs=jobs, clients=clients, **extra,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TransactionBook":
+        path = os.path.abspath(path)
+        with np.load(path) as data:
+            book = cls(capacity=max(len(data["amount"]), 1024))
+            book._read(data)
+            through = int(data["through"]) if "through" in data.files else 0
+        book._path, book._segment = path, through
+        for number, segment in _segment_files(path):
+            if number > through:
+                with np.load(segment) as data:
+                    book._read(data)
+                book._segment = number
+                book._segments.append(segment)
+        book._saved = book._size
+        return book
+
+    def _read(self, data) -> None:
+        def decode(codes: np.ndarray, values: np.ndarray) -> list:
+            lookup = np.append(values.astype(object), [None])
+            return lookup[np.where(codes < 0, len(values), codes)].tolist()
+
+        self.append(
+            data["date"],
+            data["amount"] / 100,
+            decode(data["category"], data["categories"]),
+            decode(data["job"], data["jobs"]),
+            decode(data["client"], data["clients"]),
+            data["key"] if "key" in data.files else None,
+        )
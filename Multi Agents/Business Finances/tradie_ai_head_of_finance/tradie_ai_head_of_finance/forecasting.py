@@ -0,0 +1,339 @@
+# Cash-flow forecasting: seasonal exponential smoothing of monthly income and expenses, and a vectorised
+# Monte Carlo simulation of the bank balance. Forecasts are cached per input-data fingerprint.
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from .analytics import TransactionBook, month_label
+
+SEASON = 12
+DAMPING = 0.9  # Damps the trend so a good or bad year is not extrapolated indefinitely.
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_HORIZON = 36
+MAX_PATHS = 100_000
+MIN_HISTORY = 3
+
+# Candidate smoothing parameters; every combination is fitted at once, one vector operation per month.
+_ALPHAS = np.linspace(0.05, 0.95, 10)
+_BETAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+_GAMMAS = np.array([0.0, 0.1, 0.2, 0.3, 0.5])
+
+# --- Deterministic Models ---
+
+@dataclass
+class SmoothingFit:
+    """A fitted damped-trend exponential smoothing model, additive-seasonal when there are two full years of data."""
+    level: float
+    trend: float
+    seasonal: np.ndarray
+    alpha: float
+    beta: float
+    gamma: float
+    residuals: np.ndarray
+    observations: int
+
+    @property
+    def residual_sd(self) -> float:
+        return float(np.sqrt(np.mean(self.residuals ** 2))) if len(self.residuals) else 0.0
+
+    def forecast(self, horizon: int) -> np.ndarray:
+        """The expected value for each of the next `horizon` months, never below zero."""
+        damped = np.cumsum(DAMPING ** np.arange(1, horizon + 1))
+        season = self.seasonal[(self.observations + np.arange(horizon)) % len(self.seasonal)]
+        return np.maximum(self.level + damped * self.trend + season, 0.0)
+
+    def describe(self) -> dict:
+        return {
+            "alpha": round(self.alpha, 2), "beta": round(self.beta, 2), "gamma": round(self.gamma, 2),
+            "seasonal": len(self.seasonal) > 1, "residual_sd": round(self.residual_sd),
+        }
+
+def fit_smoothing(series: np.ndarray, season: int = SEASON) -> SmoothingFit:
+    """Fits exponential smoothing to a monthly series, picking the parameters with the lowest one-step error."""
+    y = np.asarray(series, dtype=np.float64)
+    n = len(y)
+    if n < 2:
+        raise ValueError("At least two observations are needed to fit a forecast.")
+    seasonal = n >= 2 * season
+    alpha, beta, gamma = (
+        grid.ravel() for grid in np.meshgrid(_ALPHAS, _BETAS, _GAMMAS if seasonal else [0.0], indexing="ij")
+    )
+    if seasonal:
+        first_year = y[:season].mean()
+        level = np.full(len(alpha), first_year)
+        trend = np.full(len(alpha), (y[season:2 * season].mean() - first_year) / season)
+        seasons = np.tile(y[:season] - first_year, (len(alpha), 1))
+    else:
+        level = np.full(len(alpha), y[0])
+        trend = np.full(len(alpha), (y[-1] - y[0]) / (n - 1))
+        seasons = np.zeros((len(alpha), 1))
+
+    errors = np.empty((len(alpha), n))
+    for t in range(n):
+        i = t % seasons.shape[1]
+        errors[:, t] = y[t] - (level + DAMPING * trend + seasons[:, i])
+        previous = level
+        level = alpha * (y[t] - seasons[:, i]) + (1 - alpha) * (previous + DAMPING * trend)
+        trend = beta * (level - previous) + (1 - beta) * DAMPING * trend
+        seasons[:, i] = gamma * (y[t] - level) + (1 - gamma) * seasons[:, i]
+
+    best = int(np.argmin((errors ** 2).sum(axis=1)))
+    return SmoothingFit(
+        level=float(level[best]), trend=float(trend[best]), seasonal=seasons[best].copy(),
+        alpha=float(alpha[best]), beta=float(beta[best]), gamma=float(gamma[best]),
+        residuals=errors[best], observations=n,
+    )
+
+# --- Inputs ---
+
+@dataclass
+class History:
+    """Monthly operating income and expenses in dollars (both positive) and the current bank balance.
+
+    Args:
+        first_month: The first month, in months since 1970-01.
+        income: Money in per month.
+        expenses: Money out per month.
+        balance: The balance at the end of the last month.
+    """
+    first_month: int
+    income: np.ndarray
+    expenses: np.ndarray
+    balance: float
+
+    @classmethod
+    def from_book(cls, book: TransactionBook, balance: float | None = None) -> "History":
+        """Builds the history from recorded transactions; `balance` overrides the balance they imply."""
+        first, money_in, money_out, closing = book.monthly_operating()
+        return cls(first, money_in / 100, money_out / 100, closing / 100 if balance is None else float(balance))
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(np.int64(self.first_month).tobytes())
+        digest.update(np.ascontiguousarray(self.income, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(self.expenses, dtype=np.float64).tobytes())
+        digest.update(np.float64(self.balance).tobytes())
+        return digest.hexdigest()
+
+@dataclass
+class Scenario:
+    """A what-if applied on top of the base forecast.
+
+    Args:
+        name: A label for reports.
+        revenue_change_pct: Percentage change to expected income, e.g. -20 for a quiet year.
+        expense_change_pct: Percentage change to expected expenses.
+        volatility: Multiplier on the month-to-month uncertainty.
+        one_offs: One-off amounts by months ahead (1 is next month), negative for a purchase.
+    """
+    name: str = "base"
+    revenue_change_pct: float = 0.0
+    expense_change_pct: float = 0.0
+    volatility: float = 1.0
+    one_offs: dict[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scenario":
+        one_offs = {int(k): float(v) for k, v in (data.get("one_offs") or {}).items()}
+        if data.get("one_off_amount"):
+            month = int(data.get("one_off_month") or 1)
+            one_offs[month] = one_offs.get(month, 0.0) + float(data["one_off_amount"])
+        return cls(
+            name=str(data.get("name") or "scenario"),
+            revenue_change_pct=float(data.get("revenue_change_pct") or 0.0),
+            expense_change_pct=float(data.get("expense_change_pct") or 0.0),
+            volatility=float(data.get("volatility") or 1.0),
+            one_offs=one_offs,
+        )
+
+# --- Monte Carlo ---
+
+def simulate(
+    opening: float,
+    income: np.ndarray,
+    expenses: np.ndarray,
+    income_sd: float,
+    expenses_sd: float,
+    correlation: float,
+    paths: int,
+    threshold: float,
+    seed: int,
+    one_offs: np.ndarray | None = None,
+) -> dict:
+    """Simulates `paths` balance trajectories at once and summarises them.
+
+    Monthly income and expenses are their expected values plus correlated normal shocks scaled by the
+    models' one-step errors; neither can go negative.
+
+    Returns:
+        Balance percentiles per month, the probability of falling below `threshold` at any point and
+        in each month, and the distribution of the lowest balance reached.
+    """
+    rng = np.random.default_rng(seed)
+    # Months are rows and paths columns, so the running balance and the per-month percentiles both
+    # work along contiguous memory. Single precision is ample for balances over a few years.
+    shocks = rng.standard_normal((2, len(income), paths), dtype=np.float32)
+    expense_shocks = correlation * shocks[0] + np.float32(np.sqrt(1 - correlation ** 2)) * shocks[1]
+    net = np.maximum(np.float32(income_sd) * shocks[0] + income[:, None].astype(np.float32), 0)
+    net -= np.maximum(np.float32(expenses_sd) * expense_shocks + expenses[:, None].astype(np.float32), 0)
+    if one_offs is not None:
+        net += one_offs[:, None].astype(np.float32)
+    balance = np.cumsum(net, axis=0, out=net)
+    balance += np.float32(opening)
+    below = balance < threshold
+    lowest = balance.min(axis=0)
+    return {
+        "percentiles": np.percentile(balance, PERCENTILES, axis=1),
+        "probability_below": float(below.any(axis=0).mean()),
+        "probability_below_by_month": below.mean(axis=1),
+        "lowest_balance": np.percentile(lowest, PERCENTILES),
+    }
+
+def _run(job: tuple) -> dict:
+    # Module-level so the process pool can pickle it.
+    return _summarise(*job)
+
+def _summarise(history: History, fits: tuple, scenario: Scenario, horizon: int, paths: int, threshold: float,
+               seed: int) -> dict:
+    income_fit, expenses_fit = fits
+    income = income_fit.forecast(horizon) * (1 + scenario.revenue_change_pct / 100)
+    expenses = expenses_fit.forecast(horizon) * (1 + scenario.expense_change_pct / 100)
+    one_offs = np.zeros(horizon)
+    for month, amount in scenario.one_offs.items():
+        if 1 <= month <= horizon:
+            one_offs[month - 1] += amount
+    correlation = 0.0
+    if len(income_fit.residuals) > 2 and income_fit.residual_sd and expenses_fit.residual_sd:
+        correlation = float(np.clip(np.corrcoef(income_fit.residuals, expenses_fit.residuals)[0, 1], -0.95, 0.95))
+    result = simulate(
+        history.balance, income, expenses, income_fit.residual_sd * scenario.volatility,
+        expenses_fit.residual_sd * scenario.volatility, correlation, paths, threshold, seed, one_offs,
+    )
+    start = history.first_month + len(history.income)
+    months = [month_label(start + i) for i in range(horizon)]
+    by_month = result["probability_below_by_month"]
+    at_risk = np.flatnonzero(by_month >= 0.1)
+    return {
+        "scenario": asdict(scenario),
+        "months": months,
+        "opening_balance": round(history.balance),
+        "threshold": threshold,
+        "expected": {
+            "income": np.round(income).astype(int).tolist(),
+            "expenses": np.round(expenses).astype(int).tolist(),
+            "net": np.round(income - expenses + one_offs).astype(int).tolist(),
+        },
+        "balance_percentiles": {
+            f"p{p}": np.round(row).astype(int).tolist() for p, row in zip(PERCENTILES, result["percentiles"], strict=True)
+        },
+        "probability_below_threshold": round(result["probability_below"], 3),
+        "probability_below_by_month": np.round(by_month, 3).tolist(),
+        "first_month_at_risk": months[int(at_risk[0])] if len(at_risk) else None,
+        "lowest_balance": {f"p{p}": round(float(v)) for p, v in zip(PERCENTILES, result["lowest_balance"], strict=True)},
+        "model": {"income": income_fit.describe(), "expenses": expenses_fit.describe(), "correlation": round(correlation, 2)},
+        "paths": paths,
+    }
+
+# --- Forecaster ---
+
+class CashFlowForecaster:
+    """Fits the deterministic models and runs the simulation, caching each result under a fingerprint of its inputs.
+
+    The same history and settings always give the same answer: the random seed is derived from the
+    fingerprint, so a repeat question is served from the cache and a cache miss reproduces it exactly.
+
+    Args:
+        paths: Default number of simulated paths.
+        workers: Processes used by `sweep`; 0 or 1 runs scenarios in this process.
+        max_entries: The number of cached forecasts; the least recently used are evicted first.
+    """
+
+    def __init__(self, paths: int = 20_000, workers: int = 0, max_entries: int = 256):
+        self.paths = paths
+        self.workers = workers
+        self.max_entries = max_entries
+        self._results: OrderedDict[str, dict] = OrderedDict()
+        self._fits: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def _remember(self, entries: OrderedDict, key: str, value) -> None:
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def _lookup(self, entries: OrderedDict, key: str):
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def fit(self, history: History) -> tuple[SmoothingFit, SmoothingFit]:
+        """Fits (or returns the cached) income and expense models."""
+        if len(history.income) < MIN_HISTORY:
+            raise ValueError(f"Forecasting needs at least {MIN_HISTORY} months of recorded transactions.")
+        key = history.fingerprint()
+        fits = self._lookup(self._fits, key)
+        if fits is None:
+            fits = (fit_smoothing(history.income), fit_smoothing(history.expenses))
+            self._remember(self._fits, key, fits)
+        return fits
+
+    def _job(self, history: History, scenario: Scenario, horizon: int, paths: int | None, threshold: float):
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f"The horizon must be between 1 and {MAX_HORIZON} months.")
+        paths = min(paths or self.paths, MAX_PATHS)
+        settings = json.dumps([asdict(scenario), horizon, paths, threshold], sort_keys=True, default=str)
+        key = hashlib.sha256(f"{history.fingerprint()}:{settings}".encode()).hexdigest()
+        return key, (history, self.fit(history), scenario, horizon, paths, float(threshold), int(key[:15], 16))
+
+    def forecast(self, history: History, horizon: int = 12, threshold: float = 0.0,
+                 scenario: Scenario | None = None, paths: int | None = None) -> dict:
+        """Forecasts the balance `horizon` months ahead. Results carry `cached: True` when served from the cache."""
+        key, job = self._job(history, scenario or Scenario(), horizon, paths, threshold)
+        cached = self._lookup(self._results, key)
+        if cached is not None:
+            self.counters["hits"] += 1
+            return {**cached, "cached": True}
+        self.counters["misses"] += 1
+        result = _summarise(*job)
+        self._remember(self._results, key, result)
+        return {**result, "cached": False}
+
+    def sweep(self, history: History, scenarios: list[Scenario], horizon: int = 12, threshold: float = 0.0,
+              paths: int | None = None, workers: int | None = None) -> list[dict]:
+        """Forecasts several scenarios, running the uncached ones across a process pool when `workers` > 1."""
+        jobs = [self._job(history, scenario, horizon, paths, threshold) for scenario in scenarios]
+        results: dict[str, dict] = {}
+        pending: dict[str, tuple] = {}
+        for key, job in jobs:
+            cached = self._lookup(self._results, key)
+            if cached is not None:
+                self.counters["hits"] += 1
+                results[key] = {**cached, "cached": True}
+            else:
+                pending[key] = job
+        self.counters["misses"] += len(pending)
+        workers = self.workers if workers is None else workers
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                computed = list(pool.map(_run, pending.values()))
+        else:
+            computed = [_summarise(*job) for job in pending.values()]
+        for key, result in zip(pending, computed, strict=True):
+            self._remember(self._results, key, result)
+            results[key] = {**result, "cached": False}
+        return [results[key] for key, _ in jobs]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._fits.clear()
@@ -0,0 +1,494 @@
+# Streaming import of bank statement exports (CSV, OFX/QFX and QIF) with content-hash dedupe and per-account watermarks.
+import csv
+import datetime
+import hashlib
+import itertools
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+DEFAULT_IMPORTS_PATH = os.path.join(os.path.expanduser("~"), ".tradie_ai", "bank_imports.sqlite")
+CHUNK_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bank_transactions (
+    hash TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bank_transactions_account_date ON bank_transactions(account, date);
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL,
+    transactions INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+# The lines each running import has added, in file order, so they can be read back after the commit.
+_FRESH_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS fresh (
+    seq INTEGER PRIMARY KEY,
+    import_id INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+"""
+
+@dataclass
+class BankTransaction:
+    """One statement line in the common schema. Amounts are signed cents: money in is positive."""
+    account: str
+    date: str
+    amount_cents: int
+    description: str
+    reference: str = ""
+    category: str = ""
+    fitid: str = ""
+    hash: str = ""  # The content hash it is stored under; set on lines read back from the importer
+
+    @property
+    def amount(self) -> float:
+        return self.amount_cents / 100
+
+# --- Parsing ---
+
+# Day-first formats come first: New Zealand banks export dates as DD/MM/YYYY.
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y", "%Y%m%d", "%d %b %Y", "%d %B %Y", "%m/%d/%Y", "%Y/%m/%d")
+
+class _DateParser:
+    """Parses statement dates to ISO strings, remembering the format that worked and every value seen."""
+
+    def __init__(self):
+        self._format: str | None = None
+        self._seen: dict[str, str] = {}
+
+    def __call__(self, text: str) -> str:
+        text = text.strip().replace("'", "/")
+        iso = self._seen.get(text)
+        if iso is not None:
+            return iso
+        formats = (self._format, *_DATE_FORMATS) if self._format else _DATE_FORMATS
+        for fmt in formats:
+            try:
+                iso = datetime.datetime.strptime(text, fmt).date().isoformat()
+            except ValueError:
+                continue
+            self._format = fmt
+            if len(self._seen) > 100_000:
+                self._seen.clear()
+            self._seen[text] = iso
+            return iso
+        raise ValueError(f"Unrecognised date '{text}'")
+
+def parse_amount(text: str) -> int | None:
+    """Converts '1,234.50', '$-12.00', '(12.00)' or '12.00 DR' to signed cents; None for a blank field."""
+    text = text.strip().replace(",", "").replace("$", "").replace(" ", "")
+    if not text:
+        return None
+    negative = False
+    if text.startswith("(") and text.endswith(")"):
+        negative, text = True, text[1:-1]
+    upper = text.upper()
+    if upper.endswith(("DR", "CR")):
+        negative, text = upper.endswith("DR"), text[:-2]
+    cents = round(float(text) * 100)
+    return -abs(cents) if negative else cents
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+def _file_account(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+_CSV_COLUMNS = {
+    "date": ("date", "transaction date", "posted date", "posting date", "processed date", "value date"),
+    "amount": ("amount", "amount (nzd)", "transaction amount", "value"),
+    "debit": ("debit", "debit amount", "withdrawals", "withdrawal", "money out", "paid out"),
+    "credit": ("credit", "credit amount", "deposits", "deposit", "money in", "paid in"),
+    "reference": ("reference", "unique id", "transaction id", "cheque number", "tp ref", "code"),
+    "category": ("category",),
+}
+# Description columns, in the order they are joined.
+_CSV_DESCRIPTION = ("payee", "description", "details", "transaction details", "name", "narrative", "particulars", "memo")
+
+def _csv_header(row: list[str]) -> tuple[dict[str, int | None], list[int]] | None:
+    """The index of each known column and of the description columns, or None if `row` is not the header."""
+    names = [cell.strip().lower() for cell in row]
+    columns = {key: next((names.index(n) for n in candidates if n in names), None) for key, candidates in _CSV_COLUMNS.items()}
+    if columns["date"] is None or (columns["amount"] is None and columns["debit"] is None and columns["credit"] is None):
+        return None
+    return columns, [names.index(n) for n in _CSV_DESCRIPTION if n in names]
+
+def read_csv(path: str, account: str) -> Iterator[BankTransaction]:
+    """Streams a CSV export row by row. Preamble lines before the header row (as some banks add) are skipped."""
+    account = account or _file_account(path)
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        header = None
+        for row in itertools.islice(reader, 50):
+            header = _csv_header(row)
+            if header:
+                break
+        if header is None:
+            raise ValueError(f"{os.path.basename(path)}: no header row with a date and an amount column")
+        columns, description_columns = header
+        parse_date = _DateParser()
+
+        def cell(row: list[str], key: str) -> str:
+            index = columns[key]
+            return row[index] if index is not None and index < len(row) else ""
+
+        for row in reader:
+            if not row or not cell(row, "date").strip():
+                continue
+            amount = parse_amount(cell(row, "amount"))
+            if amount is None:
+                amount = (parse_amount(cell(row, "credit")) or 0) - abs(parse_amount(cell(row, "debit")) or 0)
+            description = []
+            for index in description_columns:
+                value = _clean(row[index]) if index < len(row) else ""
+                if value and value not in description:
+                    description.append(value)
+            yield BankTransaction(
+                account, parse_date(cell(row, "date")), amount, " ".join(description),
+                _clean(cell(row, "reference")), _clean(cell(row, "category")).lower(),
+            )
+
+_OFX_TOKEN = re.compile(rb"<ACCTID>\s*([^<\r\n]+)|<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_FIELD = re.compile(rb"<(DTPOSTED|TRNAMT|FITID|NAME|PAYEE|MEMO|CHECKNUM|REFNUM)>\s*([^<\r\n]*)", re.I)
+
+def read_ofx(path: str, account: str) -> Iterator[BankTransaction]:
+    """Scans an OFX/QFX file (SGML or XML) through a memory map, so only the current transaction is materialised.
+
+    The account number in the file is used unless `account` is given.
+    """
+    current = account or _file_account(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in _OFX_TOKEN.finditer(data):
+                if match.group(1) is not None:
+                    current = account or match.group(1).decode("utf-8", "replace").strip()
+                    continue
+                fields = {
+                    name.upper().decode(): _clean(value.decode("utf-8", "replace"))
+                    for name, value in _OFX_FIELD.findall(match.group(2))
+                }
+                posted = fields.get("DTPOSTED", "")[:8]
+                description = " ".join(dict.fromkeys(v for v in (fields.get("NAME") or fields.get("PAYEE"), fields.get("MEMO")) if v))
+                yield BankTransaction(
+                    current, f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}", parse_amount(fields.get("TRNAMT", "")) or 0,
+                    description, fields.get("CHECKNUM") or fields.get("REFNUM", ""), fitid=fields.get("FITID", ""),
+                )
+
+def read_qif(path: str, account: str) -> Iterator[BankTransaction]:
+    """Streams a QIF export record by record (records end with '^')."""
+    account = account or _file_account(path)
+    parse_date = _DateParser()
+    record: dict[str, str] = {}
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for raw in f:
+            line = raw.rstrip("\r\n")
+            if not line or line.startswith("!"):
+                continue
+            if line.startswith("^"):
+                if "D" in record:
+                    yield BankTransaction(
+                        account, parse_date(record["D"]), parse_amount(record.get("T") or record.get("U", "")) or 0,
+                        " ".join(dict.fromkeys(v for v in (record.get("P"), record.get("M")) if v)),
+                        record.get("N", ""), record.get("L", "").lower(),
+                    )
+                record = {}
+                continue
+            record[line[0]] = _clean(line[1:])
+
+READERS: dict[str, Callable[[str, str], Iterator[BankTransaction]]] = {
+    ".csv": read_csv, ".ofx": read_ofx, ".qfx": read_ofx, ".qif": read_qif,
+}
+
+def read_statement(path: str, account: str = "") -> Iterator[BankTransaction]:
+    """Streams the transactions in a statement export, picking the parser from the file extension.
+
+    CSV and QIF files carry no account number, so they are filed under `account` or the file name.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported statement format '{extension}'; use CSV, OFX, QFX or QIF.")
+    return READERS[extension](path, account)
+
+# --- Dedupe and Ingest ---
+
+def content_hash(transaction: BankTransaction, occurrence: int) -> str:
+    """Identifies a transaction across overlapping statement downloads.
+
+    The bank's FITID is used when the file has one. Otherwise the hash covers the transaction's content
+    plus its occurrence number among identical lines on the same day, so two genuine $4.50 coffees on
+    one day stay distinct while the same coffee in two downloads collapses to one.
+    """
+    if transaction.fitid:
+        key = f"{transaction.account}|fitid|{transaction.fitid}"
+    else:
+        key = "|".join((
+            transaction.account, transaction.date, str(transaction.amount_cents),
+            transaction.description.lower(), transaction.reference.lower(), str(occurrence),
+        ))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+class _UnorderedError(Exception):
+    """An account's day came back after the file had moved past it, so its dropped counts are needed again."""
+
+class _Occurrences:
+    """Numbers identical lines on the same day of the same account, over the whole file, for `content_hash`.
+
+    Statements list each account's lines in date order (oldest or newest first), so with `ordered` a day's
+    counts are dropped once the file moves past it and memory stays flat however long the export. A day that
+    comes back raises _UnorderedError, and the file is numbered again without `ordered`, keeping every day's counts.
+    """
+
+    def __init__(self, ordered: bool = True):
+        self.ordered = ordered
+        self._counts: Counter = Counter()
+        self._day: tuple[str, str] | None = None
+        self._finished: set[tuple[str, str]] = set()
+
+    def number(self, transaction: BankTransaction) -> int:
+        day = (transaction.account, transaction.date)
+        if self.ordered and day != self._day:
+            if day in self._finished:
+                raise _UnorderedError(day)
+            if self._day is not None:
+                self._finished.add(self._day)
+            self._day = day
+            self._counts.clear()
+        key = (transaction.account, transaction.date, transaction.amount_cents, transaction.description,
+               transaction.reference)
+        self._counts[key] += 1
+        return self._counts[key]
+
+@dataclass
+class ImportReport:
+    source: str
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    before_watermark: int = 0
+    accounts: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "seconds": round(self.seconds, 3),
+            "rows_per_s": round(self.rows / self.seconds) if self.seconds else None,
+        }
+
+class StatementImporter:
+    """Imports statement exports into SQLite, idempotently and incrementally.
+
+    Every transaction is keyed by its content hash, so importing the same or an overlapping download
+    again adds nothing. Each account keeps a watermark (its latest imported date); lines older than the
+    watermark minus `grace_days` are skipped without a lookup unless the import is a backfill.
+
+    Args:
+        path: The SQLite database file, or ':memory:'.
+        grace_days: How far before the watermark lines are still checked, for late-posted transactions.
+        chunk_size: Lines parsed, deduped and written per batch.
+    """
+
+    def __init__(self, path: str = DEFAULT_IMPORTS_PATH, grace_days: int = 7, chunk_size: int = CHUNK_SIZE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.grace_days = grace_days
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA + _FRESH_SCHEMA)
+        self._imports = itertools.count(1)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _cutoff(self, db: sqlite3.Connection, account: str) -> str:
+        row = db.execute("SELECT watermark FROM accounts WHERE account = ?", (account,)).fetchone()
+        if row is None:
+            return ""
+        return (datetime.date.fromisoformat(row[0]) - datetime.timedelta(days=self.grace_days)).isoformat()
+
+    def import_file(
+        self,
+        path: str,
+        account: str = "",
+        backfill: bool = False,
+        on_chunk: Callable[[list[BankTransaction]], None] | None = None,
+    ) -> ImportReport:
+        """Imports one statement export.
+
+        Args:
+            path: A .csv, .ofx, .qfx or .qif file.
+            account: The account to file the lines under; OFX files name their own account.
+            backfill: Also check lines older than the account's watermark, e.g. when importing older history.
+            on_chunk: Called with each batch of newly imported transactions, e.g. to update the books, once the
+                whole file has been committed. The batches are read back from the database, so they are never
+                all in memory at once.
+
+        The whole file is one transaction: an error part-way through leaves nothing imported, and `on_chunk` is
+        not called at all. A file whose days are not in order is read twice (see _Occurrences).
+        """
+        started = time.perf_counter()
+        import_id = next(self._imports) if on_chunk is not None else None
+        try:
+            report = self._import(path, account, backfill, import_id, _Occurrences())
+        except _UnorderedError:
+            report = self._import(path, account, backfill, import_id, _Occurrences(ordered=False))
+        if import_id is not None and on_chunk is not None:
+            try:
+                for fresh in self._read_back(import_id):
+                    on_chunk(fresh)
+            finally:
+                with self._lock:
+                    self._db.execute("DELETE FROM fresh WHERE import_id = ?", (import_id,))
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _import(self, path: str, account: str, backfill: bool, import_id: int | None,
+                occurrences: _Occurrences) -> ImportReport:
+        report = ImportReport(source=os.path.basename(path))
+        transactions = read_statement(path, account)
+        cutoffs: dict[str, str] = {}
+        latest: dict[str, str] = {}
+        added: Counter = Counter()
+        with self._transaction() as db:
+            while True:
+                chunk = list(itertools.islice(transactions, self.chunk_size))
+                if not chunk:
+                    break
+                report.rows += len(chunk)
+                keyed = []
+                for transaction in chunk:
+                    occurrence = occurrences.number(transaction)
+                    if transaction.account not in cutoffs:
+                        cutoffs[transaction.account] = "" if backfill else self._cutoff(db, transaction.account)
+                    if transaction.date < cutoffs[transaction.account]:
+                        report.before_watermark += 1
+                        continue
+                    keyed.append((content_hash(transaction, occurrence), transaction))
+                fresh = self._insert(db, keyed, report.source, import_id)
+                report.imported += len(fresh)
+                report.duplicates += len(keyed) - len(fresh)
+                for transaction in fresh:
+                    added[transaction.account] += 1
+                    if transaction.date > latest.get(transaction.account, ""):
+                        latest[transaction.account] = transaction.date
+            for name, date in latest.items():
+                db.execute(
+                    "INSERT INTO accounts VALUES (?, ?, ?, ?) ON CONFLICT(account) DO UPDATE SET"
+                    " watermark = MAX(watermark, excluded.watermark),"
+                    " transactions = transactions + excluded.transactions, updated_at = excluded.updated_at",
+                    (name, date, added[name], time.time()),
+                )
+            report.accounts = {name: watermark for name in cutoffs if (watermark := self._watermark(db, name))}
+        return report
+
+    def _read_back(self, import_id: int) -> Iterator[list[BankTransaction]]:
+        """The lines an import added, in file order and chunks of `chunk_size`."""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT f.seq, b.hash, b.account, b.date, b.amount_cents, b.description, b.reference, b.category"
+                    " FROM fresh f JOIN bank_transactions b ON b.hash = f.hash WHERE f.import_id = ? AND f.seq > ?"
+                    " ORDER BY f.seq LIMIT ?", (import_id, last, self.chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [BankTransaction(account, date, cents, description, reference, category, hash=h)
+                   for _, h, account, date, cents, description, reference, category in rows]
+
+    def _insert(self, db: sqlite3.Connection, keyed: list[tuple[str, BankTransaction]], source: str,
+                import_id: int | None = None) -> list[BankTransaction]:
+        """Writes the lines whose hashes are not yet stored and returns them, noting them under `import_id` if given."""
+        if not keyed:
+            return []
+        known: set[str] = set()
+        hashes = [h for h, _ in keyed]
+        for i in range(0, len(hashes), 900):
+            batch = hashes[i:i + 900]
+            cursor = db.execute(f"SELECT hash FROM bank_transactions WHERE hash IN ({','.join('?' * len(batch))})", batch)
+            known.update(h for (h,) in cursor)
+        fresh: list[BankTransaction] = []
+        rows: list[tuple] = []
+        seen: set[str] = set()
+        for h, t in keyed:
+            if h in known or h in seen:
+                continue
+            seen.add(h)
+            fresh.append(t)
+            rows.append((h, t.account, t.date, t.amount_cents, t.description, t.reference, t.category, source))
+        db.executemany("INSERT INTO bank_transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        if import_id is not None:
+            db.executemany("INSERT INTO fresh (import_id, hash) VALUES (?, ?)", [(import_id, row[0]) for row in rows])
+        return fresh
+
+    # --- Queries ---
+
+    def _watermark(self, db: sqlite3.Connection, account: str) -> str | None:
+        row = db.execute("SELECT watermark FROM accounts WHERE account = ?", (account,)).fetchone()
+        return row[0] if row else None
+
+    def watermark(self, account: str) -> str | None:
+        with self._lock:
+            return self._watermark(self._db, account)
+
+    def accounts(self) -> list[dict]:
+        with self._lock:
+            rows = self._db.execute("SELECT account, watermark, transactions FROM accounts ORDER BY account").fetchall()
+        return [{"account": a, "imported_through": w, "transactions": n} for a, w, n in rows]
+
+    def transactions(self, account: str | None = None, start: str | None = None, end: str | None = None,
+                     text: str | None = None, limit: int = 100) -> list[dict]:
+        """Lists imported transactions, newest first, filtered by account, inclusive date range and description text."""
+        clauses, params = [], []
+        for clause, value in (("account = ?", account), ("date >= ?", start), ("date <= ?", end)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        if text:
+            clauses.append("description LIKE ?")
+            params.append(f"%{text}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT account, date, amount_cents, description, reference, category FROM bank_transactions {where}"
+                " ORDER BY date DESC LIMIT ?", (*params, limit),
+            ).fetchall()
+        return [
+            {"account": a, "date": d, "amount": c / 100, "description": desc, "reference": ref, "category": cat}
+            for a, d, c, desc, ref, cat in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
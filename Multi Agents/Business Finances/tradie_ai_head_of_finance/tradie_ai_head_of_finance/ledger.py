@@ -0,0 +1,235 @@
+# A persistent invoice ledger: collision-free invoice numbers, batch issuing and indexed receivables queries.
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+DEFAULT_LEDGER_PATH = os.path.join(os.path.expanduser("~"), ".tradie_ai", "finance_ledger.sqlite")
+INVOICE_PREFIX = "INV-"
+ISSUED, PAID, VOID = "issued", "paid", "void"
+AGEING_BUCKETS = (("current", None, 0), ("1-30", 1, 30), ("31-60", 31, 60), ("61-90", 61, 90), ("90+", 91, None))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    number INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_id TEXT NOT NULL UNIQUE,
+    client_name TEXT NOT NULL,
+    client_key TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    issued_on TEXT NOT NULL,
+    due_on TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'issued',
+    paid_on TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invoices_client_status ON invoices(client_key, status);
+CREATE INDEX IF NOT EXISTS invoices_issued_on ON invoices(issued_on);
+CREATE INDEX IF NOT EXISTS invoices_status_due_on ON invoices(status, due_on);
+"""
+
+def to_cents(amount: float) -> int:
+    return round(amount * 100)
+
+def client_key(name: str) -> str:
+    """Lowercases and collapses whitespace so 'Harbour Builders' and 'harbour  builders ' are one client."""
+    return " ".join(name.split()).lower()
+
+def format_invoice_id(number: int) -> str:
+    return f"{INVOICE_PREFIX}{number:06d}"
+
+@dataclass
+class Invoice:
+    """One invoice in the ledger. Amounts are held in cents."""
+    invoice_id: str
+    client_name: str
+    description: str
+    amount_cents: int
+    issued_on: str
+    due_on: str
+    status: str = ISSUED
+    paid_on: str | None = None
+
+    @property
+    def amount(self) -> float:
+        return self.amount_cents / 100
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "amount": self.amount}
+
+@dataclass
+class InvoiceRequest:
+    """The details needed to issue one invoice; used for batch issuing."""
+    client_name: str
+    amount: float
+    description: str
+    issued_on: datetime.date | None = None
+    due_days: int | None = None
+
+_COLUMNS = "invoice_id, client_name, description, amount_cents, issued_on, due_on, status, paid_on"
+
+class Ledger:
+    """An invoice ledger in SQLite (WAL mode) that is safe to share between threads and processes.
+
+    Invoice numbers come from an AUTOINCREMENT key allocated inside a write transaction, so they are
+    unique and strictly increasing even when invoices are issued concurrently.
+
+    Args:
+        path: The SQLite database file, or ':memory:'.
+        due_days: Default payment terms in days.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH, due_days: int = 20):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.due_days = due_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so number allocation cannot race another writer.
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _row(self, request: InvoiceRequest, number: int, created_at: float) -> tuple:
+        if not request.client_name.strip():
+            raise ValueError("client_name must not be empty")
+        if request.amount <= 0:
+            raise ValueError(f"Invoice amount must be positive, got {request.amount}")
+        issued_on = request.issued_on or datetime.date.today()
+        due_on = issued_on + datetime.timedelta(days=request.due_days if request.due_days is not None else self.due_days)
+        return (
+            number, format_invoice_id(number), request.client_name.strip(), client_key(request.client_name),
+            request.description, to_cents(request.amount), issued_on.isoformat(), due_on.isoformat(), ISSUED, created_at,
+        )
+
+    # --- Issuing ---
+
+    def issue(self, client_name: str, amount: float, description: str, issued_on: datetime.date | None = None,
+              due_days: int | None = None) -> Invoice:
+        """Issues and stores a single invoice."""
+        return self.issue_many([InvoiceRequest(client_name, amount, description, issued_on, due_days)])[0]
+
+    def issue_many(self, requests: Iterable[InvoiceRequest]) -> list[Invoice]:
+        """Issues many invoices in one transaction, e.g. a month-end run.
+
+        Either every invoice is stored or, if any request is invalid, none are.
+        """
+        requests = list(requests)
+        if not requests:
+            return []
+        created_at = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'invoices'").fetchone()
+            first = (row[0] if row else 0) + 1
+            rows = [self._row(request, first + i, created_at) for i, request in enumerate(requests)]
+            db.executemany(
+                "INSERT INTO invoices (number, invoice_id, client_name, client_key, description, amount_cents,"
+                " issued_on, due_on, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [Invoice(r[1], r[2], r[4], r[5], r[6], r[7]) for r in rows]
+
+    def mark_paid(self, invoice_id: str, paid_on: datetime.date | None = None) -> Invoice | None:
+        """Marks an issued invoice as paid. Returns None if there is no such invoice."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE invoices SET status = ?, paid_on = ? WHERE invoice_id = ? AND status = ?",
+                (PAID, (paid_on or datetime.date.today()).isoformat(), invoice_id, ISSUED),
+            )
+        return self.get(invoice_id)
+
+    def void(self, invoice_id: str) -> Invoice | None:
+        with self._transaction() as db:
+            db.execute("UPDATE invoices SET status = ? WHERE invoice_id = ? AND status = ?", (VOID, invoice_id, ISSUED))
+        return self.get(invoice_id)
+
+    # --- Queries ---
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def get(self, invoice_id: str) -> Invoice | None:
+        rows = self._query(f"SELECT {_COLUMNS} FROM invoices WHERE invoice_id = ?", (invoice_id,))
+        return Invoice(*rows[0]) if rows else None
+
+    def invoices(self, client_name: str | None = None, status: str | None = None,
+                 start: str | None = None, end: str | None = None, limit: int = 100) -> list[Invoice]:
+        """Lists invoices, newest first, filtered by client, status and an inclusive issue-date range."""
+        clauses, params = [], []
+        if client_name:
+            clauses.append("client_key = ?")
+            params.append(client_key(client_name))
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if start:
+            clauses.append("issued_on >= ?")
+            params.append(start)
+        if end:
+            clauses.append("issued_on <= ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT {_COLUMNS} FROM invoices {where} ORDER BY number DESC LIMIT ?", (*params, limit))
+        return [Invoice(*row) for row in rows]
+
+    def outstanding_by_client(self, client_name: str | None = None) -> list[dict]:
+        """Totals unpaid invoices per client, largest balance first."""
+        sql = (
+            "SELECT MIN(client_name), COUNT(*), SUM(amount_cents), MIN(due_on) FROM invoices"
+            " WHERE status = ?{} GROUP BY client_key ORDER BY SUM(amount_cents) DESC"
+        )
+        if client_name:
+            rows = self._query(sql.format(" AND client_key = ?"), (ISSUED, client_key(client_name)))
+        else:
+            rows = self._query(sql.format(""), (ISSUED,))
+        return [
+            {"client_name": name, "invoices": count, "outstanding": cents / 100, "oldest_due_on": oldest}
+            for name, count, cents, oldest in rows
+        ]
+
+    def aged_receivables(self, as_of: datetime.date | None = None) -> dict:
+        """Buckets unpaid invoices by days past due: current, 1-30, 31-60, 61-90 and 90+."""
+        day = (as_of or datetime.date.today()).isoformat()
+        overdue = "CAST(julianday(?) - julianday(due_on) AS INTEGER)"
+        cases = []
+        for _name, low, high in AGEING_BUCKETS:
+            condition = " AND ".join(filter(None, [
+                f"{overdue} >= {low}" if low is not None else None,
+                f"{overdue} <= {high}" if high is not None else None,
+            ]))
+            cases.append(f"SUM(CASE WHEN {condition} THEN amount_cents ELSE 0 END)")
+        params = tuple(day for _name, low, high in AGEING_BUCKETS for bound in (low, high) if bound is not None)
+        row = self._query(f"SELECT {', '.join(cases)}, COUNT(*) FROM invoices WHERE status = ?", (*params, ISSUED))[0]
+        buckets = {name: (cents or 0) / 100 for (name, _, _), cents in zip(AGEING_BUCKETS, row, strict=False)}
+        return {"as_of": day, "buckets": buckets, "total": round(sum(buckets.values()), 2), "invoices": row[-1]}
+
+    def totals(self, start: str | None = None, end: str | None = None) -> dict:
+        """Invoiced, paid and outstanding totals for invoices issued in an inclusive date range."""
+        row = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(amount_cents), 0),"
+            " COALESCE(SUM(CASE WHEN status = ? THEN amount_cents END), 0),"
+            " COALESCE(SUM(CASE WHEN status = ? THEN amount_cents END), 0)"
+            " FROM invoices WHERE status != ? AND issued_on >= ? AND issued_on <= ?",
+            (PAID, ISSUED, VOID, start or "0000-01-01", end or "9999-12-31"),
+        )[0]
+        return {"invoices": row[0], "invoiced": row[1] / 100, "paid": row[2] / 100, "outstanding": row[3] / 100}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,521 @@
+# Bulk receipt ingestion: walk a folder or archive, extract text in a process pool, parse vendor, date, total
+# and GST with deterministic rules, and skip receipts already seen by content hash. Only receipts the rules
+# cannot read confidently are left for the model to extract.
+import argparse
+import datetime
+import email
+import email.policy
+import hashlib
+import io
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECEIPTS_PATH = os.path.join(os.path.expanduser("~"), ".tradie_ai", "receipts.sqlite")
+EXTENSIONS = frozenset({".pdf", ".txt", ".eml", ".html", ".htm"})
+CONFIDENCE_THRESHOLD = 0.75
+REVIEW_TEXT_CHARS = 2000
+PARSED, NEEDS_REVIEW, REVIEWED = "parsed", "needs_review", "reviewed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    hash TEXT PRIMARY KEY,
+    receipt_id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    vendor TEXT,
+    date TEXT,
+    total_cents INTEGER,
+    gst_cents INTEGER,
+    gst_number TEXT,
+    confidence REAL NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    text TEXT,
+    imported_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS receipts_status ON receipts(status);
+CREATE INDEX IF NOT EXISTS receipts_date ON receipts(date);
+"""
+
+# --- Sources ---
+
+def iter_sources(path: str) -> Iterator[tuple[str, bytes]]:
+    """Yields (name, content) for every receipt file in a directory tree, .zip archive or tar archive, one at a time."""
+    def wanted(name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in EXTENSIONS and not os.path.basename(name).startswith(".")
+
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if wanted(name):
+                    full = os.path.join(root, name)
+                    with open(full, "rb") as f:
+                        yield os.path.relpath(full, path), f.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zip_archive:
+            for info in zip_archive.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    yield info.filename, zip_archive.read(info)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as tar_archive:
+            for member in tar_archive:
+                if member.isfile() and wanted(member.name):
+                    contents = tar_archive.extractfile(member)
+                    if contents is not None:  # Only None for links and devices, which isfile() ruled out
+                        yield member.name, contents.read()
+    elif os.path.isfile(path) and wanted(path):
+        with open(path, "rb") as f:
+            yield os.path.basename(path), f.read()
+    else:
+        raise ValueError(f"'{path}' is not a receipt file, folder, .zip or tar archive.")
+
+# --- Text Extraction ---
+
+class _TextOnly(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in ("br", "p", "div", "tr", "li", "h1", "h2", "h3", "table"):
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(self._skip - 1, 0)
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+def _html_text(markup: str) -> str:
+    parser = _TextOnly()
+    parser.feed(markup)
+    return "".join(parser.parts)
+
+def _email_text(data: bytes) -> str:
+    message = email.message_from_bytes(data, policy=email.policy.default)
+    header = f"From: {message.get('From', '')}\nDate: {message.get('Date', '')}\nSubject: {message.get('Subject', '')}\n"
+    body = message.get_body(preferencelist=("plain", "html"))
+    if body is None:
+        return header
+    content = body.get_content()
+    return header + (_html_text(content) if body.get_content_type() == "text/html" else content)
+
+def _pdf_text(data: bytes) -> str:
+    # pypdf is optional (pip install .[receipts]); without it PDFs are left for review.
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages[:5])
+
+def extract_text(name: str, data: bytes) -> str:
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".pdf":
+        return _pdf_text(data)
+    if extension == ".eml":
+        return _email_text(data)
+    text = data.decode("utf-8", errors="replace")
+    return _html_text(text) if extension in (".html", ".htm") else text
+
+# --- Parsing ---
+
+KNOWN_VENDORS = (
+    "Bunnings", "Mitre 10", "PlaceMakers", "ITM", "Carters", "Repco", "Supercheap Auto", "Z Energy", "BP",
+    "Mobil", "Gull", "Waitomo", "Caltex", "Countdown", "Woolworths", "New World", "Pak'nSave", "Noel Leeming",
+    "Harvey Norman", "Jaycar", "Trade Depot", "Plumbing World", "Mico", "Corys", "Ideal Electrical", "Blackwoods",
+    "Spark", "One NZ", "2degrees", "Warehouse Stationery", "The Warehouse", "Torpedo7", "Hirepool", "Kennards Hire",
+)
+_VENDOR_PATTERNS = [(vendor, re.compile(rf"(?<![a-z]){re.escape(vendor)}(?![a-z])", re.I)) for vendor in KNOWN_VENDORS]
+_AMOUNT = re.compile(r"(?<![\d.])-?\$?\s?(\d{1,3}(?:,\d{3})+|\d+)\.(\d{2})(?!\d)")
+_TOTAL_LABEL = re.compile(r"\b(total|amount due|balance due|amount paid|to pay)\b", re.I)
+_GST_LABEL = re.compile(r"\bgst\b", re.I)
+_NOT_TOTAL = re.compile(r"\b(sub-?\s?total|savings?|discount|points|change)\b", re.I)
+_EXCLUDES_GST = re.compile(r"\b(excl?\.?(uding|usive)?|ex)\s+gst\b", re.I)
+_GST_NUMBER = re.compile(r"\bgst\s*(?:reg(?:istration)?\.?\s*)?(?:no\.?|number|#)\s*:?\s*(\d{2,3}[- ]?\d{3}[- ]?\d{3})\b", re.I)
+_INCLUDES_GST = re.compile(r"\b(incl?\.?(uding|usive)?|includes)\b", re.I)
+_MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec"
+_DATES = [
+    (re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b"), "ymd"),
+    (re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b"), "dmy"),
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTHS})[a-z]*\.?,?\s+(\d{{4}})\b", re.I), "d_mon_y"),
+    (re.compile(rf"\b({_MONTHS})[a-z]*\.?\s+(\d{{1,2}}),?\s+(\d{{4}})\b", re.I), "mon_d_y"),
+]
+_GENERIC_LINES = re.compile(r"^(tax invoice|invoice|receipt|customer copy|merchant copy|eftpos|welcome|thank you)\b", re.I)
+
+@dataclass
+class ParsedReceipt:
+    vendor: str | None = None
+    date: str | None = None
+    total_cents: int | None = None
+    gst_cents: int | None = None
+    gst_number: str | None = None
+    confidence: float = 0.0
+    reasons: list[str] = field(default_factory=list)
+
+def _amounts(line: str) -> list[int]:
+    return [int(whole.replace(",", "")) * 100 + int(cents) for whole, cents in _AMOUNT.findall(line)]
+
+def _parse_date(text: str) -> str | None:
+    latest = datetime.date.today() + datetime.timedelta(days=1)
+    for pattern, order in _DATES:
+        for match in pattern.finditer(text):
+            a, b, c = match.groups()
+            try:
+                if order == "ymd":
+                    date = datetime.date(int(a), int(b), int(c))
+                elif order == "dmy":
+                    date = datetime.date(int(c) + (2000 if len(c) == 2 else 0), int(b), int(a))
+                elif order == "d_mon_y":
+                    date = datetime.datetime.strptime(f"{a} {b[:3]} {c}", "%d %b %Y").date()
+                else:
+                    date = datetime.datetime.strptime(f"{b} {a[:3]} {c}", "%d %b %Y").date()
+            except ValueError:
+                continue
+            if datetime.date(2000, 1, 1) <= date <= latest:
+                return date.isoformat()
+    return None
+
+def _parse_vendor(lines: list[str], text: str) -> tuple[str | None, float]:
+    sender = re.search(r"^From:\s*\"?([^\"<\n@]+?)\"?\s*(<|$)", text, re.M)
+    head = "\n".join(lines[:12])
+    for vendor, pattern in _VENDOR_PATTERNS:
+        if pattern.search(head):
+            return vendor, 1.0
+    if sender and sender.group(1).strip():
+        return sender.group(1).strip(), 0.8
+    for line in lines[:6]:
+        if re.search(r"[A-Za-z]{3}", line) and not _GENERIC_LINES.match(line) and not line.lower().startswith(("from:", "date:", "subject:")):
+            return line[:60], 0.5
+    return None, 0.0
+
+def parse_receipt(text: str) -> ParsedReceipt:
+    """Pulls vendor, date, total, GST and GST number out of receipt text, with a confidence between 0 and 1."""
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    receipt = ParsedReceipt()
+    if not lines:
+        receipt.reasons.append("no text (scanned image or empty file)")
+        return receipt
+
+    gst_number = _GST_NUMBER.search(text)
+    receipt.gst_number = gst_number.group(1).replace(" ", "-") if gst_number else None
+    totals, gst_amounts, all_amounts = [], [], []
+    for line in lines:
+        amounts = _amounts(_GST_NUMBER.sub("", line))
+        all_amounts += amounts
+        if not amounts:
+            continue
+        if _EXCLUDES_GST.search(line):
+            continue  # A GST-exclusive subtotal
+        has_gst = _GST_LABEL.search(line) and not _GST_NUMBER.search(line)
+        includes_gst = _INCLUDES_GST.search(line)
+        is_total = _TOTAL_LABEL.search(line) and not _NOT_TOTAL.search(line)
+        if is_total and (includes_gst or not has_gst):
+            # "Total 92.00", "Total incl GST 92.00" or "Total (incl GST 12.00) 92.00"
+            totals.append(max(amounts))
+            if has_gst and len(amounts) > 1:
+                gst_amounts.append(min(amounts))
+        elif has_gst:
+            # "GST 12.00", "Total GST 12.00" or "Includes GST of 12.00"
+            gst_amounts.append(amounts[-1])
+
+    score = 0.0
+    if totals:
+        receipt.total_cents, score = max(totals), 0.4
+    elif all_amounts:
+        receipt.total_cents, score = max(all_amounts), 0.15
+        receipt.reasons.append("no labelled total; used the largest amount")
+    else:
+        receipt.reasons.append("no amounts found")
+
+    receipt.date = _parse_date(text)
+    score += 0.2 if receipt.date else 0.0
+    if not receipt.date:
+        receipt.reasons.append("no date found")
+
+    receipt.vendor, vendor_score = _parse_vendor(lines, text)
+    score += 0.2 * vendor_score
+    if vendor_score < 1:
+        receipt.reasons.append("vendor not recognised" if receipt.vendor else "no vendor found")
+
+    if receipt.total_cents is not None:
+        expected = round(receipt.total_cents * 3 / 23)
+        consistent = [gst for gst in gst_amounts if abs(gst - expected) <= 2]
+        if consistent:
+            receipt.gst_cents, score = consistent[0], score + 0.2
+        elif gst_amounts:
+            receipt.gst_cents, score = gst_amounts[-1], score + 0.05
+            receipt.reasons.append("GST is not 3/23 of the total")
+        else:
+            receipt.gst_cents, score = expected, score + 0.1
+            receipt.reasons.append("GST not shown; calculated as 3/23 of the total")
+    receipt.confidence = round(min(score, 1.0), 2)
+    return receipt
+
+def extract(name: str, data: bytes) -> tuple[ParsedReceipt, str]:
+    """Extracts and parses one receipt. Runs in the worker processes, so it never touches the register."""
+    try:
+        text = extract_text(name, data)
+    except ImportError:
+        return ParsedReceipt(reasons=["PDF text extraction needs pypdf (pip install pypdf)"]), ""
+    except Exception as e:  # noqa: BLE001 - a corrupt file must not take the batch down
+        return ParsedReceipt(reasons=[f"could not read the file: {e}"]), ""
+    return parse_receipt(text), text
+
+# --- Register ---
+
+@dataclass
+class IngestReport:
+    source: str
+    files: int = 0
+    new: int = 0
+    duplicates: int = 0
+    parsed: int = 0
+    needs_review: int = 0
+    seconds: float = 0.0
+    workers: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "seconds": round(self.seconds, 3),
+            "files_per_s": round(self.files / self.seconds, 1) if self.seconds else None,
+        }
+
+def _receipt_row(row: tuple) -> dict:
+    receipt_id, source, vendor, date, total, gst, gst_number, confidence, status, reason = row
+    return {
+        "receipt_id": receipt_id, "source": source, "vendor": vendor, "date": date,
+        "total": total / 100 if total is not None else None, "gst": gst / 100 if gst is not None else None,
+        "gst_number": gst_number, "confidence": confidence, "status": status, "reason": reason,
+    }
+
+_ROW_COLUMNS = "receipt_id, source, vendor, date, total_cents, gst_cents, gst_number, confidence, status, reason"
+
+class ReceiptRegister:
+    """Receipts in SQLite (WAL), keyed by the SHA-256 of the file so the same receipt is never processed twice.
+
+    Args:
+        path: The SQLite database file, or ':memory:'.
+        threshold: The parser confidence at or above which a receipt needs no review.
+        workers: Processes for text extraction; 0 or 1 extracts in this process. The process pool is started
+            with the first receipt that needs it and reused by later ingests until `close()`.
+    """
+
+    def __init__(self, path: str = DEFAULT_RECEIPTS_PATH, threshold: float = CONFIDENCE_THRESHOLD, workers: int | None = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.threshold = threshold
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_workers = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _known(self, digest: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM receipts WHERE hash = ?", (digest,)).fetchone() is not None
+
+    def _store(self, rows: list[tuple]) -> None:
+        with self._transaction() as db:
+            db.executemany(f"INSERT OR IGNORE INTO receipts VALUES ({', '.join('?' * 13)})", rows)
+
+    def _row(self, digest: str, name: str, result: tuple[ParsedReceipt, str]) -> tuple:
+        receipt, text = result
+        # A receipt without a date or total cannot be claimed, however sure the rest of it is.
+        confident = receipt.confidence >= self.threshold and receipt.date and receipt.total_cents is not None
+        status = PARSED if confident else NEEDS_REVIEW
+        return (
+            digest, digest[:12], name, receipt.vendor, receipt.date, receipt.total_cents, receipt.gst_cents,
+            receipt.gst_number, receipt.confidence, status, "; ".join(receipt.reasons) or None,
+            text[:REVIEW_TEXT_CHARS] if status == NEEDS_REVIEW else None, time.time(),
+        )
+
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        """The register's process pool, started on first use and restarted only if the worker count changes."""
+        with self._lock:
+            if self._pool is None or self._pool_workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool, self._pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+            return self._pool
+
+    def ingest(self, path: str, workers: int | None = None,
+               on_progress: Callable[[IngestReport], None] | None = None, progress_every: int = 100) -> IngestReport:
+        """Ingests every receipt under `path`, skipping files already in the register.
+
+        Files are hashed as they are read; only unseen ones are sent to the worker processes, with a
+        bounded number in flight so a large archive never sits in memory at once.
+
+        Args:
+            path: A folder, .zip or tar archive, or a single receipt file.
+            workers: Overrides the register's worker count.
+            on_progress: Called with the running report every `progress_every` files and at the end.
+        """
+        workers = self.workers if workers is None else workers
+        report = IngestReport(source=os.path.basename(os.path.normpath(path)), workers=workers)
+        started = time.perf_counter()
+        pending: dict[Future, tuple[str, str]] = {}
+        rows: list[tuple] = []
+        batch_hashes: set[str] = set()
+
+        def finish(digest: str, name: str, result: tuple) -> None:
+            row = self._row(digest, name, result)
+            rows.append(row)
+            if row[9] == PARSED:
+                report.parsed += 1
+            else:
+                report.needs_review += 1
+            if len(rows) >= 200:
+                self._store(rows)
+                rows.clear()
+
+        def progress() -> None:
+            report.seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(report)
+
+        pool: ProcessPoolExecutor | None = None
+        try:
+            for name, data in iter_sources(path):
+                report.files += 1
+                digest = hashlib.sha256(data).hexdigest()
+                if digest in batch_hashes or self._known(digest):
+                    report.duplicates += 1
+                else:
+                    batch_hashes.add(digest)
+                    report.new += 1
+                    if workers <= 1:
+                        finish(digest, name, extract(name, data))
+                    else:
+                        pool = pool or self._executor(workers)
+                        pending[pool.submit(extract, name, data)] = (digest, name)
+                        if len(pending) >= workers * 8:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                finish(*pending.pop(future), future.result())
+                if report.files % progress_every == 0:
+                    progress()
+            for future in list(pending):
+                finish(*pending.pop(future), future.result())
+        finally:
+            for future in pending:  # Left over only if reading or extracting failed part way
+                future.cancel()
+            if rows:
+                self._store(rows)
+        progress()
+        return report
+
+    # --- Review ---
+
+    def pending_review(self, limit: int = 5) -> list[dict]:
+        """Receipts the parser was not confident about, oldest first, with their text for the model to read."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_ROW_COLUMNS}, text FROM receipts WHERE status = ? ORDER BY imported_at LIMIT ?", (NEEDS_REVIEW, limit),
+            ).fetchall()
+        return [{**_receipt_row(row[:-1]), "text": row[-1]} for row in rows]
+
+    def save_review(self, receipt_id: str, vendor: str, date: str, total: float, gst: float | None = None) -> dict | None:
+        """Stores the details the model read from a receipt. Returns None if there is no such receipt."""
+        date = datetime.date.fromisoformat(date).isoformat()
+        total_cents = round(total * 100)
+        gst_cents = round(gst * 100) if gst is not None else round(total_cents * 3 / 23)
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE receipts SET vendor = ?, date = ?, total_cents = ?, gst_cents = ?, status = ?, confidence = 1.0,"
+                " reason = 'extracted by the assistant', text = NULL WHERE receipt_id = ?",
+                (vendor.strip(), date, total_cents, gst_cents, REVIEWED, receipt_id),
+            )
+        return self.get(receipt_id) if cursor.rowcount else None
+
+    # --- Queries ---
+
+    def get(self, receipt_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_ROW_COLUMNS} FROM receipts WHERE receipt_id = ?", (receipt_id,)).fetchone()
+        return _receipt_row(row) if row else None
+
+    def receipts(self, start: str | None = None, end: str | None = None, vendor: str | None = None,
+                 status: str | None = None, limit: int = 100) -> list[dict]:
+        """Lists receipts, newest first, filtered by an inclusive date range, vendor text and status."""
+        clauses, params = [], []
+        for clause, value in (("date >= ?", start), ("date <= ?", end), ("status = ?", status)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        if vendor:
+            clauses.append("vendor LIKE ?")
+            params.append(f"%{vendor}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_ROW_COLUMNS} FROM receipts {where} ORDER BY date DESC LIMIT ?", (*params, limit),
+            ).fetchall()
+        return [_receipt_row(row) for row in rows]
+
+    def totals(self, start: str | None = None, end: str | None = None) -> dict:
+        """Receipt count, total spend and GST for an inclusive date range, and how many still need review."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total_cents), 0), COALESCE(SUM(gst_cents), 0),"
+                " SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) FROM receipts WHERE COALESCE(date, '') BETWEEN ? AND ?",
+                (NEEDS_REVIEW, start or "", end or "9999-12-31"),
+            ).fetchone()
+        return {"receipts": row[0], "total": row[1] / 100, "gst": row[2] / 100, "needs_review": row[3] or 0}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+            self._db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a folder or archive of receipts.")
+    parser.add_argument("path")
+    parser.add_argument("--db", default=os.path.expanduser(os.getenv("FINANCE_RECEIPTS_PATH", DEFAULT_RECEIPTS_PATH)))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    def show(report: IngestReport) -> None:
+        print(f"\r{report.files} files, {report.new} new, {report.duplicates} seen, {report.needs_review} to review"
+              f" ({report.files / max(report.seconds, 1e-9):.0f} files/s)", end="", file=sys.stderr, flush=True)
+
+    result = ReceiptRegister(args.db, workers=args.workers).ingest(args.path, on_progress=show)
+    print(file=sys.stderr)
+    print(result.to_dict())
@@ -0,0 +1,94 @@
+# Routing rules for the local intent router, mirroring the delegation bullets in COORDINATOR_PROMPT.
+# A keyword match skips the coordinator, so patterns name the task (a verb and its object, or a phrase) rather
+# than a single word a request might only mention in passing; anything vaguer is left to the centroid examples.
+from .router import Route
+
+ROUTES = [
+    Route(
+        agent="InvoiceReceiptAgent",
+        patterns=[
+            r"\b(generate|create|raise|send|issue|void)\b.*\binvoices?\b",
+            r"\b(unpaid|outstanding|overdue) invoices?\b",
+            r"\b(record|add|scan|upload|log)\b.*\breceipts?\b",
+            r"\bbill (a |the )?client\b",
+            r"\boverdue (payments?|accounts?)\b",
+        ],
+        examples=[
+            "Generate a new invoice for Harbour Builders for $4,850 for kitchen rewiring.",
+            "Record this receipt from Bunnings for $312.40.",
+            "Which invoices are still unpaid?",
+            "Send a payment reminder for the overdue account.",
+            "Bill the client for yesterday's callout.",
+        ],
+    ),
+    Route(
+        agent="TaxComplianceAgent",
+        patterns=[
+            r"\bhow much (gst|tax)\b",
+            r"\bgst (returns?|owing|payable|periods?|filing)\b",
+            r"\b(provisional|income) tax\b",
+            r"\btax (returns?|deductions?|deductible|compliance)\b",
+            r"\bird (rules|deadlines?|returns?|record[- ]keeping)\b",
+            r"\bpaye (returns?|payments?|filing)\b",
+        ],
+        examples=[
+            "How much GST do I owe for the last two months?",
+            "When is my next provisional tax payment due?",
+            "Am I compliant with the IRD record-keeping rules?",
+            "Calculate my income tax for this financial year.",
+            "Can I claim my ute as a business expense?",
+        ],
+    ),
+    Route(
+        agent="FinancialAnalysisAgent",
+        patterns=[
+            r"\bprofit (and|&) loss\b",
+            r"\bp&l (reports?|statements?)\b",
+            r"\bbalance sheet\b",
+            r"\b(profit|gross) margins?\b",
+            r"\bexpense (report|breakdown|analysis)\b",
+            r"\bfinancial (report|analysis|statements?)\b",
+        ],
+        examples=[
+            "Give me a profit and loss report for last quarter.",
+            "What are my biggest expenses this year?",
+            "How healthy are my profit margins compared to last year?",
+            "Analyse my spending by category.",
+            "Show me the balance sheet as at 31 March.",
+        ],
+    ),
+    Route(
+        agent="ForecastingWealthAgent",
+        patterns=[
+            r"\bforecast\b.*\b(cash ?flow|revenue|income|expenses|profit)\b",
+            r"\bcash ?flow (forecasts?|projections?)\b",
+            r"\bwealth (plan|planning|management)\b",
+            r"\b(plan|planning|save|saving) (for|towards) retirement\b",
+            r"\b(contribute|put|invest|pay)\b.*\bkiwisaver\b",
+            r"\bshould i invest\b",
+            r"\binvestment (options?|strateg(y|ies)|portfolio|property)\b",
+        ],
+        examples=[
+            "Forecast my cash flow for the next six months.",
+            "Will I be able to afford a new van next year?",
+            "How much should I put into KiwiSaver?",
+            "Help me plan for retirement.",
+            "Should I invest surplus cash or pay down the mortgage?",
+        ],
+    ),
+    Route(
+        agent="DataIntegrationAgent",
+        patterns=[
+            r"\b(connect|sync|link|integrate)\b.*\b(xero|myob|bank|account|quickbooks)\b",
+            r"\bimport\b.*\b(statement|transactions?|csv)\b",
+            r"\bbank feeds?\b",
+        ],
+        examples=[
+            "Connect my Xero account.",
+            "Import last month's bank statement.",
+            "Sync my transactions from the bank.",
+            "Pull in the CSV export from MYOB.",
+            "Set up a bank feed for my business account.",
+        ],
+    ),
+]
@@ -0,0 +1,223 @@
+# Persistent, bounded conversations: sessions kept in SQLite across restarts, history compacted into a digest once
+# the coordinator's prompt passes a token budget, and large tool outputs from earlier turns replaced by references
+# into session state. The same module ships with each of the four agent packages (kept identical by sync_shared.py).
+import hashlib
+import json
+import os
+from typing import Any
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.apps import App
+from google.adk.apps.app import EventsCompactionConfig
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.events import Event, EventActions
+from google.adk.events.event_actions import EventCompaction
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+DEFAULT_SESSION_DB_PATH = os.path.join(os.path.expanduser("~"), ".tradie_ai", "sessions.sqlite")
+OUTPUT_PREFIX = "output:"
+PREVIEW_CHARS = 300
+RECALL_PAGE_CHARS = 8000
+
+def token_budget() -> int:
+    """Coordinator prompt tokens that trigger compaction (SESSION_TOKEN_BUDGET)."""
+    return int(os.getenv("SESSION_TOKEN_BUDGET", "8000"))
+
+def kept_events() -> int:
+    """Most recent events kept word for word when history is compacted (SESSION_KEEP_EVENTS)."""
+    return int(os.getenv("SESSION_KEEP_EVENTS", "8"))
+
+def output_ref_chars() -> int:
+    """Size, in characters, above which a tool output from an earlier turn is sent as a reference (SESSION_OUTPUT_REF_CHARS)."""
+    return int(os.getenv("SESSION_OUTPUT_REF_CHARS", "2000"))
+
+def session_service(path: str | None = None):
+    """A SQLite session service (SESSION_DB_PATH), for runners started in code; `make dev` passes the same file to adk web."""
+    from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+    path = os.path.expanduser(path or os.getenv("SESSION_DB_PATH") or DEFAULT_SESSION_DB_PATH)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return SqliteSessionService(db_path=path)
+
+def _serialise(response: Any) -> str:
+    """A tool output as the model sees it: ADK wraps anything but a dict as {"result": ...}."""
+    return json.dumps(response if isinstance(response, dict) else {"result": response}, default=str)
+
+def _truncate(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def output_key(tool_name: str, text: str) -> str:
+    """The state key a tool output is kept under: the tool and a hash of the output, so it is found from the output alone."""
+    return f"{OUTPUT_PREFIX}{tool_name}:{hashlib.sha1(text.encode()).hexdigest()[:12]}"
+
+# --- Summariser ---
+
+_HEADER = "Summary of the earlier conversation (older turns compacted; tool outputs can be read back with recall_tool_output):"
+
+class DigestSummarizer(BaseEventsSummarizer):
+    """Compacts old turns into a digest without a model call.
+
+    Each user message and agent reply is kept up to `line_chars`; tool calls are reduced to the tool's name
+    and tool outputs to their size and state key. The previous digest, when there is one, is carried over
+    first and the oldest lines are dropped once the digest passes `max_chars`.
+
+    Args:
+        line_chars: Characters kept from each message.
+        max_chars: Characters the whole digest may use.
+    """
+
+    def __init__(self, line_chars: int = 400, max_chars: int = 6000):
+        self.line_chars = line_chars
+        self.max_chars = max_chars
+
+    def digest(self, events: list[Event]) -> list[str]:
+        lines = []
+        for event in events:
+            if not event.content or not event.content.parts:
+                continue
+            for part in event.content.parts:
+                if part.thought:
+                    continue
+                if part.text:
+                    if event.author == "model" and part.text.startswith(_HEADER):  # The previous digest, kept whole
+                        lines.extend(part.text[len(_HEADER):].strip().splitlines())
+                    else:
+                        lines.append(f"{event.author}: {_truncate(part.text, self.line_chars)}")
+                elif part.function_call:
+                    lines.append(f"{event.author} asked {part.function_call.name}")
+                elif part.function_response:
+                    text = _serialise(part.function_response.response)
+                    lines.append(f"{part.function_response.name} answered ({len(text)} chars, {output_key(part.function_response.name or '', text)})"
+                                 if len(text) > output_ref_chars() else
+                                 f"{part.function_response.name} answered: {_truncate(text, self.line_chars)}")
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.max_chars:
+            lines.pop(0)
+        return lines
+
+    async def maybe_summarize_events(self, *, events: list[Event]) -> Event | None:
+        lines = self.digest(events)
+        if not lines:
+            return None
+        return Event(
+            author="user",
+            invocation_id=Event.new_id(),
+            actions=EventActions(compaction=EventCompaction(
+                start_timestamp=events[0].timestamp,
+                end_timestamp=events[-1].timestamp,
+                compacted_content=types.Content(role="model", parts=[types.Part(text=_HEADER + "\n" + "\n".join(lines))]),
+            )),
+        )
+
+def compaction_config() -> EventsCompactionConfig | None:
+    """Token-budget compaction (SESSION_TOKEN_BUDGET, SESSION_KEEP_EVENTS), or None when SESSION_COMPACTION=off.
+
+    SESSION_SUMMARIZER=llm has gemini-2.5-flash write the summary instead of the local digest.
+    """
+    if os.getenv("SESSION_COMPACTION", "on").lower() == "off":
+        return None
+    summarizer: BaseEventsSummarizer
+    if os.getenv("SESSION_SUMMARIZER", "digest").lower() == "llm":
+        from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+        from google.adk.models.registry import LLMRegistry
+
+        # Resolved through the registry, so the summary call goes through the model scheduler too.
+        summarizer = LlmEventSummarizer(llm=LLMRegistry.new_llm("gemini-2.5-flash"))
+    else:
+        summarizer = DigestSummarizer()
+    return EventsCompactionConfig(summarizer=summarizer, token_threshold=token_budget(), event_retention_size=kept_events())
+
+# --- Tool Output References ---
+
+class OutputReferencePlugin(BasePlugin):
+    """Keeps large tool outputs in session state and sends them as references once their turn is over.
+
+    The turn that called a tool sees its output in full. Later turns see the state key, the size and a short
+    preview instead, and `recall_tool_output` is offered to the model, only while a reference or digest is in
+    its prompt, to read the rest back. Only the request sent to the model changes; the session's events keep
+    every output as it was.
+
+    Args:
+        max_chars: Outputs longer than this are kept and referenced (SESSION_OUTPUT_REF_CHARS).
+    """
+
+    def __init__(self, max_chars: int | None = None):
+        super().__init__(name="output_references")
+        self.max_chars = max_chars or output_ref_chars()
+        self.recall_tool = FunctionTool(recall_tool_output)
+
+    async def after_tool_callback(self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext,
+                                  result: Any) -> dict | None:
+        text = _serialise(result)
+        if len(text) > self.max_chars and tool.name != recall_tool_output.__name__:
+            key = output_key(tool.name, text)
+            if key not in tool_context.state:
+                tool_context.state[key] = result if isinstance(result, str) else text
+        return None
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        contents = llm_request.contents
+        # The current turn starts at the last message the user typed; everything before it is an earlier turn.
+        turn = next((i for i in range(len(contents) - 1, -1, -1) if contents[i].role == "user" and any(
+            part.text for part in contents[i].parts or []
+        )), 0)
+        referenced = False
+        for i, content in enumerate(contents[:turn]):
+            parts = [self._reference(part) for part in content.parts or []]
+            if any(new is not old for new, old in zip(parts, content.parts or [], strict=True)):
+                # A new Content, as the one in the request may be the session event's own.
+                contents[i] = types.Content(role=content.role, parts=parts)
+                referenced = True
+            referenced = referenced or any((part.text or "").startswith(_HEADER) for part in parts)
+        if referenced and self.recall_tool.name not in llm_request.tools_dict:
+            llm_request.append_tools([self.recall_tool])
+        return None
+
+    def _reference(self, part: types.Part) -> types.Part:
+        response = part.function_response
+        if response is None or response.response is None:
+            return part
+        text = _serialise(response.response)
+        if len(text) <= self.max_chars:
+            return part
+        reference = {"chars": len(text), "preview": _truncate(text, PREVIEW_CHARS)}
+        if response.name != recall_tool_output.__name__:  # A page read back is not stored again
+            reference = {"stored_as": output_key(response.name or "", text), **reference}
+        return types.Part(function_response=types.FunctionResponse(id=response.id, name=response.name, response=reference))
+
+def recall_tool_output(key: str, tool_context: ToolContext, offset: int = 0) -> str:
+    """Reads back a tool output from an earlier turn that the conversation now only references.
+
+    Args:
+        key: The `stored_as` key given in place of the output, e.g. 'output:LeadGenerationAgent:3f2a9c1b7d4e'.
+        offset: Character to start from, to page through a long output.
+
+    Returns:
+        Up to 8,000 characters of the output, noting where the next page starts if there is more.
+    """
+    text = tool_context.state.get(key)
+    if text is None:
+        return f"Nothing is stored under {key!r}."
+    page = text[offset:offset + RECALL_PAGE_CHARS]
+    if offset + RECALL_PAGE_CHARS < len(text):
+        page += f"\n[{len(text) - offset - RECALL_PAGE_CHARS} more characters; call again with offset={offset + RECALL_PAGE_CHARS}]"
+    return page
+
+# --- App ---
+
+def session_app(root_agent: BaseAgent, app_name: str, plugins: list[BasePlugin] | None = None) -> App:
+    """Wraps a root agent in an App with history compaction and output references (unless SESSION_COMPACTION=off).
+
+    Expose the result as `app` in agent.py; `adk web` and `adk run` prefer it over `root_agent`.
+    """
+    config = compaction_config()
+    plugins = list(plugins or [])
+    if config is not None:
+        plugins.insert(0, OutputReferencePlugin())
+    return App(name=app_name, root_agent=root_agent, plugins=plugins, events_compaction_config=config)
@@ -1,10 +1,22 @@
 # A specialist agent for Data Integration.
 from google.adk.agents import Agent
+from google.adk.tools import FunctionTool
+
 from tradie_ai_head_of_finance import prompt
+from tradie_ai_head_of_finance.tools import (
+    import_bank_statement,
+    list_bank_accounts,
+    search_bank_transactions,
+)
+
 DataIntegrationAgent = Agent(
     name="DataIntegrationAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Securely integrates with and retrieves financial data from various external sources.",
     instruction=prompt.SPECIALIST_DATA_INTEGRATION_PROMPT,
-    # tools=[] # Add any custom or built-in tools here.
+    tools=[
+        FunctionTool(import_bank_statement),
+        FunctionTool(list_bank_accounts),
+        FunctionTool(search_bank_transactions),
+    ]
 )
@@ -1,10 +1,28 @@
 # A specialist agent for Financial Analysis and Reporting.
 from google.adk.agents import Agent
+from google.adk.tools import FunctionTool
+
 from tradie_ai_head_of_finance import prompt
+from tradie_ai_head_of_finance.tools import (
+    get_aged_receivables,
+    get_cash_flow_statement,
+    get_margins,
+    get_outstanding_by_client,
+    get_profit_and_loss,
+    record_transactions,
+)
+
 FinancialAnalysisAgent = Agent(
     name="FinancialAnalysisAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Performs in-depth financial analysis, generates various financial reports, and provides key insights.",
     instruction=prompt.SPECIALIST_FINANCIAL_ANALYSIS_PROMPT,
-    # tools=[] # Add any custom or built-in tools here.
+    tools=[
+        FunctionTool(record_transactions),
+        FunctionTool(get_profit_and_loss),
+        FunctionTool(get_margins),
+        FunctionTool(get_cash_flow_statement),
+        FunctionTool(get_aged_receivables), # Debtor ageing, from the invoice ledger
+        FunctionTool(get_outstanding_by_client),
+    ]
 )
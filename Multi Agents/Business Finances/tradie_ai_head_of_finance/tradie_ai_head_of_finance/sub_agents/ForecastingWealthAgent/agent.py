@@ -1,10 +1,24 @@
 # A specialist agent for Forecasting and Wealth Management.
 from google.adk.agents import Agent
+from google.adk.tools import FunctionTool
+
 from tradie_ai_head_of_finance import prompt
+from tradie_ai_head_of_finance.tools import (
+    compare_cash_flow_scenarios,
+    forecast_cash_flow,
+    get_profit_and_loss,
+    record_transactions,
+)
+
 ForecastingWealthAgent = Agent(
     name="ForecastingWealthAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Develops financial forecasts, assists with wealth management strategies, and provides high-level financial planning guidance.",
     instruction=prompt.SPECIALIST_FORECASTING_WEALTH_PROMPT,
-    # tools=[] # Add any custom or built-in tools here.
+    tools=[
+        FunctionTool(forecast_cash_flow),
+        FunctionTool(compare_cash_flow_scenarios),
+        FunctionTool(get_profit_and_loss), # Past performance, to explain the forecast
+        FunctionTool(record_transactions),
+    ]
 )
@@ -1,13 +1,36 @@
 # A specialist agent for Invoice and Receipt management.
 from google.adk.agents import Agent
-from google.adk.tools import FunctionTool # Import FunctionTool
+from google.adk.tools import FunctionTool  # Import FunctionTool
+
 from tradie_ai_head_of_finance import prompt
-from tradie_ai_head_of_finance.tools import generate_invoice # Import the new tool
+from tradie_ai_head_of_finance.tools import (
+    generate_invoice,
+    get_aged_receivables,
+    get_invoice,
+    get_outstanding_by_client,
+    get_receipts_for_review,
+    ingest_receipts,
+    list_invoices,
+    list_receipts,
+    mark_invoice_paid,
+    save_receipt_details,
+)
 
 InvoiceReceiptAgent = Agent(
     name="InvoiceReceiptAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Manages the creation, tracking, and processing of all invoices and receipts.",
     instruction=prompt.SPECIALIST_INVOICE_RECEIPT_PROMPT,
-    tools=[FunctionTool(generate_invoice)] # Use the new tool
+    tools=[
+        FunctionTool(generate_invoice),
+        FunctionTool(get_invoice),
+        FunctionTool(list_invoices),
+        FunctionTool(mark_invoice_paid),
+        FunctionTool(get_outstanding_by_client),
+        FunctionTool(get_aged_receivables),
+        FunctionTool(ingest_receipts),
+        FunctionTool(get_receipts_for_review),
+        FunctionTool(save_receipt_details),
+        FunctionTool(list_receipts),
+    ]
 )
\ No newline at end of file
@@ -1,10 +1,28 @@
 # A specialist agent for Tax and Compliance.
 from google.adk.agents import Agent
+from google.adk.tools import FunctionTool
+
 from tradie_ai_head_of_finance import prompt
+from tradie_ai_head_of_finance.tools import (
+    categorise_gst_purchases,
+    get_gst_return,
+    get_gst_returns,
+    get_uncategorised_gst_purchases,
+    record_gst_transactions,
+    set_gst_registration,
+)
+
 TaxComplianceAgent = Agent(
     name="TaxComplianceAgent",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Handles tax calculations, ensures compliance with New Zealand tax laws, and prepares tax-related reports.",
     instruction=prompt.SPECIALIST_TAX_COMPLIANCE_PROMPT,
-    # tools=[] # Add any custom or built-in tools here.
+    tools=[
+        FunctionTool(get_gst_return),
+        FunctionTool(get_gst_returns),
+        FunctionTool(set_gst_registration),
+        FunctionTool(record_gst_transactions),
+        FunctionTool(get_uncategorised_gst_purchases),
+        FunctionTool(categorise_gst_purchases),
+    ]
 )
@@ -1,39 +1,703 @@
+import datetime  # Import datetime module
+import logging
+import os
+import threading
+from functools import cache
+
 from google.adk.agents import Agent
-from google.adk.tools import google_search, FunctionTool
-import datetime # Import datetime module
+from google.adk.tools import google_search
+
+from .lazy import LazyAttributes
+from .search_cache import SearchCallbacks
+
+logger = logging.getLogger(__name__)
+
+@cache
+def get_ledger():
+    """Returns the invoice ledger shared by every invoice tool."""
+    from .ledger import DEFAULT_LEDGER_PATH, Ledger
+
+    return Ledger(
+        os.path.expanduser(os.getenv("FINANCE_LEDGER_PATH", DEFAULT_LEDGER_PATH)),
+        due_days=int(os.getenv("FINANCE_INVOICE_DUE_DAYS", "20")),
+    )
+
+_book_lock = threading.Lock()
+
+def _book_path() -> str:
+    from .analytics import DEFAULT_BOOK_PATH
+
+    return os.path.expanduser(os.getenv("FINANCE_TRANSACTIONS_PATH", DEFAULT_BOOK_PATH))
+
+@cache
+def get_transaction_book():
+    """Returns the transaction book behind the analysis tools, loaded from disk on first use. Imports NumPy lazily."""
+    from .analytics import TransactionBook
+
+    path = _book_path()
+    return TransactionBook.load(path) if os.path.exists(path) else TransactionBook()
+
+@cache
+def get_statement_importer():
+    """Returns the bank statement importer, which remembers every imported line and each account's watermark."""
+    from .importer import DEFAULT_IMPORTS_PATH, StatementImporter
+
+    return StatementImporter(os.path.expanduser(os.getenv("FINANCE_IMPORTS_PATH", DEFAULT_IMPORTS_PATH)))
+
+@cache
+def get_gst_engine():
+    """Returns the GST engine, first bringing in any ledger invoices it has not seen.
+
+    Issued invoices are the GST return's sales. generate_invoice and mark_invoice_paid record each invoice and
+    its payment in both stores as they happen; this catch-up covers invoices issued before the GST engine was
+    first used or by another process. It reads the whole ledger once per process, and invoices already recorded
+    are skipped by their id.
+    """
+    from .gst import DEFAULT_GST_PATH, GstEngine
+    from .ledger import VOID
+
+    engine = GstEngine(os.path.expanduser(os.getenv("FINANCE_GST_PATH", DEFAULT_GST_PATH)))
+    invoices = [invoice for invoice in get_ledger().invoices(limit=-1) if invoice.status != VOID]
+    engine.record_many([_invoice_gst_record(invoice) for invoice in invoices], source="invoice")
+    return engine
+
+def _invoice_gst_record(invoice) -> dict:
+    # Invoice amounts are the total the client pays, so they are GST-inclusive.
+    return {
+        "id": invoice.invoice_id, "kind": "sale", "amount": invoice.amount, "treatment": "inclusive",
+        "date": invoice.issued_on, "paid_date": invoice.paid_on,
+    }
+
+def _record_gst_purchases(transactions: list[dict], source: str) -> None:
+    """Passes money out from recorded or imported transactions to the GST engine; sales come from invoices.
+
+    Each transaction has 'date', 'amount', and optionally 'category', 'description' and 'account', which give the
+    purchase its id unless it has an 'id' of its own, so recording the same transactions again adds nothing.
+    """
+    purchases = [
+        {"kind": "purchase", "date": str(t["date"]), "amount": -t["amount"], "category": t.get("category") or "",
+         "description": t.get("description") or "", "account": t.get("account") or "", "id": t.get("id")}
+        for t in transactions if t["amount"] < 0
+    ]
+    if purchases:
+        get_gst_engine().record_many(purchases, source=source)
+
+@cache
+def get_forecaster():
+    """Returns the cash-flow forecaster shared by the forecasting tools, with its result cache."""
+    from .forecasting import CashFlowForecaster
+
+    return CashFlowForecaster(
+        paths=int(os.getenv("FINANCE_FORECAST_PATHS", "20000")),
+        workers=int(os.getenv("FINANCE_FORECAST_WORKERS", "0")),
+    )
+
+@cache
+def get_receipt_register():
+    """Returns the receipt register, which remembers every receipt file by content hash."""
+    from .receipts import DEFAULT_RECEIPTS_PATH, ReceiptRegister
+
+    workers = os.getenv("FINANCE_RECEIPT_WORKERS")
+    return ReceiptRegister(
+        os.path.expanduser(os.getenv("FINANCE_RECEIPTS_PATH", DEFAULT_RECEIPTS_PATH)),
+        workers=int(workers) if workers else None,
+    )
 
 # --- Custom Function Tools ---
 
-def generate_invoice(client_name: str, amount: float, description: str) -> str:
-    """Generates a new invoice for a client.
+def generate_invoice(client_name: str, amount: float, description: str) -> dict:
+    """Generates a new invoice for a client and records it in the ledger and as a sale for GST.
 
     Args:
         client_name: The name of the client.
         amount: The amount of the invoice.
         description: A description of the work done.
+
+    Returns:
+        A dict with a 'status' of 'success', the 'invoice_id' and the formatted 'invoice', or 'error' if the
+        client name is empty or the amount is not positive.
     """
-    invoice_id = f"INV-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    invoice_date = datetime.date.today().strftime('%Y-%m-%d')
+    try:
+        invoice = get_ledger().issue(client_name, amount, description)
+    except ValueError as e:
+        return {"status": "error", "error_message": f"Could not generate the invoice: {e}"}
+    # The ledger stays the record of the invoice; the GST engine keeps its own copy as a sale (see get_gst_engine).
+    get_gst_engine().record_many([_invoice_gst_record(invoice)], source="invoice")
 
     invoice_details = f"""
 --- INVOICE ---
-Invoice ID: {invoice_id}
-Date: {invoice_date}
-Client: {client_name}
+Invoice ID: {invoice.invoice_id}
+Date: {invoice.issued_on}
+Due: {invoice.due_on}
+Client: {invoice.client_name}
 -----------------
-Description: {description}
-Amount: ${amount:,.2f} NZD
+Description: {invoice.description}
+Amount: ${invoice.amount:,.2f} NZD
 -----------------
 Status: Generated
 """
-    print(f"DEBUG: Invoice generated: {invoice_details}") # For debugging purposes
-    return invoice_details
+    logger.debug("Invoice generated: %s", invoice_details)
+    return {"status": "success", "invoice_id": invoice.invoice_id, "invoice": invoice_details}
+
+def get_invoice(invoice_id: str) -> dict:
+    """Looks up a single invoice by its ID (e.g. 'INV-000042').
+
+    Args:
+        invoice_id: The invoice ID.
+
+    Returns:
+        A dict with a 'status' of 'success' and the 'invoice', or 'error' if it does not exist.
+    """
+    invoice = get_ledger().get(invoice_id.strip().upper())
+    if invoice is None:
+        return {"status": "error", "error_message": f"No invoice found with ID '{invoice_id}'."}
+    return {"status": "success", "invoice": invoice.to_dict()}
+
+def list_invoices(client_name: str = "", status: str = "", start_date: str = "", end_date: str = "") -> dict:
+    """Lists recent invoices, optionally filtered by client, status and issue date.
+
+    Args:
+        client_name: Only invoices for this client.
+        status: 'issued' (unpaid), 'paid' or 'void'.
+        start_date: Earliest issue date, as YYYY-MM-DD.
+        end_date: Latest issue date, as YYYY-MM-DD.
+
+    Returns:
+        A dict with a 'status' of 'success' and up to 100 'invoices', newest first.
+    """
+    invoices = get_ledger().invoices(client_name or None, status or None, start_date or None, end_date or None)
+    return {"status": "success", "invoices": [invoice.to_dict() for invoice in invoices]}
+
+def mark_invoice_paid(invoice_id: str, paid_date: str = "") -> dict:
+    """Records that an invoice has been paid.
+
+    Args:
+        invoice_id: The invoice ID.
+        paid_date: The payment date as YYYY-MM-DD; defaults to today.
+
+    Returns:
+        A dict with a 'status' of 'success' and the updated 'invoice', or 'error'.
+    """
+    try:
+        paid_on = datetime.date.fromisoformat(paid_date) if paid_date else None
+    except ValueError:
+        return {"status": "error", "error_message": f"'{paid_date}' is not a valid YYYY-MM-DD date."}
+    invoice = get_ledger().mark_paid(invoice_id.strip().upper(), paid_on)
+    if invoice is None:
+        return {"status": "error", "error_message": f"No invoice found with ID '{invoice_id}'."}
+    if invoice.paid_on:
+        get_gst_engine().mark_paid(invoice.invoice_id, invoice.paid_on)
+    return {"status": "success", "invoice": invoice.to_dict()}
+
+def get_outstanding_by_client(client_name: str = "") -> dict:
+    """Totals unpaid invoices per client, largest balance first.
+
+    Args:
+        client_name: Only this client's balance; leave empty for every client.
+
+    Returns:
+        A dict with a 'status' of 'success' and 'clients', each with invoices, outstanding and oldest_due_on.
+    """
+    return {"status": "success", "clients": get_ledger().outstanding_by_client(client_name or None)}
+
+def get_aged_receivables(as_of_date: str = "") -> dict:
+    """Buckets unpaid invoices by how far past due they are: current, 1-30, 31-60, 61-90 and 90+ days.
+
+    Args:
+        as_of_date: The date to age from, as YYYY-MM-DD; defaults to today.
+
+    Returns:
+        A dict with a 'status' of 'success', the 'buckets' and the 'total' outstanding.
+    """
+    try:
+        as_of = datetime.date.fromisoformat(as_of_date) if as_of_date else None
+    except ValueError:
+        return {"status": "error", "error_message": f"'{as_of_date}' is not a valid YYYY-MM-DD date."}
+    return {"status": "success", **get_ledger().aged_receivables(as_of)}
+
+# --- Receipt Tools ---
+
+def ingest_receipts(path: str) -> dict:
+    """Reads every receipt in a folder, .zip or tar archive (PDF, email, HTML or text) into the receipt register.
+
+    Vendor, date, total and GST are read by rules; receipts seen before are skipped, so ingesting a folder again is safe.
+
+    Args:
+        path: The folder, archive or single receipt file.
+
+    Returns:
+        A dict with a 'status' of 'success', how many 'files' were read, how many were 'new' or 'duplicates',
+        how many were 'parsed' and how many 'needs_review', the 'progress' of the run (files, new and to review
+        at up to the last ten checkpoints, every 250 files), and the first receipts to review with their text.
+        A failed run reports how far it got in 'progress' too.
+    """
+    path = os.path.expanduser(path)
+    if not os.path.exists(path):
+        return {"status": "error", "error_message": f"Nothing found at '{path}'."}
+    progress: list[dict] = []
+
+    def record_progress(report) -> None:
+        logger.info("Receipts: %d files, %d new, %d to review", report.files, report.new, report.needs_review)
+        progress.append({"files": report.files, "new": report.new, "needs_review": report.needs_review,
+                         "seconds": round(report.seconds, 3)})
+        del progress[:-10]
+
+    register = get_receipt_register()
+    try:
+        report = register.ingest(path, on_progress=record_progress, progress_every=250)
+    except (ValueError, OSError) as e:
+        return {"status": "error", "error_message": f"Could not read receipts from {os.path.basename(path)}: {e}",
+                "progress": progress}
+    review = register.pending_review(limit=5) if report.needs_review else []
+    return {"status": "success", **report.to_dict(), "progress": progress, "review": review}
+
+def get_receipts_for_review(limit: int = 5) -> dict:
+    """Lists receipts the rules could not read confidently, with their text, so the details can be read from it.
+
+    Args:
+        limit: The most receipts to return (up to 20).
+
+    Returns:
+        A dict with a 'status' of 'success' and the 'receipts', each with its 'receipt_id', best-guess fields, 'reason' and 'text'.
+    """
+    return {"status": "success", "receipts": get_receipt_register().pending_review(min(max(limit, 1), 20))}
+
+def save_receipt_details(receipt_id: str, vendor: str, date: str, total: float, gst: float | None = None) -> dict:
+    """Saves the details read from a receipt that needed review.
+
+    Args:
+        receipt_id: The receipt's ID from `get_receipts_for_review`.
+        vendor: The business that issued the receipt.
+        date: The receipt date, as YYYY-MM-DD.
+        total: The total paid, including GST.
+        gst: The GST shown on the receipt; leave out to use 3/23 of the total.
+
+    Returns:
+        A dict with a 'status' of 'success' and the saved 'receipt'.
+    """
+    try:
+        receipt = get_receipt_register().save_review(receipt_id, vendor, date, total, gst)
+    except ValueError:
+        return {"status": "error", "error_message": f"'{date}' is not a valid date; use YYYY-MM-DD."}
+    if receipt is None:
+        return {"status": "error", "error_message": f"Receipt {receipt_id} not found."}
+    return {"status": "success", "receipt": receipt}
+
+def list_receipts(start_date: str = "", end_date: str = "", vendor: str = "", limit: int = 50) -> dict:
+    """Lists stored receipts, newest first, with totals for the range.
+
+    Args:
+        start_date: Earliest receipt date, as YYYY-MM-DD.
+        end_date: Latest receipt date, as YYYY-MM-DD.
+        vendor: Text the vendor name must contain.
+        limit: The most receipts to return (up to 200).
+
+    Returns:
+        A dict with a 'status' of 'success', the 'receipts' and the range 'totals'.
+    """
+    register = get_receipt_register()
+    receipts = register.receipts(start_date or None, end_date or None, vendor or None, limit=min(max(limit, 1), 200))
+    return {"status": "success", "receipts": receipts, "totals": register.totals(start_date or None, end_date or None)}
+
+# --- Financial Analysis Tools ---
+# These return compact computed summaries, so the model never has to do arithmetic over raw transactions.
+
+def record_transactions(transactions: list[dict]) -> dict:
+    """Adds transactions to the books used for financial reports. Transactions already recorded are skipped.
+
+    Args:
+        transactions: Each with 'date' (YYYY-MM-DD), 'amount' (positive for money in, negative for money out),
+            'category', and optionally 'job', 'client' and 'description'.
+
+    Returns:
+        A dict with a 'status' of 'success', the number of transactions 'recorded', skipped as 'duplicates'
+        and now in the books in 'total'.
+    """
+    try:
+        with _book_lock:
+            book = get_transaction_book()
+            before = len(book)
+            total = book.add(transactions)
+            book.save(_book_path())
+        _record_gst_purchases(transactions, source="transactions")
+    except (KeyError, ValueError, TypeError) as e:
+        return {"status": "error", "error_message": f"Could not record transactions: {e}"}
+    return {"status": "success", "recorded": total - before, "duplicates": len(transactions) - (total - before), "total": total}
+
+def get_profit_and_loss(period: str = "month", start_month: str = "", end_month: str = "") -> dict:
+    """Calculates a profit and loss statement by month, quarter or year.
+
+    Args:
+        period: 'month', 'quarter' or 'year'.
+        start_month: First month to include, as YYYY-MM.
+        end_month: Last month to include, as YYYY-MM.
+
+    Returns:
+        A dict with a 'status' of 'success', income, expenses, net profit and margin per period, the
+        'total', and the largest expense categories.
+    """
+    try:
+        with _book_lock:
+            report = get_transaction_book().profit_and_loss(period, start_month or None, end_month or None)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", **report}
+
+def get_margins(by: str = "job", start_date: str = "", end_date: str = "") -> dict:
+    """Calculates revenue, costs and margin per job or per client, largest revenue first.
+
+    Args:
+        by: 'job' or 'client'.
+        start_date: Earliest transaction date, as YYYY-MM-DD.
+        end_date: Latest transaction date, as YYYY-MM-DD.
+
+    Returns:
+        A dict with a 'status' of 'success' and the top 10 'rows'.
+    """
+    try:
+        with _book_lock:
+            report = get_transaction_book().margins(by, start_date or None, end_date or None)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", **report}
+
+def get_cash_flow_statement(start_month: str = "", end_month: str = "") -> dict:
+    """Builds a cash-flow statement: opening balance, operating, investing and financing flows, and closing balance.
+
+    Args:
+        start_month: First month to include, as YYYY-MM.
+        end_month: Last month to include, as YYYY-MM.
+
+    Returns:
+        A dict with a 'status' of 'success' and the statement.
+    """
+    try:
+        with _book_lock:
+            report = get_transaction_book().cash_flow(start_month or None, end_month or None)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", **report}
+
+# --- GST Tools ---
+
+def _gst_month(period: str, frequency: int, balance_month: int) -> str:
+    from .gst import period_for
+
+    today = datetime.date.today().isoformat()[:7]
+    if period in ("", "last"):
+        start, _ = period_for(today, frequency, balance_month)
+        year, month = int(start[:4]), int(start[5:7]) - 1
+        return f"{year - 1}-12" if month == 0 else f"{year}-{month:02d}"
+    if period == "current":
+        return today
+    datetime.date.fromisoformat(f"{period[:7]}-01")
+    return period[:7]
+
+def get_gst_return(period: str = "last", basis: str = "", entity: str = "") -> dict:
+    """Calculates a GST return: sales, GST collected, purchases, GST paid and the net to pay or refund.
+
+    Args:
+        period: 'last' (the most recent finished period), 'current', or any month in the period as YYYY-MM.
+        basis: 'invoice' or 'payments'; defaults to the registered basis.
+        entity: The business, when returns are kept for more than one; defaults to the user's own.
+
+    Returns:
+        A dict with a 'status' of 'success' and the 'return', with IRD GST101A box numbers and the due date.
+    """
+    from .gst import DEFAULT_ENTITY
+
+    engine = get_gst_engine()
+    entity = entity or DEFAULT_ENTITY
+    settings = engine.settings(entity)
+    try:
+        month = _gst_month(period.strip().lower(), settings.frequency, settings.balance_month)
+        gst_return = engine.gst_return(month, entity, basis or None)
+    except ValueError as e:
+        return {"status": "error", "error_message": f"Could not calculate the GST return: {e}"}
+    return {"status": "success", "return": gst_return}
+
+def get_gst_returns(start_month: str, end_month: str, entities: list[str] | None = None, basis: str = "") -> dict:
+    """Calculates every GST return between two months, for one or many businesses in one call.
+
+    Args:
+        start_month: A month in the first period, as YYYY-MM.
+        end_month: A month in the last period, as YYYY-MM.
+        entities: The businesses to include; defaults to the user's own.
+        basis: 'invoice' or 'payments'; defaults to each business's registered basis.
+
+    Returns:
+        A dict with a 'status' of 'success' and the 'returns' in period order.
+    """
+    from .gst import DEFAULT_ENTITY
+
+    try:
+        returns = get_gst_engine().returns(entities or [DEFAULT_ENTITY], start_month, end_month, basis or None)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", "returns": returns}
+
+def set_gst_registration(frequency: int, basis: str, balance_month: int = 3, entity: str = "") -> dict:
+    """Saves how a business is registered for GST.
+
+    Args:
+        frequency: Filing frequency in months: 1, 2 or 6.
+        basis: 'invoice' or 'payments'.
+        balance_month: The month of the balance date (3 for 31 March), which sets when periods end.
+        entity: The business; defaults to the user's own.
+
+    Returns:
+        A dict with a 'status' of 'success' and the saved 'registration'.
+    """
+    from .gst import DEFAULT_ENTITY
+
+    try:
+        settings = get_gst_engine().configure(entity or DEFAULT_ENTITY, frequency, basis.strip().lower(), balance_month)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", "registration": vars(settings)}
+
+def record_gst_transactions(transactions: list[dict], entity: str = "") -> dict:
+    """Records sales and purchases for GST that are not already in the books, e.g. cash sales or another business's records.
+
+    Args:
+        transactions: Each with 'date' (invoice date, YYYY-MM-DD), 'amount', and optionally 'kind' ('sale' or
+            'purchase'; otherwise positive amounts are sales), 'paid_date', 'category', 'description', and 'treatment'
+            ('inclusive', 'exclusive', 'zero-rated' or 'exempt'; otherwise worked out from the category).
+            A negative amount with a 'kind' is a credit note or refund. Transactions already recorded are skipped,
+            and purchases without a category are held back for review (see get_uncategorised_gst_purchases).
+        entity: The business; defaults to the user's own.
+
+    Returns:
+        A dict with a 'status' of 'success' and how many were 'recorded'.
+    """
+    from .gst import DEFAULT_ENTITY
+
+    try:
+        recorded = get_gst_engine().record_many(transactions, entity or DEFAULT_ENTITY, source="manual")
+    except (KeyError, ValueError, TypeError) as e:
+        return {"status": "error", "error_message": f"Could not record GST transactions: {e}"}
+    return {"status": "success", "recorded": recorded}
+
+def get_uncategorised_gst_purchases(period: str = "last", entity: str = "", limit: int = 50) -> dict:
+    """Lists the purchases in a GST period that have no category, which are left out of its return until categorised.
+
+    Args:
+        period: 'last' (the most recent finished period), 'current', or any month in the period as YYYY-MM.
+        entity: The business; defaults to the user's own.
+        limit: The most purchases to return (up to 200).
+
+    Returns:
+        A dict with a 'status' of 'success' and the 'purchases', each with the 'id' to categorise it by.
+    """
+    from .gst import DEFAULT_ENTITY, period_for
+
+    engine = get_gst_engine()
+    entity = entity or DEFAULT_ENTITY
+    settings = engine.settings(entity)
+    try:
+        month = _gst_month(period.strip().lower(), settings.frequency, settings.balance_month)
+    except ValueError as e:
+        return {"status": "error", "error_message": f"Could not read the period: {e}"}
+    first, last = period_for(month, settings.frequency, settings.balance_month)
+    purchases = engine.uncategorised(f"{first}-01", f"{last}-31", entity, min(max(limit, 1), 200))
+    return {"status": "success", "period": f"{first} to {last}", "purchases": purchases}
+
+def categorise_gst_purchases(purchase_ids: list[int], category: str, treatment: str = "", entity: str = "") -> dict:
+    """Categorises purchases listed by `get_uncategorised_gst_purchases`, so those with GST are claimed in their return.
+
+    Args:
+        purchase_ids: The purchases' ids.
+        category: What they were, e.g. 'materials', 'fuel', 'wages', 'loan repayment' or 'transfer'.
+        treatment: 'inclusive', 'exclusive', 'zero-rated' or 'exempt'; otherwise worked out from the category.
+        entity: The business; defaults to the user's own.
+
+    Returns:
+        A dict with a 'status' of 'success' and how many were 'categorised'.
+    """
+    from .gst import DEFAULT_ENTITY
+
+    try:
+        categorised = get_gst_engine().categorise(purchase_ids, category, treatment, entity or DEFAULT_ENTITY)
+    except ValueError as e:
+        return {"status": "error", "error_message": f"Could not categorise the purchases: {e}"}
+    return {"status": "success", "categorised": categorised}
+
+# --- Forecasting Tools ---
+
+def _history(current_balance: float | None):
+    from .forecasting import History
+
+    with _book_lock:
+        return History.from_book(get_transaction_book(), current_balance)
+
+def forecast_cash_flow(
+    months: int = 12,
+    low_balance_threshold: float = 0.0,
+    current_balance: float | None = None,
+    revenue_change_pct: float = 0.0,
+    expense_change_pct: float = 0.0,
+    one_off_amount: float = 0.0,
+    one_off_month: int = 1,
+) -> dict:
+    """Forecasts monthly income, expenses and bank balance from the recorded transactions.
+
+    Args:
+        months: How many months ahead to forecast (1 to 36).
+        low_balance_threshold: The balance the user does not want to fall below.
+        current_balance: Today's bank balance, if known; otherwise the balance implied by the recorded transactions.
+        revenue_change_pct: A what-if change to expected income, e.g. -20.
+        expense_change_pct: A what-if change to expected expenses.
+        one_off_amount: A one-off payment (negative) or receipt (positive), e.g. -45000 for a new van.
+        one_off_month: Months ahead the one-off happens (1 is next month).
+
+    Returns:
+        A dict with a 'status' of 'success', the expected income, expenses and net per month, balance
+        percentiles per month (p5 to p95), and the probability of falling below the threshold.
+    """
+    from .forecasting import Scenario
+
+    scenario = Scenario.from_dict({
+        "name": "forecast", "revenue_change_pct": revenue_change_pct, "expense_change_pct": expense_change_pct,
+        "one_off_amount": one_off_amount, "one_off_month": one_off_month,
+    })
+    try:
+        report = get_forecaster().forecast(_history(current_balance), months, low_balance_threshold, scenario)
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", **report}
+
+def compare_cash_flow_scenarios(
+    scenarios: list[dict],
+    months: int = 12,
+    low_balance_threshold: float = 0.0,
+    current_balance: float | None = None,
+) -> dict:
+    """Compares what-if scenarios against the same cash-flow forecast.
+
+    Args:
+        scenarios: Each with a 'name' and optionally 'revenue_change_pct', 'expense_change_pct', 'volatility'
+            (1 is normal), 'one_off_amount' and 'one_off_month'.
+        months: How many months ahead to forecast (1 to 36).
+        low_balance_threshold: The balance the user does not want to fall below.
+        current_balance: Today's bank balance, if known; otherwise the balance implied by the recorded transactions.
+
+    Returns:
+        A dict with a 'status' of 'success' and, per scenario, the median and 5th percentile closing
+        balance, the likely lowest balance and the probability of falling below the threshold.
+    """
+    from .forecasting import Scenario
+
+    try:
+        reports = get_forecaster().sweep(
+            _history(current_balance), [Scenario.from_dict(s) for s in scenarios], months, low_balance_threshold,
+        )
+    except (ValueError, TypeError) as e:
+        return {"status": "error", "error_message": str(e)}
+    return {
+        "status": "success",
+        "months": months,
+        "threshold": low_balance_threshold,
+        "scenarios": [
+            {
+                "name": report["scenario"]["name"],
+                "closing_balance_median": report["balance_percentiles"]["p50"][-1],
+                "closing_balance_p5": report["balance_percentiles"]["p5"][-1],
+                "lowest_balance_p5": report["lowest_balance"]["p5"],
+                "probability_below_threshold": report["probability_below_threshold"],
+                "first_month_at_risk": report["first_month_at_risk"],
+            }
+            for report in reports
+        ],
+    }
+
+# --- Data Integration Tools ---
+
+def import_bank_statement(file_path: str, account: str = "", backfill: bool = False) -> dict:
+    """Imports a bank statement export (CSV, OFX, QFX or QIF) into the books.
+
+    Lines already imported, including from overlapping downloads, are skipped, so importing a file twice is safe.
+
+    Args:
+        file_path: Path to the exported file.
+        account: The account name; OFX files name their own account, other formats default to the file name.
+        backfill: True when importing history older than what has already been imported for the account.
+
+    Returns:
+        A dict with a 'status' of 'success', the 'rows' read, how many were 'imported' or skipped as
+        'duplicates' or 'before_watermark', and each account's latest imported date.
+    """
+    from .importer import BankTransaction
+
+    path = os.path.expanduser(file_path)
+    if not os.path.isfile(path):
+        return {"status": "error", "error_message": f"No file found at '{file_path}'."}
+
+    def add_to_books(transactions: list[BankTransaction]) -> None:
+        # Bank exports rarely carry categories; keeping money in and out apart keeps the P&L meaningful.
+        categories = [
+            t.category or ("uncategorised income" if t.amount_cents > 0 else "uncategorised expenses") for t in transactions
+        ]
+        with _book_lock:
+            get_transaction_book().append([t.date for t in transactions], [t.amount for t in transactions], categories)
+        # Each line's import hash is its GST id, so identical lines in different chunks stay distinct.
+        _record_gst_purchases([
+            {"date": t.date, "amount": t.amount, "category": t.category, "description": t.description,
+             "account": t.account, "id": f"bank:{t.hash}"}
+            for t in transactions
+        ], source="bank")
+
+    try:
+        report = get_statement_importer().import_file(path, account.strip(), backfill, on_chunk=add_to_books)
+    except (ValueError, OSError) as e:
+        return {"status": "error", "error_message": f"Could not import {os.path.basename(path)}: {e}"}
+    if report.imported:
+        with _book_lock:
+            get_transaction_book().save(_book_path())
+    return {"status": "success", **report.to_dict()}
+
+def list_bank_accounts() -> dict:
+    """Lists the bank accounts statements have been imported for, with how far each is imported.
+
+    Returns:
+        A dict with a 'status' of 'success' and 'accounts', each with its latest imported date and transaction count.
+    """
+    return {"status": "success", "accounts": get_statement_importer().accounts()}
+
+def search_bank_transactions(account: str = "", start_date: str = "", end_date: str = "", text: str = "", limit: int = 50) -> dict:
+    """Finds imported bank transactions, newest first.
+
+    Args:
+        account: Only this account.
+        start_date: Earliest date, as YYYY-MM-DD.
+        end_date: Latest date, as YYYY-MM-DD.
+        text: Text the description must contain, e.g. a payee name.
+        limit: The most transactions to return (up to 200).
+
+    Returns:
+        A dict with a 'status' of 'success' and the matching 'transactions'.
+    """
+    transactions = get_statement_importer().transactions(
+        account or None, start_date or None, end_date or None, text or None, min(max(limit, 1), 200),
+    )
+    return {"status": "success", "transactions": transactions}
 
 # --- Agent-as-a-Tool Definitions ---
 
-SearchAgent = Agent(
-    name="SearchAgent",
-    model="gemini-2.0-flash",
-    description="Performs a Google search.",
-    tools=[google_search],
-)
+# Sits behind the shared search cache, so repeated or concurrent identical queries cost one search.
+web_search_cache = SearchCallbacks(namespace="web")
+
+# Built the first time it is imported or accessed, e.g. `from tradie_ai_head_of_finance.tools import SearchAgent`.
+def _build_search_agent() -> Agent:
+    return Agent(
+        name="SearchAgent",
+        model="gemini-2.0-flash",
+        description="Performs a Google search.",
+        tools=[google_search],
+        before_agent_callback=web_search_cache.before_agent,
+        after_model_callback=web_search_cache.after_model,
+        after_agent_callback=web_search_cache.after_agent,
+        on_model_error_callback=web_search_cache.on_model_error,
+    )
+
+_lazy = LazyAttributes(globals(), SearchAgent=_build_search_agent)
+__getattr__ = _lazy.__getattr__
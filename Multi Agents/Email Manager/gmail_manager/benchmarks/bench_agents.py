@@ -0,0 +1,72 @@
+# Offline benchmarks for gmail_manager: coordinator and pipeline triage against scripted models.
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from harness import Call, Reply, Workload, main
+
+EMAIL = (
+    "From: Sam Taylor <sam@taylorbuilders.co.nz>\n"
+    "Subject: Quoting tool for our crew\n\n"
+    "Hey Joe, we're drowning in quote requests and a mate said you build AI agents. "
+    "Could you have a look at how we do quotes and whether an agent could help? Keen to chat next week."
+)
+CATEGORY = "Action Required: Personal Response"
+DRAFT = (
+    "Hey Sam,\nCheers for reaching out mate. Quoting is a perfect job for an agent - it can build the quote, "
+    "send it and chase it up a week later.\nAre you free for a quick call next week?\nCheers!\nJoe"
+)
+
+def _coordinator():
+    from gmail_manager.agent import _build_coordinator, _build_specialists
+    from gmail_manager.router import IntentRouter
+    from gmail_manager.routes import ROUTES
+    specialists = _build_specialists()
+    return _build_coordinator(specialists, IntentRouter.from_routes(specialists, ROUTES))
+
+def _pipeline():
+    from gmail_manager.pipeline import TriagePipeline
+    return TriagePipeline
+
+def _reset_fast_path():
+    # Keep the categorizer's local classifier cold so every iteration makes the same model calls.
+    from gmail_manager.sub_agents.email_categorizer.fast_path import (
+        NaiveBayesClassifier,
+        preclassifier,
+    )
+    preclassifier.model = NaiveBayesClassifier()
+
+WORKLOADS = [
+    Workload(
+        name="gmail_triage_coordinator",
+        root_agent=_coordinator,
+        message=EMAIL,
+        scripts={
+            "GmailManager": [
+                Call("EmailCategorizer", {"request": EMAIL}),
+                Call("EmailDrafter", {"request": f"Category: {CATEGORY}\n\n{EMAIL}"}),
+                Call("BookingLinkInserter", {"request": DRAFT}),
+                Reply(DRAFT),
+            ],
+            "EmailCategorizer": [Reply(CATEGORY)],
+            "EmailDrafter": [Reply(DRAFT)],
+            "BookingLinkInserter": [Reply(DRAFT)],
+        },
+        reset=_reset_fast_path,
+    ),
+    Workload(
+        name="gmail_triage_pipeline",
+        root_agent=_pipeline,
+        message=EMAIL,
+        scripts={
+            "PipelineCategorizer": [Reply(CATEGORY)],
+            "PipelineDrafter": [Reply(DRAFT)],
+        },
+        reset=_reset_fast_path,
+    ),
+]
+
+if __name__ == "__main__":
+    main(WORKLOADS, default_output=str(pathlib.Path(__file__).parent / "results.jsonl"))
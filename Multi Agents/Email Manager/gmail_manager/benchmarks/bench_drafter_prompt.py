@@ -0,0 +1,48 @@
+# Measures the drafter's instruction size per email: the static, cacheable prefix plus the retrieved examples.
+import json
+import pathlib
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from harness import estimate_tokens
+
+from gmail_manager import prompt
+from gmail_manager.sub_agents.email_drafter.examples import ExampleInstruction
+
+EMAILS = [
+    "Hey Joe, could we book a call next week to talk about an AI quote system for my plumbing crew?",
+    "Hi Joe, we keep running out of materials on site. Is there a way to forecast what we need?",
+    "Joe - are you free to take on another project? It's a big inventory build for a hardware store.",
+    "Afternoon, I've tried ChatGPT already and it didn't really help with my admin. What's different about agents?",
+    "Thanks for the proposal, looks good. What would the next steps be?",
+]
+
+def main() -> None:
+    provider = ExampleInstruction()
+    full_library = provider.template.format(examples="\n".join(f'- "{e}"' for e in prompt.EMAIL_DRAFTER_EXAMPLES))
+    static_tokens = estimate_tokens(prompt.EMAIL_DRAFTER_STATIC_PROMPT)
+    dynamic_tokens, timings = [], []
+    for email in EMAILS:
+        started = time.perf_counter()
+        rendered = provider.render(email)
+        timings.append(time.perf_counter() - started)
+        dynamic_tokens.append(estimate_tokens(rendered))
+    result = {
+        "benchmark": "drafter_prompt",
+        "static_tokens": static_tokens,
+        "dynamic_tokens_p50": statistics.median(dynamic_tokens),
+        "dynamic_tokens_max": max(dynamic_tokens),
+        "instruction_tokens_p50": static_tokens + statistics.median(dynamic_tokens),
+        "full_library_instruction_tokens": static_tokens + estimate_tokens(full_library),
+        "retrieval_us_p50": round(statistics.median(timings) * 1e6, 1),
+        "k": provider.k,
+        "max_chars": provider.max_chars,
+    }
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Measures the mail store on a synthetic mailbox: the first header-only sync, a re-sync with nothing new, a re-sync
+# after new mail arrives, and lazy body reads, for an mbox file, a Maildir and the local IMAP stand-in. The baseline
+# parses every whole message with the standard library, as a loader without a watermark must on each sync.
+import argparse
+import email
+import json
+import mailbox
+import os
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+from email import policy
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from gmail_manager.local_imap import serve
+from gmail_manager.mailstore import ImapSource, MaildirSource, MailStore, MboxSource
+
+SENDERS = [f"{name}@{domain}" for name in ("mike", "sarah", "accounts", "tom", "priya", "noreply", "jess")
+           for domain in ("kiwiplumbing.co.nz", "gmail.com", "buildco.nz", "xtra.co.nz")]
+SUBJECTS = ["Quote for bathroom reno", "Invoice overdue", "Site visit Tuesday?", "Your order has shipped",
+            "Heat pump install", "Re: Deck materials", "Booking confirmation", "Question about the AI agent"]
+LINE = "Thanks for getting back to me, the job on Smith St is going well and we should be done by Friday.\n"
+
+def message(i: int, rng: random.Random) -> bytes:
+    """One synthetic email: plain, multipart/alternative with HTML, or with a PDF attachment; most quote a reply."""
+    sender = SENDERS[i % len(SENDERS)]
+    thread = i // 4
+    day = 1 + i % 28
+    headers = (
+        f"From: {sender.split('@')[0].title()} <{sender}>\nTo: joe@tradie.ai\n"
+        f"Subject: {SUBJECTS[thread % len(SUBJECTS)]}\nDate: Mon, {day:02d} Sep 2024 09:{i % 60:02d}:00 +1200\n"
+        f"Message-ID: <m{i}@bench.local>\nReferences: <m{thread * 4}@bench.local>\nMIME-Version: 1.0\n"
+    )
+    text = LINE * rng.randint(2, 8)
+    quoted = "\nOn Sun, 1 Sep 2024 at 10:00, Joe <joe@tradie.ai> wrote:\n" + "> " + LINE * rng.randint(5, 40) if i % 3 else ""
+    kind = i % 20
+    if kind == 0:
+        attachment = "JVBERi0xLjQKJcfsj6IK" * 2000  # About 40 KB of base64
+        body = (
+            'Content-Type: multipart/mixed; boundary="mix"\n\n--mix\nContent-Type: text/plain\n\n' + text + quoted +
+            '\n--mix\nContent-Type: application/pdf; name="quote.pdf"\nContent-Transfer-Encoding: base64\n\n' +
+            "\n".join(attachment[j:j + 76] for j in range(0, len(attachment), 76)) + "\n--mix--\n"
+        )
+    elif kind < 8:
+        html = "<html><body><p>" + text.replace("\n", "<br>") + "</p><blockquote>" + quoted + "</blockquote></body></html>"
+        body = (
+            'Content-Type: multipart/alternative; boundary="alt"\n\n--alt\nContent-Type: text/plain\n\n' + text + quoted +
+            '\n--alt\nContent-Type: text/html\n\n' + html + "\n--alt--\n"
+        )
+    else:
+        body = "Content-Type: text/plain; charset=utf-8\n\n" + text + quoted
+    return (headers + body).encode()
+
+def write_mailboxes(root: pathlib.Path, start: int, count: int, seed: int = 7) -> None:
+    """Appends messages start..start+count to root/inbox.mbox and delivers them to root/maildir/new."""
+    rng = random.Random(seed + start)
+    new = root / "maildir" / "new"
+    for folder in ("new", "cur", "tmp"):
+        (root / "maildir" / folder).mkdir(parents=True, exist_ok=True)
+    with open(root / "inbox.mbox", "ab") as mbox:
+        for i in range(start, start + count):
+            data = message(i, rng)
+            mbox.write(b"From - Mon Sep  2 09:00:00 2024\n" + data.replace(b"\nFrom ", b"\n>From ") + b"\n")
+            (new / f"{1700000000 + i}.M{i}P1.bench").write_bytes(data)
+
+def full_parse(path: pathlib.Path) -> float:
+    """Seconds to parse every message and its body with the standard library."""
+    started = time.perf_counter()
+    for raw in mailbox.mbox(str(path), factory=None, create=False).itervalues():
+        parsed = email.message_from_bytes(raw.as_bytes(), policy=policy.default)
+        part = parsed.get_body(("plain", "html"))
+        if part is not None:
+            part.get_content()
+    return time.perf_counter() - started
+
+def measure(name: str, store: MailStore, source, append, ids: list[int]) -> dict:
+    first = store.sync(source)[0]
+    again = store.sync(source)[0]
+    append()
+    after_new = store.sync(source)[0]
+    timings, cached, chars = [], [], []
+    for id in ids:
+        started = time.perf_counter()
+        chars.append(len(store.body(id)))
+        timings.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        store.body(id)
+        cached.append(time.perf_counter() - started)
+    quoted = store._db.execute("SELECT SUM(quoted_chars), SUM(LENGTH(text)) FROM bodies").fetchone()
+    return {
+        "benchmark": "mailstore",
+        "source": name,
+        "messages": first.scanned,
+        "first_sync_s": round(first.seconds, 2),
+        "first_sync_messages_per_s": round(first.scanned / first.seconds),
+        "resync_unchanged_ms": round(again.seconds * 1000, 1),
+        "resync_unchanged_scanned": again.scanned,
+        "resync_new_ms": round(after_new.seconds * 1000, 1),
+        "resync_new_scanned": after_new.scanned,
+        "body_first_read_ms_p50": round(statistics.median(timings) * 1000, 2),
+        "body_cached_ms_p50": round(statistics.median(cached) * 1000, 3),
+        "quoted_chars_stripped_pct": round(100 * quoted[0] / (quoted[0] + quoted[1]), 1) if quoted[1] else 0,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--new", type=int, default=100, help="Messages that arrive between syncs.")
+    parser.add_argument("--bodies", type=int, default=200, help="Bodies read lazily per source.")
+    parser.add_argument("--skip-baseline", action="store_true")
+    parser.add_argument("--output", default=str(pathlib.Path(__file__).resolve().parent / "results.jsonl"))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        started = time.perf_counter()
+        write_mailboxes(root, 0, args.messages)
+        size_mb = os.path.getsize(root / "inbox.mbox") / 1e6
+        print(f"# wrote {args.messages} messages ({size_mb:.0f} MB) in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        total = [args.messages]
+
+        def append() -> None:
+            write_mailboxes(root, total[0], args.new)
+            total[0] += args.new
+
+        results = []
+        sample = random.Random(1).sample(range(1, args.messages + 1), args.bodies)
+        for name, make in (
+            ("mbox", lambda: MboxSource(str(root / "inbox.mbox"))),
+            ("maildir", lambda: MaildirSource(str(root / "maildir"))),
+        ):
+            store = MailStore(str(root / f"{name}.sqlite"))
+            results.append(measure(name, store, make(), append, sample))
+            store.close()
+        server = serve(str(root / "inbox.mbox"))
+        source = ImapSource("127.0.0.1", "joe", "secret", port=server.server_address[1], ssl=False)
+        store = MailStore(str(root / "imap.sqlite"))
+        results.append(measure("imap", store, source, append, sample))
+        store.close()
+        server.shutdown()
+        if not args.skip_baseline:
+            seconds = full_parse(root / "inbox.mbox")
+            results.append({
+                "benchmark": "mailstore", "source": "stdlib_full_parse", "messages": total[0],
+                "full_parse_s": round(seconds, 2), "messages_per_s": round(total[0] / seconds),
+            })
+    with open(args.output, "a") as f:
+        for result in results:
+            print(json.dumps(result))
+            f.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Measures the model scheduler against a local fake Gemini API that throttles (see fake_gemini.py). A burst of
+# calls is sent straight at it and through the scheduler, with a known quota and with one set too high for the
+# scheduler's adaptive limit to find; then interactive calls arrive behind a batch backlog, with and without lanes.
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+os.environ.update(GOOGLE_API_KEY="fake-key", GOOGLE_GENAI_USE_VERTEXAI="False")
+
+from fake_gemini import Limits, serve
+from google.adk.models import Gemini, LlmRequest
+from google.genai import types
+
+from gmail_manager.scheduler import (
+    ModelScheduler,
+    Quota,
+    ScheduledGemini,
+    install_scheduler,
+    model_lane,
+)
+
+MODEL = "gemini-2.5-flash"
+EMAIL = "From: mike@kiwiplumbing.co.nz\nSubject: Quote for bathroom reno\n\nCan you come and look at the job on Smith St? " * 4
+
+def request() -> LlmRequest:
+    return LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text=EMAIL)])],
+                      config=types.GenerateContentConfig())
+
+async def call(model: Gemini, lane: str = "interactive") -> tuple[float, str]:
+    """Seconds the call took and how it ended: 'ok' or the error code."""
+    started = time.perf_counter()
+    try:
+        with model_lane(lane):
+            async for _ in model.generate_content_async(request()):
+                pass
+        outcome = "ok"
+    except Exception as e:  # noqa: BLE001 - any failure is counted as an outcome
+        outcome = str(getattr(e, "code", type(e).__name__))
+    return time.perf_counter() - started, outcome
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000) if ordered else 0
+
+async def burst(mode: str, server, calls: int, quota: Quota) -> dict:
+    server.reset()
+    if mode == "direct":
+        model, scheduler = Gemini(model=MODEL, base_url=server.base_url), None
+    else:
+        scheduler = install_scheduler(ModelScheduler(quotas={MODEL: quota}, attempts=8, base_delay_s=0.1, max_delay_s=2))
+        model = ScheduledGemini(model=MODEL, base_url=server.base_url)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(model) for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    latencies = [seconds for seconds, outcome in results if outcome == "ok"]
+    counters = server.counters
+    return {
+        "benchmark": "scheduler", "scenario": "burst", "mode": mode, "calls": calls,
+        "succeeded": len(latencies), "failed": calls - len(latencies),
+        "server_requests": counters.requests, "server_429s": counters.throttled, "server_503s": counters.server_errors,
+        "server_peak_concurrent": counters.peak_concurrent,
+        "elapsed_s": round(elapsed, 2), "goodput_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": percentile(latencies, 0.5), "latency_ms_p95": percentile(latencies, 0.95),
+        "final_concurrency_limit": round(scheduler.queue(MODEL).limit.limit, 2) if scheduler else None,
+        "final_requests_per_s": round(scheduler.queue(MODEL).pace.limit, 1) if scheduler else None,
+    }
+
+async def lanes(mode: str, server, batch_calls: int, interactive_calls: int, quota: Quota) -> dict:
+    """A batch backlog is queued, then interactive calls arrive one every 50 ms."""
+    server.reset()
+    install_scheduler(ModelScheduler(quotas={MODEL: quota}, attempts=8, base_delay_s=0.1, max_delay_s=2))
+    model = ScheduledGemini(model=MODEL, base_url=server.base_url)
+    batch_lane = "batch" if mode == "lanes" else "interactive"
+    backlog = [asyncio.create_task(call(model, batch_lane)) for _ in range(batch_calls)]
+    await asyncio.sleep(0.2)
+    interactive = []
+    for _ in range(interactive_calls):
+        interactive.append(asyncio.create_task(call(model, "interactive")))
+        await asyncio.sleep(0.05)
+    interactive_results = await asyncio.gather(*interactive)
+    batch_started = time.perf_counter()
+    batch_results = await asyncio.gather(*backlog)
+    return {
+        "benchmark": "scheduler", "scenario": "interactive_behind_batch", "mode": mode,
+        "batch_calls": batch_calls, "interactive_calls": interactive_calls,
+        "interactive_ms_p50": percentile([s for s, _ in interactive_results], 0.5),
+        "interactive_ms_p95": percentile([s for s, _ in interactive_results], 0.95),
+        "batch_ms_p50": percentile([s for s, _ in batch_results], 0.5),
+        "batch_drain_after_interactive_s": round(time.perf_counter() - batch_started, 2),
+        "failed": sum(outcome != "ok" for _, outcome in interactive_results + batch_results),
+        "server_429s": server.counters.throttled,
+    }
+
+async def run(args) -> list[dict]:
+    limits = Limits(requests_per_window=args.rps, window_s=1.0, max_concurrent=args.server_concurrency,
+                    error_rate=args.error_rate, latency_s=0.05, jitter_s=0.05)
+    server = serve(limits)
+    rpm = args.rps * 60
+    results = [
+        await burst("direct", server, args.calls, Quota(rpm, 10_000_000)),
+        await burst("scheduled_known_quota", server, args.calls, Quota(rpm, 10_000_000, burst_s=1)),
+        await burst("scheduled_quota_too_high", server, args.calls, Quota(rpm * 5, 10_000_000, burst_s=1)),
+    ]
+    server.limits = Limits(requests_per_window=10_000, max_concurrent=args.server_concurrency, latency_s=0.1, jitter_s=0.0)
+    quota = Quota(rpm * 10, 10_000_000, initial_concurrency=args.server_concurrency,
+                  max_concurrency=args.server_concurrency)
+    for mode in ("single_lane", "lanes"):
+        results.append(await lanes(mode, server, args.batch, args.interactive, quota))
+    server.shutdown()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model scheduler against a throttling fake Gemini API.")
+    parser.add_argument("--calls", type=int, default=300, help="Calls in the burst.")
+    parser.add_argument("--rps", type=int, default=20, help="Requests per second the fake API accepts.")
+    parser.add_argument("--server-concurrency", type=int, default=8, help="Requests the fake API serves at once.")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of requests failing with 503.")
+    parser.add_argument("--batch", type=int, default=200, help="Batch calls queued before the interactive ones.")
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--output", default=str(pathlib.Path(__file__).resolve().parent / "results.jsonl"))
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    with open(args.output, "a", encoding="utf-8") as out:
+        for result in results:
+            print(json.dumps(result))
+            out.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
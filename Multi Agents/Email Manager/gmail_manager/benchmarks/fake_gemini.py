@@ -0,0 +1,157 @@
+# A local stand-in for the Gemini API's generateContent endpoint that throttles like the real one: 429 once a
+# project's requests per window or concurrent requests pass a limit, plus a rate of random 503s. Point a Gemini
+# model at it with base_url (any API key works), e.g. `python benchmarks/fake_gemini.py --port 8089 --rps 20`.
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH = re.compile(r"^/[^/]+/models/([^/:]+):generateContent")
+
+@dataclass
+class Limits:
+    """What the fake project allows.
+
+    Args:
+        requests_per_window: Requests accepted per sliding `window_s`; more are refused with 429.
+        window_s: The window, in seconds.
+        max_concurrent: Requests served at once; more are refused with 429.
+        error_rate: Share of accepted requests that fail with 503.
+        latency_s: Time each accepted request takes, plus up to `jitter_s`.
+        retry_after_s: Sent as Retry-After with each 429 when set.
+    """
+    requests_per_window: int = 20
+    window_s: float = 1.0
+    max_concurrent: int = 8
+    error_rate: float = 0.0
+    latency_s: float = 0.05
+    jitter_s: float = 0.05
+    retry_after_s: float = 0.0
+
+@dataclass
+class Counters:
+    requests: int = 0
+    ok: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    peak_concurrent: int = 0
+    by_model: dict = field(default_factory=dict)
+
+class FakeGemini(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], limits: Limits, seed: int = 7):
+        super().__init__(address, _Handler)
+        self.limits = limits
+        self.counters = Counters()
+        self.rng = random.Random(seed)
+        self._recent: deque = deque()
+        self._concurrent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def admit(self, model: str) -> int:
+        """200 when the request may proceed (and then counts it as in flight), else the status to refuse it with."""
+        now = time.monotonic()
+        with self._lock:
+            self.counters.requests += 1
+            self.counters.by_model[model] = self.counters.by_model.get(model, 0) + 1
+            while self._recent and self._recent[0] <= now - self.limits.window_s:
+                self._recent.popleft()
+            if len(self._recent) >= self.limits.requests_per_window or self._concurrent >= self.limits.max_concurrent:
+                self.counters.throttled += 1
+                return 429
+            self._recent.append(now)
+            if self.rng.random() < self.limits.error_rate:
+                self.counters.server_errors += 1
+                return 503
+            self._concurrent += 1
+            self.counters.peak_concurrent = max(self.counters.peak_concurrent, self._concurrent)
+            return 200
+
+    def finish(self) -> None:
+        with self._lock:
+            self._concurrent -= 1
+            self.counters.ok += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = Counters()
+            self._recent.clear()
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeGemini
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        match = _PATH.match(self.path)
+        if not match:
+            return self._reply(404, _error(404, "NOT_FOUND", f"No route for {self.path}"))
+        model = match.group(1)
+        status = self.server.admit(model)
+        if status == 429:
+            return self._reply(429, _error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."))
+        if status != 200:
+            return self._reply(status, _error(status, "UNAVAILABLE", "The model is overloaded. Please try again later."))
+        limits = self.server.limits
+        time.sleep(limits.latency_s + self.server.rng.random() * limits.jitter_s)
+        self.server.finish()
+        prompt = sum(len(part.get("text", "")) for content in body.get("contents", []) for part in content.get("parts", []))
+        text = "Thanks for getting in touch, we can come out Tuesday morning to take a look."
+        self._reply(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": prompt // 4 + 1, "candidatesTokenCount": len(text) // 4,
+                              "totalTokenCount": prompt // 4 + 1 + len(text) // 4},
+            "modelVersion": model,
+        })
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429 and self.server.limits.retry_after_s:
+            self.send_header("Retry-After", str(self.server.limits.retry_after_s))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def _error(code: int, status: str, message: str) -> dict:
+    return {"error": {"code": code, "message": message, "status": status}}
+
+def serve(limits: Limits, host: str = "127.0.0.1", port: int = 0) -> FakeGemini:
+    """Starts the server in a background thread; port 0 picks a free port (see `server.base_url`)."""
+    server = FakeGemini((host, port), limits)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a throttling stand-in for the Gemini generateContent API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rps", type=int, default=20, help="Requests accepted per second.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests served at once.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each request takes.")
+    args = parser.parse_args()
+    server = serve(Limits(args.rps, 1.0, args.concurrency, args.error_rate, args.latency), args.host, args.port)
+    print(f"Serving a fake Gemini API on {server.base_url} (set base_url on the model)", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
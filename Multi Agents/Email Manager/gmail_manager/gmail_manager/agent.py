@@ -1,22 +1,73 @@
 # The Root Coordinator Agent for the gmail_manager system.
-from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
-
-from . import prompt
-# Import all specialist agents that you will define.
-from .sub_agents.email_categorizer import EmailCategorizer
-from .sub_agents.email_drafter import EmailDrafter
-from .sub_agents.booking_link_inserter import BookingLinkInserter
-
-# The root_agent uses the AgentTool model to call specialists.
-root_agent = Agent(
-    name="GmailManager",
-    model="gemini-2.5-pro", # Or another powerful model for orchestration
-    description="Orchestrates email management, delegating tasks to specialist agents for categorization, drafting, and booking link insertion.",
-    instruction=prompt.COORDINATOR_PROMPT,
-    tools=[
-        AgentTool(agent=EmailCategorizer),
-        AgentTool(agent=EmailDrafter),
-        AgentTool(agent=BookingLinkInserter),
+import os
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.plugins.base_plugin import BasePlugin
+
+from . import prompt, tracing
+from .lazy import LazyAgentTool
+from .router import IntentRouter
+from .routes import ROUTES
+from .scheduler import install_scheduler
+from .sessions import session_app
+from .tools import list_emails
+
+
+def _build_specialists() -> list[LazyAgentTool]:
+    # Specialists are registered lazily: each sub_agent module is only loaded the first time
+    # the coordinator delegates to it.
+    return [
+        LazyAgentTool(
+            "gmail_manager.sub_agents.email_categorizer:EmailCategorizer",
+            name="EmailCategorizer",
+            description="Categorizes incoming emails based on content and sender to determine if a response is required.",
+        ),
+        LazyAgentTool(
+            "gmail_manager.sub_agents.email_drafter:EmailDrafter",
+            name="EmailDrafter",
+            description="Drafts personalized email replies, considering the user's tone of voice, and intelligently decides whether a reply is necessary.",
+        ),
+        LazyAgentTool(
+            "gmail_manager.sub_agents.booking_link_inserter:BookingLinkInserter",
+            name="BookingLinkInserter",
+            description="Inserts a predefined Google Calendar booking link into an email draft.",
+        ),
     ]
-)
+
+def _build_coordinator(specialists: list[LazyAgentTool], intent_router: IntentRouter) -> Agent:
+    return Agent(
+        name="GmailManager",
+        model="gemini-2.5-pro", # Or another powerful model for orchestration
+        description="Orchestrates email management, delegating tasks to specialist agents for categorization, drafting, and booking link insertion.",
+        instruction=prompt.COORDINATOR_PROMPT,
+        tools=[*specialists, list_emails],
+        before_agent_callback=intent_router.before_agent,
+        after_model_callback=intent_router.after_model,
+        on_model_error_callback=intent_router.on_model_error,
+    )
+
+# Set GMAIL_MANAGER_MODE=pipeline to run the fixed categorize -> draft -> link workflow instead.
+# Only the selected mode is imported and built.
+root_agent: BaseAgent
+if os.getenv("GMAIL_MANAGER_MODE", "coordinator").lower() == "pipeline":
+    from .pipeline import TriagePipeline
+    root_agent = TriagePipeline
+    intent_router = None
+else:
+    # Explicit instructions go straight to a specialist without a coordinator model call (see router.py).
+    specialists = _build_specialists()
+    intent_router = IntentRouter.from_routes(specialists, ROUTES)
+    root_agent = _build_coordinator(specialists, intent_router)
+
+# Every Gemini call waits its turn in one scheduler: per-model quotas, adaptive concurrency, retries on 429
+# and 5xx, and interactive calls ahead of batch ones (see scheduler.py). MODEL_SCHEDULER=off calls models directly.
+scheduler = install_scheduler()
+
+# Set TRACE_PATH, METRICS_PATH or METRICS_PORT to trace every agent, model and tool hop (see tracing.py).
+plugins: list[BasePlugin] = []
+if tracing.enabled():
+    plugins.append(tracing.tracing_plugin_from_env(collectors=(scheduler.metrics.render,) if scheduler else ()))
+
+# Long conversations are compacted once they pass SESSION_TOKEN_BUDGET, and large tool outputs from
+# earlier turns are sent as references into session state (see sessions.py).
+app = session_app(root_agent, app_name="gmail_manager", plugins=plugins)
@@ -0,0 +1,213 @@
+# Batch inbox triage: runs categorize -> draft -> insert-link for many emails concurrently.
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import asdict, dataclass, field
+
+from google.adk.agents import BaseAgent
+from google.adk.apps import App
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from . import tracing
+from .scheduler import install_scheduler, model_lane
+from .sub_agents.email_categorizer import EmailCategorizer
+from .sub_agents.email_drafter import EmailDrafter
+from .tools import insert_booking_link
+
+APP_NAME = "gmail_manager_batch"
+USER_ID = "batch_triage"
+
+Email = dict
+EmailSource = Iterable[Email] | AsyncIterable[Email]
+
+# --- Result Types ---
+
+@dataclass
+class TriageResult:
+    """The outcome of triaging a single email."""
+    email_id: str
+    category: str = ""
+    draft: str = ""
+    latency_s: float = 0.0
+    error: str = ""
+
+@dataclass
+class BatchStats:
+    """Running totals for a batch triage run."""
+    started_at: float = field(default_factory=time.perf_counter)
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, result: TriageResult) -> None:
+        self.latencies.append(result.latency_s)
+        if result.error:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        """Returns total throughput and per-email latency percentiles."""
+        elapsed = time.perf_counter() - self.started_at
+        count = len(self.latencies)
+        ordered = sorted(self.latencies)
+        return {
+            "emails": count,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(count / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency_mean_s": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+            "latency_p50_s": round(ordered[count // 2], 3) if ordered else 0.0,
+            "latency_p95_s": round(ordered[min(count - 1, int(count * 0.95))], 3) if ordered else 0.0,
+        }
+
+# --- Agent Execution ---
+
+class _AgentCaller:
+    """Runs a single specialist agent against a fresh session and returns its final text."""
+
+    def __init__(self, agent: BaseAgent, session_service: InMemorySessionService, plugins: list | None = None):
+        self.agent = agent
+        self.session_service = session_service
+        app = App(name=APP_NAME, root_agent=agent, plugins=plugins or [])
+        self.runner = Runner(app=app, session_service=session_service)
+
+    async def __call__(self, text: str) -> str:
+        session = await self.session_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=f"{self.agent.name}-{uuid.uuid4().hex}"
+        )
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        reply = ""
+        try:
+            async for event in self.runner.run_async(
+                user_id=USER_ID, session_id=session.id, new_message=message
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    reply = "".join(part.text or "" for part in event.content.parts)
+        finally:
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+            )
+        return reply.strip()
+
+def format_email(email: Email) -> str:
+    """Renders an email dict (sender, subject, headers, body) as the text the specialists expect."""
+    lines = [f"From: {email.get('sender', '')}", f"Subject: {email.get('subject', '')}"]
+    lines += [f"{name}: {value}" for name, value in email.get("headers", {}).items()]
+    return "\n".join(lines) + f"\n\n{email.get('body', '')}"
+
+class BatchTriage:
+    """Triages emails through the specialist agents without the coordinator hop.
+
+    Args:
+        concurrency: The maximum number of emails in flight at once.
+        lane: The scheduler lane its model calls wait in (see scheduler.py); "batch" lets interactive
+            requests from the coordinator go first when both share a model's quota.
+    """
+
+    def __init__(self, concurrency: int = 8, lane: str = "batch"):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.lane = lane
+        self.scheduler = install_scheduler()
+        session_service = InMemorySessionService()
+        # Both specialists share one tracing plugin (see tracing.py) so their spans land in one trace file.
+        collectors = (self.scheduler.metrics.render,) if self.scheduler else ()
+        plugins = [tracing.tracing_plugin_from_env(collectors=collectors)] if tracing.enabled() else []
+        self.categorize = _AgentCaller(EmailCategorizer, session_service, plugins)
+        self.draft = _AgentCaller(EmailDrafter, session_service, plugins)
+        self.stats = BatchStats()
+
+    async def triage_one(self, email: Email) -> TriageResult:
+        """Runs categorize, then draft, then inserts the booking link in code for a single email."""
+        result = TriageResult(email_id=str(email.get("id", uuid.uuid4().hex)))
+        started = time.perf_counter()
+        try:
+            with model_lane(self.lane):
+                text = format_email(email)
+                result.category = await self.categorize(text)
+                draft = await self.draft(f"Category: {result.category}\n\n{text}")
+            result.draft = insert_booking_link(draft, result.category)
+        except Exception as e:  # noqa: BLE001 - one bad email is recorded, not allowed to stop the batch
+            result.error = f"{type(e).__name__}: {e}"
+        result.latency_s = time.perf_counter() - started
+        self.stats.record(result)
+        return result
+
+    async def run(self, emails: EmailSource) -> AsyncIterator[TriageResult]:
+        """Triages a list or stream of emails, yielding each result as soon as it finishes."""
+        self.stats = BatchStats()
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        finished: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def produce() -> None:
+            try:
+                if hasattr(emails, "__aiter__"):
+                    async for email in emails:
+                        await pending.put(email)
+                else:
+                    # A sync source such as stdin or a file blocks while it reads, so it is read off the event loop.
+                    source = iter(emails)
+                    while (email := await asyncio.to_thread(next, source, None)) is not None:
+                        await pending.put(email)
+            finally:
+                for _ in range(self.concurrency):
+                    await pending.put(done)
+
+        async def work() -> None:
+            while (email := await pending.get()) is not done:
+                await finished.put(await self.triage_one(email))
+            await finished.put(done)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            remaining = self.concurrency
+            while remaining:
+                item = await finished.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+async def triage_batch(emails: EmailSource, concurrency: int = 8) -> AsyncIterator[TriageResult]:
+    """Convenience wrapper around `BatchTriage.run`."""
+    async for result in BatchTriage(concurrency=concurrency).run(emails):
+        yield result
+
+# --- Command Line Entry Point ---
+
+def _read_jsonl(path: str) -> Iterable[Email]:
+    if path == "-":
+        yield from _parse_lines(sys.stdin)  # Not closed here: stdin belongs to the process
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from _parse_lines(f)
+
+def _parse_lines(lines: Iterable[str]) -> Iterable[Email]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+async def _main(path: str, concurrency: int) -> None:
+    triage = BatchTriage(concurrency=concurrency)
+    async for result in triage.run(_read_jsonl(path)):
+        print(json.dumps(asdict(result)), flush=True)
+    print(json.dumps({"summary": triage.stats.summary()}), file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Triage a JSONL file of emails (id, sender, subject, body).")
+    parser.add_argument("path", help="Path to a JSONL file of emails, or '-' for stdin.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum emails in flight at once.")
+    args = parser.parse_args()
+    asyncio.run(_main(args.path, args.concurrency))
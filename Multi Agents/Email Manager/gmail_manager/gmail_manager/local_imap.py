@@ -0,0 +1,171 @@
+# A minimal read-only IMAP server over a local mbox file or Maildir: a stand-in for a real mail account when testing
+# ImapSource or benchmarking sync, e.g. `python -m gmail_manager.local_imap inbox.mbox --port 1143`.
+import argparse
+import re
+import socket
+import socketserver
+import threading
+import time
+
+from .mailstore import MaildirSource, open_source
+
+_COMMAND = re.compile(rb"^(\S+) (UID )?(\S+) ?(.*)$", re.I)
+_FIELDS = re.compile(rb"HEADER\.FIELDS \(([^)]*)\)", re.I)
+
+class LocalMailbox:
+    """A local mailbox with IMAP UIDs: messages are numbered in the order they are found and keep their UID.
+
+    New mail is picked up, incrementally, each time the mailbox is selected. If the file is rewritten the
+    messages are renumbered under a new UIDVALIDITY, as a real server would.
+    """
+
+    def __init__(self, path: str):
+        self.source = open_source(path)
+        self.uidvalidity = int(time.time())
+        self.messages: list[tuple[str, int, bytes]] = []  # (location, size, header block); UID = index + 1
+        self._uids: set[str] = set()
+        self._watermark: dict | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        with self._lock:
+            if isinstance(self.source, MaildirSource):
+                self.source.known = lambda: self._uids
+            scan = self.source.scan(self._watermark)
+            if scan.reset:
+                self.messages, self._uids = [], set()
+                self.uidvalidity += 1
+            for raw in scan.records:
+                self.messages.append((raw.location, raw.size, raw.headers))
+                self._uids.add(raw.uid)
+            self._watermark = scan.watermark
+
+    def uids(self, spec: str) -> list[int]:
+        """The UIDs a sequence set such as '1:500', '12', '40:*' or '3,7:9' names."""
+        last = len(self.messages)
+        found: set[int] = set()
+        for item in spec.split(","):
+            low, _, high = item.partition(":")
+            a = last if low == "*" else int(low)
+            b = a if not high else (last if high == "*" else int(high))
+            a, b = min(a, b), max(a, b)
+            found.update(range(max(a, 1), min(b, last) + 1))
+            if high == "*" and a > last and last:
+                found.add(last)  # 'n:*' always includes the last message
+        return sorted(found)
+
+def header_fields(block: bytes, names: set[bytes]) -> bytes:
+    """The named header fields (with their continuation lines) from a raw header block, ending in a blank line."""
+    kept, keep = [], False
+    for line in block.replace(b"\r\n", b"\n").split(b"\n"):
+        if line[:1] in (b" ", b"\t"):
+            if keep:
+                kept.append(line)
+            continue
+        keep = line.split(b":", 1)[0].strip().upper() in names
+        if keep:
+            kept.append(line)
+    return b"\r\n".join(kept) + b"\r\n\r\n"
+
+class _Handler(socketserver.StreamRequestHandler):
+    mailbox: LocalMailbox
+    credentials: tuple[str, str] | None
+    wbufsize = 64 * 1024  # Each reply goes out in as few packets as possible, flushed once the command is done
+
+    def setup(self) -> None:
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, data: bytes) -> None:
+        self.wfile.write(data)
+
+    def handle(self) -> None:
+        self.send(b"* OK local IMAP stand-in ready\r\n")
+        self.wfile.flush()
+        while line := self.rfile.readline():
+            done = self.command(line.rstrip(b"\r\n"))
+            self.wfile.flush()
+            if done:
+                return
+
+    def command(self, line: bytes) -> bool:
+        """Answers one command; True once the client has logged out."""
+        match = _COMMAND.match(line)
+        if not match:
+            self.send(b"* BAD unparsable command\r\n")
+            return False
+        tag, uid, command, args = match.groups()
+        command = command.upper()
+        if command == b"CAPABILITY":
+            self.send(b"* CAPABILITY IMAP4rev1\r\n" + tag + b" OK CAPABILITY completed\r\n")
+        elif command == b"LOGIN":
+            given = tuple(part.strip(b'"').decode() for part in args.split(b" ", 1))
+            if self.credentials and given != self.credentials:
+                self.send(tag + b" NO [AUTHENTICATIONFAILED] Invalid credentials\r\n")
+            else:
+                self.send(tag + b" OK LOGIN completed\r\n")
+        elif command in (b"SELECT", b"EXAMINE"):
+            self.mailbox.refresh()
+            count = len(self.mailbox.messages)
+            self.send(
+                f"* {count} EXISTS\r\n* 0 RECENT\r\n* OK [UIDVALIDITY {self.mailbox.uidvalidity}]\r\n"
+                f"* OK [UIDNEXT {count + 1}]\r\n".encode() + tag + b" OK [READ-ONLY] " + command + b" completed\r\n"
+            )
+        elif command == b"FETCH" and uid:
+            self.fetch(tag, args)
+        elif command == b"NOOP":
+            self.send(tag + b" OK NOOP completed\r\n")
+        elif command == b"LOGOUT":
+            self.send(b"* BYE logging out\r\n" + tag + b" OK LOGOUT completed\r\n")
+            return True
+        else:
+            self.send(tag + b" BAD " + command + b" is not supported here\r\n")
+        return False
+
+    def fetch(self, tag: bytes, args: bytes) -> None:
+        spec, _, items = args.partition(b" ")
+        fields = _FIELDS.search(items)
+        names = set(fields.group(1).upper().split()) if fields else set()
+        whole = b"BODY.PEEK[]" in items.upper() or b"BODY[]" in items.upper()
+        for uid in self.mailbox.uids(spec.decode()):
+            location, size, block = self.mailbox.messages[uid - 1]
+            response = f"* {uid} FETCH (UID {uid} RFC822.SIZE {size}".encode()
+            if fields:
+                data = header_fields(block, names)
+                response += b" BODY[HEADER.FIELDS (" + fields.group(1) + b")] {%d}\r\n" % len(data) + data
+            if whole:
+                data = b"".join(self.mailbox.source.fetch(location))
+                response += b" BODY[] {%d}\r\n" % len(data) + data
+            self.send(response + b")\r\n")
+        self.send(tag + b" OK UID FETCH completed\r\n")
+
+class LocalImapServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(path: str, host: str = "127.0.0.1", port: int = 0, user: str = "", password: str = "") -> LocalImapServer:
+    """Starts the server in a background thread; port 0 picks a free port (see `server.server_address`)."""
+    handler = type("Handler", (_Handler,), {
+        "mailbox": LocalMailbox(path), "credentials": (user, password) if user else None,
+    })
+    server = LocalImapServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local mbox file or Maildir over IMAP (read-only, no TLS).")
+    parser.add_argument("path", help="An mbox file or a Maildir directory.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1143)
+    parser.add_argument("--user", default="", help="Require this login (any login is accepted by default).")
+    parser.add_argument("--password", default="")
+    args = parser.parse_args()
+    server = serve(args.path, args.host, args.port, args.user, args.password)
+    print(f"Serving {args.path} on imap://{args.host}:{server.server_address[1]}/INBOX", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
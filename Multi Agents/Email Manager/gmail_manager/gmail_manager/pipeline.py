@@ -0,0 +1,53 @@
+# A fixed-workflow alternative to the coordinator: categorize, then draft, then insert the booking link in code.
+
+from google.adk.agents import Agent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from . import prompt
+from .sub_agents.email_categorizer.fast_path import (
+    after_categorizer_model,
+    before_categorizer,
+)
+from .sub_agents.email_drafter.examples import ExampleInstruction
+from .tools import insert_booking_link
+
+CATEGORY_KEY = "email_category"
+DRAFT_KEY = "email_draft"
+
+def _insert_link_after_draft(callback_context: CallbackContext) -> types.Content | None:
+    """Runs the booking link insertion as plain code on the drafter's output."""
+    draft = callback_context.state.get(DRAFT_KEY, "")
+    linked = insert_booking_link(draft, callback_context.state.get(CATEGORY_KEY, ""))
+    if linked == draft:
+        return None
+    callback_context.state[DRAFT_KEY] = linked
+    return types.Content(role="model", parts=[types.Part(text=linked)])
+
+# The agents below mirror the specialists but are separate instances, since an agent can only have one parent.
+PipelineCategorizer = Agent(
+    name="PipelineCategorizer",
+    model="gemini-2.0-flash",
+    description="Categorizes the incoming email.",
+    instruction=prompt.EMAIL_CATEGORIZER_PROMPT,
+    output_key=CATEGORY_KEY,
+    before_agent_callback=before_categorizer,
+    after_model_callback=after_categorizer_model,
+)
+
+PipelineDrafter = Agent(
+    name="PipelineDrafter",
+    model="gemini-2.0-flash",
+    description="Drafts a reply to the incoming email using the category in session state.",
+    static_instruction=prompt.PIPELINE_DRAFTER_STATIC_PROMPT,
+    instruction=ExampleInstruction(prompt.PIPELINE_DRAFTER_EXAMPLES_PROMPT),
+    output_key=DRAFT_KEY,
+    after_agent_callback=_insert_link_after_draft,
+)
+
+# Two model calls per email instead of four: no coordinator hop and no BookingLinkInserter hop.
+TriagePipeline = SequentialAgent(
+    name="GmailTriagePipeline",
+    description="Categorizes an incoming email, drafts a reply if one is needed, and adds the booking link when a meeting is proposed.",
+    sub_agents=[PipelineCategorizer, PipelineDrafter],
+)
@@ -0,0 +1,19 @@
+# Routing rules for the local intent router, mirroring the delegation bullets in COORDINATOR_PROMPT.
+# The coordinator's input is usually an email, whose words say nothing about the task, so only explicit
+# instructions at the start of the message are routed and there are no centroid examples.
+from .router import Route
+
+ROUTES = [
+    Route(
+        agent="EmailCategorizer",
+        patterns=[r"^\s*(please\s+)?(categori[sz]e|classify|triage)\b"],
+    ),
+    Route(
+        agent="EmailDrafter",
+        patterns=[r"^\s*(please\s+)?(draft|write)\s+(a\s+)?(reply|response)\b"],
+    ),
+    Route(
+        agent="BookingLinkInserter",
+        patterns=[r"^\s*(please\s+)?(insert|add)\s+(the\s+|a\s+)?booking link\b"],
+    ),
+]
@@ -0,0 +1,248 @@
+# A shared cache for search results: TTL eviction, coalescing of identical in-flight searches and an optional on-disk store.
+# The same module ships with each of the four agent packages (kept identical by sync_shared.py);
+# point SEARCH_CACHE_PATH at one file to share results between them.
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def normalise_query(query: str) -> str:
+    """Lowercases, strips punctuation and collapses whitespace so near-identical queries share an entry."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s:.'-]", " ", query.lower())).strip()
+
+class SearchCache:
+    """An in-memory TTL cache of search results with an optional SQLite store shared between processes.
+
+    Args:
+        ttl: Seconds a result stays valid.
+        max_entries: The in-memory entry limit; the least recently used entries are evicted first.
+        path: Optional SQLite file shared between apps. Results missing from memory are looked up there.
+        wait: Seconds a coalesced caller waits for an identical in-flight search before searching itself. A search
+            still in flight after this long is taken to have been abandoned (e.g. its agent raised or was cancelled
+            without releasing it), and the next caller takes it over.
+
+    Cached results are shared by every thread and event loop. In-flight searches are coalesced per event loop,
+    as a caller can only await a future of its own loop: runners on different loops search separately.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 1024, path: str | None = None, wait: float = 60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait = wait
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # (Loop, key) -> owner, started, future; the future belongs to that loop
+        self._inflight: dict[tuple[asyncio.AbstractEventLoop, str], tuple[str, float, asyncio.Future]] = {}
+        self._lock = threading.Lock()  # Guards the entries, the in-flight searches and the counters
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS search_results (key TEXT PRIMARY KEY, stored_at REAL, result TEXT)")
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "abandoned": 0}
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._entries.pop(key, None)
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT stored_at, result FROM search_results WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[0] >= self.ttl:
+                return None
+            self._remember(key, row[0], row[1])
+            return row[1]
+
+    def put(self, key: str, result: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, result)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO search_results VALUES (?, ?, ?)", (key, now, result))
+                self._db.execute("DELETE FROM search_results WHERE stored_at < ?", (now - self.ttl,))
+
+    def clear(self) -> None:
+        """Drops every cached result, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_results")
+
+    def _remember(self, key: str, stored_at: float, result: str) -> None:
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- Coalescing ---
+
+    def begin(self, key: str, owner: str) -> str | asyncio.Future | None:
+        """Returns a cached result, a future for an identical search already in flight on this event loop, or None
+        if `owner` should search."""
+        result = self.get(key)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if result is not None:
+                self.counters["hits"] += 1
+                return result
+            inflight = self._inflight.get((loop, key))
+            if inflight is not None and time.monotonic() - inflight[1] < self.wait:
+                self.counters["coalesced"] += 1
+                return inflight[2]
+            if inflight is not None:
+                self._abandon_locked(loop, key, inflight[2])
+            self.counters["misses"] += 1
+            self._inflight[(loop, key)] = (owner, time.monotonic(), loop.create_future())
+        return None
+
+    def complete(self, key: str, owner: str, result: str | None) -> None:
+        """Stores `owner`'s result and wakes any coalesced waiters. A None result lets waiters search for themselves."""
+        if result:  # Even if its search was taken over, the answer is still good
+            self.put(key, result)
+        loop = _running_loop()
+        if loop is None:  # Only a search begun on a running loop is in flight
+            return
+        with self._lock:
+            inflight = self._inflight.get((loop, key))
+            if inflight is None or inflight[0] != owner:
+                return
+            del self._inflight[(loop, key)]
+        if not inflight[2].done():
+            inflight[2].set_result(result)
+
+    async def join(self, key: str, future: asyncio.Future) -> str | None:
+        """Waits for an in-flight search's result; None if it failed or took longer than `wait`, to search instead."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._abandon_locked(asyncio.get_running_loop(), key, future)
+            return None
+
+    def _abandon_locked(self, loop: asyncio.AbstractEventLoop, key: str, future: asyncio.Future) -> None:
+        """Drops an in-flight search that never completed, waking its waiters to search for themselves.
+
+        Called with the lock held, on the future's own loop.
+        """
+        inflight = self._inflight.get((loop, key))
+        if inflight is None or inflight[2] is not future:
+            return
+        del self._inflight[(loop, key)]
+        self.counters["abandoned"] += 1
+        if not future.done():
+            future.set_result(None)
+
+    async def get_or_search(self, query: str, search: Callable[[str], Awaitable[str]], namespace: str = "web") -> str:
+        """Returns a cached result, joins an identical in-flight search, or runs `search` once."""
+        key = f"{namespace}:{normalise_query(query)}"
+        owner = f"call-{id(search)}-{time.monotonic_ns()}"
+        state = self.begin(key, owner)
+        if isinstance(state, str):
+            return state
+        if state is not None:
+            result = await self.join(key, state)
+            if result is not None:
+                return result
+            return await search(query)
+        result = None
+        try:
+            result = await search(query)
+            return result
+        finally:
+            self.complete(key, owner, result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats: dict[str, float] = dict(self.counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["searches_saved"] = stats["hits"] + stats["coalesced"]
+        stats["hit_rate"] = round(stats["searches_saved"] / lookups, 4) if lookups else 0.0
+        return stats
+
+search_cache = SearchCache(
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "3600")),
+    path=os.getenv("SEARCH_CACHE_PATH") or None,
+    wait=float(os.getenv("SEARCH_CACHE_WAIT", "60")),
+)
+
+# --- Agent Callbacks ---
+
+def _text(content: types.Content | None) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text or "" for part in content.parts if not part.thought)
+
+class SearchCallbacks:
+    """Callbacks that put an LLM search agent behind the shared search cache.
+
+    Register all four: without `on_model_error`, a search whose model call fails (e.g. a 429) leaves identical
+    searches waiting on it until the cache's `wait` runs out.
+
+    Args:
+        namespace: Separates agents whose answers differ for the same query (e.g. site-restricted search).
+        cache: The cache to use; defaults to the module-wide shared cache.
+    """
+
+    def __init__(self, namespace: str = "web", cache: SearchCache | None = None):
+        self.namespace = namespace
+        self.cache = cache or search_cache
+
+    def _key(self, callback_context: CallbackContext) -> str | None:
+        query = _text(callback_context.user_content)
+        return f"{self.namespace}:{normalise_query(query)}" if query else None
+
+    async def before_agent(self, callback_context: CallbackContext) -> types.Content | None:
+        """Answers from cache or from an identical in-flight search, skipping the model call."""
+        key = self._key(callback_context)
+        if key is None:
+            return None
+        state = self.cache.begin(key, callback_context.invocation_id)
+        if isinstance(state, asyncio.Future):
+            state = await self.cache.join(key, state)
+        if state is None:
+            return None
+        return types.Content(role="model", parts=[types.Part(text=state)])
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        """Stores the search agent's final answer."""
+        key = self._key(callback_context)
+        text = _text(llm_response.content)
+        if key and text and not llm_response.partial:
+            self.cache.complete(key, callback_context.invocation_id, text)
+        return None
+
+    def after_agent(self, callback_context: CallbackContext) -> types.Content | None:
+        """Releases coalesced waiters if the search ended without an answer to cache."""
+        key = self._key(callback_context)
+        if key:
+            self.cache.complete(key, callback_context.invocation_id, None)
+        return None
+
+    def on_model_error(
+        self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> LlmResponse | None:
+        """Releases coalesced waiters when the search's model call raises, so they search for themselves."""
+        key = self._key(callback_context)
+        if key:
+            self.cache.complete(key, callback_context.invocation_id, None)
+        return None
@@ -1,5 +1,6 @@
 # A specialist agent for inserting booking links.
 from google.adk.agents import Agent
+
 from gmail_manager import prompt
 
 BookingLinkInserter = Agent(
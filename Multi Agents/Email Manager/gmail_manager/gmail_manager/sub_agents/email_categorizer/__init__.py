@@ -1 +1,2 @@
-from .agent import EmailCategorizer
\ No newline at end of file
+from .agent import EmailCategorizer
+from .fast_path import preclassifier
\ No newline at end of file
@@ -1,11 +1,21 @@
 # A specialist agent for categorizing emails.
 from google.adk.agents import Agent
+
 from gmail_manager import prompt
 
+from .fast_path import (
+    after_categorizer_model,
+    before_categorizer,
+    before_categorizer_model,
+)
+
 EmailCategorizer = Agent(
     name="EmailCategorizer",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Categorizes incoming emails based on content and sender to determine if a response is required.",
     instruction=prompt.EMAIL_CATEGORIZER_PROMPT,
-    tools=[] # Add any custom or built-in tools here.
+    tools=[], # Add any custom or built-in tools here.
+    before_agent_callback=before_categorizer, # Header rules and local classifier skip the model when confident
+    before_model_callback=before_categorizer_model, # Given an email ID, the model sees the stored email
+    after_model_callback=after_categorizer_model, # Every LLM label trains the local classifier
 )
@@ -0,0 +1,303 @@
+# A zero-LLM pre-classification stage that answers obvious emails before EmailCategorizer calls the model.
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from email import policy
+from email.parser import Parser
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from gmail_manager.tools import read_email_content
+
+ACTION_REQUIRED = "Action Required: Personal Response"
+INFORMATIONAL = "Informational: No Response Needed"
+SPAM = "Spam/Promotional"
+MEETING = "Meeting/Appointment Related"
+OTHER = "Other"
+CATEGORIES = (ACTION_REQUIRED, INFORMATIONAL, SPAM, MEETING, OTHER)
+
+_NOREPLY_SENDER = re.compile(r"(no-?reply|do-?not-?reply|notifications?|mailer-daemon|bounce)[^@]*@", re.I)
+_PROMO_SUBJECT = re.compile(r"(\d+\s?% off|\bsale\b|\bdeal(s)?\b|\bdiscount\b|\bpromo\b|limited time|free shipping|last chance)", re.I)
+_INVITE_SUBJECT = re.compile(r"^(invitation|updated invitation|accepted|declined|tentative|new event)\s*:", re.I)
+_TOKEN = re.compile(r"[a-z0-9']{2,}")
+# What the coordinator passes when working through the mailbox: an ID from list_emails, e.g. '42', '[42]' or 'email 42'.
+_EMAIL_ID = re.compile(r"^(?:email\s+)?(?:id:?\s*)?\[?(\d+)\]?\.?$", re.I)
+
+@dataclass
+class Prediction:
+    """A category decided without calling the model."""
+    category: str
+    source: str  # "rule" or "model"
+    confidence: float
+
+# --- Deterministic Header Rules ---
+
+def parse_email_text(text: str):
+    """Parses 'Header: value' lines followed by a blank line and body into an EmailMessage."""
+    return Parser(policy=policy.default).parsestr(text)
+
+def header_rule(message) -> str | None:
+    """Returns a category when the headers alone make it certain, otherwise None."""
+    sender = str(message.get("From", ""))
+    subject = str(message.get("Subject", ""))
+    if str(message.get("X-Spam-Flag", "")).strip().lower() == "yes":
+        return SPAM
+    if _INVITE_SUBJECT.match(subject) or message.get("X-Google-Calendar-Content-Type"):
+        return MEETING
+    bulk = (
+        message.get("List-Unsubscribe") is not None
+        or message.get("List-Id") is not None
+        or str(message.get("Precedence", "")).strip().lower() in ("bulk", "list", "junk")
+    )
+    if bulk and _PROMO_SUBJECT.search(subject):
+        return SPAM
+    automated = str(message.get("Auto-Submitted", "no")).strip().lower() != "no"
+    if bulk or automated or _NOREPLY_SENDER.search(sender):
+        return INFORMATIONAL
+    return None
+
+# --- Incremental Local Classifier ---
+
+def _features(message) -> list[int]:
+    """Hashes sender domain and subject/body tokens into a fixed feature space."""
+    sender = str(message.get("From", "")).lower()
+    tokens = [f"from:{sender.rsplit('@', 1)[-1].strip('> ')}"] if "@" in sender else []
+    subject = str(message.get("Subject", "")).lower()
+    tokens += [f"subj:{t}" for t in _TOKEN.findall(subject)]
+    body = message.get_body(preferencelist=("plain",)) if message.is_multipart() else message
+    content = body.get_content() if body is not None else ""
+    tokens += _TOKEN.findall(str(content).lower()[:4000])
+    return [zlib.crc32(t.encode()) for t in tokens]
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over hashed features, updated one example at a time.
+
+    Args:
+        n_features: The size of the hashed feature space.
+        alpha: The additive (Laplace) smoothing constant.
+    """
+
+    def __init__(self, n_features: int = 2**18, alpha: float = 0.5):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.doc_counts: dict[str, int] = defaultdict(int)
+        self.token_totals: dict[str, int] = defaultdict(int)
+        self.token_counts: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def examples(self) -> int:
+        return sum(self.doc_counts.values())
+
+    def learn(self, features: list[int], label: str) -> None:
+        self.doc_counts[label] += 1
+        counts = self.token_counts[label]
+        for f in features:
+            counts[f % self.n_features] += 1
+        self.token_totals[label] += len(features)
+
+    def predict(self, features: list[int]) -> tuple[str | None, float]:
+        """Returns the most likely label and its posterior probability."""
+        if not self.doc_counts:
+            return None, 0.0
+        total_docs = self.examples
+        scores: dict[str, float] = {}
+        for label, docs in self.doc_counts.items():
+            counts = self.token_counts[label]
+            denominator = math.log(self.token_totals[label] + self.alpha * self.n_features)
+            score = math.log(docs / total_docs)
+            for f in features:
+                score += math.log(counts.get(f % self.n_features, 0) + self.alpha) - denominator
+            scores[label] = score
+        best = max(scores, key=lambda label: scores[label])
+        normaliser = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / normaliser
+
+    def to_dict(self) -> dict:
+        return {
+            "n_features": self.n_features,
+            "alpha": self.alpha,
+            "doc_counts": dict(self.doc_counts),
+            "token_totals": dict(self.token_totals),
+            "token_counts": {label: {str(k): v for k, v in c.items()} for label, c in self.token_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesClassifier":
+        model = cls(n_features=data["n_features"], alpha=data["alpha"])
+        model.doc_counts.update(data["doc_counts"])
+        model.token_totals.update(data["token_totals"])
+        for label, counts in data["token_counts"].items():
+            model.token_counts[label].update({int(k): v for k, v in counts.items()})
+        return model
+
+# --- Pre-Classifier ---
+
+_LABELS = {category.lower(): category for category in CATEGORIES}
+
+def normalise_category(text: str) -> str | None:
+    """Maps model output onto one of the known category names, when the whole answer is one of them.
+
+    Quotes, surrounding whitespace, a trailing full stop and a 'Category:' prefix are ignored; anything
+    else, such as 'Other than that, Spam/Promotional', is not a label.
+    """
+    lowered = " ".join(text.split()).strip("'\"` .").lower()
+    lowered = lowered.removeprefix("category:").strip("'\"` ")
+    return _LABELS.get(lowered)
+
+class PreClassifier:
+    """Header rules plus a local classifier that learns from past LLM labels.
+
+    Args:
+        threshold: The minimum posterior for the local classifier to answer instead of the LLM.
+        min_examples: How many LLM labels to learn from before the classifier may answer.
+        model_path: Optional JSON file the classifier is loaded from and periodically saved to.
+        save_every: How many new labels to learn between saves to `model_path`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        min_examples: int = 50,
+        model_path: str | None = None,
+        save_every: int = 25,
+    ):
+        self.threshold = threshold
+        self.min_examples = min_examples
+        self.model_path = model_path
+        self.save_every = save_every
+        self.model = NaiveBayesClassifier()
+        if model_path and os.path.exists(model_path):
+            with open(model_path, encoding="utf-8") as f:
+                self.model = NaiveBayesClassifier.from_dict(json.load(f))
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.counters = {
+            "emails": 0,
+            "rule_hits": 0,
+            "model_hits": 0,
+            "llm_calls": 0,
+            "shadow_predictions": 0,
+            "shadow_correct": 0,
+        }
+
+    def classify(self, text: str) -> Prediction | None:
+        """Returns a Prediction, or None when the email should go to the LLM."""
+        message = parse_email_text(text)
+        with self._lock:
+            self.counters["emails"] += 1
+            category = header_rule(message)
+            if category:
+                self.counters["rule_hits"] += 1
+                return Prediction(category, "rule", 1.0)
+            if self.model.examples >= self.min_examples:
+                label, confidence = self.model.predict(_features(message))
+                if label and confidence >= self.threshold:
+                    self.counters["model_hits"] += 1
+                    return Prediction(label, "model", confidence)
+            self.counters["llm_calls"] += 1
+            return None
+
+    def learn(self, text: str, llm_output: str) -> None:
+        """Records an LLM label, scoring the classifier's shadow guess before learning from it."""
+        category = normalise_category(llm_output)
+        if category is None:
+            return
+        features = _features(parse_email_text(text))
+        with self._lock:
+            guess, _ = self.model.predict(features)
+            if guess is not None:
+                self.counters["shadow_predictions"] += 1
+                self.counters["shadow_correct"] += int(guess == category)
+            self.model.learn(features, category)
+            self._unsaved += 1
+            if self.model_path and self._unsaved >= self.save_every:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if not self.model_path:
+            return
+        tmp_path = f"{self.model_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.model.to_dict(), f)
+        os.replace(tmp_path, self.model_path)
+        self._unsaved = 0
+
+    def stats(self) -> dict:
+        """Returns hit-rate and accuracy counters, including how many model calls were saved."""
+        counts = dict(self.counters)
+        saved = counts["rule_hits"] + counts["model_hits"]
+        return {
+            **counts,
+            "llm_calls_saved": saved,
+            "hit_rate": round(saved / counts["emails"], 4) if counts["emails"] else 0.0,
+            "shadow_accuracy": (
+                round(counts["shadow_correct"] / counts["shadow_predictions"], 4) if counts["shadow_predictions"] else None
+            ),
+            "training_examples": self.model.examples,
+        }
+
+preclassifier = PreClassifier(
+    threshold=float(os.getenv("EMAIL_CATEGORIZER_THRESHOLD", "0.95")),
+    model_path=os.getenv("EMAIL_CATEGORIZER_MODEL_PATH"),
+)
+
+# --- Agent Callbacks ---
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text or "" for part in content.parts)
+
+_EMAIL_TEXT_KEY = "temp:categorizer_email"
+
+def _email_text(callback_context: CallbackContext) -> str:
+    """The email being categorized, with all its headers: the user's text, or the stored email when that is only
+    an email ID, as the coordinator passes when working through the mailbox. Read once per invocation."""
+    text = _user_text(callback_context)
+    match = _EMAIL_ID.match(text.strip())
+    if match is None:
+        return text
+    read = callback_context.state.get(_EMAIL_TEXT_KEY) or {}
+    if read.get("id") != match.group(1):
+        read = {"id": match.group(1), "text": read_email_content(match.group(1))}
+        callback_context.state[_EMAIL_TEXT_KEY] = read
+    return read["text"]
+
+def before_categorizer(callback_context: CallbackContext) -> types.Content | None:
+    """Answers from the fast path when confident, which skips the model call entirely."""
+    text = _email_text(callback_context)
+    prediction = preclassifier.classify(text) if text else None
+    if prediction is None:
+        return None
+    return types.Content(role="model", parts=[types.Part(text=prediction.category)])
+
+def before_categorizer_model(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """Shows the model the stored email in place of the email ID it was given."""
+    asked, email = _user_text(callback_context), _email_text(callback_context)
+    if email != asked:
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                if part.text == asked:
+                    part.text = email
+    return None
+
+def after_categorizer_model(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """Feeds each LLM label back into the local classifier."""
+    if llm_response.content and llm_response.content.parts:
+        output = "".join(part.text or "" for part in llm_response.content.parts)
+        text = _email_text(callback_context)
+        if text and output:
+            preclassifier.learn(text, output)
+    return None
@@ -1,11 +1,17 @@
 # A specialist agent for drafting email replies.
 from google.adk.agents import Agent
+
 from gmail_manager import prompt
+from gmail_manager.tools import read_email_content
+
+from .examples import ExampleInstruction
 
 EmailDrafter = Agent(
     name="EmailDrafter",
     model="gemini-2.0-flash", # A focused, cost-effective model
     description="Drafts personalized email replies, considering the user's tone of voice, and intelligently decides whether a reply is necessary.",
-    instruction=prompt.EMAIL_DRAFTER_PROMPT,
-    tools=[] # Add any custom or built-in tools here.
+    # The static prompt is a cacheable prefix; only the retrieved style examples vary per email.
+    static_instruction=prompt.EMAIL_DRAFTER_STATIC_PROMPT + prompt.EMAIL_DRAFTER_MAILBOX_PROMPT,
+    instruction=ExampleInstruction(),
+    tools=[read_email_content], # Loads the email's body from the local mail store when given only its ID
 )
@@ -0,0 +1,127 @@
+# Retrieval of the few style examples most relevant to an incoming email, so the drafter's prompt stays small.
+import math
+import os
+import re
+from collections import Counter
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+from gmail_manager import prompt
+from gmail_manager.tools import read_email_content
+
+_TOKEN = re.compile(r"[a-z0-9']{2,}")
+_STOPWORDS = frozenset({
+    "about", "after", "all", "also", "and", "any", "are", "because", "been", "but", "can", "could", "did", "does",
+    "for", "from", "had", "has", "have", "her", "his", "how", "i'm", "if", "into", "it's", "its", "just", "like",
+    "more", "most", "not", "now", "off", "one", "our", "out", "over", "she", "that", "the", "their", "them", "then",
+    "there", "these", "they", "this", "those", "through", "too", "was", "way", "were", "what", "when", "which",
+    "who", "will", "with", "would", "you", "you're", "your",
+})
+
+def tokenize(text: str) -> list[str]:
+    return [word for word in _TOKEN.findall(text.lower()) if word not in _STOPWORDS]
+
+class ExampleIndex:
+    """A BM25 index over the example library.
+
+    Args:
+        examples: The example replies.
+        defaults: How many of the first examples fill in when fewer than k examples match.
+        k1: BM25 term-frequency saturation.
+        b: BM25 length normalisation.
+    """
+
+    def __init__(self, examples: list[str], defaults: int = 2, k1: float = 1.5, b: float = 0.75):
+        self.examples = examples
+        self.defaults = defaults
+        self.k1 = k1
+        self.b = b
+        self._docs = [Counter(tokenize(example)) for example in examples]
+        self._lengths = [sum(doc.values()) for doc in self._docs]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        document_frequency = Counter(word for doc in self._docs for word in doc)
+        n = len(self._docs)
+        self._idf = {word: math.log(1 + (n - df + 0.5) / (df + 0.5)) for word, df in document_frequency.items()}
+
+    def scores(self, query: str) -> list[float]:
+        words = [word for word in set(tokenize(query)) if word in self._idf]
+        results = []
+        for doc, length in zip(self._docs, self._lengths, strict=True):
+            score = 0.0
+            for word in words:
+                tf = doc.get(word, 0)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * length / self._avg_length)
+                    score += self._idf[word] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+    def select(self, query: str, k: int = 3, max_chars: int = 900) -> list[str]:
+        """Returns up to `k` examples, best match first, whose combined length stays within `max_chars`.
+
+        The best match is always returned, so the drafter never loses every example of the user's tone.
+        """
+        scores = self.scores(query)
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        ranked += [i for i in range(min(self.defaults, len(self.examples))) if i not in ranked]
+        chosen: list[str] = []
+        used = 0
+        for i in ranked:
+            if len(chosen) == k:
+                break
+            if chosen and used + len(self.examples[i]) > max_chars:
+                continue
+            chosen.append(self.examples[i])
+            used += len(self.examples[i])
+        return chosen
+
+class _Fields(dict):
+    def __missing__(self, key):
+        return ""
+
+class ExampleInstruction:
+    """An instruction provider that renders `template` with the examples closest to the incoming email.
+
+    Used as the agent's `instruction` next to a `static_instruction`, so the static prompt stays a
+    cacheable prefix and only this small part changes per request.
+
+    Args:
+        template: Filled with `{examples}` and any session state keys it names.
+        index: The example index; defaults to the library in prompt.py.
+        k: The most examples to include (EMAIL_DRAFTER_EXAMPLES_K).
+        max_chars: The character budget for the examples (EMAIL_DRAFTER_EXAMPLES_MAX_CHARS).
+    """
+
+    def __init__(
+        self,
+        template: str = prompt.EMAIL_DRAFTER_EXAMPLES_PROMPT,
+        index: ExampleIndex | None = None,
+        k: int | None = None,
+        max_chars: int | None = None,
+    ):
+        self.template = template
+        self.index = index or ExampleIndex(prompt.EMAIL_DRAFTER_EXAMPLES)
+        self.k = k if k is not None else int(os.getenv("EMAIL_DRAFTER_EXAMPLES_K", "3"))
+        self.max_chars = max_chars if max_chars is not None else int(os.getenv("EMAIL_DRAFTER_EXAMPLES_MAX_CHARS", "900"))
+
+    def render(self, email_text: str, state: dict | None = None) -> str:
+        examples = self.index.select(email_text, k=self.k, max_chars=self.max_chars)
+        fields = _Fields(state or {})
+        fields["examples"] = "\n".join(f'- "{example}"' for example in examples)
+        return self.template.format_map(fields)
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        return self.render(email_text(context), dict(context.state))
+
+def email_text(context: ReadonlyContext) -> str:
+    """The email being answered: what `read_email_content` returned in this invocation when the drafter was
+    given only an email's ID (the instruction is rendered again before each model call), else the request."""
+    for event in reversed(context.session.events):
+        if event.invocation_id != context.invocation_id:
+            continue
+        for response in event.get_function_responses():
+            if response.name == read_email_content.__name__:
+                result = response.response or {}
+                return str(result.get("result", result))
+    content = context.user_content
+    return "".join(part.text or "" for part in content.parts or []) if content else ""
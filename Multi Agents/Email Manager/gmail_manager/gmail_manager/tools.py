@@ -1,20 +1,124 @@
 # Central repository for all tools and tool-agents.
+import imaplib
+import os
+import re
+from functools import cache
+
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from .lazy import LazyAttributes
+from .prompt import BOOKING_LINK
+from .search_cache import SearchCallbacks
+
 # --- Custom Function Tools ---
 
-# Placeholder for Email Reading Tool
+@cache
+def get_mail_store():
+    """Returns the local mail store (MAIL_STORE_PATH), with the MAIL_SOURCE mailbox attached, opened on first use.
+
+    MAIL_SOURCE is an mbox file, a Maildir directory or an imap:// or imaps:// URL (see mailstore.open_source).
+    """
+    from .mailstore import DEFAULT_MAIL_STORE_PATH, MailStore, open_source
+
+    store = MailStore(os.path.expanduser(os.getenv("MAIL_STORE_PATH") or DEFAULT_MAIL_STORE_PATH))
+    if os.getenv("MAIL_SOURCE"):
+        store.attach(open_source(os.getenv("MAIL_SOURCE")))
+    return store
+
+def list_emails(sender: str = "", since: str = "", limit: int = 20) -> str:
+    """Checks the mailbox for new mail and lists emails, newest first, without reading their bodies.
+
+    Args:
+        sender: Only emails from this address.
+        since: Only emails on or after this ISO date, e.g. '2024-07-01'.
+        limit: The most emails to list.
+
+    Returns:
+        One line per email with its ID, date, sender, subject and thread, for read_email_content. If the
+        mailbox cannot be reached, the emails already downloaded, after a note saying so.
+    """
+    store = get_mail_store()
+    note = ""
+    try:
+        store.sync()
+    except (OSError, imaplib.IMAP4.error) as e:  # The server is unreachable: list what is already stored
+        note = f"Could not check for new mail ({e}); listing emails already downloaded.\n"
+    messages = store.messages(sender=sender or None, since=since or None, limit=limit)
+    if not messages:
+        return note + "No emails found."
+    return note + "\n".join(
+        f"[{m['id']}] {m['date']} | {m['sender_name'] or m['sender']} <{m['sender']}> | {m['subject']} | thread {m['thread_id']}"
+        for m in messages
+    )
+
 def read_email_content(email_id: str) -> str:
-    """A placeholder tool to read the content of an email given its ID."""
-    # In a real implementation, this would interact with a Gmail API or similar.
-    return f"Content of email {email_id}: This is a sample email content."
+    """Reads an email from the mailbox, with quoted earlier replies removed.
 
-# --- Agent-as-a-Tool Definitions ---
+    Args:
+        email_id: The ID shown by list_emails, or the email's Message-ID.
 
-SearchAgent = Agent(
-    name="SearchAgent",
-    model="gemini-2.0-flash",
-    description="Performs a Google search.",
-    tools=[google_search],
+    Returns:
+        The email's headers and text, or a note that no such email is in the mailbox.
+    """
+    store = get_mail_store()
+    try:
+        email = store.email(email_id)
+        if email is None:
+            store.sync()
+            email = store.email(email_id)
+    except (OSError, imaplib.IMAP4.error) as e:  # Deleted from the mailbox, or the server is unreachable
+        return f"Email {email_id} could not be read: {e}"
+    if email is None:
+        return f"No email with ID {email_id} in the mailbox."
+    headers = "\n".join(f"{name}: {value}" for name, value in email["headers"].items() if value)
+    return f"From: {email['sender']}\nSubject: {email['subject']}\n{headers}\n\n{email['body']}"
+
+MEETING_CATEGORY = "Meeting/Appointment Related"
+_PROPOSES_CALL = re.compile(
+    r"\b(quick call|a call|jump on a call|phone call|catch up|catch-up|chat more|meet up|meeting|book a time|grab a coffee)\b",
+    re.IGNORECASE,
 )
+_SIGN_OFF = re.compile(r"^\s*(cheers|thanks|regards|best|joe)\b", re.IGNORECASE)
+
+def insert_booking_link(draft: str, category: str) -> str:
+    """Inserts the booking link into an email draft when a meeting or call is on the table.
+
+    Args:
+        draft: The drafted email reply.
+        category: The category assigned to the original email.
+
+    Returns:
+        The draft, with the booking link added before the sign-off if appropriate.
+    """
+    if not draft or "NO DRAFT REQUIRED" in draft.upper() or BOOKING_LINK in draft:
+        return draft
+    if MEETING_CATEGORY.lower() not in category.lower() and not _PROPOSES_CALL.search(draft):
+        return draft
+    line = f"If you're keen, here is a booking link to grab a time that suits: {BOOKING_LINK}"
+    lines = draft.rstrip().splitlines()
+    for i in range(max(len(lines) - 3, 0), len(lines)):
+        if _SIGN_OFF.match(lines[i]):
+            return "\n".join([*lines[:i], line, "", *lines[i:]])
+    return "\n".join([*lines, "", line])
+
+# --- Agent-as-a-Tool Definitions ---
+
+# Sits behind the shared search cache, so repeated or concurrent identical queries cost one search.
+web_search_cache = SearchCallbacks(namespace="web")
+
+# Built the first time it is imported or accessed, e.g. `from gmail_manager.tools import SearchAgent`.
+def _build_search_agent() -> Agent:
+    return Agent(
+        name="SearchAgent",
+        model="gemini-2.0-flash",
+        description="Performs a Google search.",
+        tools=[google_search],
+        before_agent_callback=web_search_cache.before_agent,
+        after_model_callback=web_search_cache.after_model,
+        after_agent_callback=web_search_cache.after_agent,
+        on_model_error_callback=web_search_cache.on_model_error,
+    )
+
+_lazy = LazyAttributes(globals(), SearchAgent=_build_search_agent)
+__getattr__ = _lazy.__getattr__
@@ -0,0 +1,101 @@
+# Batch inbox triage (batch.py) on scripted stand-in models: one result per email, a failing email not stopping
+# the rest, the run's latency stats, reading emails from stdin without closing it, and a slow email source not
+# holding up the event loop.
+import asyncio
+import io
+import json
+import pathlib
+import sys
+import time
+
+import pytest
+
+from gmail_manager import batch
+from gmail_manager.prompt import BOOKING_LINK
+from gmail_manager.sub_agents.email_categorizer import fast_path
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from harness import Recorder, Reply, ScriptedLlm
+
+DELAY_S = 0.02
+
+class FailingLlm(ScriptedLlm):
+    """Fails every request that mentions 'boom', and replays its script for the rest."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if any("boom" in (part.text or "") for content in llm_request.contents for part in content.parts or []):
+            raise ConnectionError("model unavailable")
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+def emails(n: int) -> list[dict]:
+    return [
+        {"id": f"m{i}", "sender": f"client{i}@example.co.nz", "subject": "Quote" if i != 3 else "boom",
+         "body": f"Can you come and look at job {i} next week?"}
+        for i in range(n)
+    ]
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+@pytest.fixture
+def triage(monkeypatch, recorder):
+    monkeypatch.setenv("MODEL_SCHEDULER", "off")
+    monkeypatch.setattr(fast_path, "preclassifier", fast_path.PreClassifier())  # Learns nothing across tests
+    for agent, text in ((batch.EmailCategorizer, fast_path.MEETING), (batch.EmailDrafter, "Hey mate, Tuesday works. Cheers! Joe")):
+        model = FailingLlm(model="gemini-2.0-flash", agent_name=agent.name, steps=[Reply(text)], base_delay_s=DELAY_S,
+                           recorder=recorder)
+        monkeypatch.setattr(agent, "model", model)
+    return batch.BatchTriage(concurrency=4)
+
+@pytest.mark.asyncio
+async def test_every_email_gets_one_result_and_a_failure_stays_with_its_email(triage, recorder):
+    results = [result async for result in triage.run(emails(10))]
+    assert sorted(result.email_id for result in results) == sorted(f"m{i}" for i in range(10))
+    [failed] = [result for result in results if result.error]
+    assert failed.email_id == "m3" and failed.error == "ConnectionError: model unavailable" and not failed.draft
+    for result in results:
+        if result is not failed:
+            assert result.category == fast_path.MEETING
+            assert result.draft.startswith("Hey mate, Tuesday works.") and BOOKING_LINK in result.draft
+    assert len(recorder.hops) == 9 * 2  # The failed email's categorizer call raised before any hop
+
+@pytest.mark.asyncio
+async def test_stats(triage):
+    results = [result async for result in triage.run(emails(8))]
+    summary = triage.stats.summary()
+    assert (summary["emails"], summary["errors"]) == (8, 1)
+    latencies = sorted(result.latency_s for result in results)
+    assert summary["latency_p50_s"] == round(latencies[4], 3)
+    assert summary["latency_p95_s"] == round(latencies[7], 3)
+    assert summary["latency_p50_s"] >= 2 * DELAY_S  # Categorize, then draft
+    # Four at a time: well under the 8 x 2 model calls run one after another.
+    assert summary["elapsed_s"] < 8 * 2 * DELAY_S
+
+def test_reading_emails_from_stdin_leaves_it_open(monkeypatch):
+    stdin = io.StringIO("\n".join(json.dumps(email) for email in emails(2)) + "\n\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert list(batch._read_jsonl("-")) == emails(2)
+    assert not stdin.closed
+
+@pytest.mark.asyncio
+async def test_a_blocking_email_source_is_read_off_the_event_loop(triage):
+    def slow_source():
+        for email in emails(2):
+            time.sleep(0.1)  # A pipe or a network file waiting for its next line
+            yield email
+
+    ticks = 0
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    results = [result async for result in triage.run(slow_source())]
+    ticker.cancel()
+    assert len(results) == 2
+    assert ticks >= 10  # The loop kept running while the source slept for 0.2s
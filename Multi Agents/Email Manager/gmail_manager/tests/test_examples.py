@@ -0,0 +1,96 @@
+# Style example retrieval for the drafter (sub_agents/email_drafter/examples.py): BM25 picks the examples closest
+# to the email, and only that part of the instruction changes between requests. Given only an email's ID, the
+# drafter picks its examples from the email it reads.
+import pathlib
+import sys
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from gmail_manager.sub_agents.email_drafter import EmailDrafter
+from gmail_manager.sub_agents.email_drafter.examples import (
+    ExampleIndex,
+    ExampleInstruction,
+)
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from harness import Call, Recorder, Reply, ScriptedLlm
+
+LIBRARY = [
+    "Cheers mate, good to hear from you.",
+    "Happy to help with the switchboard upgrade - the electrician can come by Thursday.",
+    "Sorry about the leaking hot water cylinder, our plumber can replace the valve tomorrow.",
+    "The blocked drain sounds like a plumbing job; we'll bring the drain camera and clear the pipes.",
+    "Thanks for the invoice, I'll pay it at the end of the month.",
+]
+
+class RequestLlm(ScriptedLlm):
+    """Replays its script and keeps every request it was sent."""
+
+    requests: list = Field(default_factory=list)
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(llm_request)
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+def read_email_content(email_id: str) -> str:
+    """Stands in for the mail store."""
+    return f"From: sam@example.co.nz\nSubject: Leak\n\nEmail {email_id}: our hot water cylinder is leaking, can a plumber come?"
+
+async def draft(message: str) -> None:
+    runner = InMemoryRunner(agent=EmailDrafter, app_name="drafter")
+    session = await runner.session_service.create_session(app_name="drafter", user_id="joe")
+    async for _ in runner.run_async(user_id="joe", session_id=session.id, new_message=types.Content(
+        role="user", parts=[types.Part(text=message)],
+    )):
+        pass
+
+def request_text(llm_request) -> str:
+    return "".join(part.text or "" for content in llm_request.contents for part in content.parts or [])
+
+@pytest.fixture
+def drafter_model(monkeypatch):
+    """Gives the EmailDrafter a request-keeping model and a small example library; returns the model."""
+    def install(*steps):
+        model = RequestLlm(model="gemini-2.0-flash", agent_name="EmailDrafter", steps=list(steps), recorder=Recorder(),
+                           requests=[])
+        monkeypatch.setattr(EmailDrafter, "model", model)
+        monkeypatch.setattr(EmailDrafter, "instruction", ExampleInstruction(index=ExampleIndex(LIBRARY, defaults=0), k=1))
+        return model
+    return install
+
+def test_a_plumbing_enquiry_retrieves_the_plumbing_examples():
+    index = ExampleIndex(LIBRARY, defaults=1)
+    chosen = index.select("Hi, my drain is blocked and a pipe under the sink is leaking. Can your plumber help?", k=2)
+    assert chosen == [LIBRARY[3], LIBRARY[2]]
+    # Nothing matches: the first examples fill in, so the drafter still sees the user's tone.
+    assert index.select("Quarterly newsletter", k=2) == [LIBRARY[0]]
+
+def test_examples_stay_within_the_character_budget():
+    index = ExampleIndex(LIBRARY, defaults=0)
+    chosen = index.select("plumber plumbing drain cylinder pipes", k=3, max_chars=len(LIBRARY[3]) + 10)
+    assert chosen == [LIBRARY[3]]  # The best match always makes it in; the next one would overrun
+
+@pytest.mark.asyncio
+async def test_only_the_examples_change_between_requests(drafter_model):
+    model = drafter_model(Reply("Hey mate, on it. Cheers! Joe"))
+    for email in ("Our hot water cylinder is leaking, can a plumber come?", "Can an electrician upgrade our switchboard?"):
+        await draft(email)
+    first, second = model.requests
+    assert "specialized in drafting email replies" in str(first.config.system_instruction)
+    assert first.config.system_instruction == second.config.system_instruction
+    assert LIBRARY[2] in request_text(first) and LIBRARY[2] not in request_text(second)
+    assert LIBRARY[1] in request_text(second) and LIBRARY[1] not in request_text(first)
+
+@pytest.mark.asyncio
+async def test_given_an_email_id_the_examples_match_the_email_it_reads(monkeypatch, drafter_model):
+    model = drafter_model(Call("read_email_content", {"email_id": "42"}), Reply("Hey mate, on it. Cheers! Joe"))
+    monkeypatch.setattr(EmailDrafter, "tools", [read_email_content])
+    await draft("Draft a reply to email 42 (category: Action Required: Personal Response).")
+    before_reading, after_reading = model.requests
+    assert LIBRARY[2] not in request_text(before_reading)
+    assert LIBRARY[2] in request_text(after_reading)
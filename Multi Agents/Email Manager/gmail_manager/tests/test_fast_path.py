@@ -0,0 +1,129 @@
+# The categorizer's fast path (sub_agents/email_categorizer/fast_path.py): which headers answer without the model,
+# when the local classifier answers or defers to it, which model answers count as labels, and an email ID from the
+# coordinator read from the mailbox with all its headers.
+import pathlib
+import sys
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from gmail_manager.sub_agents.email_categorizer import EmailCategorizer, fast_path
+from gmail_manager.sub_agents.email_categorizer.fast_path import (
+    ACTION_REQUIRED,
+    INFORMATIONAL,
+    MEETING,
+    OTHER,
+    SPAM,
+    PreClassifier,
+    header_rule,
+    normalise_category,
+    parse_email_text,
+)
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from harness import Recorder, Reply, ScriptedLlm
+
+
+def email(headers: dict, body: str = "Hi Joe, can you quote for a new hot water cylinder?") -> str:
+    lines = {"From": "Sam Client <sam@example.co.nz>", "Subject": "Hot water cylinder", **headers}
+    return "\n".join(f"{name}: {value}" for name, value in lines.items()) + f"\n\n{body}"
+
+@pytest.mark.parametrize("headers, category", [
+    ({"X-Spam-Flag": "YES"}, SPAM),
+    ({"Subject": "Invitation: Site visit @ Tue 10am"}, MEETING),
+    ({"X-Google-Calendar-Content-Type": "text/calendar"}, MEETING),
+    ({"List-Unsubscribe": "<mailto:unsub@shop.co.nz>", "Subject": "20% off all tools this weekend"}, SPAM),
+    ({"Precedence": "bulk", "Subject": "Last chance: free shipping"}, SPAM),
+    ({"List-Unsubscribe": "<mailto:unsub@trade.co.nz>"}, INFORMATIONAL),
+    ({"List-Id": "<members.masterplumbers.org.nz>"}, INFORMATIONAL),
+    ({"Auto-Submitted": "auto-generated"}, INFORMATIONAL),
+    ({"From": "Xero <no-reply@xero.com>"}, INFORMATIONAL),
+    ({"From": "notifications@github.com"}, INFORMATIONAL),
+])
+def test_headers_that_answer_without_the_model(headers, category):
+    assert header_rule(parse_email_text(email(headers))) == category
+    classifier = PreClassifier()
+    prediction = classifier.classify(email(headers))
+    assert (prediction.category, prediction.source) == (category, "rule")
+    assert classifier.stats()["llm_calls"] == 0
+
+@pytest.mark.parametrize("headers", [{}, {"Auto-Submitted": "no"}, {"Precedence": "first-class"}, {"Subject": "Re: invitation to quote"}])
+def test_personal_email_goes_to_the_model(headers):
+    assert header_rule(parse_email_text(email(headers))) is None
+    classifier = PreClassifier()
+    assert classifier.classify(email(headers)) is None
+    assert classifier.stats()["llm_calls"] == 1
+
+def test_the_local_classifier_answers_only_when_trained_and_confident():
+    classifier = PreClassifier(threshold=0.95, min_examples=30)
+    quote = email({}, "Can you quote for a new hot water cylinder at our place?")
+    for i in range(10):
+        classifier.learn(email({"From": f"client{i}@example.co.nz"}, f"Please quote for a hot water cylinder, job {i}"),
+                         ACTION_REQUIRED)
+        classifier.learn(email({"From": f"crew{i}@example.co.nz", "Subject": "Site notes"}, f"FYI the deck {i} is finished"),
+                         f"'{INFORMATIONAL}'")
+    assert classifier.classify(quote) is None  # Not enough labels yet
+    for i in range(10, 20):
+        classifier.learn(email({"From": f"client{i}@example.co.nz"}, f"Please quote for a hot water cylinder, job {i}"),
+                         ACTION_REQUIRED)
+    prediction = classifier.classify(quote)
+    assert (prediction.category, prediction.source) == (ACTION_REQUIRED, "model") and prediction.confidence >= 0.95
+
+    # Words it has never seen leave it near its prior (20 to 10), short of the threshold, so the model is asked.
+    unsure = email({"From": "someone@elsewhere.nz", "Subject": "Gidday"}, "Long time no see, how was Fiji?")
+    assert classifier.classify(unsure) is None
+    stats = classifier.stats()
+    assert (stats["model_hits"], stats["llm_calls"], stats["training_examples"]) == (1, 2, 30)
+
+@pytest.mark.parametrize("output, category", [
+    (OTHER, OTHER),
+    (f"'{SPAM}'\n", SPAM),
+    (f"Category: {MEETING}.", MEETING),
+    ("Another newsletter", None),
+    (f"Other than the invoice, this is {INFORMATIONAL}", None),
+])
+def test_only_a_whole_category_name_is_a_label(output, category):
+    assert normalise_category(output) == category
+
+class RequestLlm(ScriptedLlm):
+    """Replays its script and keeps every request it was sent."""
+
+    requests: list = Field(default_factory=list)
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(llm_request)
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+async def categorize(message: str) -> str:
+    runner = InMemoryRunner(agent=EmailCategorizer, app_name="categorizer")
+    session = await runner.session_service.create_session(app_name="categorizer", user_id="joe")
+    reply = ""
+    async for event in runner.run_async(user_id="joe", session_id=session.id, new_message=types.Content(
+        role="user", parts=[types.Part(text=message)],
+    )):
+        if event.is_final_response() and event.content and event.content.parts:
+            reply = event.content.parts[0].text or ""
+    return reply
+
+@pytest.mark.asyncio
+async def test_given_an_email_id_the_stored_headers_reach_the_fast_path_and_the_model(monkeypatch):
+    mailbox = {
+        "41": email({"From": "Trade Depot <news@tradedepot.co.nz>", "List-Unsubscribe": "<mailto:unsub@tradedepot.co.nz>"}),
+        "42": email({}),
+    }
+    monkeypatch.setattr(fast_path, "read_email_content", lambda email_id: mailbox[email_id])
+    monkeypatch.setattr(fast_path, "preclassifier", PreClassifier())
+    model = RequestLlm(model="gemini-2.0-flash", agent_name="EmailCategorizer", steps=[Reply(ACTION_REQUIRED)],
+                       recorder=Recorder(), requests=[])
+    monkeypatch.setattr(EmailCategorizer, "model", model)
+
+    assert await categorize("41") == INFORMATIONAL  # List-Unsubscribe is not in list_emails' From and Subject
+    assert model.requests == []
+    assert await categorize("email [42]") == ACTION_REQUIRED
+    [request] = model.requests
+    assert "hot water cylinder" in "".join(part.text or "" for content in request.contents for part in content.parts or [])
+    assert fast_path.preclassifier.model.examples == 1  # Learned from the stored email, not the ID
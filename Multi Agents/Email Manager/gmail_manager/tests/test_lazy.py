@@ -0,0 +1,40 @@
+# Lazy specialists (lazy.py): a LazyAgentTool is set up like the AgentTool it stands in for, and only builds its
+# agent on first use.
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+
+from gmail_manager.lazy import LazyAgentTool
+
+
+def drafter(name: str = "EmailDrafter") -> LlmAgent:
+    return LlmAgent(name=name, model="gemini-2.0-flash", description="Drafts replies.")
+
+def test_set_up_like_an_agent_tool():
+    real = AgentTool(drafter(), skip_summarization=True)
+    lazy = LazyAgentTool(drafter, name="EmailDrafter", description="Drafts replies.", skip_summarization=True)
+    # Every field AgentTool sets, this ADK version's included, is set the same way without loading the agent.
+    fields = {name: value for name, value in vars(real).items() if name != "agent"}
+    assert {name: getattr(lazy, name) for name in fields} == fields
+    assert not lazy.loaded
+
+def test_the_agent_is_built_on_first_use():
+    built = []
+
+    def build() -> LlmAgent:
+        built.append(1)
+        return drafter()
+
+    tool = LazyAgentTool(build, name="EmailDrafter", description="Drafts replies.")
+    declaration = tool._get_declaration()
+    assert (declaration.name, list(declaration.parameters.properties)) == ("EmailDrafter", ["request"])
+    assert not built and not tool.loaded
+
+    assert tool.agent is tool.agent and tool.loaded and built == [1]
+    assert tool._get_declaration().name == "EmailDrafter"
+
+def test_an_agent_with_another_name_is_refused():
+    tool = LazyAgentTool(lambda: drafter("Drafter"), name="EmailDrafter", description="Drafts replies.")
+    with pytest.raises(ValueError, match="loaded an agent named 'Drafter'"):
+        _ = tool.agent
+    assert not tool.loaded
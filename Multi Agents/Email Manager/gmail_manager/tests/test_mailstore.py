@@ -0,0 +1,54 @@
+# The mail store (mailstore.py) and the email tools: quoted reply stripping in text and HTML, and listing stored
+# mail when the mailbox cannot be reached.
+import socket
+
+from gmail_manager import tools
+from gmail_manager.mailstore import ImapSource, html_to_text, strip_quoted
+
+MBOX = """From joe@example.com Mon Sep  2 09:00:00 2024
+From: Joe Bloggs <joe@example.com>
+To: office@tradie.ai
+Subject: Leaking tap
+Date: Mon, 2 Sep 2024 09:00:00 +1200
+Message-ID: <tap-1@example.com>
+
+Can someone look at the kitchen tap this week?
+
+"""
+
+def test_dated_attributions_and_quote_blocks_are_stripped():
+    text, removed = strip_quoted("Thursday works.\n\nOn Mon, 2 Sep 2024 at 09:00, Joe <joe@example.com> wrote:\n> Can you come?")
+    assert text == "Thursday works." and removed > 0
+    text, _ = strip_quoted("Thursday works.\n\nJoe Bloggs <joe@example.com> wrote:\n\n> Can you come?\n> Thanks")
+    assert text == "Thursday works."
+
+def test_wrote_in_the_body_is_kept_without_a_quote_after_it():
+    body = "Here is what the council inspector wrote:\nThe downpipe must drain to the stormwater.\n\nCheers, Sam"
+    assert strip_quoted(body) == (body, 0)
+
+def test_text_after_an_html_quote_is_kept():
+    html = "<p>Hi Bob</p><blockquote>old<br>stuff<p>unclosed</blockquote><p>Inline answer: yes, Tuesday works.</p>"
+    assert html_to_text(html) == "\nHi Bob\n\nInline answer: yes, Tuesday works."
+    html = ('<div>Thanks</div><div class="gmail_quote">On Mon wrote:<br><div>Can you<div>come?</div></div>'
+            '<img src="logo.png"><hr></div><div>Cheers, Sam</div>')
+    assert html_to_text(html) == "\nThanks\n\nCheers, Sam"
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_list_emails_falls_back_to_stored_mail(tmp_path, monkeypatch):
+    mbox = tmp_path / "inbox.mbox"
+    mbox.write_text(MBOX)
+    monkeypatch.setenv("MAIL_STORE_PATH", str(tmp_path / "mail.sqlite"))
+    monkeypatch.setenv("MAIL_SOURCE", str(mbox))
+    tools.get_mail_store.cache_clear()
+    try:
+        assert "Leaking tap" in tools.list_emails()
+        tools.get_mail_store().attach(ImapSource("127.0.0.1", "office", "secret", port=_closed_port(), ssl=False))
+        listing = tools.list_emails()
+        assert listing.startswith("Could not check for new mail") and "Leaking tap" in listing
+    finally:
+        tools.get_mail_store().close()
+        tools.get_mail_store.cache_clear()
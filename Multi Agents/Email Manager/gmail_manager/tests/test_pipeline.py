@@ -0,0 +1,63 @@
+# The fixed triage workflow (pipeline.py) on scripted stand-in models: the category handed from the categorizer to
+# the drafter through session state, and the booking link added in code after the draft.
+import pathlib
+import sys
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from gmail_manager import pipeline
+from gmail_manager.prompt import BOOKING_LINK
+from gmail_manager.sub_agents.email_categorizer import fast_path
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from harness import Recorder, Reply, ScriptedLlm
+
+EMAIL = "From: sam@example.co.nz\nSubject: Bathroom\n\nCould you come round to look at the bathroom sometime next week?"
+DRAFT = "Hey Sam,\n\nHappy to come and take a look, Tuesday or Wednesday works.\n\nCheers!\nJoe"
+
+class RequestLlm(ScriptedLlm):
+    """Replays its script and keeps every request it was sent."""
+
+    requests: list = Field(default_factory=list)
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(llm_request)
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+def request_text(llm_request) -> str:
+    return "".join(part.text or "" for content in llm_request.contents for part in content.parts or [])
+
+@pytest.fixture
+def models(monkeypatch):
+    monkeypatch.setenv("MODEL_SCHEDULER", "off")
+    monkeypatch.setattr(fast_path, "preclassifier", fast_path.PreClassifier())  # Learns nothing across tests
+    recorder = Recorder()
+    installed = {}
+    for agent, text in ((pipeline.PipelineCategorizer, fast_path.MEETING), (pipeline.PipelineDrafter, DRAFT)):
+        installed[agent.name] = RequestLlm(model="gemini-2.0-flash", agent_name=agent.name, steps=[Reply(text)],
+                                           recorder=recorder, requests=[])
+        monkeypatch.setattr(agent, "model", installed[agent.name])
+    return installed
+
+@pytest.mark.asyncio
+async def test_the_drafter_gets_the_category_and_the_draft_gets_the_booking_link(models):
+    runner = InMemoryRunner(agent=pipeline.TriagePipeline, app_name="pipeline")
+    session = await runner.session_service.create_session(app_name="pipeline", user_id="joe")
+    events = [event async for event in runner.run_async(user_id="joe", session_id=session.id, new_message=types.Content(
+        role="user", parts=[types.Part(text=EMAIL)],
+    ))]
+    [drafter_request] = models["PipelineDrafter"].requests
+    assert f"categorized as: {fast_path.MEETING}" in request_text(drafter_request)
+
+    state = (await runner.session_service.get_session(app_name="pipeline", user_id="joe", session_id=session.id)).state
+    assert state[pipeline.CATEGORY_KEY] == fast_path.MEETING
+    draft = state[pipeline.DRAFT_KEY]
+    assert draft.startswith("Hey Sam,") and BOOKING_LINK in draft
+    assert draft.index(BOOKING_LINK) < draft.index("Cheers!")  # Added before the sign-off
+    # The callback's reply is the pipeline's last word, so callers reading the final event get the linked draft.
+    assert events[-1].content.parts[0].text == draft
@@ -0,0 +1,95 @@
+# The local intent router (router.py): dispatching a confident request straight to its specialist, logging the
+# coordinator's choice for requests it did not dispatch, and dropping the pending decision when the coordinator's
+# model call fails.
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from gmail_manager.router import IntentRouter, KeywordStage
+from gmail_manager.routes import ROUTES
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from harness import Recorder, Reply, ScriptedLlm
+
+
+@pytest.fixture
+def router(tmp_path):
+    tools = [SimpleNamespace(name=route.agent) for route in ROUTES]
+    return IntentRouter(tools, [KeywordStage(ROUTES)], mode="shadow", log_path=str(tmp_path / "routing.jsonl"))
+
+def context(invocation_id: str, text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        invocation_id=invocation_id,
+        user_content=types.Content(role="user", parts=[types.Part(text=text)]),
+        session=SimpleNamespace(events=[]),
+    )
+
+def logged(router) -> list[dict]:
+    with open(router.log_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+@pytest.mark.asyncio
+async def test_a_confident_request_runs_its_specialist_without_the_coordinators_model(tmp_path):
+    recorder = Recorder()
+    drafter = Agent(
+        name="EmailDrafter",
+        model=ScriptedLlm(model="gemini-2.0-flash", agent_name="EmailDrafter", steps=[Reply("Hey Joe, Tuesday works.")],
+                          recorder=recorder),
+        instruction="Draft the reply.",
+    )
+    router = IntentRouter([AgentTool(drafter)], [KeywordStage(ROUTES)], mode="on",
+                          log_path=str(tmp_path / "routing.jsonl"))
+    coordinator = Agent(
+        name="Coordinator",
+        model=ScriptedLlm(model="gemini-2.0-flash", agent_name="Coordinator", steps=[Reply("Coordinator reply")],
+                          recorder=recorder),
+        instruction="Delegate to the right specialist.",
+        tools=list(router.tools.values()),
+        before_agent_callback=router.before_agent,
+        after_model_callback=router.after_model,
+        on_model_error_callback=router.on_model_error,
+    )
+    runner = InMemoryRunner(agent=coordinator, app_name="router")
+    session = await runner.session_service.create_session(app_name="router", user_id="joe")
+    replies = [
+        part.text
+        async for event in runner.run_async(user_id="joe", session_id=session.id, new_message=types.Content(
+            role="user", parts=[types.Part(text="Please draft a reply to Sam about Tuesday")],
+        ))
+        for part in (event.content.parts if event.content else []) or []
+        if part.text
+    ]
+    assert replies == ["Hey Joe, Tuesday works."]
+    assert [hop.agent for hop in recorder.hops] == ["EmailDrafter"]
+    assert router.stats()["dispatched"] == 1
+    [record] = logged(router)
+    assert (record["router"], record["dispatched"]) == ("EmailDrafter", True)
+
+@pytest.mark.asyncio
+async def test_shadow_mode_logs_the_models_choice(router):
+    ctx = context("inv-1", "Please draft a reply to Joe")
+    assert await router.before_agent(ctx) is None
+    call = types.Part(function_call=types.FunctionCall(name="EmailDrafter", args={}))
+    router.after_model(ctx, LlmResponse(content=types.Content(role="model", parts=[call])))
+    [record] = logged(router)
+    assert (record["router"], record["llm"], record["dispatched"]) == ("EmailDrafter", "EmailDrafter", False)
+    assert router._pending == {}
+
+@pytest.mark.asyncio
+async def test_a_failed_model_call_drops_the_pending_decision(router):
+    ctx = context("inv-2", "Classify this email")
+    await router.before_agent(ctx)
+    assert "inv-2" in router._pending
+    assert router.on_model_error(ctx, None, TimeoutError("model timed out")) is None
+    assert router._pending == {}
+    [record] = logged(router)
+    assert (record["router"], record["llm"], record["error"]) == ("EmailCategorizer", None, "TimeoutError")
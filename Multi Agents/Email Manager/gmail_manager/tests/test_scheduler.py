@@ -0,0 +1,167 @@
+# The model scheduler (scheduler.py): admission by lane, retries, serving a new event loop after the old one
+# closed, serving two live event loops at once, and rendering metrics from another thread.
+import asyncio
+import threading
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from google.genai.errors import APIError
+
+from gmail_manager.scheduler import (
+    AimdLimit,
+    ModelScheduler,
+    Quota,
+    TokenBucket,
+    model_lane,
+)
+
+MODEL = "gemini-2.5-flash"
+
+def request(text: str = "Quote for a bathroom reno") -> LlmRequest:
+    return LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+def response(text: str = "ok", tokens: int = 10) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]),
+                       usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=tokens))
+
+def scripted(*outcomes):
+    """A send() whose attempts fail with the given error codes, in order, then succeed."""
+    attempts = []
+
+    def send():
+        async def generate():
+            attempts.append(len(attempts))
+            code = outcomes[len(attempts) - 1] if len(attempts) <= len(outcomes) else None
+            if code:
+                raise APIError(code, {"error": {"code": code, "message": "nope", "status": "RESOURCE_EXHAUSTED"}})
+            yield response()
+        return generate()
+
+    return send, attempts
+
+async def drain(scheduler: ModelScheduler, send) -> list[LlmResponse]:
+    return [r async for r in scheduler.call(MODEL, request(), send)]
+
+def test_buckets_and_limits():
+    bucket = TokenBucket(60, capacity=2)
+    bucket.take(2, now=bucket._updated)
+    assert bucket.wait_time(1, bucket._updated) == pytest.approx(1.0)
+    limit = AimdLimit(initial=8, cooldown_s=1.0)
+    assert limit.on_throttle(10.0) and limit.limit == 4
+    assert not limit.on_throttle(10.5) and limit.limit == 4
+    limit.on_success()
+    assert limit.limit == 4.25
+
+@pytest.mark.asyncio
+async def test_throttled_and_server_errors_are_retried():
+    scheduler = ModelScheduler(quotas={MODEL: Quota(6000, 10_000_000)}, attempts=4, base_delay_s=0.001, max_delay_s=0.01)
+    send, attempts = scripted(429, 503)
+    assert [r.content.parts[0].text for r in await drain(scheduler, send)] == ["ok"]
+    assert len(attempts) == 3
+    assert scheduler.metrics.outcomes() == {"throttled": 1, "server_error": 1, "ok": 1}
+    assert scheduler.queue(MODEL).in_flight == 0
+
+@pytest.mark.asyncio
+async def test_client_errors_and_exhausted_retries_raise():
+    scheduler = ModelScheduler(quotas={MODEL: Quota(6000, 10_000_000)}, attempts=2, base_delay_s=0.001, max_delay_s=0.01)
+    send, attempts = scripted(400)
+    with pytest.raises(APIError):
+        await drain(scheduler, send)
+    assert len(attempts) == 1
+    send, attempts = scripted(429, 429, 429)
+    with pytest.raises(APIError):
+        await drain(scheduler, send)
+    assert len(attempts) == 2 and scheduler.queue(MODEL).in_flight == 0
+
+@pytest.mark.asyncio
+async def test_interactive_calls_are_admitted_before_batch():
+    scheduler = ModelScheduler(quotas={MODEL: Quota(6000, 10_000_000, initial_concurrency=1, max_concurrency=1)})
+    queue = scheduler.queue(MODEL)
+    await queue.acquire(1, "interactive")  # Holds the only slot
+    order = []
+
+    async def call(lane: str):
+        await queue.acquire(1, lane)
+        order.append(lane)
+        queue.release("ok", 1, None)
+
+    with model_lane("batch"):
+        batch = [asyncio.create_task(call("batch")) for _ in range(3)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("interactive"))
+    await asyncio.sleep(0)
+    assert queue.depth("batch") == 3 and queue.depth("interactive") == 1
+    queue.release("ok", 1, None)
+    await asyncio.gather(interactive, *batch)
+    assert order == ["interactive", "batch", "batch", "batch"]
+
+def test_a_new_event_loop_is_served_after_a_waiter_gave_up_on_the_old_one():
+    # One request a second, so the second call waits on the refill timer.
+    scheduler = ModelScheduler(quotas={MODEL: Quota(60, 10_000_000, burst_s=1)})
+    queue = scheduler.queue(MODEL)
+
+    async def first_loop():
+        await queue.acquire(1, "interactive")
+        queue.release("ok", 1, None)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(queue.acquire(1, "interactive"), 0.05)  # Gives up with the timer pending
+
+    async def second_loop() -> float:
+        return await asyncio.wait_for(queue.acquire(1, "interactive"), 3)
+
+    asyncio.run(first_loop())
+    assert asyncio.run(second_loop()) < 3
+    assert queue.in_flight == 1
+
+def test_calls_waiting_on_two_live_loops_are_both_served():
+    scheduler = ModelScheduler(quotas={MODEL: Quota(6000, 10_000_000, initial_concurrency=1, max_concurrency=1)})
+    queue = scheduler.queue(MODEL)
+    holding, queued_elsewhere = threading.Event(), threading.Event()
+    served = []
+
+    async def first_loop():
+        await queue.acquire(1, "interactive")  # Holds the only slot
+        holding.set()
+        await asyncio.to_thread(queued_elsewhere.wait, 5)
+        mine = asyncio.create_task(queue.acquire(1, "interactive"))  # Queued behind the other loop's call
+        await asyncio.sleep(0)
+        queue.release("ok", 1, None)  # Admits the other loop's call, from this thread
+        await asyncio.wait_for(mine, 5)
+        served.append("first")
+        queue.release("ok", 1, None)
+
+    async def second_loop():
+        await asyncio.to_thread(holding.wait, 5)
+        call = asyncio.create_task(queue.acquire(1, "interactive"))
+        await asyncio.sleep(0)
+        queued_elsewhere.set()
+        await asyncio.wait_for(call, 5)
+        served.append("second")
+        await asyncio.sleep(0.05)
+        queue.release("ok", 1, None)  # Admits the first loop's call, from this thread
+
+    thread = threading.Thread(target=lambda: asyncio.run(second_loop()))
+    thread.start()
+    asyncio.run(first_loop())
+    thread.join(5)
+    assert served == ["second", "first"]
+    assert queue.in_flight == 0
+
+def test_metrics_render_while_calls_are_queued():
+    scheduler = ModelScheduler(quotas={MODEL: Quota(60, 10_000_000, burst_s=1)})
+    rendered = []
+
+    async def main():
+        queue = scheduler.queue(MODEL)
+        await queue.acquire(1, "interactive")
+        waiting = asyncio.create_task(queue.acquire(1, "batch"))
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=lambda: rendered.append(scheduler.metrics.render()))
+        thread.start()
+        thread.join()
+        waiting.cancel()
+
+    asyncio.run(main())
+    assert f'tradie_ai_model_queue_depth{{model="{MODEL}",lane="batch"}} 1' in rendered[0]
+    assert f'tradie_ai_model_in_flight{{model="{MODEL}"}} 1' in rendered[0]
@@ -0,0 +1,97 @@
+# Bounded conversations (sessions.py): a large tool output is sent as a reference in later turns and read back a
+# page at a time, and each compaction digest carries the one before it.
+from types import SimpleNamespace
+
+import pytest
+from google.adk.events import Event
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from gmail_manager.sessions import (
+    _HEADER,
+    PREVIEW_CHARS,
+    RECALL_PAGE_CHARS,
+    DigestSummarizer,
+    OutputReferencePlugin,
+    output_key,
+    recall_tool_output,
+)
+
+INBOX = {"emails": [{"id": f"m{i}", "subject": f"Quote for job {i}", "body": "x" * 200} for i in range(60)]}
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+def tool_turn(name: str, response: dict) -> list[types.Content]:
+    return [
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(id="c1", name=name, args={}))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id="c1", name=name, response=response))]),
+    ]
+
+@pytest.mark.asyncio
+async def test_a_large_output_is_a_reference_in_later_turns_and_recalled_a_page_at_a_time():
+    plugin, context = OutputReferencePlugin(max_chars=2000), SimpleNamespace(state={})
+    await plugin.after_tool_callback(tool=SimpleNamespace(name="read_inbox"), tool_args={}, tool_context=context,
+                                     result=INBOX)
+    [key] = context.state
+    assert key == output_key("read_inbox", context.state[key])
+
+    # The turn that called the tool sees the output in full.
+    request = LlmRequest(contents=[user("Check my inbox"), *tool_turn("read_inbox", INBOX)])
+    await plugin.before_model_callback(callback_context=None, llm_request=request)
+    assert request.contents[2].parts[0].function_response.response == INBOX
+    assert "recall_tool_output" not in request.tools_dict
+
+    # The next turn sees a reference, and is offered the tool to read it back.
+    request = LlmRequest(contents=[user("Check my inbox"), *tool_turn("read_inbox", INBOX), user("Reply to m7")])
+    await plugin.before_model_callback(callback_context=None, llm_request=request)
+    reference = request.contents[2].parts[0].function_response.response
+    assert reference["stored_as"] == key and reference["chars"] == len(context.state[key])
+    assert len(reference["preview"]) == PREVIEW_CHARS + len("...")
+    assert "recall_tool_output" in request.tools_dict
+
+    text = context.state[key]
+    first = recall_tool_output(key, context)
+    assert first.startswith(text[:RECALL_PAGE_CHARS]) and f"offset={RECALL_PAGE_CHARS}]" in first
+    pages = [text[:RECALL_PAGE_CHARS]]
+    offset = RECALL_PAGE_CHARS
+    while offset < len(text):
+        page = recall_tool_output(key, context, offset=offset)
+        pages.append(page.split("\n[", 1)[0])
+        offset += RECALL_PAGE_CHARS
+    assert "".join(pages) == text
+    assert recall_tool_output("output:read_inbox:missing", context) == "Nothing is stored under 'output:read_inbox:missing'."
+
+def event(author: str, content: types.Content) -> Event:
+    return Event(author=author, invocation_id=Event.new_id(), content=content)
+
+@pytest.mark.asyncio
+async def test_a_digest_keeps_the_previous_digest():
+    summarizer = DigestSummarizer()
+    first = await summarizer.maybe_summarize_events(events=[
+        event("user", user("Any new quotes?")),
+        event("coordinator", types.Content(role="model", parts=[types.Part(text="Two new quote requests.")])),
+    ])
+    digest = first.actions.compaction.compacted_content
+    assert digest.parts[0].text == f"{_HEADER}\nuser: Any new quotes?\ncoordinator: Two new quote requests."
+
+    # ADK hands the summariser the last digest as a model event ahead of the newer events.
+    second = await summarizer.maybe_summarize_events(events=[
+        event("model", digest),
+        event("user", user("Draft replies to both")),
+        *[event("coordinator", content) for content in tool_turn("read_inbox", INBOX)],
+    ])
+    lines = second.actions.compaction.compacted_content.parts[0].text.splitlines()
+    assert lines[0] == _HEADER
+    assert lines[1:4] == ["user: Any new quotes?", "coordinator: Two new quote requests.", "user: Draft replies to both"]
+    assert lines[4] == "coordinator asked read_inbox"
+    assert lines[5].startswith("read_inbox answered (") and "output:read_inbox:" in lines[5]
+
+@pytest.mark.asyncio
+async def test_a_long_digest_drops_its_oldest_lines():
+    summarizer = DigestSummarizer(line_chars=50, max_chars=200)
+    summary = await summarizer.maybe_summarize_events(events=[event("user", user(f"Message {i}")) for i in range(40)])
+    lines = summary.actions.compaction.compacted_content.parts[0].text.splitlines()[1:]
+    assert lines[-1] == "user: Message 39" and "user: Message 0" not in lines
+    assert sum(len(line) + 1 for line in lines) <= 200
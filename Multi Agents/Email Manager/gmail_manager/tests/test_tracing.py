@@ -0,0 +1,37 @@
+# The tracing plugin (tracing.py): the METRICS_PORT endpoint opens with the runner's first run, not when the
+# plugin is built at import.
+import asyncio
+import socket
+import urllib.request
+
+import pytest
+
+from gmail_manager.tracing import tracing_plugin_from_env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=1) as response:
+        return response.read().decode()
+
+@pytest.mark.asyncio
+async def test_the_metrics_endpoint_opens_with_the_first_run(monkeypatch):
+    port = _free_port()
+    monkeypatch.setenv("METRICS_PORT", str(port))
+    plugin = tracing_plugin_from_env(collectors=(lambda: "queue_depth 3\n",))
+    assert plugin.server is None
+    with pytest.raises(OSError):
+        await asyncio.to_thread(_get, f"http://127.0.0.1:{port}/metrics")  # Off the loop, like any blocking call
+
+    await plugin.before_run_callback(invocation_context=None)
+    server = plugin.server
+    await plugin.before_run_callback(invocation_context=None)  # AgentTool runners inherit the plugin
+    assert plugin.server is server
+    assert "queue_depth 3" in await asyncio.to_thread(_get, f"http://127.0.0.1:{port}/metrics")
+
+    await plugin.close()
+    assert plugin.server is None
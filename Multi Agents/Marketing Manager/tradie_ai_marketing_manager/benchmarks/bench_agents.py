@@ -0,0 +1,59 @@
+# Offline benchmarks for tradie_ai_marketing_manager: a strategy request against scripted models.
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from harness import Call, Reply, Step, Workload, main
+
+REQUEST = "I'm a plumber in Auckland and want more leads for hot water cylinder replacements. Build me a marketing plan."
+SEARCH_ANSWER = (
+    "Hot water cylinder replacement searches in Auckland peak in winter. Homeowners compare price, speed and "
+    "warranty; most competitors advertise same-day installs."
+)
+SOCIAL_ANSWER = (
+    "Competitor Social Media Links:\n- Auckland Plumbers Ltd: facebook.com/aucklandplumbers\n"
+    "- Drain-O-Rama: instagram.com/drainorama_akl\n- Pipe Dreams Plumbing: facebook.com/pipedreams"
+)
+PLAN = (
+    "Strategy: own 'same-day hot water cylinder replacement Auckland'. Channels: Google Search ads and a local SEO "
+    "landing page, Facebook before/after posts. Plan: 1) landing page, 2) winter ad campaign, 3) weekly social posts."
+)
+
+# The StrategyAgent looks competitors up without a model call unless COMPETITOR_LOOKUP=agent; run both to compare.
+COMPETITOR_SCRIPTS: dict[str, list[Step]]
+if os.getenv("COMPETITOR_LOOKUP", "tool").lower() == "agent":
+    COMPETITOR_SCRIPTS = {"StrategyCompetitorResearch": [
+        Call("get_competitor_social_media", {"business_type": "plumber", "location": "Auckland"}),
+        Reply(SOCIAL_ANSWER),
+    ]}
+else:
+    COMPETITOR_SCRIPTS = {}
+
+def _root():
+    from tradie_ai_marketing_manager.agent import root_agent
+    return root_agent
+
+def _reset_search_cache():
+    from tradie_ai_marketing_manager.search_cache import search_cache
+    search_cache.clear()
+
+WORKLOADS = [
+    Workload(
+        name="marketing_strategy",
+        root_agent=_root,
+        message=REQUEST,
+        scripts={
+            "MarketingCoordinator": [Call("StrategyAgent", {"request": REQUEST}), Reply(PLAN)],
+            "StrategyWebResearch": [Reply(SEARCH_ANSWER)],
+            **COMPETITOR_SCRIPTS,
+            "StrategyPlanner": [Reply(PLAN)],
+        },
+        reset=_reset_search_cache,
+    ),
+]
+
+if __name__ == "__main__":
+    main(WORKLOADS, default_output=str(pathlib.Path(__file__).parent / "results.jsonl"))
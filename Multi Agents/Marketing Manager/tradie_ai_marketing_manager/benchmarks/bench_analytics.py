@@ -0,0 +1,251 @@
+# Ad performance analytics (analytics.py) on a synthetic year of daily Facebook Ads, Google Ads and Google Analytics
+# exports across dozens of campaigns: cold ingest, an incremental week, a re-sync with nothing new, reopening the
+# store and query latency, against re-reading and aggregating the CSVs per question. Also checks the totals against
+# that baseline, that re-exporting an overlapping range does not double count, that an injected cost-per-lead spike
+# is reported, and how many prompt tokens the tool outputs take next to the raw exports.
+import argparse
+import csv
+import glob
+import json
+import os
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_marketing_manager.analytics import AdStore, metrics
+
+TRADES = ["Plumbing", "Electrical", "Roofing", "Heat Pumps", "Drainage", "Solar", "Bathrooms", "Decks"]
+PLACES = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Tauranga", "Dunedin"]
+# Google Ads adds a title and date range above the header and a total row below the data; leads are a custom
+# column there, as its Conversions count every conversion action.
+HEADERS = {
+    "facebook": ["Reporting starts", "Reporting ends", "Campaign name", "Ad set name", "Impressions", "Link clicks",
+                 "Amount spent (NZD)", "Leads", "Purchases", "Purchases conversion value"],
+    "google_ads": ["Day", "Campaign", "Impr.", "Clicks", "Cost", "Leads", "Conversions", "Conv. value"],
+    "analytics": ["Date", "Session campaign", "Sessions", "Key events", "Transactions", "Total revenue"],
+}
+
+class Generator:
+    """Daily measures per channel and campaign, from a seeded random walk, so a re-export gives the same rows."""
+
+    def __init__(self, campaigns: int, seed: int = 7):
+        rng = random.Random(seed)
+        names = [f"{trade} - {place}" for trade in TRADES for place in PLACES]
+        self.campaigns = {
+            "facebook": [f"FB | {name}" for name in names[:campaigns // 2]],
+            "google_ads": [f"Search | {name}" for name in names[:campaigns - campaigns // 2]],
+        }
+        self.campaigns["analytics"] = [name.lower().replace(" | ", "_").replace(" - ", "_").replace(" ", "_")
+                                       for name in self.campaigns["facebook"][:campaigns // 4]]
+        self.base = {(channel, name): (rng.uniform(800, 6000), rng.uniform(0.008, 0.04), rng.uniform(0.03, 0.12))
+                     for channel, names in self.campaigns.items() for name in names}
+        self.seed = seed
+        self.spikes: dict[tuple[str, str], tuple[date, date]] = {}
+
+    def day(self, channel: str, name: str, day: date) -> tuple[int, int, float, float, float, float]:
+        rng = random.Random(f"{self.seed}{channel}{name}{day}")
+        impressions_mean, ctr, conversion = self.base[channel, name]
+        weekend = 0.7 if day.weekday() >= 5 else 1.0
+        impressions = int(impressions_mean * weekend * rng.uniform(0.85, 1.15))
+        clicks = int(impressions * ctr * rng.uniform(0.9, 1.1))
+        spend = round(clicks * rng.uniform(1.2, 2.4), 2) if channel != "analytics" else 0.0
+        leads = clicks * conversion * rng.uniform(0.8, 1.2)
+        spike = self.spikes.get((channel, name))
+        if spike and spike[0] <= day <= spike[1]:
+            leads /= 3
+        leads = int(leads)
+        conversions = int(leads * rng.uniform(0.2, 0.4))
+        return impressions, clicks, spend, leads, conversions, round(conversions * rng.uniform(400, 2500), 2)
+
+    def write(self, channel: str, path: str, first: date, last: date) -> int:
+        rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if channel == "google_ads":
+                writer.writerow(["Campaign report"])
+                writer.writerow([f"{first:%B %d, %Y} - {last:%B %d, %Y}"])
+            writer.writerow(HEADERS[channel])
+            totals = [0.0] * 6
+            day = first
+            while day <= last:
+                for name in self.campaigns[channel]:
+                    values = self.day(channel, name, day)
+                    totals = [t + v for t, v in zip(totals, values, strict=True)]
+                    if channel == "facebook":  # Split across two ad sets, as exported at ad set level
+                        halves = [(v // 2 if isinstance(v, int) else round(v / 2, 2)) for v in values]
+                        rest = [v - h for v, h in zip(values, halves, strict=True)]
+                        for ad_set, part in (("Broad", halves), ("Retargeting", rest)):
+                            writer.writerow([day.isoformat(), day.isoformat(), name, ad_set, *part[:2], f"{part[2]:.2f}",
+                                             *part[3:5], f"{part[5]:.2f}"])
+                            rows += 1
+                    elif channel == "google_ads":
+                        writer.writerow([day.isoformat(), name, f"{values[0]:,}", values[1], f"{values[2]:,.2f}",
+                                         f"{values[3]:.2f}", values[4], f"{values[5]:,.2f}"])
+                        rows += 1
+                    else:
+                        writer.writerow([day.strftime("%Y%m%d"), name, values[1], values[3], values[4], f"{values[5]:.2f}"])
+                        rows += 1
+                day += timedelta(days=1)
+            if channel == "google_ads":
+                writer.writerow(["Total: Account", "", f"{int(totals[0]):,}", int(totals[1]), f"{totals[2]:,.2f}",
+                                 f"{totals[3]:.2f}", int(totals[4]), f"{totals[5]:,.2f}"])
+        return rows
+
+def months(first: date, last: date):
+    start = first
+    while start <= last:
+        following = date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+        yield start, min(following - timedelta(days=1), last)
+        start = following
+
+def naive(paths: list[str], weeks: int, last: date) -> list[dict]:
+    """Re-reads every ad platform export and sums the last `weeks` weeks per campaign with dicts, as a script per
+    question would. Google Analytics exports are left out, as they re-count the same traffic."""
+    since = last - timedelta(days=7 * weeks - 1)
+    totals: dict[str, list[float]] = defaultdict(lambda: [0.0] * 6)
+    for path in paths:
+        if os.path.basename(path).startswith("analytics"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        start = 2 if lines[0] == "Campaign report" else 0
+        for row in csv.DictReader(lines[start:]):
+            raw = row.get("Reporting starts") or row.get("Day") or row.get("Date") or ""
+            try:
+                day = date.fromisoformat(raw) if "-" in raw else date(int(raw[:4]), int(raw[4:6]), int(raw[6:]))
+            except ValueError:
+                continue
+            if day < since:
+                continue
+            name = row.get("Campaign name") or row.get("Campaign") or row.get("Session campaign") or "(not set)"
+            def number(*keys: str, row: dict = row) -> float:
+                return float(next((row[k] for k in keys if row.get(k)), "0").replace(",", ""))
+            values = (number("Impressions", "Impr."), number("Link clicks", "Clicks", "Sessions"),
+                      number("Amount spent (NZD)", "Cost"), number("Leads", "Key events"),
+                      number("Purchases", "Conversions", "Transactions"),
+                      number("Purchases conversion value", "Conv. value", "Total revenue"))
+            totals[name] = [t + v for t, v in zip(totals[name], values, strict=True)]
+    return sorted(({"campaign": name, **metrics(values), "spend": values[2]} for name, values in totals.items()),
+                  key=lambda row: -row["spend"])
+
+def timed(function, repeat: int) -> tuple[float, Any]:
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 3), result
+
+def run(args, tmp: str) -> list[dict]:
+    generator = Generator(args.campaigns)
+    last = date(2026, 10, 11)  # A Sunday
+    held_back = last - timedelta(days=6)
+    first = last - timedelta(days=7 * args.weeks - 1)
+    anomaly = generator.campaigns["facebook"][args.anomaly]
+    generator.spikes["facebook", anomaly] = (held_back, last)
+    exports = os.path.join(tmp, "exports")
+    os.makedirs(exports)
+    paths, rows = [], 0
+    for channel in generator.campaigns:
+        for start, end in months(first, held_back - timedelta(days=1)):
+            paths.append(os.path.join(exports, f"{channel}_{start:%Y_%m}.csv"))
+            rows += generator.write(channel, paths[-1], start, end)
+    raw_bytes = sum(os.path.getsize(path) for path in paths)
+    results = []
+
+    store_path = os.path.join(tmp, "ad_analytics.npz")
+    started = time.perf_counter()
+    store = AdStore.open(store_path)
+    reports = store.sync(exports)
+    results.append({"benchmark": "analytics", "step": "cold_ingest", "exports": len(reports), "csv_rows": rows,
+                    "csv_mb": round(raw_bytes / 1e6, 1), "stored_rows": len(store.keys), "campaigns": len(store.campaigns),
+                    "elapsed_s": round(time.perf_counter() - started, 3),
+                    "store_kb": round(sum(os.path.getsize(path) for path in glob.glob(f"{tmp}/ad_analytics*")) / 1024)})
+
+    week_paths = []
+    for channel in generator.campaigns:
+        week_paths.append(os.path.join(exports, f"{channel}_week_{held_back:%Y_%m_%d}.csv"))
+        generator.write(channel, week_paths[-1], held_back, last)
+    started = time.perf_counter()
+    reports = store.sync(exports)
+    results.append({"benchmark": "analytics", "step": "incremental_week", "exports": len(reports),
+                    "rows": sum(r.rows for r in reports), "added": sum(r.added for r in reports),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)})
+    paths += week_paths
+
+    started = time.perf_counter()
+    reports = store.sync(exports)
+    results.append({"benchmark": "analytics", "step": "resync_nothing_new", "exports": len(reports),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+
+    open_ms, store = timed(lambda: AdStore.open(store_path), args.repeat)
+    queries = {
+        "by_campaign_4_weeks": lambda: store.performance("campaign", 4),
+        "by_channel_all": lambda: store.performance("channel"),
+        "by_week_all": lambda: store.performance("week"),
+        "one_campaign_by_week": lambda: store.performance("week", 12, campaign="plumbing - auckland"),
+        "anomalies": store.anomalies,
+    }
+    latencies = {name: timed(query, args.repeat)[0] for name, query in queries.items()}
+    baseline_ms, expected = timed(lambda: naive(paths, 4, last), max(1, args.repeat // 20))
+    got = {row["campaign"]: row for row in store.performance("campaign", 4)}
+    mismatched = sum(abs(got[row["campaign"]]["spend"] - row["spend"]) > 0.05 or got[row["campaign"]]["cpl"] != row["cpl"]
+                     for row in expected)
+    results.append({"benchmark": "analytics", "step": "queries", "open_store_ms": open_ms,
+                    **{f"{name}_ms": ms for name, ms in latencies.items()},
+                    "naive_csv_by_campaign_4_weeks_ms": baseline_ms,
+                    "speedup_vs_naive": round(baseline_ms / latencies["by_campaign_4_weeks"]),
+                    "campaigns_mismatched_vs_naive": mismatched})
+
+    # Re-export the last month of Facebook data (overlapping what is stored): totals must not change.
+    before = store.performance("channel")
+    overlap = os.path.join(exports, "facebook_reexport.csv")
+    generator.write("facebook", overlap, last - timedelta(days=30), last)
+    report = store.ingest(overlap)
+    after = store.performance("channel")
+    anomalies = store.anomalies()
+    results.append({"benchmark": "analytics", "step": "overlapping_reexport", "rows": report.rows,
+                    "replaced": report.replaced, "added": report.added, "totals_unchanged": before == after,
+                    "injected_anomaly": f"{anomaly} leads cut to a third", "anomalies": len(anomalies),
+                    "injected_found_first": bool(anomalies) and anomalies[0]["campaign"] == anomaly,
+                    "reported_as": anomalies[0]["metric"] if anomalies else None})
+
+    os.environ.update(AD_ANALYTICS_PATH=store_path, AD_EXPORTS_DIR=exports)
+    from tradie_ai_marketing_manager import tools
+
+    outputs = [tools.get_campaign_performance("campaign", 4), tools.get_campaign_performance("channel", 0),
+               tools.get_performance_anomalies()]
+    results.append({"benchmark": "analytics", "step": "prompt_tokens", "raw_exports_est": raw_bytes // 4,
+                    "last_4_weeks_raw_est": raw_bytes * 4 // args.weeks // 4,
+                    "tool_outputs_est": sum(len(output) for output in outputs) // 4,
+                    "by_campaign_output_lines": outputs[0].count("\n") + 1})
+    if args.show:
+        print("\n\n".join(outputs))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ad performance analytics store.")
+    parser.add_argument("--campaigns", type=int, default=48, help="Campaigns across Facebook and Google Ads.")
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--anomaly", type=int, default=0, help="Which Facebook campaign gets fewer leads in the last week.")
+    parser.add_argument("--show", action="store_true", help="Print the tool outputs.")
+    parser.add_argument("--output", default=str(pathlib.Path(__file__).resolve().parent / "results.jsonl"))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args, tmp)
+    with open(args.output, "a", encoding="utf-8") as out:
+        for result in results:
+            print(json.dumps(result))
+            out.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Competitor directory: load time and nearest-neighbour lookup latency on the grid index, against measuring
+# every business of the trade, for synthetic directories spread around NZ towns.
+import argparse
+import json
+import pathlib
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_marketing_manager.competitors import (
+    TOWNS,
+    Competitor,
+    CompetitorDirectory,
+    distance_km,
+)
+
+TRADES = ["plumber", "electrician", "builder", "roofer", "painter", "landscaper", "drainlayer", "tiler"]
+
+def synthetic(n: int, seed: int = 7) -> list[Competitor]:
+    rng = random.Random(seed)
+    towns = list(TOWNS.items())
+    competitors = []
+    for i in range(n):
+        town, (lat, lon) = rng.choice(towns)
+        competitors.append(Competitor(
+            name=f"Business {i}", trade=rng.choice(TRADES), suburb=town, town=town, region=town,
+            lat=lat + rng.gauss(0, 0.1), lon=lon + rng.gauss(0, 0.1), facebook=f"facebook.com/business{i}",
+        ))
+    return competitors
+
+def _scan(directory: CompetitorDirectory, trade: str, lat: float, lon: float, limit: int = 5) -> list:
+    """What the grid replaces: measure every business of the trade and sort."""
+    matches = [(distance_km(lat, lon, c.lat, c.lon), c) for c in directory.competitors
+               if c.trade == trade and c.lat is not None and c.lon is not None]
+    return sorted(matches, key=lambda match: match[0])[:limit]
+
+def _ms(fn, queries: list) -> dict:
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(*query)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {"p50_ms": round(statistics.median(times), 3), "p95_ms": round(times[int(len(times) * 0.95) - 1], 3)}
+
+def bench(n: int) -> dict:
+    competitors = synthetic(n)
+    started = time.perf_counter()
+    directory = CompetitorDirectory(competitors)
+    index_s = time.perf_counter() - started
+    rng = random.Random(1)
+    towns = list(TOWNS)
+    queries = [(rng.choice(TRADES), rng.choice(towns)) for _ in range(200)]
+    points = [(trade, *TOWNS[town]) for trade, town in queries]
+    result = {
+        "businesses": n,
+        "index_s": round(index_s, 2),
+        "find_by_town": _ms(directory.find, queries),
+        "nearest_grid": _ms(directory.nearest, points),
+    }
+    if n <= 100_000:
+        result["nearest_scan"] = _ms(lambda trade, lat, lon: _scan(directory, trade, lat, lon), points[:20])
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark competitor directory lookups.")
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(json.dumps({"benchmark": "competitors", **bench(size)}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# SEO keyword engine: compile time, time to open a compiled index, and lookup latency before and after memoising,
+# on synthetic corpora of up to millions of keywords.
+import argparse
+import csv
+import json
+import os
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from tradie_ai_marketing_manager.seo import REGIONS, KeywordIndex, build_index
+
+SERVICES = [
+    "plumber", "plumbing", "electrician", "electrical", "builder", "roofer", "roofing", "painter", "landscaper",
+    "tiler", "drainlayer", "gasfitter", "heat pump", "hot water cylinder", "switchboard", "deck", "fence", "kitchen",
+    "bathroom", "driveway", "retaining wall", "gutter", "insulation", "solar panel", "ev charger", "concrete",
+]
+WORDS = [
+    "repair", "installation", "replacement", "emergency", "cost", "prices", "quote", "near me", "best", "cheap",
+    "24 hour", "renovation", "service", "inspection", "upgrade", "cleaning", "maintenance", "new", "local", "licensed",
+    "commercial", "residential", "leaking", "blocked", "burst", "small", "modern", "diy", "how to", "advice",
+]
+TOPICS = [
+    "Why your hot water cylinder is leaking", "Blocked drains in winter", "Choosing a licensed electrician",
+    "Heat pump installation costs", "Deck building ideas", "Is it time for a switchboard upgrade",
+    "Bathroom renovation on a budget", "Roof repair after a storm", "EV charger installation at home",
+    "Retaining wall options for sloping sections", "Kitchen renovation trends", "Solar panel payback",
+]
+
+def write_corpus(path: str, n: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    regions = ["nz"] * 4 + list(REGIONS)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["keyword", "volume", "difficulty", "region"])
+        for i in range(n):
+            words = [rng.choice(SERVICES), *rng.sample(WORDS, rng.randint(1, 3))]
+            rng.shuffle(words)
+            writer.writerow([f"{' '.join(words)} {i % 997}", int(rng.paretovariate(1.2) * 10), rng.randint(1, 100), rng.choice(regions)])
+
+def _latencies(index: KeywordIndex, topics: list[tuple[str, str]]) -> dict:
+    times = []
+    for topic, region in topics:
+        started = time.perf_counter()
+        index.search(topic, region)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {"p50_ms": round(statistics.median(times), 3), "p95_ms": round(times[int(len(times) * 0.95) - 1], 3)}
+
+def bench(n: int, directory: str) -> dict:
+    corpus = os.path.join(directory, f"keywords_{n}.csv")
+    index_path = os.path.join(directory, f"keywords_{n}.sqlite")
+    write_corpus(corpus, n)
+    started = time.perf_counter()
+    build_index(corpus, index_path)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    index = KeywordIndex.open(corpus, index_path)
+    open_ms = (time.perf_counter() - started) * 1000
+    regions = ["", *REGIONS]
+    topics = [(topic, region) for topic in TOPICS for region in regions[:8]]
+    result = {
+        "keywords": n,
+        "index_mib": round(os.path.getsize(index_path) / 2 ** 20, 1),
+        "build_s": round(build_s, 1),
+        "open_ms": round(open_ms, 2),
+        "lookup": _latencies(index, topics),
+        "lookup_memoised": _latencies(index, topics),
+    }
+    index.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the SEO keyword engine.")
+    parser.add_argument("--sizes", default="100000,1000000")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(json.dumps({"benchmark": "seo_keywords", **bench(size, directory)}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# The ad performance store (analytics.py): Google Analytics kept out of cross-channel totals, Google Ads
+# conversions, saving each ingest as a segment that reopening replays, and CSVs in the exports directory that
+# are not ad exports.
+import os
+
+import pytest
+
+from tradie_ai_marketing_manager import tools
+from tradie_ai_marketing_manager.analytics import (
+    COMPACT_SEGMENTS,
+    AdStore,
+    parse_export,
+)
+
+FACEBOOK = """Reporting starts,Reporting ends,Campaign name,Impressions,Link clicks,Amount spent (NZD),Leads
+2026-09-07,2026-09-07,Plumbing - Auckland,1000,40,80.00,4
+2026-09-08,2026-09-08,Plumbing - Auckland,1200,50,100.00,5
+"""
+GOOGLE_ADS = """Campaign report
+"September 7, 2026 - September 8, 2026"
+Day,Campaign,Impr.,Clicks,Cost,Conversions,Conv. value
+2026-09-07,Plumbing - Auckland,500,25,60.00,2.00,"1,800.00"
+2026-09-08,Plumbing - Auckland,600,30,70.00,1.00,900.00
+Total: Account,,"1,100",55,130.00,3.00,"2,700.00"
+"""
+# The website's view of the same Facebook traffic.
+ANALYTICS = """Date,Session campaign,Sessions,Key events,Total revenue
+20260907,Plumbing - Auckland,38,4,0
+20260908,Plumbing - Auckland,47,5,0
+"""
+
+@pytest.fixture
+def store(tmp_path):
+    for name, text in (("facebook.csv", FACEBOOK), ("google_ads.csv", GOOGLE_ADS), ("analytics.csv", ANALYTICS)):
+        (tmp_path / name).write_text(text)
+    store = AdStore.open(str(tmp_path / "store" / "ad_analytics.npz"))
+    store.sync(str(tmp_path))
+    return store
+
+def test_google_ads_conversions_are_not_leads():
+    export = parse_export(GOOGLE_ADS)
+    assert export.channel == "google_ads"
+    assert export.values[:, 3:].tolist() == [[0.0, 2.0, 1800.0], [0.0, 1.0, 900.0]]  # leads, conversions, revenue
+
+def test_analytics_is_left_out_of_cross_channel_totals(store):
+    [campaign] = store.performance("campaign")
+    assert (campaign["clicks"], campaign["leads"], campaign["conversions"], campaign["spend"]) == (145, 9, 3, 310)
+    assert sum(week["leads"] for week in store.performance("week")) == 9
+    by_channel = {row["channel"]: row for row in store.performance("channel")}
+    assert by_channel["analytics"]["leads"] == 9 and by_channel["facebook"]["leads"] == 9
+    assert store.performance("campaign", channel="analytics")[0]["clicks"] == 85
+
+def test_ingests_are_saved_as_segments_and_compacted(store, tmp_path):
+    directory = tmp_path / "store"
+    assert sorted(os.listdir(directory)) == ["ad_analytics.000001.npz", "ad_analytics.000002.npz", "ad_analytics.npz"]
+    reopened = AdStore.open(store.path)
+    assert reopened.performance("channel") == store.performance("channel")
+    assert reopened.sync(str(tmp_path)) == []  # What was ingested, and from where, is saved with each segment
+
+    for day in range(COMPACT_SEGMENTS - 1):  # The last one finds COMPACT_SEGMENTS segments and compacts them
+        path = tmp_path / f"facebook_{day}.csv"
+        path.write_text(FACEBOOK.replace("Plumbing", f"Drainage {day}"))
+        reopened.ingest(str(path))
+    assert sorted(os.listdir(directory)) == ["ad_analytics.npz"]
+    assert AdStore.open(store.path).performance("campaign") == reopened.performance("campaign")
+
+def test_a_csv_that_is_not_an_export_is_reported_and_tried_again_once_changed(store, tmp_path):
+    notes = tmp_path / "notes.csv"
+    notes.write_text("name,phone\nSam,021 555 0101\n")
+    [report] = store.sync(str(tmp_path))
+    assert report.error.startswith("No header row") and not report.rows
+    assert store.sync(str(tmp_path)) == []  # Not re-read until it changes
+    reopened = AdStore.open(store.path)  # Nor recorded as ingested
+    assert str(notes) not in reopened.seen
+    notes.write_text(FACEBOOK.replace("Plumbing", "Roofing"))
+    [report] = reopened.sync(str(tmp_path))
+    assert not report.error and report.rows == 2
+
+def test_tools_answer_with_a_bad_csv_in_the_exports_directory(store, tmp_path, monkeypatch):
+    (tmp_path / "notes.csv").write_text("name,phone\nSam,021 555 0101\n")
+    monkeypatch.setenv("AD_EXPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(tools, "get_ad_store", lambda: store)
+    assert "Plumbing - Auckland" in tools.get_campaign_performance(weeks=0)
+    assert tools.get_performance_anomalies().startswith("No anomalies")
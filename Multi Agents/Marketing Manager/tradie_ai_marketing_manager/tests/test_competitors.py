@@ -0,0 +1,34 @@
+# The competitor directory (competitors.py) and its tools: places written the way people write them, and the
+# competitor list each lookup renders.
+import pytest
+
+from tradie_ai_marketing_manager import tools
+from tradie_ai_marketing_manager.competitors import CompetitorDirectory, bare_place
+
+
+@pytest.fixture(scope="module")
+def directory():
+    return CompetitorDirectory.load()
+
+@pytest.mark.parametrize("location, key", [
+    ("Auckland, New Zealand", "auckland"),
+    ("Christchurch NZ", "christchurch"),
+    ("near Hamilton", "hamilton"),
+    ("in Canterbury", "canterbury"),
+    ("Ponsonby, Auckland", "ponsonby"),
+    ("Mt Eden", "mt-eden"),
+])
+def test_places_are_found_however_they_are_written(directory, location, key):
+    assert directory.place_key(location) == key
+    assert directory.find("electricians", location)
+
+def test_bare_place():
+    assert bare_place("around Tauranga, NZ.") == "Tauranga"
+    assert bare_place("New Zealand") == "New Zealand"
+
+def test_rendered_lookup_names_the_place_once():
+    text = tools.get_competitor_social_media("electricians", "near Hamilton")
+    assert text.splitlines()[0] == "Competitor Social Media Links (electricians near Hamilton):"
+    assert "Hilltop Electrical (Dinsdale" in text
+    assert tools.get_competitor_social_media("electricians", "Christchurch NZ").startswith(
+        "Competitor Social Media Links (electricians near Christchurch):")
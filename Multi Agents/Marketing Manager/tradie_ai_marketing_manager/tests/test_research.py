@@ -0,0 +1,76 @@
+# Parallel research (research.py): every branch leaves findings or a note saying why it has none, a slow or
+# failing source does not hold up the others, and a branch with a bug is not hidden behind a note.
+import asyncio
+import time
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from tradie_ai_marketing_manager.research import FunctionBranch, parallel_research
+
+
+def demand(request: str) -> str:
+    return f"Demand for: {request}"
+
+async def slow_source(request: str) -> str:
+    await asyncio.sleep(5)
+    return "too late"
+
+def broken_source(request: str) -> str:
+    raise ConnectionError("search API down")
+
+def buggy_source(request: str) -> str:
+    return {}["trade"]
+
+class SilentSource(BaseAgent):
+    """A source that finishes without an answer."""
+
+    async def _run_async_impl(self, ctx):
+        return
+        yield
+
+async def run(agent: BaseAgent) -> tuple[dict, float]:
+    """Runs `agent` on one request; returns the session state afterwards and how long the run took."""
+    runner = InMemoryRunner(agent=agent, app_name="research")
+    session = await runner.session_service.create_session(app_name="research", user_id="joe")
+    started = time.monotonic()
+    async for _ in runner.run_async(user_id="joe", session_id=session.id, new_message=types.Content(
+        role="user", parts=[types.Part(text="Plumbing in Timaru")],
+    )):
+        pass
+    elapsed = time.monotonic() - started
+    finished = await runner.session_service.get_session(app_name="research", user_id="joe", session_id=session.id)
+    assert finished is not None
+    return finished.state, elapsed
+
+@pytest.mark.asyncio
+async def test_every_branch_leaves_findings_or_a_note():
+    state, elapsed = await run(parallel_research("Research", {
+        "research_demand": FunctionBranch(name="Demand", function=demand),
+        "research_slow": FunctionBranch(name="Slow", function=slow_source),
+        "research_broken": FunctionBranch(name="Broken", function=broken_source),
+        "research_silent": SilentSource(name="Silent"),
+    }, timeouts={"research_slow": 0.2}))
+    assert state["research_demand"] == "Demand for: Plumbing in Timaru"
+    assert state["research_slow"] == "(Slow did not finish within 0.2s; carry on without it.)"
+    assert state["research_broken"] == "(Broken failed: search API down)"
+    assert state["research_silent"] == "(Silent found nothing.)"
+    assert elapsed < 2  # The slow source was cut off at its deadline, not awaited
+
+def test_branches_get_their_keys_and_the_default_deadline(monkeypatch):
+    monkeypatch.setenv("RESEARCH_BRANCH_TIMEOUT", "12")
+    agent = parallel_research("Research", {"research_demand": FunctionBranch(name="Demand", function=demand)},
+                              timeouts={"research_other": 1})
+    [branch] = agent.sub_agents
+    assert (branch.name, branch.output_key, branch.timeout_s) == ("DemandDeadline", "research_demand", 12)
+    assert branch.sub_agents[0].output_key == "research_demand"
+
+@pytest.mark.asyncio
+async def test_a_bug_in_a_branch_is_raised():
+    with pytest.raises(KeyError, match="trade"):
+        await run(parallel_research("Research", {
+            "research_demand": FunctionBranch(name="Demand", function=demand),
+            "research_buggy": FunctionBranch(name="Buggy", function=buggy_source),
+        }))
@@ -0,0 +1,78 @@
+# The SEO keyword index (seo.py): which towns and regions a search keeps, prefix matching, the memoised topics and
+# rebuilding when the corpus changes.
+import os
+
+import pytest
+
+from tradie_ai_marketing_manager.seo import KeywordIndex, named_town
+
+CORPUS = """keyword,volume,difficulty,region
+blocked drain repair,900,30,nz
+blocked drain repair christchurch,60,39,canterbury
+blocked drain repair timaru,120,41,canterbury
+blocked drain repair canterbury,40,35,canterbury
+blocked drain repair hamilton,150,38,waikato
+plumber near me,5000,45,nz
+emergency plumber christchurch,300,40,canterbury
+"""
+
+def keywords(index: KeywordIndex, topic: str, region: str = "") -> list[str]:
+    return [row["keyword"] for row in index.search(topic, region)]
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "keywords.csv"
+    path.write_text(CORPUS)
+    return path
+
+@pytest.fixture
+def index(corpus, tmp_path):
+    index = KeywordIndex.open(str(corpus), str(tmp_path / "keywords.sqlite"))
+    yield index
+    index.close()
+
+@pytest.mark.parametrize("keyword, town", [
+    ("blocked drain repair timaru", "timaru"),
+    ("plumber new plymouth", "new-plymouth"),
+    ("blocked drain repair canterbury", ""),
+    ("plumber near me", ""),
+])
+def test_the_town_a_keyword_names(keyword, town):
+    assert named_town(keyword) == town
+
+def test_a_town_keeps_its_own_keywords_and_drops_the_rest_of_its_region(index):
+    found = keywords(index, "blocked drains", "Christchurch")
+    assert "blocked drain repair christchurch" in found and "blocked drain repair canterbury" in found
+    assert "blocked drain repair" in found
+    assert "blocked drain repair timaru" not in found and "blocked drain repair hamilton" not in found
+
+def test_a_region_keeps_its_towns(index):
+    found = keywords(index, "blocked drains", "Canterbury")
+    assert {"blocked drain repair christchurch", "blocked drain repair timaru"} <= set(found)
+    assert "blocked drain repair hamilton" not in found
+    assert keywords(index, "blocked drains") == ["blocked drain repair"]  # National only
+
+def test_topics_match_keyword_prefixes(index):
+    assert sorted(keywords(index, "plumbing", "Christchurch")) == ["emergency plumber christchurch", "plumber near me"]
+
+def test_topics_are_memoised_by_their_words(index):
+    first = index.search("Blocked drains", "Christchurch")
+    assert index.search("blocked drains?", "christchurch") == first
+    assert (index.cache_info().hits, index.cache_info().misses) == (1, 1)
+    index.search("blocked drains", "Timaru")
+    assert index.cache_info().misses == 2
+
+def test_a_changed_corpus_is_rebuilt(corpus, tmp_path, index):
+    path = str(tmp_path / "keywords.sqlite")
+    assert keywords(index, "gutters") == []
+    corpus.write_text(CORPUS + "gutter cleaning,700,20,nz\n")
+    stat = os.stat(corpus)
+    os.utime(corpus, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    rebuilt = KeywordIndex.open(str(corpus), path)
+    try:
+        assert keywords(rebuilt, "gutters") == ["gutter cleaning"]
+        built = os.stat(path).st_mtime_ns
+        KeywordIndex.open(str(corpus), path).close()  # Unchanged: opened as is
+        assert os.stat(path).st_mtime_ns == built
+    finally:
+        rebuilt.close()
@@ -1,22 +1,57 @@
 # The Root Coordinator Agent for the tradie_ai_marketing_manager system.
 from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
+from google.adk.plugins.base_plugin import BasePlugin
 
-from . import prompt
-# Import all specialist agents that you will define.
-from .sub_agents.StrategyAgent import StrategyAgent
-from .sub_agents.ContentAgent import ContentAgent
-from .sub_agents.AnalyticsAgent import AnalyticsAgent
+from . import prompt, tracing
+from .lazy import LazyAgentTool
+from .router import IntentRouter
+from .routes import ROUTES
+from .scheduler import install_scheduler
+from .sessions import session_app
+
+# Specialists are registered lazily: each sub_agent module (and the tools it imports) is only
+# loaded the first time the coordinator delegates to it.
+specialists = [
+    LazyAgentTool(
+        "tradie_ai_marketing_manager.sub_agents.StrategyAgent:StrategyAgent",
+        name="StrategyAgent",
+        description="Conducts market research, analyzes competitors, and develops marketing strategies and plans by delegating to specialized research agents.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_marketing_manager.sub_agents.ContentAgent:ContentAgent",
+        name="ContentAgent",
+        description="Generates marketing content, including social media posts, email campaigns, blog articles, and ad copy.",
+    ),
+    LazyAgentTool(
+        "tradie_ai_marketing_manager.sub_agents.AnalyticsAgent:AnalyticsAgent",
+        name="AnalyticsAgent",
+        description="Tracks marketing campaign performance, analyzes key metrics (KPIs), and generates reports with data-driven insights.",
+    ),
+]
+
+# Obvious requests go straight to a specialist without a coordinator model call (see router.py).
+intent_router = IntentRouter.from_routes(specialists, ROUTES)
 
-# The root_agent uses the AgentTool model to call specialists.
 root_agent = Agent(
     name="MarketingCoordinator",
     model="gemini-2.5-flash", # Or another powerful model for orchestration
     description="A multi-agent system that acts as a marketing manager for tradespeople, handling strategy, content creation, and performance analytics.",
     instruction=prompt.COORDINATOR_PROMPT,
-    tools=[
-        AgentTool(agent=StrategyAgent),
-        AgentTool(agent=ContentAgent),
-        AgentTool(agent=AnalyticsAgent),
-    ]
+    tools=[*specialists],
+    before_agent_callback=intent_router.before_agent,
+    after_model_callback=intent_router.after_model,
+    on_model_error_callback=intent_router.on_model_error,
 )
+
+# Every Gemini call waits its turn in one scheduler: per-model quotas, adaptive concurrency, retries on 429
+# and 5xx, and interactive calls ahead of batch ones (see scheduler.py). MODEL_SCHEDULER=off calls models directly.
+scheduler = install_scheduler()
+
+# Set TRACE_PATH, METRICS_PATH or METRICS_PORT to trace every agent, model and tool hop (see tracing.py).
+plugins: list[BasePlugin] = []
+if tracing.enabled():
+    plugins.append(tracing.tracing_plugin_from_env(collectors=(scheduler.metrics.render,) if scheduler else ()))
+
+# Long conversations are compacted once they pass SESSION_TOKEN_BUDGET, and large tool outputs from
+# earlier turns are sent as references into session state (see sessions.py).
+app = session_app(root_agent, app_name="tradie_ai_marketing_manager", plugins=plugins)
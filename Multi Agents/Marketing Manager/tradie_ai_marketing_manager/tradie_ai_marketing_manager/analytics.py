@@ -0,0 +1,529 @@
+# Campaign performance analytics: Facebook Ads, Google Ads and Google Analytics CSV exports are ingested into a
+# columnar store of daily rows (NumPy arrays, with a segment file per ingest), with weekly rollups by campaign and channel updated in
+# place as each export arrives. The AnalyticsAgent's tools get compact summary tables and detected anomalies from
+# here, never the exported rows themselves.
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import warnings
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "tradie_ai", "ad_analytics.npz")
+CHANNELS = ("facebook", "google_ads", "analytics")
+MEASURES = ("impressions", "clicks", "spend", "leads", "conversions", "revenue")
+GROUPS = ("campaign", "channel", "week")
+_IMPRESSIONS, _CLICKS, _SPEND, _LEADS, _CONVERSIONS, _REVENUE = range(len(MEASURES))
+# Google Analytics attributes the same clicks, leads and revenue the ad platforms report, from the website's side.
+_AD_PLATFORMS = np.array([channel != "analytics" for channel in CHANNELS])
+# Each ingest is saved as a segment file; this many are folded back into the main file.
+COMPACT_SEGMENTS = 16
+
+# Keys pack a row's day, channel and campaign into one sortable int64: day << 24 | channel << 20 | campaign.
+_CHANNEL_SHIFT, _DAY_SHIFT = 20, 24
+_CAMPAIGN_MASK = (1 << _CHANNEL_SHIFT) - 1
+_MONDAY = 4  # 1970-01-05, the first Monday after the epoch, as days since the epoch
+
+# Export columns, by what they hold: the first one an export has is used. Headers are compared lowercased and
+# without a trailing currency, e.g. 'Amount spent (NZD)' matches 'amount spent'. Analytics has no clicks, so its
+# sessions stand in for them. Google Ads' 'Conversions' count every conversion action, so they are conversions.
+COLUMNS = {
+    "date": ("day", "date", "reporting starts"),
+    "campaign": ("campaign name", "campaign", "session campaign", "session campaign name", "first user campaign name"),
+    "impressions": ("impressions", "impr."),
+    "clicks": ("link clicks", "clicks", "clicks (all)", "sessions"),
+    "spend": ("amount spent", "cost", "spend"),
+    "leads": ("leads", "website leads", "on-facebook leads", "key events"),
+    "conversions": ("purchases", "website purchases", "transactions", "ecommerce purchases", "jobs won", "conversions"),
+    "revenue": ("purchases conversion value", "website purchases conversion value", "conv. value", "conversion value",
+                "total revenue", "purchase revenue", "revenue"),
+}
+# Columns only one channel's exports have, for telling which channel an export came from.
+_SIGNATURES = (("facebook", ("amount spent", "reporting starts", "link clicks")),
+               ("google_ads", ("impr.", "conv. value", "cost")),
+               ("analytics", ("sessions", "key events", "session campaign", "total revenue")))
+_DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d", "%d/%m/%Y", "%b %d, %Y", "%a, %b %d, %Y", "%d %b %Y", "%d/%m/%y")
+_CURRENCY = re.compile(r"\s*\((?:[a-z]{3}|\$)\)$")
+_NUMBER_JUNK = str.maketrans("", "", "$,% ")
+
+def _header(name: str) -> str:
+    return _CURRENCY.sub("", " ".join(name.strip().lower().split()))
+
+def _number(text: str) -> float:
+    text = (text or "").translate(_NUMBER_JUNK)
+    try:
+        return float(text) if text not in ("", "-", "--") else 0.0
+    except ValueError:
+        return 0.0
+
+def _segment_files(path: str) -> list[tuple[int, str]]:
+    """The numbered segment files saved next to `path` (e.g. ad_analytics.000003.npz), oldest first."""
+    root, ext = os.path.splitext(path)
+    segments = []
+    for name in glob.glob(f"{glob.escape(root)}.*{ext}"):
+        number = name[len(root) + 1:len(name) - len(ext)]
+        if number.isdigit():
+            segments.append((int(number), name))
+    return sorted(segments)
+
+def week_start(week: int) -> date:
+    """The Monday a week index (weeks since 1970-01-05) starts on."""
+    return date.fromordinal(date(1970, 1, 1).toordinal() + _MONDAY + 7 * int(week))
+
+def _day(value: date) -> int:
+    return value.toordinal() - date(1970, 1, 1).toordinal()
+
+def _week(days):
+    return (days - _MONDAY) // 7
+
+def metrics(totals) -> dict:
+    """CTR (%), cost per lead, cost per acquisition and return on ad spend from summed measures; None where undefined."""
+    impressions, clicks, spend, leads, conversions, revenue = (float(value) for value in totals)
+
+    def ratio(numerator: float, denominator: float, scale: float = 1.0) -> float | None:
+        return round(scale * numerator / denominator, 2) if denominator else None
+
+    return {"ctr": ratio(clicks, impressions, 100), "cpl": ratio(spend, leads if spend else 0),
+            "cpa": ratio(spend, conversions if spend else 0), "roas": ratio(revenue, spend)}
+
+# --- Parsing ---
+
+@dataclass
+class Export:
+    """The rows of one export, as columns: day (days since the epoch), campaign name and the measures."""
+    channel: str
+    days: np.ndarray
+    campaigns: list[str]
+    values: np.ndarray
+
+def detect_channel(header: Iterable[str]) -> str | None:
+    """Which channel an export's columns come from, or None if they match none."""
+    names = {_header(name) for name in header}
+    return next((channel for channel, signature in _SIGNATURES if names.intersection(signature)), None)
+
+def parse_export(text: str, channel: str = "") -> Export:
+    """Parses a CSV export, skipping report titles above the header and total rows below the data.
+
+    Raises:
+        ValueError: If no header with a date and a campaign column is found, or the channel cannot be told.
+    """
+    lines = text.splitlines()
+    for start, line in enumerate(lines[:20]):  # noqa: B007 - `start` is read after the loop
+        header = [_header(name) for name in next(csv.reader([line]), [])]
+        if set(header) & set(COLUMNS["date"]) and set(header) & set(COLUMNS["campaign"]):
+            break
+    else:
+        raise ValueError("No header row with a date and a campaign column in the first 20 lines")
+    channel = channel or detect_channel(header) or ""
+    if channel not in CHANNELS:
+        raise ValueError(f"Could not tell the channel from the columns; pass one of {', '.join(CHANNELS)}")
+    position = {}
+    for column, aliases in COLUMNS.items():
+        found = next((alias for alias in aliases if alias in header), None)
+        if found is not None:
+            position[column] = header.index(found)
+    measures = [(MEASURES.index(column), index) for column, index in position.items() if column in MEASURES]
+    seen: dict[str, int | None] = {}
+    days, campaigns, rows = [], [], []
+    for row in csv.reader(lines[start + 1:]):
+        if len(row) <= max(position["date"], position["campaign"]):
+            continue
+        raw_date = row[position["date"]].strip()
+        day = seen.get(raw_date, -1)
+        if day == -1:
+            day = seen[raw_date] = _parse_day(raw_date)
+        if day is None:  # Totals and footers
+            continue
+        values = [0.0] * len(MEASURES)
+        for measure, index in measures:
+            if index < len(row):
+                values[measure] = _number(row[index])
+        days.append(day)
+        campaigns.append(row[position["campaign"]].strip() or "(not set)")
+        rows.append(values)
+    return Export(channel, np.array(days, dtype=np.int64), campaigns, np.array(rows, dtype=np.float64).reshape(-1, len(MEASURES)))
+
+def _parse_day(text: str) -> int | None:
+    for fmt in _DATE_FORMATS:
+        try:
+            return _day(datetime.strptime(text, fmt).date())
+        except ValueError:
+            continue
+    return None
+
+# --- Store ---
+
+@dataclass
+class IngestReport:
+    """What one export changed in the store."""
+    path: str
+    channel: str = ""
+    rows: int = 0
+    added: int = 0
+    replaced: int = 0
+    first_day: str = ""
+    last_day: str = ""
+    campaigns: int = 0
+    skipped: bool = False
+    seconds: float = 0.0
+    error: str = ""
+
+class AdStore:
+    """Daily ad performance by channel and campaign, kept as sorted columns, plus weekly rollups.
+
+    Rows are keyed by day, channel and campaign. Within one export, rows with the same key (e.g. one per ad set)
+    are summed; across exports, a later export's row replaces the earlier one, so re-exporting an overlapping
+    date range does not double count. Each ingest adds only the difference it makes to the weekly rollup.
+    Each ingest is saved as a numbered segment file holding just that export's rows, replayed when the store is
+    opened; every COMPACT_SEGMENTS ingests the whole store is written to its main .npz file instead.
+
+    Args:
+        path: The store file; created on the first ingest.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros((0, len(MEASURES)), dtype=np.float64)
+        self.weekly = np.zeros((0, len(CHANNELS), 0, len(MEASURES)), dtype=np.float64)  # week, channel, campaign, measure
+        self.first_week = 0
+        self.campaigns: list[str] = []
+        self.files: dict[str, dict] = {}  # Content hash -> what was ingested from it
+        self.seen: dict[str, list] = {}  # Path -> [size, mtime, content hash], so unchanged files are not re-read
+        self.rejected: dict[str, list] = {}  # Path -> [size, mtime] of files that failed to ingest, until they change
+        self._campaign_ids: dict[str, int] = {}
+        self._segment = 0  # Number of the last segment written or read
+        self._segments: list[str] = []
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self.keys, self.values, self.weekly = data["keys"], data["values"], data["weekly"]
+                manifest = json.loads(str(data["manifest"]))
+            self.first_week = manifest["first_week"]
+            self.campaigns, self.files, self.seen = manifest["campaigns"], manifest["files"], manifest["seen"]
+            self._campaign_ids = {name: i for i, name in enumerate(self.campaigns)}
+            # The main file records the last segment it includes, so segments left by an interrupted compaction are skipped.
+            self._segment = manifest.get("through", 0)
+            for number, segment in _segment_files(path):
+                if number > self._segment:
+                    self._replay(segment)
+                    self._segment = number
+                    self._segments.append(segment)
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_STORE_PATH) -> "AdStore":
+        return cls(path)
+
+    # --- Ingest ---
+
+    def ingest(self, path: str, channel: str = "") -> IngestReport:
+        """Adds one export to the store; an export already ingested (by content) is skipped.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If it is not an export parse_export can read; it is not recorded as seen.
+        """
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            stat = os.stat(path)
+            if digest in self.files:
+                self.seen[os.path.abspath(path)] = [stat.st_size, stat.st_mtime, digest]
+                return IngestReport(path, self.files[digest]["channel"], skipped=True)
+            export = parse_export(data.decode("utf-8-sig", errors="replace"), channel)
+            self.seen[os.path.abspath(path)] = [stat.st_size, stat.st_mtime, digest]
+            report = self._merge(export)
+            report.path = path
+            self.files[digest] = {"path": path, "channel": export.channel, "rows": report.rows, "ingested_at": time.time()}
+            self._save(export, {digest: self.files[digest]}, {os.path.abspath(path): self.seen[os.path.abspath(path)]})
+        report.seconds = round(time.perf_counter() - started, 4)
+        return report
+
+    def sync(self, directory: str) -> list[IngestReport]:
+        """Ingests the CSV exports in `directory` that are new or changed since the last sync.
+
+        A CSV that cannot be ingested (e.g. one that is not an ad export) is logged and reported with its error,
+        and not tried again until it changes; the rest are still ingested.
+        """
+        reports = []
+        with self._lock:
+            for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+                if not entry.name.lower().endswith(".csv") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                path = os.path.abspath(entry.path)
+                known = self.seen.get(path) or self.rejected.get(path)
+                if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+                    continue
+                try:
+                    reports.append(self.ingest(entry.path))
+                except (OSError, ValueError) as e:
+                    logger.warning("Could not ingest %s: %s", entry.path, e)
+                    self.rejected[path] = [stat.st_size, stat.st_mtime]
+                    reports.append(IngestReport(entry.path, error=str(e)))
+                else:
+                    self.rejected.pop(path, None)
+        return reports
+
+    def _merge(self, export: Export) -> IngestReport:
+        report = IngestReport("", export.channel, rows=len(export.days))
+        if not len(export.days):
+            return report
+        channel = CHANNELS.index(export.channel)
+        ids = np.array([self._campaign_id(name) for name in export.campaigns], dtype=np.int64)
+        keys: np.ndarray
+        keys, inverse = np.unique(export.days << _DAY_SHIFT | channel << _CHANNEL_SHIFT | ids, return_inverse=True)
+        values = np.zeros((len(keys), len(MEASURES)))
+        np.add.at(values, inverse.ravel(), export.values)  # Rows of one export with the same key are parts of it
+
+        where = np.searchsorted(self.keys, keys)
+        found = where < len(self.keys)
+        found[found] = self.keys[where[found]] == keys[found]
+        delta = values.copy()
+        delta[found] -= self.values[where[found]]
+        self.values[where[found]] = values[found]
+        self.keys = np.insert(self.keys, where[~found], keys[~found])
+        self.values = np.insert(self.values, where[~found], values[~found], axis=0)
+        self._add_weekly(keys, delta)
+
+        days = keys >> _DAY_SHIFT
+        report.added, report.replaced = int((~found).sum()), int(found.sum())
+        report.first_day, report.last_day = (str(date.fromordinal(date(1970, 1, 1).toordinal() + int(d)))
+                                             for d in (days.min(), days.max()))
+        report.campaigns = len(np.unique(keys & _CAMPAIGN_MASK))
+        return report
+
+    def _campaign_id(self, name: str) -> int:
+        if name not in self._campaign_ids:
+            self._campaign_ids[name] = len(self.campaigns)
+            self.campaigns.append(name)
+        return self._campaign_ids[name]
+
+    def _add_weekly(self, keys: np.ndarray, delta: np.ndarray) -> None:
+        weeks = _week(keys >> _DAY_SHIFT)
+        low, high = int(weeks.min()), int(weeks.max())
+        if not self.weekly.shape[0]:
+            self.first_week = low
+        before = max(self.first_week - low, 0)
+        after = max(high - (self.first_week + self.weekly.shape[0] - 1), 0) if self.weekly.shape[0] else high - low + 1
+        wider = max(len(self.campaigns) - self.weekly.shape[2], 0)
+        if before or after or wider:
+            self.weekly = np.pad(self.weekly, ((before, after), (0, 0), (0, wider), (0, 0)))
+            self.first_week -= before
+        np.add.at(self.weekly, (weeks - self.first_week, (keys >> _CHANNEL_SHIFT) & 0xF, keys & _CAMPAIGN_MASK), delta)
+
+    def _save(self, export: Export, files: dict, seen: dict) -> None:
+        """Saves an ingested export as the next segment, or compacts the store when it has COMPACT_SEGMENTS."""
+        if not os.path.exists(self.path) or len(self._segments) >= COMPACT_SEGMENTS:
+            self._compact()
+            return
+        self._segment += 1
+        root, ext = os.path.splitext(self.path)
+        segment = f"{root}.{self._segment:06d}{ext}"
+        names, campaigns = np.unique(np.asarray(export.campaigns, dtype=str), return_inverse=True)
+        manifest = {"channel": export.channel, "files": files, "seen": seen}
+        tmp = f"{segment}.tmp.npz"
+        np.savez(tmp, days=export.days, campaigns=campaigns.ravel(), names=names, values=export.values,
+                 manifest=np.array(json.dumps(manifest)))
+        os.replace(tmp, segment)
+        self._segments.append(segment)
+
+    def _replay(self, segment: str) -> None:
+        with np.load(segment, allow_pickle=False) as data:
+            manifest = json.loads(str(data["manifest"]))
+            names = data["names"].tolist()
+            export = Export(manifest["channel"], data["days"], [names[i] for i in data["campaigns"].tolist()], data["values"])
+        self._merge(export)
+        self.files.update(manifest["files"])
+        self.seen.update(manifest["seen"])
+
+    def _compact(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        stale = _segment_files(self.path)
+        self._segment = max([self._segment] + [number for number, _ in stale])
+        manifest = {"first_week": self.first_week, "campaigns": self.campaigns, "files": self.files, "seen": self.seen,
+                    "through": self._segment}
+        tmp = f"{self.path}.tmp.npz"
+        np.savez(tmp, keys=self.keys, values=self.values, weekly=self.weekly, manifest=np.array(json.dumps(manifest)))
+        os.replace(tmp, self.path)
+        for _, segment in stale:
+            os.remove(segment)
+        self._segments = []
+
+    # --- Queries ---
+
+    def last_day(self) -> date | None:
+        return date.fromordinal(date(1970, 1, 1).toordinal() + int(self.keys[-1] >> _DAY_SHIFT)) if len(self.keys) else None
+
+    def _select(self, weeks: int | None, channel: str, campaign: str) -> tuple[np.ndarray, int]:
+        """The rollup restricted to the last `weeks` weeks and the given channel and campaign, and its first week."""
+        cube = self.weekly
+        first = self.first_week
+        if weeks:
+            cube = cube[-weeks:]
+            first = self.first_week + self.weekly.shape[0] - cube.shape[0]
+        if channel:
+            mask = np.zeros(len(CHANNELS), dtype=bool)
+            mask[CHANNELS.index(channel)] = True
+            cube = cube * mask[None, :, None, None]
+        if campaign:
+            needle = campaign.lower()
+            mask = np.array([needle in name.lower() for name in self.campaigns], dtype=bool)
+            cube = cube * mask[None, None, :, None]
+        return cube, first
+
+    def performance(self, group_by: str = "campaign", weeks: int | None = None, channel: str = "",
+                    campaign: str = "") -> list[dict]:
+        """Summed measures and CTR, CPL, CPA and ROAS per campaign, channel or week, from the weekly rollup.
+
+        Google Analytics re-counts the ad platforms' traffic, so campaign and week totals leave the 'analytics'
+        channel out unless it is the `channel` asked for; by channel it is a row of its own.
+
+        Args:
+            group_by: 'campaign', 'channel' or 'week'.
+            weeks: Only the last this many weeks of data; all of it when None.
+            channel: Only this channel (see CHANNELS).
+            campaign: Only campaigns whose name contains this (case-insensitive).
+
+        Returns:
+            One row per group: campaigns and channels by spend, most first; weeks in order.
+        """
+        if group_by not in GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUPS)}")
+        if channel and channel not in CHANNELS:
+            raise ValueError(f"channel must be one of {', '.join(CHANNELS)}")
+        with self._lock:
+            cube, first = self._select(weeks, channel, campaign)
+            names = list(self.campaigns)
+        if not channel and group_by != "channel":
+            cube = cube * _AD_PLATFORMS[None, :, None, None]
+        if group_by == "campaign":
+            totals, labels = cube.sum(axis=(0, 1)), names
+        elif group_by == "channel":
+            totals, labels = cube.sum(axis=(0, 2)), list(CHANNELS)
+        else:
+            totals, labels = cube.sum(axis=(1, 2)), [str(week_start(first + i)) for i in range(cube.shape[0])]
+        rows = []
+        for label, row in zip(labels, totals, strict=True):
+            if not row.any():
+                continue
+            rows.append({group_by: label, **{m: round(float(v), 2) for m, v in zip(MEASURES, row, strict=True)}, **metrics(row)})
+        if group_by != "week":
+            rows.sort(key=lambda row: -row["spend"])
+        return rows
+
+    def anomalies(self, lookback: int = 8, threshold: float = 3.0, min_change: float = 0.25, limit: int = 10) -> list[dict]:
+        """Campaigns whose last complete week is out of line with the weeks before it.
+
+        Spend, CTR, CPL and ROAS of each campaign on each channel are compared with their mean over the previous
+        `lookback` weeks, as a z-score; those beyond `threshold` that also moved by at least `min_change` of the
+        mean are reported, as is a campaign that spent with no leads after weeks of getting them. The week holding the latest day is skipped unless that day is a Sunday.
+
+        Returns:
+            Up to `limit` anomalies, largest first, each with the campaign, channel, week, metric, value, usual
+            value, z-score and a one-line description.
+        """
+        with self._lock:
+            last_day = self.last_day()
+            if last_day is None:
+                return []
+            cube, names = self.weekly, list(self.campaigns)
+            last = cube.shape[0] - (1 if last_day.weekday() != 6 else 0) - 1
+        if last < 3:
+            return []
+        window = cube[max(0, last - lookback):last + 1]  # week, channel, campaign, measure
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series = {
+                "spend": window[..., _SPEND],
+                "ctr": 100 * window[..., _CLICKS] / window[..., _IMPRESSIONS],
+                "cpl": window[..., _SPEND] / window[..., _LEADS],
+                "roas": window[..., _REVENUE] / window[..., _SPEND],
+            }
+        found = []
+        active = window[:-1, ..., _SPEND] > 0
+        for metric, raw in series.items():
+            values = np.where(np.isfinite(raw), raw, np.nan)
+            history, current = values[:-1], values[-1]
+            with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # Mean of an empty slice: no history
+                usual = np.nanmean(np.where(active, history, np.nan), axis=0)
+                spread = np.nanstd(np.where(active, history, np.nan), axis=0)
+                z = (current - usual) / np.maximum(spread, np.abs(usual) * 0.05)
+                moved = np.abs(current - usual) >= min_change * np.abs(usual)
+            flagged = (active.sum(axis=0) >= 3) & moved & (np.abs(np.nan_to_num(z)) >= threshold)
+            for channel, campaign in zip(*np.nonzero(flagged), strict=True):
+                found.append(self._anomaly(names[campaign], channel, last, metric, current[channel, campaign],
+                                           usual[channel, campaign], z[channel, campaign]))
+        leads = window[..., _LEADS]
+        dry = (window[-1, ..., _SPEND] > 0) & (leads[-1] == 0) & ((leads[:-1] > 0).sum(axis=0) >= 3)
+        for channel, campaign in zip(*np.nonzero(dry), strict=True):
+            found.append({
+                "campaign": names[campaign], "channel": CHANNELS[channel], "week": str(week_start(self.first_week + last)),
+                "metric": "leads", "value": 0.0, "usual": round(float(leads[:-1, channel, campaign].mean()), 2), "z": None,
+                "description": f"{names[campaign]} ({CHANNELS[channel]}) spent "
+                               f"${window[-1, channel, campaign, _SPEND]:,.0f} with no leads",
+            })
+        found.sort(key=lambda a: -(abs(a["z"]) if a["z"] is not None else float("inf")))
+        return found[:limit]
+
+    def _anomaly(self, name: str, channel: int, week: int, metric: str, value: float, usual: float, z: float) -> dict:
+        direction = "up" if value > usual else "down"
+        return {
+            "campaign": name, "channel": CHANNELS[channel], "week": str(week_start(self.first_week + week)),
+            "metric": metric, "value": round(float(value), 2), "usual": round(float(usual), 2), "z": round(float(z), 1),
+            "description": f"{name} ({CHANNELS[channel]}) {metric.upper() if metric != 'spend' else 'spend'} {direction} "
+                           f"to {value:,.2f} from a usual {usual:,.2f}",
+        }
+
+# --- Formatting ---
+
+def format_table(rows: list[dict], columns: list[str], limit: int = 15) -> str:
+    """A compact pipe table of the first `limit` rows, noting how many more there were."""
+    def cell(value) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:,.2f}".rstrip("0").rstrip(".")
+        return str(value)
+
+    lines = [" | ".join(columns)]
+    lines += [" | ".join(cell(row.get(column)) for column in columns) for row in rows[:limit]]
+    if len(rows) > limit:
+        lines.append(f"... and {len(rows) - limit} more")
+    return "\n".join(lines)
+
+# --- Command Line Entry Point ---
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest ad platform CSV exports and print performance by campaign.")
+    parser.add_argument("exports", nargs="*", help="CSV exports, or directories of them.")
+    parser.add_argument("--store", default=os.getenv("AD_ANALYTICS_PATH") or DEFAULT_STORE_PATH)
+    parser.add_argument("--channel", default="", help=f"The exports' channel when it cannot be told ({', '.join(CHANNELS)}).")
+    parser.add_argument("--group-by", default="campaign", choices=GROUPS)
+    parser.add_argument("--weeks", type=int, help="Only the last this many weeks.")
+    args = parser.parse_args()
+    store = AdStore.open(os.path.expanduser(args.store))
+    for path in args.exports:
+        for report in (store.sync(path) if os.path.isdir(path) else [store.ingest(path, args.channel)]):
+            print(json.dumps(report.__dict__))
+    rows = store.performance(args.group_by, args.weeks)
+    print(format_table(rows, [args.group_by, "spend", "clicks", "leads", "ctr", "cpl", "cpa", "roas"], limit=50))
+    for anomaly in store.anomalies():
+        print(f"! {anomaly['week']}: {anomaly['description']}")
+
+if __name__ == "__main__":
+    main()
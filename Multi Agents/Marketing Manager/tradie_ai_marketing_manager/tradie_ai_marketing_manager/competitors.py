@@ -0,0 +1,238 @@
+# A local competitor directory: businesses loaded from a CSV, indexed by trade and by suburb, town and region,
+# with a per-trade grid of coordinates so "electricians near Hamilton" is a nearest-neighbour lookup.
+import csv
+import math
+import os
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from .seo import REGIONS, normalise_region
+
+DEFAULT_COMPETITORS_PATH = os.path.join(os.path.dirname(__file__), "data", "competitors.csv")
+CELL_DEGREES = 0.1  # Grid cells of about 11 km north-south
+EARTH_RADIUS_KM = 6371.0
+
+# Town centres, so a town with no listed businesses can still be searched around. Suburbs and towns in the
+# directory itself are located from the businesses listed there.
+TOWNS = {
+    "auckland": (-36.8485, 174.7633), "north-shore": (-36.7877, 174.7724), "albany": (-36.7282, 174.6987),
+    "henderson": (-36.8794, 174.6312), "manukau": (-36.9928, 174.8799), "papakura": (-37.0650, 174.9440),
+    "pukekohe": (-37.2000, 174.9000), "whangarei": (-35.7251, 174.3237), "hamilton": (-37.7870, 175.2793),
+    "cambridge": (-37.8847, 175.4714), "te-awamutu": (-38.0092, 175.3247), "tauranga": (-37.6878, 176.1651),
+    "mount-maunganui": (-37.6390, 176.1850), "rotorua": (-38.1368, 176.2497), "whakatane": (-37.9533, 176.9907),
+    "taupo": (-38.6857, 176.0702), "gisborne": (-38.6623, 178.0176), "napier": (-39.4928, 176.9120),
+    "hastings": (-39.6390, 176.8400), "new-plymouth": (-39.0556, 174.0752), "whanganui": (-39.9301, 175.0479),
+    "palmerston-north": (-40.3523, 175.6082), "masterton": (-40.9597, 175.6575), "levin": (-40.6218, 175.2867),
+    "paraparaumu": (-40.9140, 175.0060), "porirua": (-41.1339, 174.8400), "lower-hutt": (-41.2091, 174.9081),
+    "upper-hutt": (-41.1244, 175.0708), "wellington": (-41.2865, 174.7762), "nelson": (-41.2706, 173.2840),
+    "richmond": (-41.3390, 173.1850), "blenheim": (-41.5134, 173.9612), "greymouth": (-42.4500, 171.2070),
+    "christchurch": (-43.5321, 172.6362), "rangiora": (-43.3030, 172.5960), "rolleston": (-43.5960, 172.3790),
+    "ashburton": (-43.9057, 171.7460), "timaru": (-44.3970, 171.2550), "oamaru": (-45.0970, 170.9710),
+    "dunedin": (-45.8788, 170.5028), "queenstown": (-45.0312, 168.6626), "wanaka": (-44.7000, 169.1500),
+    "invercargill": (-46.4132, 168.3538), "gore": (-46.0988, 168.9451),
+}
+
+# What people call a trade, mapped to the trade names used in the directory.
+TRADE_ALIASES = {
+    "plumbing": "plumber", "sparky": "electrician", "sparkie": "electrician", "electrical": "electrician",
+    "building": "builder", "carpenter": "builder", "chippy": "builder", "roofing": "roofer", "painting": "painter",
+    "decorator": "painter", "landscaping": "landscaper", "gardener": "landscaper", "drainage": "drainlayer",
+    "drain-layer": "drainlayer", "gas-fitter": "gasfitter", "gasfitting": "gasfitter", "tiling": "tiler",
+    "heat-pump": "heat pump installer", "heat-pumps": "heat pump installer", "hvac": "heat pump installer",
+}
+
+def slug(text: str) -> str:
+    """'Mt Maunganui' -> 'mt-maunganui', "Hawke's Bay" -> 'hawkes-bay'."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower().replace("'", "")).strip("-")
+
+_PLACE_PREFIX = re.compile(r"^\s*(?:near|in|around)\s+", re.IGNORECASE)
+_COUNTRY_SUFFIX = re.compile(r"[\s,]+(?:new\s+zealand|nz|aotearoa)\.?\s*$", re.IGNORECASE)
+
+def bare_place(location: str) -> str:
+    """Drops 'near'/'in'/'around' and a trailing country: 'near Hamilton' and 'Auckland, New Zealand' -> 'Hamilton', 'Auckland'."""
+    return _COUNTRY_SUFFIX.sub("", _PLACE_PREFIX.sub("", location)).strip(" ,")
+
+def normalise_trade(trade: str) -> str:
+    """Maps 'Plumbers', 'plumbing' or 'sparky' to the directory's trade names ('plumber', 'electrician')."""
+    key = slug(trade)
+    if key in TRADE_ALIASES:
+        return TRADE_ALIASES[key]
+    singular = key[:-1] if key.endswith("s") and not key.endswith("ss") else key
+    return TRADE_ALIASES.get(singular, singular.replace("-", " "))
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+@dataclass(frozen=True)
+class Competitor:
+    name: str
+    trade: str
+    suburb: str
+    town: str
+    region: str
+    lat: float | None = None
+    lon: float | None = None
+    facebook: str = ""
+    instagram: str = ""
+    website: str = ""
+    reviews: int = 0
+
+    def links(self) -> list[str]:
+        return [link for link in (self.facebook, self.instagram, self.website) if link]
+
+def read_competitors(path: str) -> Iterable[Competitor]:
+    """Reads businesses from a CSV with columns name, trade, suburb, town, region, lat, lon, facebook, instagram,
+    website and reviews. Rows without a name or trade are skipped; coordinates and links are optional."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name, trade = (row.get("name") or "").strip(), (row.get("trade") or "").strip()
+            if not name or not trade:
+                continue
+            try:
+                lat = float(row["lat"]) if row.get("lat") else None
+                lon = float(row["lon"]) if row.get("lon") else None
+                reviews = int(row.get("reviews") or 0)
+            except ValueError:
+                lat = lon = None
+                reviews = 0
+            yield Competitor(
+                name=name, trade=normalise_trade(trade), suburb=(row.get("suburb") or "").strip(),
+                town=(row.get("town") or "").strip(), region=normalise_region(row.get("region") or row.get("town") or ""),
+                lat=lat, lon=lon, facebook=(row.get("facebook") or "").strip(), instagram=(row.get("instagram") or "").strip(),
+                website=(row.get("website") or "").strip(), reviews=reviews,
+            )
+
+class CompetitorDirectory:
+    """Competitors indexed by trade, by suburb, town and region, and by grid cell of coordinates per trade.
+
+    Args:
+        competitors: The businesses in the directory.
+    """
+
+    def __init__(self, competitors: Iterable[Competitor]):
+        self.competitors = list(competitors)
+        self._by_trade: dict[str, list[int]] = defaultdict(list)
+        self._by_place: dict[str, list[int]] = defaultdict(list)
+        self._grid: dict[str, dict[tuple[int, int], list[int]]] = defaultdict(lambda: defaultdict(list))
+        sums: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        for i, competitor in enumerate(self.competitors):
+            self._by_trade[competitor.trade].append(i)
+            places = {slug(competitor.suburb), slug(competitor.town), competitor.region} - {""}
+            for place in places:
+                self._by_place[place].append(i)
+            if competitor.lat is not None and competitor.lon is not None:
+                self._grid[competitor.trade][_cell(competitor.lat, competitor.lon)].append(i)
+                for place in places - set(REGIONS):
+                    total = sums[place]
+                    total[0] += competitor.lat
+                    total[1] += competitor.lon
+                    total[2] += 1
+        self.places = dict(TOWNS)
+        for place, (lat, lon, count) in sums.items():
+            self.places.setdefault(place, (lat / count, lon / count))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_COMPETITORS_PATH) -> "CompetitorDirectory":
+        return cls(read_competitors(path))
+
+    @property
+    def trades(self) -> list[str]:
+        return sorted(self._by_trade)
+
+    def place_key(self, location: str) -> str:
+        """The directory's key for a place as people write it ('Christchurch NZ', 'Ponsonby, Auckland').
+
+        Falls back to the first place parse_request finds in it; an unknown place keeps its own slug.
+        """
+        key = slug(bare_place(location))
+        if key in self.places or key in self._by_place or normalise_region(key) in REGIONS:
+            return key
+        _, place = self.parse_request(location)
+        return slug(place) if place else key
+
+    def locate(self, location: str) -> tuple[float, float] | None:
+        """The coordinates of a suburb or town, or None for a region or an unknown place."""
+        return self.places.get(self.place_key(location))
+
+    def parse_request(self, text: str) -> tuple[str | None, str | None]:
+        """Finds the trade and the place a request is about ('electricians near Hamilton' -> ('electrician', 'Hamilton')).
+
+        Either is None when the request does not name one the directory knows.
+        """
+        words = re.findall(r"[A-Za-z'-]+", text)
+        trade = place = None
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(words[start:start + size])
+                key = slug(phrase)
+                if trade is None and normalise_trade(phrase) in self._by_trade:
+                    trade = normalise_trade(phrase)
+                if place is None and len(key) > 2 and (key in self.places or key in self._by_place or normalise_region(phrase) in REGIONS):
+                    place = phrase
+        return trade, place
+
+    def nearest(self, trade: str, lat: float, lon: float, limit: int = 5, radius_km: float = 50.0) -> list[tuple[Competitor, float]]:
+        """The `limit` businesses of a trade closest to a point, within `radius_km`, nearest first.
+
+        Searches rings of grid cells outwards from the point's cell and stops once the ring is further away
+        than the furthest result kept, so only nearby cells are ever measured.
+        """
+        grid = self._grid.get(normalise_trade(trade))
+        if not grid:
+            return []
+        cx, cy = _cell(lat, lon)
+        # A cell is CELL_DEGREES of latitude; longitude cells are narrower the further south, so ring r
+        # is at least r * cell height (in km, scaled by cos(latitude) for the east-west direction) away.
+        cell_km = CELL_DEGREES * math.pi * EARTH_RADIUS_KM / 180 * min(1.0, math.cos(math.radians(lat)))
+        max_ring = int(radius_km / cell_km) + 1
+        found: list[tuple[float, int]] = []
+        for ring in range(max_ring + 1):
+            if len(found) >= limit and (ring - 1) * cell_km > found[limit - 1][0]:
+                break
+            for cell in _ring(cx, cy, ring):
+                for i in grid.get(cell, ()):
+                    competitor = self.competitors[i]
+                    assert competitor.lat is not None and competitor.lon is not None  # Only located businesses are gridded
+                    distance = distance_km(lat, lon, competitor.lat, competitor.lon)
+                    if distance <= radius_km:
+                        found.append((distance, i))
+            found.sort()
+        return [(self.competitors[i], round(distance, 1)) for distance, i in found[:limit]]
+
+    def in_place(self, trade: str, place: str, limit: int = 5) -> list[Competitor]:
+        """Businesses of a trade listed in a suburb, town or region, most reviewed first."""
+        key = self.place_key(place)
+        ids = self._by_place.get(key) or self._by_place.get(normalise_region(key), [])
+        trade = normalise_trade(trade)
+        matches = [self.competitors[i] for i in ids if self.competitors[i].trade == trade]
+        return sorted(matches, key=lambda c: (-c.reviews, c.name))[:limit]
+
+    def find(
+        self, trade: str, location: str, limit: int = 5, radius_km: float = 50.0,
+    ) -> Sequence[tuple[Competitor, float | None]]:
+        """Competitors of a trade around a suburb or town (nearest first), or listed in a region (most reviewed first)."""
+        point = self.locate(location)
+        if point is not None:
+            results = self.nearest(trade, *point, limit=limit, radius_km=radius_km)
+            if results:
+                return results
+        return [(competitor, None) for competitor in self.in_place(trade, location, limit)]
+
+def _cell(lat: float, lon: float) -> tuple[int, int]:
+    return math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES)
+
+def _ring(cx: int, cy: int, ring: int) -> Iterable[tuple[int, int]]:
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
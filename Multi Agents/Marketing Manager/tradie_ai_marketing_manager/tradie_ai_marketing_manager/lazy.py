@@ -0,0 +1,100 @@
+# Lazy agent registration, so specialists and their heavy imports are only built on first use.
+# The same module ships with each of the four agent packages (kept identical by sync_shared.py).
+import importlib
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from google.adk.agents import BaseAgent
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+AgentLoader = str | Callable[[], BaseAgent]
+T = TypeVar("T")
+
+def load_agent(loader: AgentLoader) -> BaseAgent:
+    """Resolves 'package.module:AgentName' (or calls a factory) to an agent instance."""
+    if callable(loader):
+        return loader()
+    module_name, _, attribute = loader.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+class _Placeholder(BaseAgent):
+    """Stands in for a lazy tool's agent while AgentTool sets the tool up; only its name and description are read."""
+
+class LazyAgentTool(AgentTool):
+    """An AgentTool whose agent, and everything its module imports, is only built on first use.
+
+    The tool's name and description are given up front so the coordinator can advertise it without
+    importing the specialist.
+
+    Args:
+        loader: 'package.module:AgentName', or a zero-argument factory returning the agent.
+        name: The agent's name.
+        description: The agent's description, shown to the calling model.
+        skip_summarization: Whether to skip summarization of the agent output.
+    """
+
+    def __init__(self, loader: AgentLoader, name: str, description: str, skip_summarization: bool = False):
+        self._loader = loader
+        self._agent: BaseAgent | None = None
+        self._load_lock = threading.Lock()
+        # AgentTool sets up the tool's own fields; the placeholder it is given is dropped by the agent setter.
+        super().__init__(_Placeholder(name=name, description=description), skip_summarization)
+
+    @property
+    def agent(self) -> BaseAgent:
+        if self._agent is None:
+            with self._load_lock:
+                if self._agent is None:
+                    agent = load_agent(self._loader)
+                    if agent.name != self.name:
+                        raise ValueError(f"Lazy tool '{self.name}' loaded an agent named '{agent.name}'.")
+                    self._agent = agent
+        return self._agent
+
+    @agent.setter
+    def agent(self, agent: BaseAgent) -> None:
+        self._agent = None if isinstance(agent, _Placeholder) else agent
+
+    @property
+    def loaded(self) -> bool:
+        return self._agent is not None
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        # Advertising the tool must not build the agent. Specialists take a single free-text request.
+        if self.loaded:
+            return super()._get_declaration()
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={"request": types.Schema(type=types.Type.STRING)},
+                required=["request"],
+            ),
+        )
+
+class LazyAttributes(Generic[T]):
+    """Backs a module-level __getattr__ so module attributes are built by factories on first access.
+
+    Usage in a module:
+        _lazy = LazyAttributes(globals(), SearchAgent=_build_search_agent)
+        __getattr__ = _lazy.__getattr__
+
+    Type checkers read the module's lazy attributes as whatever the factories return.
+    """
+
+    def __init__(self, namespace: dict, **factories: Callable[[], T]):
+        self._namespace = namespace
+        self._factories = factories
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> T:
+        factory = self._factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {self._namespace.get('__name__')!r} has no attribute {name!r}")
+        with self._lock:
+            if name not in self._namespace:
+                self._namespace[name] = factory()
+        return self._namespace[name]
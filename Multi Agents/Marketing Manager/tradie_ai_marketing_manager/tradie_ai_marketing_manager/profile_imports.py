@@ -0,0 +1,73 @@
+# Import-time profiler: prints a per-module cost breakdown for importing this package's root agent.
+# The same module ships with each of the four agent packages (kept identical by sync_shared.py).
+# Usage: `python -m <package>.profile_imports [module]`.
+import importlib
+import re
+import subprocess
+import sys
+import time
+
+from .lazy import LazyAgentTool
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile_imports(module: str, top: int = 25) -> list[dict]:
+    """Imports `module` in a fresh interpreter with -X importtime and aggregates self time per package.
+
+    Returns:
+        One row per top-level package (plus each of this package's own modules) with self and
+        cumulative milliseconds, sorted by self time. Cumulative time is attributed to the package
+        that first imported a dependency, so it is an upper bound rather than an exclusive cost.
+    """
+    own_package = module.split(".")[0]
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows: dict[str, dict] = {}
+    stack: list[tuple[int, str]] = []
+    # -X importtime prints children before their parent, so walk it in reverse to see parents first.
+    for line in reversed(completed.stderr.splitlines()):
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, depth, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        if name.startswith(own_package):
+            group = name
+        else:
+            parts = name.split(".")
+            group = ".".join(parts[:2]) if parts[0] == "google" else parts[0]
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        row = rows.setdefault(group, {"module": group, "self_ms": 0.0, "cumulative_ms": 0.0})
+        row["self_ms"] += self_us / 1000
+        if not stack or stack[-1][1] != group:
+            # Only count the outermost import of each group, so nested imports are not double counted.
+            row["cumulative_ms"] += cumulative_us / 1000
+        stack.append((depth, group))
+    ordered = sorted(rows.values(), key=lambda r: r["self_ms"], reverse=True)
+    for row in ordered:
+        row["self_ms"] = round(row["self_ms"], 2)
+        row["cumulative_ms"] = round(row["cumulative_ms"], 2)
+    return ordered[:top]
+
+def time_first_use(module: str) -> dict:
+    """Times importing `module` and then materialising every lazy agent tool on its root agent."""
+    started = time.perf_counter()
+    root = importlib.import_module(module).root_agent
+    imported = time.perf_counter()
+    tools = [tool for tool in getattr(root, "tools", []) if isinstance(tool, LazyAgentTool)]
+    for tool in tools:
+        _ = tool.agent  # Builds the agent
+    return {
+        "import_ms": round((imported - started) * 1000, 2),
+        "first_use_all_agents_ms": round((time.perf_counter() - imported) * 1000, 2),
+        "lazy_tools": [tool.name for tool in tools],
+    }
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else f"{__package__}.agent"
+    print(f"{'module':<48} {'self ms':>10} {'cumulative ms':>14}")
+    for row in profile_imports(target):
+        print(f"{row['module']:<48} {row['self_ms']:>10.2f} {row['cumulative_ms']:>14.2f}")
+    print(time_first_use(target))
@@ -0,0 +1,58 @@
+# Routing rules for the local intent router, mirroring the delegation bullets in COORDINATOR_PROMPT.
+# A keyword match skips the coordinator, so patterns name the task (a verb and its object, or a phrase) rather
+# than a single word a request might only mention in passing; anything vaguer is left to the centroid examples.
+from .router import Route
+
+ROUTES = [
+    Route(
+        agent="StrategyAgent",
+        patterns=[
+            r"\bmarketing (strategy|plan)s?\b",
+            r"\b(my|our|local|main|biggest) competitors?\b",
+            r"\bcompetitor (analysis|research)\b",
+            r"\bmarket (research|analysis)\b",
+            r"\btarget (audience|market)\b",
+        ],
+        examples=[
+            "I'm a plumber in Auckland and want more leads. Build me a marketing plan.",
+            "Who are my competitors and what are they doing online?",
+            "What's the best way to reach homeowners in Wellington?",
+            "Which channels should an electrician focus on?",
+            "Help me position my business against the big franchises.",
+        ],
+    ),
+    Route(
+        agent="ContentAgent",
+        patterns=[
+            r"\b(write|draft|create)\b.*\b(post|caption|blog|article|newsletter|ad copy|email campaign)s?\b",
+            r"\bsocial media posts?\b",
+            r"\bad copy\b",
+            r"\bblog (post|article)s?\b",
+        ],
+        examples=[
+            "Write three Facebook posts about our winter hot water special.",
+            "Draft a newsletter for past customers.",
+            "Create ad copy for a Google Search campaign.",
+            "Write a blog article about preventing blocked drains.",
+            "Give me an Instagram caption for this before-and-after photo.",
+        ],
+    ),
+    Route(
+        agent="AnalyticsAgent",
+        patterns=[
+            r"\b(website|google|campaign|marketing) analytics\b",
+            r"\banalytics (reports?|dashboards?)\b",
+            r"\b(marketing|campaign) kpis?\b",
+            r"\b(click[- ]through|conversion|bounce) rates?\b",
+            r"\b(campaign|ad) performance\b",
+            r"\broi (on|of|from)\b",
+        ],
+        examples=[
+            "How did last month's Google Ads campaign perform?",
+            "What's my cost per lead this quarter?",
+            "Report on website traffic and conversions.",
+            "Which posts got the most engagement?",
+            "Is my Facebook advertising paying off?",
+        ],
+    ),
+]
@@ -0,0 +1,270 @@
+# Local SEO keyword engine: a keyword corpus (keyword, volume, difficulty, region) is compiled once into an
+# SQLite FTS5 index with prefix indexes, then ranked against a topic by BM25 weighted by search volume and
+# difficulty. Opening a compiled index is a file open, and results are memoised per topic and region.
+import argparse
+import csv
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from functools import lru_cache
+
+DEFAULT_CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "nz_keywords.csv")
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "tradie_ai", "seo_keywords.sqlite")
+NATIONAL = "nz"
+
+# NZ regions, and the towns people name instead of them.
+REGIONS = (
+    "northland", "auckland", "waikato", "bay-of-plenty", "gisborne", "hawkes-bay", "taranaki", "manawatu-whanganui",
+    "wellington", "tasman", "nelson", "marlborough", "west-coast", "canterbury", "otago", "southland",
+)
+_REGION_ALIASES = {
+    "whangarei": "northland", "hamilton": "waikato", "tauranga": "bay-of-plenty", "rotorua": "bay-of-plenty",
+    "napier": "hawkes-bay", "hastings": "hawkes-bay", "new-plymouth": "taranaki", "palmerston-north": "manawatu-whanganui",
+    "whanganui": "manawatu-whanganui", "wanganui": "manawatu-whanganui", "manawatu": "manawatu-whanganui",
+    "lower-hutt": "wellington", "upper-hutt": "wellington", "porirua": "wellington", "kapiti": "wellington",
+    "blenheim": "marlborough", "greymouth": "west-coast", "christchurch": "canterbury", "timaru": "canterbury",
+    "dunedin": "otago", "queenstown": "otago", "invercargill": "southland", "new-zealand": NATIONAL,
+}
+# The towns a keyword can name, each in its region. A region's own name ('Auckland', 'Nelson') is not a town.
+TOWNS = {town: region for town, region in _REGION_ALIASES.items() if region != NATIONAL and town not in REGIONS}
+
+_TOKEN = re.compile(r"[a-z0-9']{2,}")
+_STOPWORDS = frozenset({
+    "a", "about", "an", "and", "are", "best", "blog", "by", "can", "for", "from", "get", "guide", "how", "i", "in",
+    "is", "it", "my", "near", "of", "on", "or", "our", "post", "the", "to", "top", "what", "when", "where", "which",
+    "why", "with", "you", "your",
+})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keywords (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    town TEXT NOT NULL,
+    weight REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS keyword_index USING fts5(
+    keyword, content='keywords', content_rowid='id', tokenize='porter unicode61', prefix='2 3 4'
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_ANY_MATCH = "SELECT 1 FROM keyword_index WHERE keyword_index MATCH ? LIMIT 1"
+_FORMAT = 2  # Bumped when the index layout changes, so older compiled indexes are rebuilt
+
+def normalise_region(region: str) -> str:
+    """Maps a region or town name to its region slug ('Hawke's Bay' -> 'hawkes-bay', 'Christchurch' -> 'canterbury')."""
+    slug = re.sub(r"[^a-z0-9]+", "-", region.lower().replace("'", "")).strip("-")
+    slug = _REGION_ALIASES.get(slug, slug)
+    return slug or NATIONAL
+
+def named_town(keyword: str) -> str:
+    """The town a keyword names ('blocked drains new plymouth' -> 'new-plymouth'), or '' if it names none."""
+    words = re.findall(r"[a-z]+", keyword.lower().replace("'", ""))
+    for size in (2, 1):
+        for i in range(len(words) - size + 1):
+            slug = "-".join(words[i:i + size])
+            if slug in TOWNS:
+                return slug
+    return ""
+
+def topic_terms(topic: str) -> list[str]:
+    """The topic's words that carry meaning, in order and without repeats."""
+    return list(dict.fromkeys(word for word in _TOKEN.findall(topic.lower()) if word not in _STOPWORDS))
+
+def match_query(terms: list[str], operator: str = "OR") -> str:
+    """An FTS5 query matching each term as a word or a prefix, so 'plumbing' also finds 'plumber'.
+
+    With operator 'AND' a keyword must match every term; with 'OR', any of them.
+    """
+    alternatives = []
+    for term in terms:
+        options = [f'"{term}"', f'"{term}"*']
+        if len(term) > 6:
+            options.append(f'"{term[:5]}"*')
+        alternatives.append(f"({' OR '.join(options)})")
+    return f" {operator} ".join(alternatives)
+
+def opportunity(volume: int, difficulty: int) -> float:
+    """How much a keyword is worth targeting: grows with the log of monthly searches, shrinks with difficulty (0-100)."""
+    return math.log10(10 + max(volume, 0)) * (1 - min(max(difficulty, 0), 100) / 200)
+
+def read_corpus(path: str) -> Iterator[tuple[str, int, int, str]]:
+    """Streams (keyword, volume, difficulty, region) rows from a CSV with those columns; region defaults to national."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            keyword = " ".join((row.get("keyword") or "").split())
+            if not keyword:
+                continue
+            try:
+                volume = int(float(row.get("volume") or 0))
+                difficulty = int(float(row.get("difficulty") or 0))
+            except ValueError:
+                continue
+            yield keyword, volume, difficulty, normalise_region(row.get("region") or NATIONAL)
+
+class KeywordIndex:
+    """A compiled keyword index, opened read-only and memory-mapped.
+
+    Use `KeywordIndex.open` to compile the corpus when the index is missing or older than it.
+
+    Args:
+        path: The compiled index file.
+        cache_size: Topics whose results are memoised.
+        region_boost: How much a keyword for the asked-for region outranks an equally good national one.
+
+    Keywords naming a town are only offered for that town or its region, so a search for Christchurch leaves out
+    Timaru's keywords and a search for Canterbury leaves out Hamilton's.
+    """
+
+    def __init__(self, path: str, cache_size: int = 1024, region_boost: float = 1.5):
+        self.path = path
+        self.region_boost = region_boost
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._db.execute("PRAGMA mmap_size=1073741824")
+        self.size = self._db.execute("SELECT MAX(id) FROM keywords").fetchone()[0] or 0
+        self._cached = lru_cache(maxsize=cache_size)(self._search)
+
+    @classmethod
+    def open(cls, corpus_path: str = DEFAULT_CORPUS_PATH, index_path: str = DEFAULT_INDEX_PATH, **kwargs) -> "KeywordIndex":
+        """Opens the index for `corpus_path`, compiling it first if it is missing or the corpus has changed."""
+        if os.path.exists(corpus_path) and _stored_signature(index_path) != _signature(corpus_path):
+            build_index(corpus_path, index_path)
+        return cls(index_path, **kwargs)
+
+    def search(self, topic: str, region: str = "", limit: int = 10) -> list[dict]:
+        """The `limit` best keywords for a topic, national ones plus those for `region` (a region or town) if given.
+
+        Topics are memoised by their meaningful words, so 'Blocked drains' and 'blocked drains?' share a result.
+        """
+        terms = tuple(topic_terms(topic))
+        if not terms:
+            return []
+        town = named_town(region) if region else ""
+        return [dict(row) for row in self._cached(terms, normalise_region(region) if region else NATIONAL, town, limit)]
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def _search(self, terms: tuple[str, ...], region: str, town: str, limit: int) -> tuple[dict, ...]:
+        regions = tuple(dict.fromkeys((region, NATIONAL)))
+        # The asked-for town, or any town in the asked-for region; keywords naming no town always qualify.
+        towns = ("", town) if town else ("", *(name for name, of in TOWNS.items() if of == region))
+        # bm25() is negative (lower is better); the weight favours searched-for, winnable keywords and the
+        # boost puts the asked-for region's own keywords ahead of national ones.
+        sql = (
+            "SELECT k.keyword, k.volume, k.difficulty, k.region,"
+            " -bm25(keyword_index) * k.weight * (CASE WHEN k.region = ? THEN ? ELSE 1.0 END) AS score"
+            " FROM keyword_index JOIN keywords k ON k.id = keyword_index.rowid"
+            f" WHERE keyword_index MATCH ? AND k.region IN ({', '.join('?' * len(regions))})"
+            f" AND k.town IN ({', '.join('?' * len(towns))})"
+            " ORDER BY score DESC LIMIT ?"
+        )
+        boost = self.region_boost if region != NATIONAL else 1.0
+        # Keywords matching every topic word the corpus knows come first; only when there are too few of them is
+        # every keyword matching any word ranked, which on a large corpus is the expensive query.
+        with self._lock:
+            known = [term for term in terms if self._db.execute(_ANY_MATCH, (match_query([term]),)).fetchone()]
+        queries = [match_query(known, "AND")] if len(known) > 1 else []
+        rows: list[tuple] = []
+        for query in [*queries, match_query(known or list(terms))]:
+            with self._lock:
+                found = self._db.execute(sql, (region, boost, query, *regions, *towns, limit * 8)).fetchall()
+            seen = {row[0] for row in rows}
+            rows += [row for row in found if row[0] not in seen]
+            if len(rows) >= limit * 2:
+                break
+        candidates = [
+            {"keyword": keyword, "volume": volume, "difficulty": difficulty, "region": region, "score": round(score, 3)}
+            for keyword, volume, difficulty, region, score in rows
+        ]
+        return tuple(_diverse(candidates, limit))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def _diverse(candidates: list[dict], limit: int) -> list[dict]:
+    """Picks `limit` keywords in score order, allowing one longer variant ('... cost', '... auckland') per keyword
+    chosen, so a blog post gets several ideas rather than one phrase with different endings. Variants fill any gap."""
+    chosen: list[tuple[frozenset, dict]] = []
+    extended: set[int] = set()
+    skipped = []
+    for candidate in candidates:
+        if len(chosen) == limit:
+            break
+        words = frozenset(candidate["keyword"].lower().split())
+        parent = next((i for i, (other, _) in enumerate(chosen) if other < words), None)
+        if parent is None or parent not in extended:
+            if parent is not None:
+                extended.add(parent)
+            chosen.append((words, candidate))
+        else:
+            skipped.append(candidate)
+    return [candidate for _, candidate in chosen] + skipped[:limit - len(chosen)]
+
+def _signature(corpus_path: str) -> str:
+    stat = os.stat(corpus_path)
+    return f"v{_FORMAT}:{os.path.abspath(corpus_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def _stored_signature(index_path: str) -> str | None:
+    if not os.path.exists(index_path):
+        return None
+    try:
+        db = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'corpus'").fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+def build_index(corpus_path: str, index_path: str = DEFAULT_INDEX_PATH, chunk_size: int = 50_000) -> int:
+    """Compiles a keyword corpus CSV into an index file, replacing it atomically. Returns the number of keywords."""
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    building = f"{index_path}.{os.getpid()}.building"
+    db = sqlite3.connect(building, isolation_level=None)
+    try:
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.executescript(_SCHEMA)
+        db.execute("BEGIN")
+        count, chunk = 0, []
+        for keyword, volume, difficulty, region in read_corpus(corpus_path):
+            count += 1
+            chunk.append((count, keyword, volume, difficulty, region, named_town(keyword), opportunity(volume, difficulty)))
+            if len(chunk) >= chunk_size:
+                _insert(db, chunk)
+                chunk.clear()
+        _insert(db, chunk)
+        db.execute("INSERT INTO keyword_index(keyword_index) VALUES ('optimize')")
+        db.execute("INSERT INTO meta VALUES ('corpus', ?), ('built_at', ?)", (_signature(corpus_path), str(time.time())))
+        db.execute("COMMIT")
+    except BaseException:
+        db.close()
+        os.remove(building)
+        raise
+    db.close()
+    os.replace(building, index_path)
+    return count
+
+def _insert(db: sqlite3.Connection, rows: list[tuple]) -> None:
+    db.executemany("INSERT INTO keywords VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    db.executemany("INSERT INTO keyword_index(rowid, keyword) VALUES (?, ?)", [(row[0], row[1]) for row in rows])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a keyword corpus CSV (keyword,volume,difficulty,region) into an index.")
+    parser.add_argument("corpus", nargs="?", default=os.getenv("SEO_KEYWORDS_PATH") or DEFAULT_CORPUS_PATH)
+    parser.add_argument("--index", default=os.path.expanduser(os.getenv("SEO_INDEX_PATH") or DEFAULT_INDEX_PATH))
+    args = parser.parse_args()
+    started = time.perf_counter()
+    total = build_index(args.corpus, args.index)
+    print(f"Indexed {total} keywords into {args.index} in {time.perf_counter() - started:.1f}s")
@@ -1,14 +1,17 @@
 # A specialist agent for tracking performance and analytics.
 from google.adk.agents import Agent
-from tradie_ai_marketing_manager import prompt
-# from google.adk.tools import ... # Import any built-in tools if needed.
 
-# Define any custom Python tool functions here if needed.
+from tradie_ai_marketing_manager import prompt
+from tradie_ai_marketing_manager.tools import (
+    get_campaign_performance,
+    get_performance_anomalies,
+    ingest_ad_export,
+)
 
 AnalyticsAgent = Agent(
     name="AnalyticsAgent",
     model="gemini-2.5-flash", # A focused, cost-effective model
     description="Tracks marketing campaign performance, analyzes key metrics (KPIs), and generates reports with data-driven insights.",
     instruction=prompt.SPECIALIST_3_PROMPT,
-    # tools=[...] # Add any custom or built-in tools here.
+    tools=[get_campaign_performance, get_performance_anomalies, ingest_ad_export],
 )
@@ -1,9 +1,10 @@
 # A specialist agent for creating marketing content.
 from google.adk.agents import Agent
+
 from tradie_ai_marketing_manager import prompt
 from tradie_ai_marketing_manager.tools import (
-    get_seo_keywords,
     generate_placeholder_image,
+    get_seo_keywords,
 )
 
 # Define any custom Python tool functions here if needed.
@@ -1,16 +1,52 @@
-# The StrategyAgent, now using other agents as tools.
-from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
-from tradie_ai_marketing_manager import prompt
-from tradie_ai_marketing_manager.tools import GoogleSearchAgent, SocialMediaAgent
+# The StrategyAgent: web and competitor research run at the same time, then a planner writes the strategy from both.
+import os
 
-StrategyAgent = Agent(
-    name="StrategyAgent",
+from google.adk.agents import Agent, BaseAgent, SequentialAgent
+from google.adk.tools import google_search
+
+from tradie_ai_marketing_manager import prompt, tools
+from tradie_ai_marketing_manager.research import FunctionBranch, parallel_research
+
+# Not behind the search cache: the branch researches the whole conversation, so the latest message
+# (e.g. 'go ahead') is no key for its answer.
+web_research = Agent(
+    name="StrategyWebResearch",
     model="gemini-2.5-flash",
-    description="Conducts market research, analyzes competitors, and develops marketing strategies and plans by delegating to specialized research agents.",
+    description="Researches demand, customers and competitor advertising on the web for the StrategyAgent.",
+    instruction=prompt.STRATEGY_WEB_RESEARCH_PROMPT,
+    tools=[google_search],
+)
+
+# Competitor lookups go straight to the local directory, costing no model call.
+# COMPETITOR_LOOKUP=agent has a model read the trade and location from the request instead.
+competitor_research: BaseAgent
+if os.getenv("COMPETITOR_LOOKUP", "tool").lower() == "agent":
+    competitor_research = Agent(
+        name="StrategyCompetitorResearch",
+        model="gemini-2.5-flash",
+        description="Finds competitors and their social media for the StrategyAgent.",
+        instruction=prompt.STRATEGY_COMPETITOR_RESEARCH_PROMPT,
+        tools=[tools.get_competitor_social_media],
+    )
+else:
+    competitor_research = FunctionBranch(
+        name="StrategyCompetitorResearch",
+        description="Finds competitors and their social media for the StrategyAgent.",
+        function=tools.research_competitors,
+    )
+
+StrategyPlanner = Agent(
+    name="StrategyPlanner",
+    model="gemini-2.5-flash",
+    description="Writes the marketing strategy and action plan from the research.",
     instruction=prompt.SPECIALIST_1_PROMPT,
-    tools=[
-        AgentTool(agent=GoogleSearchAgent),
-        AgentTool(agent=SocialMediaAgent),
+)
+
+StrategyAgent = SequentialAgent(
+    name="StrategyAgent",
+    description="Conducts market research, analyzes competitors, and develops marketing strategies and plans by delegating to specialized research agents.",
+    sub_agents=[
+        parallel_research("StrategyResearch", {"research_web": web_research, "research_competitors": competitor_research}),
+        StrategyPlanner,
     ],
 )
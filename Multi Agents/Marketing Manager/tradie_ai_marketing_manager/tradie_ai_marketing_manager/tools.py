@@ -1,26 +1,45 @@
 # Central repository for all tools and tool-agents.
+import logging
+import os
+from functools import cache
 
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from .lazy import LazyAttributes
+from .search_cache import SearchCallbacks
+
+logger = logging.getLogger(__name__)
+
 # --- Custom Function Tools --------------------------------------------------
 
-def get_seo_keywords(topic: str) -> list[str]:
+@cache
+def get_keyword_index():
+    """Returns the SEO keyword index, compiling the keyword corpus first if it is new or has changed."""
+    from .seo import DEFAULT_CORPUS_PATH, DEFAULT_INDEX_PATH, KeywordIndex
+
+    return KeywordIndex.open(
+        os.path.expanduser(os.getenv("SEO_KEYWORDS_PATH") or DEFAULT_CORPUS_PATH),
+        os.path.expanduser(os.getenv("SEO_INDEX_PATH") or DEFAULT_INDEX_PATH),
+    )
+
+def get_seo_keywords(topic: str, region: str = "") -> list[str]:
     """
-    Gets a list of SEO keywords for a given topic.
+    Gets a list of SEO keywords for a given topic, most valuable first.
 
     Args:
         topic: The topic to get SEO keywords for.
+        region: Optional NZ region or town the content targets (e.g., 'Auckland', 'Christchurch').
 
     Returns:
         A list of relevant SEO keywords.
     """
-    # This is a simulated function. In a real application, this would
-    # call a real SEO API.
-    print(f"--- TOOL: Getting SEO keywords for {topic} ---")
-    if "plumbing" in topic.lower():
-        return ["emergency plumber", "blocked drain repair", "hot water cylinder", "Auckland plumbing services"]
-    return ["local tradie marketing", "get more leads", "small business social media", f"{topic} marketing"]
+    logger.debug("Getting SEO keywords for %s (%s)", topic, region or "NZ")
+    keywords = [match["keyword"] for match in get_keyword_index().search(topic, region, limit=10)]
+    if not keywords:
+        logger.debug("No indexed keywords match %s", topic)
+        return ["local tradie marketing", "get more leads", "small business social media", f"{topic} marketing"]
+    return keywords
 
 def generate_placeholder_image(topic: str) -> str:
     """
@@ -32,7 +51,7 @@ def generate_placeholder_image(topic: str) -> str:
     Returns:
         A URL for a placeholder image.
     """
-    print(f"--- TOOL: Generating placeholder image for {topic} ---")
+    logger.debug("Generating placeholder image for %s", topic)
     formatted_topic = topic.replace(" ", "+")
     return f"https://placehold.co/600x400?text={formatted_topic}"
 
@@ -42,13 +61,30 @@ def generate_placeholder_image(topic: str) -> str:
 # Note: These agents are not intended to be called directly by the coordinator.
 # They are used as tools by other specialist agents.
 
-GoogleSearchAgent = Agent(
-    name="GoogleSearchAgent",
-    model="gemini-2.5-flash",
-    description="Performs a Google search to find information on the web.",
-    instruction="You are a search agent. Use the google_search tool to answer the user's query.",
-    tools=[google_search],
-)
+# Sits behind the shared search cache, so repeated or concurrent identical queries cost one search.
+web_search_cache = SearchCallbacks(namespace="web")
+
+# Tool-agents are built the first time they are imported or accessed,
+# e.g. `from tradie_ai_marketing_manager.tools import GoogleSearchAgent`.
+def _build_google_search_agent() -> Agent:
+    return Agent(
+        name="GoogleSearchAgent",
+        model="gemini-2.5-flash",
+        description="Performs a Google search to find information on the web.",
+        instruction="You are a search agent. Use the google_search tool to answer the user's query.",
+        tools=[google_search],
+        before_agent_callback=web_search_cache.before_agent,
+        after_model_callback=web_search_cache.after_model,
+        after_agent_callback=web_search_cache.after_agent,
+        on_model_error_callback=web_search_cache.on_model_error,
+    )
+
+@cache
+def get_competitor_directory():
+    """Returns the competitor directory, loaded from COMPETITORS_PATH (or the bundled sample) on first use."""
+    from .competitors import DEFAULT_COMPETITORS_PATH, CompetitorDirectory
+
+    return CompetitorDirectory.load(os.path.expanduser(os.getenv("COMPETITORS_PATH") or DEFAULT_COMPETITORS_PATH))
 
 def get_competitor_social_media(business_type: str, location: str) -> str:
     """
@@ -56,27 +92,149 @@ def get_competitor_social_media(business_type: str, location: str) -> str:
 
     Args:
         business_type: The type of tradie business (e.g., 'plumber', 'electrician').
-        location: The city or area to search in (e.g., 'Auckland', 'Wellington').
+        location: The suburb, town or region to search in (e.g., 'Ponsonby', 'Hamilton', 'Canterbury').
+
+    Returns:
+        A string containing a list of competitors, nearest first, and their social media URLs.
+    """
+    logger.debug("Searching for social media of %ss in %s", business_type, location)
+    from .competitors import bare_place
+
+    results = get_competitor_directory().find(business_type, location, limit=5)
+    place = bare_place(location) or location
+    if not results:
+        return f"No specific social media data found for {business_type} in {place}. Try a broader search."
+    lines = [f"Competitor Social Media Links ({business_type} near {place}):"]
+    for competitor, distance in results:
+        where = f"{competitor.suburb}, {distance} km" if distance is not None else competitor.suburb or competitor.town
+        lines.append(f"- {competitor.name} ({where}): {', '.join(competitor.links()) or 'no links listed'}")
+    return "\n".join(lines)
+
+def research_competitors(request: str) -> str:
+    """
+    Looks up competitors for the trade and place named in a request, for the StrategyAgent's parallel research.
+
+    Args:
+        request: The user's request, e.g. 'I'm a plumber in Auckland and want more leads'.
+
+    Returns:
+        The competitor list from get_competitor_social_media, or a note that the request names no trade or place.
+    """
+    trade, place = get_competitor_directory().parse_request(request)
+    if trade is None or place is None:
+        missing = " and ".join(label for label, value in (("trade", trade), ("location", place)) if value is None)
+        return f"No competitor lookup: the request does not name a {missing}."
+    return get_competitor_social_media(trade, place)
+
+@cache
+def get_ad_store():
+    """Returns the ad performance store from AD_ANALYTICS_PATH, opened on first use."""
+    from .analytics import DEFAULT_STORE_PATH, AdStore
+
+    return AdStore.open(os.path.expanduser(os.getenv("AD_ANALYTICS_PATH") or DEFAULT_STORE_PATH))
+
+def _synced_ad_store():
+    """The ad store, with any new or changed exports in AD_EXPORTS_DIR ingested first.
+
+    Raises:
+        OSError: If the store or the exports directory cannot be read.
+    """
+    store = get_ad_store()
+    exports = os.path.expanduser(os.getenv("AD_EXPORTS_DIR", ""))
+    if exports and os.path.isdir(exports):
+        for report in store.sync(exports):  # Exports that fail are logged by the store and left out
+            if not report.error:
+                logger.info("Ingested %s: %d rows, %d new, %d replaced", report.path, report.rows, report.added, report.replaced)
+    return store
+
+def ingest_ad_export(path: str, channel: str = "") -> str:
+    """
+    Adds a campaign performance CSV export to the analytics store.
+
+    Args:
+        path: The export's file path: a Facebook Ads Manager, Google Ads or Google Analytics report with a row per day and campaign.
+        channel: Optional 'facebook', 'google_ads' or 'analytics' when it cannot be told from the export's columns.
+
+    Returns:
+        What the export added: rows, new and replaced days, the date range and campaigns covered.
+    """
+    logger.debug("Ingesting ad export %s", path)
+    try:
+        report = get_ad_store().ingest(os.path.expanduser(path), channel)
+    except (OSError, ValueError) as e:
+        return f"Could not ingest {path}: {e}"
+    if report.skipped:
+        return f"{path} ({report.channel}) has already been ingested."
+    return (f"Ingested {path} ({report.channel}): {report.rows} rows covering {report.campaigns} campaigns from "
+            f"{report.first_day} to {report.last_day}; {report.added} new campaign-days, {report.replaced} replaced.")
+
+def get_campaign_performance(group_by: str = "campaign", weeks: int = 4, channel: str = "", campaign: str = "") -> str:
+    """
+    Gets ad performance (spend, clicks, leads, CTR, CPL, CPA and ROAS) summed over recent weeks.
+
+    Args:
+        group_by: 'campaign', 'channel' or 'week'.
+        weeks: How many of the most recent weeks to include; 0 for all data.
+        channel: Optional 'facebook', 'google_ads' or 'analytics' to only include that channel. Google Analytics
+            counts the same traffic as the ad platforms, so it is only in campaign and week totals when asked for.
+        campaign: Optional text to only include campaigns whose name contains it.
+
+    Returns:
+        A table with one row per group, campaigns and channels by spend (most first), with CTR in percent,
+        CPL and CPA in dollars and ROAS as revenue per dollar spent.
+    """
+    logger.debug("Getting campaign performance by %s over %s weeks", group_by, weeks or "all")
+    try:
+        store = _synced_ad_store()
+    except (OSError, ValueError) as e:
+        return f"Could not read the ad performance data: {e}"
+    try:
+        rows = store.performance(group_by, weeks or None, channel, campaign)
+    except ValueError as e:
+        return f"Invalid request: {e}"
+    if not rows:
+        return "No ad performance data matches. Exports can be added with ingest_ad_export."
+    from .analytics import format_table
+
+    period = f"last {weeks} weeks" if weeks else "all data"
+    header = f"Ad performance by {group_by} ({period}, data to {store.last_day()}):"
+    return header + "\n" + format_table(rows, [group_by, "spend", "impressions", "clicks", "leads", "conversions",
+                                               "ctr", "cpl", "cpa", "roas"])
+
+def get_performance_anomalies(weeks: int = 8) -> str:
+    """
+    Finds campaigns whose last complete week stands out from the weeks before it: spend, CTR, cost per lead or ROAS
+    well above or below usual, or spend without any leads.
+
+    Args:
+        weeks: How many earlier weeks to compare the last complete week with.
 
     Returns:
-        A string containing a list of competitors and their social media URLs.
+        One line per anomaly, largest first, or a note that there are none.
     """
-    # This is a simulated function. In a real application, this would
-    # call a real API like Google Places or a social media analytics service.
-    print(f"--- TOOL: Searching for social media of {business_type}s in {location} ---")
-    if business_type.lower() == 'plumber' and location.lower() == 'auckland':
-        return (
-            "Competitor Social Media Links:\n"
-            "- Auckland Plumbers Ltd: facebook.com/aucklandplumbers\n"
-            "- Drain-O-Rama: instagram.com/drainorama_akl\n"
-            "- Pipe Dreams Plumbing: facebook.com/pipedreams"
-        )
-    return f"No specific social media data found for {business_type} in {location}. Try a broader search."
-
-SocialMediaAgent = Agent(
-    name="SocialMediaAgent",
-    model="gemini-2.5-flash",
-    description="Finds the social media links of competing businesses in a specific location.",
-    instruction="You are a social media intelligence agent. Use the get_competitor_social_media tool to find competitor information.",
-    tools=[get_competitor_social_media],
+    logger.debug("Looking for performance anomalies against %s weeks", weeks)
+    try:
+        anomalies = _synced_ad_store().anomalies(lookback=weeks)
+    except (OSError, ValueError) as e:
+        return f"Could not read the ad performance data: {e}"
+    if not anomalies:
+        return "No anomalies: every campaign's last complete week is in line with the weeks before it."
+    lines = [f"Performance anomalies (week of {anomalies[0]['week']}):"]
+    lines += [f"- {a['description']}" + (f" (z={a['z']})" if a["z"] is not None else "") for a in anomalies]
+    return "\n".join(lines)
+
+def _build_social_media_agent() -> Agent:
+    return Agent(
+        name="SocialMediaAgent",
+        model="gemini-2.5-flash",
+        description="Finds the social media links of competing businesses in a specific location.",
+        instruction="You are a social media intelligence agent. Use the get_competitor_social_media tool to find competitor information.",
+        tools=[get_competitor_social_media],
+    )
+
+_lazy = LazyAttributes(
+    globals(),
+    GoogleSearchAgent=_build_google_search_agent,
+    SocialMediaAgent=_build_social_media_agent,
 )
+__getattr__ = _lazy.__getattr__
@@ -0,0 +1,330 @@
+# Per-hop tracing and metrics: a runner plugin that records agent, model and tool spans.
+# The same module ships with each of the four agent packages (kept identical by sync_shared.py).
+# Spans go to a JSONL trace file and aggregate metrics to a Prometheus text file and/or HTTP endpoint;
+# set TRACE_PATH, METRICS_PATH or METRICS_PORT to turn it on.
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+@dataclass
+class Span:
+    """One agent invocation, model call or tool call."""
+    kind: str
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: str | None = None
+    agent: str | None = None
+    invocation_id: str | None = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float | None = None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    status: str = "ok"
+    error: str | None = None
+    attributes: dict = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def to_dict(self) -> dict:
+        record = asdict(self)
+        del record["_started"]
+        return {key: value for key, value in record.items() if value not in (None, {})}
+
+# The innermost open span in the current task. Parallel tool calls run in their own tasks, so each
+# sees its parent's span without seeing its siblings'.
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+# --- Sinks ---
+
+class TraceWriter:
+    """Appends finished spans to a JSONL file, flushing at the end of each run.
+
+    Args:
+        path: The JSONL file to append to.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115 - open for the writer's lifetime; close() closes it
+        self._lock = threading.Lock()
+
+    def write(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+class Metrics:
+    """Aggregates spans into Prometheus counters and duration histograms, labelled by kind and name.
+
+    Args:
+        buckets: Upper bounds of the duration histogram, in seconds.
+        collectors: Callables whose Prometheus text is appended to each render, e.g. the model scheduler's.
+    """
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS, collectors: tuple[Callable[[], str], ...] = ()):
+        self.buckets = buckets
+        self.collectors = collectors
+        self._lock = threading.Lock()
+        self._durations: dict[tuple[str, str], list] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+        self._tokens: dict[tuple[str, str, str], int] = {}
+
+    def observe(self, span: Span) -> None:
+        key = (span.kind, span.name)
+        seconds = (span.duration_ms or 0.0) / 1000
+        with self._lock:
+            counts = self._durations.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += seconds
+            if span.status == "error":
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for direction, tokens in (("prompt", span.prompt_tokens), ("completion", span.completion_tokens)):
+                if tokens:
+                    token_key = (span.kind, span.name, direction)
+                    self._tokens[token_key] = self._tokens.get(token_key, 0) + tokens
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP tradie_ai_span_duration_seconds Wall time of agent invocations, model calls and tool calls.",
+            "# TYPE tradie_ai_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (kind, name), counts in sorted(self._durations.items()):
+                labels = f'kind="{kind}",name="{name}"'
+                for bound, count in zip(self.buckets, counts, strict=False):
+                    lines.append(f'tradie_ai_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'tradie_ai_span_duration_seconds_bucket{{{labels},le="+Inf"}} {counts[-2]}')
+                lines.append(f"tradie_ai_span_duration_seconds_count{{{labels}}} {counts[-2]}")
+                lines.append(f"tradie_ai_span_duration_seconds_sum{{{labels}}} {counts[-1]:.6f}")
+            lines += ["# HELP tradie_ai_span_errors_total Spans that ended in an error.",
+                      "# TYPE tradie_ai_span_errors_total counter"]
+            for (kind, name), count in sorted(self._errors.items()):
+                lines.append(f'tradie_ai_span_errors_total{{kind="{kind}",name="{name}"}} {count}')
+            lines += ["# HELP tradie_ai_tokens_total Prompt and completion tokens reported by the model.",
+                      "# TYPE tradie_ai_tokens_total counter"]
+            for (kind, name, direction), count in sorted(self._tokens.items()):
+                lines.append(f'tradie_ai_tokens_total{{kind="{kind}",name="{name}",direction="{direction}"}} {count}')
+        return "\n".join(lines) + "\n" + "".join(collect() for collect in self.collectors)
+
+    def write(self, path: str) -> None:
+        """Atomically rewrites a textfile-collector file with the current metrics."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serves the metrics at http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        return server
+
+# --- Plugin ---
+
+def _usage(llm_response: LlmResponse) -> tuple[int | None, int | None]:
+    usage = llm_response.usage_metadata
+    if usage is None:
+        return None, None
+    return usage.prompt_token_count, usage.candidates_token_count
+
+class TracingPlugin(BasePlugin):
+    """Records a span per agent invocation, model call and tool call, nested by delegation.
+
+    Registered on the root runner, it is inherited by the runners AgentTools start for their
+    sub-agents, so one trace covers the whole delegation tree. Built-in model-side tools such as
+    google_search are part of the model span that uses them.
+
+    Args:
+        trace_path: Optional JSONL file that finished spans are appended to.
+        metrics_path: Optional Prometheus textfile rewritten at the end of each run.
+        metrics: The metrics aggregate to update; a new one is created if not given.
+        metrics_port: Optional port to serve the metrics on, opened when the runner starts its first run
+            rather than when the plugin is built, so importing an agent module never binds a port.
+    """
+
+    def __init__(self, trace_path: str | None = None, metrics_path: str | None = None,
+                 metrics: Metrics | None = None, metrics_port: int | None = None):
+        super().__init__(name="tracing")
+        self.writer = TraceWriter(trace_path) if trace_path else None
+        self.metrics_path = metrics_path
+        self.metrics = metrics or Metrics()
+        self.metrics_port = metrics_port
+        self.server: ThreadingHTTPServer | None = None
+        self._open: dict[tuple, Span] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, key: tuple, kind: str, name: str, invocation_id: str, agent: str | None = None,
+               **attributes: Any) -> None:
+        parent = _current_span.get()
+        span = Span(
+            kind=kind,
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            parent_id=parent.span_id if parent else None,
+            agent=agent,
+            invocation_id=invocation_id,
+            attributes=attributes,
+        )
+        with self._lock:
+            self._open[key] = span
+        _current_span.set(span)
+
+    def _finish(self, key: tuple, error: BaseException | None = None) -> Span | None:
+        with self._lock:
+            span = self._open.pop(key, None)
+        if span is None:
+            return None
+        span.duration_ms = round((time.perf_counter() - span._started) * 1000, 3)
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"
+        if _current_span.get() is span:
+            with self._lock:
+                parent = next((s for s in self._open.values() if s.span_id == span.parent_id), None)
+            _current_span.set(parent)
+        if self.writer:
+            self.writer.write(span)
+        self.metrics.observe(span)
+        return span
+
+    async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> types.Content | None:
+        self._start(("agent", callback_context.invocation_id, agent.name), "agent", agent.name,
+                    callback_context.invocation_id, agent=agent.name)
+        return None
+
+    async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> types.Content | None:
+        self._finish(("agent", callback_context.invocation_id, agent.name))
+        return None
+
+    async def on_agent_error_callback(self, *, agent: BaseAgent, callback_context: CallbackContext,
+                                      error: Exception) -> None:
+        self._finish(("agent", callback_context.invocation_id, agent.name), error)
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name), "model",
+                    callback_context.agent_name, callback_context.invocation_id,
+                    agent=callback_context.agent_name, model=llm_request.model)
+        return None
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        if llm_response.partial:
+            return None
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            span = self._open.get(key)
+        if span is not None:
+            span.prompt_tokens, span.completion_tokens = _usage(llm_response)
+        self._finish(key)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest,
+                                      error: Exception) -> LlmResponse | None:
+        self._finish(("model", callback_context.invocation_id, callback_context.agent_name), error)
+        return None
+
+    async def before_tool_callback(self, *, tool: BaseTool, tool_args: dict[str, Any],
+                                   tool_context: ToolContext) -> dict | None:
+        self._start(("tool", tool_context.function_call_id or tool.name), "tool", tool.name,
+                    tool_context.invocation_id, agent=tool_context.agent_name)
+        return None
+
+    async def after_tool_callback(self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext,
+                                  result: dict) -> dict | None:
+        self._finish(("tool", tool_context.function_call_id or tool.name))
+        return None
+
+    async def on_tool_error_callback(self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext,
+                                     error: Exception) -> dict | None:
+        self._finish(("tool", tool_context.function_call_id or tool.name), error)
+        return None
+
+    def start(self) -> None:
+        """Opens the metrics endpoint, if a port was given and it is not already open."""
+        with self._lock:
+            if self.metrics_port is not None and self.server is None:
+                self.server = self.metrics.serve(self.metrics_port)
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> types.Content | None:
+        self.start()
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        # Agents answered by their own before_agent_callback (e.g. a search-cache hit) end the
+        # invocation without an after_agent_callback; close their spans here.
+        with self._lock:
+            leftover = [key for key, span in self._open.items() if span.invocation_id == invocation_context.invocation_id]
+        for key in leftover:
+            self._finish(key)
+        if self.writer:
+            self.writer.flush()
+        if self.metrics_path:
+            self.metrics.write(self.metrics_path)
+
+    async def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+        with self._lock:
+            server, self.server = self.server, None
+        if server:
+            server.shutdown()
+            server.server_close()
+
+# --- Opt-in ---
+
+def enabled() -> bool:
+    """True when any of TRACE_PATH, METRICS_PATH or METRICS_PORT is set."""
+    return any(os.getenv(name) for name in ("TRACE_PATH", "METRICS_PATH", "METRICS_PORT"))
+
+def tracing_plugin_from_env(collectors: tuple[Callable[[], str], ...] = ()) -> TracingPlugin:
+    """Builds a TracingPlugin from TRACE_PATH, METRICS_PATH and METRICS_PORT, exporting `collectors` alongside its spans.
+
+    The METRICS_PORT endpoint opens with the runner's first run (see TracingPlugin.start), not here.
+    """
+    port = os.getenv("METRICS_PORT")
+    return TracingPlugin(trace_path=os.getenv("TRACE_PATH") or None, metrics_path=os.getenv("METRICS_PATH") or None,
+                         metrics=Metrics(collectors=collectors), metrics_port=int(port) if port else None)
@@ -0,0 +1,74 @@
+# Keeps the modules shared by the agent packages identical. Each package is built and deployed on its own,
+# so each ships its own copy instead of depending on a common distribution. Edit any one copy, then
+#   python sync_shared.py <edited file>   copies it over the other packages' copies, and
+#   python sync_shared.py --check         lists the shared modules whose copies differ (exit status 1).
+# `make check-shared` in any package runs the check.
+import argparse
+import hashlib
+import pathlib
+import shutil
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent
+PACKAGES = {
+    "Business Development Manager/bdm_assistant": "bdm_assistant",
+    "Business Finances/tradie_ai_head_of_finance": "tradie_ai_head_of_finance",
+    "Email Manager/gmail_manager": "gmail_manager",
+    "Marketing Manager/tradie_ai_marketing_manager": "tradie_ai_marketing_manager",
+}
+SHARED = (
+    "{package}/lazy.py", "{package}/profile_imports.py", "{package}/router.py", "{package}/scheduler.py",
+    "{package}/search_cache.py", "{package}/sessions.py", "{package}/tracing.py", "benchmarks/harness.py",
+)
+# Modules only some of the packages ship, with the projects that do.
+SHARED_BY = {
+    "{package}/research.py": ("Business Development Manager/bdm_assistant", "Marketing Manager/tradie_ai_marketing_manager"),
+}
+
+def copies(name: str) -> list[pathlib.Path]:
+    """Every copy of a shared module, e.g. copies('{package}/router.py'), in the packages that ship it."""
+    projects = SHARED_BY.get(name, PACKAGES)
+    return [ROOT / project / name.format(package=PACKAGES[project]) for project in projects]
+
+def check() -> list[str]:
+    """Describes each shared module whose copies are missing or differ; empty when all match."""
+    problems = []
+    for name in (*SHARED, *SHARED_BY):
+        digests: dict[str, list[str]] = {}
+        for path in copies(name):
+            digest = hashlib.sha1(path.read_bytes()).hexdigest()[:10] if path.exists() else "missing"
+            digests.setdefault(digest, []).append(str(path.relative_to(ROOT)))
+        if len(digests) > 1:
+            problems.append(f"{name.format(package='<package>')} differs:\n" + "\n".join(
+                f"  {digest}: {', '.join(paths)}" for digest, paths in sorted(digests.items(), key=lambda item: -len(item[1]))
+            ))
+    return problems
+
+def sync(source: pathlib.Path) -> list[pathlib.Path]:
+    """Copies an edited shared module over the other packages' copies. Returns the files it changed."""
+    source = source.resolve()
+    for name in (*SHARED, *SHARED_BY):
+        paths = copies(name)
+        if source in paths:
+            changed = [path for path in paths if path != source and (not path.exists() or path.read_bytes() != source.read_bytes())]
+            for path in changed:
+                shutil.copyfile(source, path)
+            return changed
+    raise SystemExit(f"{source} is not one of the shared modules")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check or sync the modules shared by the agent packages.")
+    parser.add_argument("source", nargs="?", type=pathlib.Path, help="An edited shared module to copy to the other packages.")
+    parser.add_argument("--check", action="store_true", help="Only report shared modules whose copies differ.")
+    args = parser.parse_args()
+    if args.source and not args.check:
+        for path in sync(args.source):
+            print(f"updated {path.relative_to(ROOT)}")
+    problems = check()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()